@@ -45,7 +45,7 @@ Provided by Honeybee 0.0.65
         simulationOutputs_: A list of the outputs that you would like EnergyPlus to write into the result CSV file.  This can be any set of any outputs that you would like from EnergyPlus, writen as a list of text that will be written into the IDF.  It is recommended that, if you are not expereinced with writing EnergyPlus outputs, you should use the "Honeybee_Write EP Result Parameters" component to request certain types of common outputs.  If no value is input here, this component will automatically request outputs of heating, cooling, lighting, and equipment energy use.
         +++++++++++++++: ...
         _writeIdf: Set to "True" to have the component take your HBZones and other inputs and write them into an IDF file.  The file path of the resulting file will appear in the idfFileAddress output of this component.  Note that only setting this to "True" and not setting the output below to "True" will not automatically run the IDF through EnergyPlus for you.
-        runEnergyPlus_: Set to "True" to have the component run your IDF through EnergyPlus once it has finished writing it.  This will ensure that a CSV result file appears in the resultFileAddress output. Set to 2 if you want the analysis to run in background. This option is useful for parametric runs when you don't want to see command shells.
+        runEnergyPlus_: Set to "True" to have the component run your IDF through EnergyPlus once it has finished writing it.  This will ensure that a CSV result file appears in the resultFileAddress output. Set to 2 if you want the analysis to run in background. This option is useful for parametric runs when you don't want to see command shells. If the model, the weather file and the outputs have not changed since an earlier run, the results are loaded from the result cache and EnergyPlus will not run again.
         +++++++++++++++: ...
         _workingDir_: An optional working directory to a folder on your system, into which your IDF and result files will be written.  NOTE THAT DIRECTORIES INPUT HERE SHOULD NOT HAVE ANY SPACES OR UNDERSCORES IN THE FILE PATH.
         _idfFileName_: Optional text which will be used to name your IDF and result files.  Change this to aviod over-writing results of previous energy simulations.
@@ -62,11 +62,11 @@ Provided by Honeybee 0.0.65
 """
 ghenv.Component.Name = "Honeybee_ Run Energy Simulation"
 ghenv.Component.NickName = 'runEnergySimulation'
-ghenv.Component.Message = 'VER 0.0.65\nJAN_01_2020'
+ghenv.Component.Message = 'VER 0.0.65\nOCT_17_2026'
 ghenv.Component.IconDisplayMode = ghenv.Component.IconDisplayMode.application
 ghenv.Component.Category = "Honeybee"
 ghenv.Component.SubCategory = "10 | Energy | Energy"
-#compatibleHBVersion = VER 0.0.63\nMAR_01_2018
+#compatibleHBVersion = VER 0.0.65\nOCT_17_2026
 #compatibleLBVersion = VER 0.0.59\nJUL_24_2015
 ghenv.Component.AdditionalHelpFromDocStrings = "1"
 
@@ -80,12 +80,50 @@ import Grasshopper.Kernel as gh
 import math
 import shutil
 import collections
-import subprocess
 import copy
 
 rc.Runtime.HostUtils.DisplayOleAlerts(False)
 
 
+class IDFFile(object):
+    """Collect the strings of an idf file and write them to the file in large blocks."""
+    
+    def __init__(self, filePath, bufferSize = 1024 * 1024):
+        self.file = open(filePath, "w")
+        self.bufferSize = bufferSize
+        self.buffer = []
+        self.size = 0
+    
+    def write(self, string):
+        if not isinstance(string, basestring):
+            raise TypeError("expected a character buffer object")
+        self.buffer.append(string)
+        self.size += len(string)
+        if self.size >= self.bufferSize: self.flush()
+    
+    def flush(self):
+        self.file.write("".join(self.buffer))
+        self.buffer = []
+        self.size = 0
+    
+    def close(self):
+        self.flush()
+        self.file.close()
+
+class NameList(list):
+    """A list of names that is checked against a set so the names can be checked quickly before they are written."""
+    
+    def __init__(self, names = None):
+        list.__init__(self, names or [])
+        self.names = set(self)
+    
+    def append(self, name):
+        list.append(self, name)
+        self.names.add(name)
+    
+    def __contains__(self, name):
+        return name in self.names
+
 class WriteIDF(object):
     # Add all HBcontext surfaces from both HBContext_ and HB generator here so that if user connects the same
     # HBcontext surfaces to both HB generator and HBcontext duplicate surfaces will be detected and an error thrown.
@@ -101,6 +139,9 @@ class WriteIDF(object):
     
     financialdata = []
     
+    # max number of strings of the library objects that are kept for the next runs
+    maxLibraryStrings = 10000
+    
     @staticmethod
     def booleanToYesNo(input):
         if input:
@@ -111,6 +152,7 @@ class WriteIDF(object):
     def __init__(self, workingDir):
         self.fileBasedSchedules = {}
         self.workingDir = workingDir
+        self.libraryStrings = self.getLibraryStrings()
         self.PVcount = 0
         self.PVcounter = 0
 
@@ -153,21 +195,19 @@ class WriteIDF(object):
                 '\t' + surface.groundViewFactor + ',\t!- View Factor to Ground\n' + \
                 '\t' + `len(coordinates)` + ',\t!- Number of Vertices\n'
         
-            str_2 = '\t';
-            
-            for ptCount, pt in enumerate(coordinates):
-                if ptCount < len (coordinates) - 1:
-                    str_2 = str_2 + `pt.X` + ',\n\t' + `pt.Y` + ',\n\t' + `pt.Z` + ',\n\t'
-                else:
-                    str_2 = str_2 + `pt.X` + ',\n\t' + `pt.Y` + ',\n\t' + `pt.Z` + ';\n\n'
-            
-            fullString = str_1 + str_2
+            fullString = str_1 + self.EPVertices(coordinates)
             
             return fullString
         
         else:
             return "\n"
     
+    @staticmethod
+    def EPVertices(coordinates):
+        # x, y and z of all the vertices in one join
+        if len(coordinates) == 0: return '\t'
+        return '\t' + ',\n\t'.join([`pt.X` + ',\n\t' + `pt.Y` + ',\n\t' + `pt.Z` for pt in coordinates]) + ';\n\n'
+    
     def extractDDYObjs(self, ddyFile):
         ddyfile = open(ddyFile,"r")
         designDayLines = ['\n']
@@ -417,14 +457,7 @@ class WriteIDF(object):
                             '\t' + `childSrf.Multiplier`+ ',\t!- Multiplier\n' + \
                             '\t' + `len(glzCoordinates)` + ',\t!- Number of Vertices\n'
                 
-                    str_2 = '\t';
-                    for ptCount, pt in enumerate(glzCoordinates):
-                        if ptCount < len (glzCoordinates) - 1:
-                            str_2 = str_2 + `pt.X` + ',\n\t' + `pt.Y` + ',\n\t' + `pt.Z` + ',\n\t'
-                        else:
-                            str_2 = str_2 + `pt.X` + ',\n\t' + `pt.Y` + ',\n\t' + `pt.Z` + ';\n\n'
-                    
-                    glzStr += str_1 + str_2
+                    glzStr += str_1 + self.EPVertices(glzCoordinates)
                 
                 else:
                     glzStr += "\n"
@@ -456,14 +489,7 @@ class WriteIDF(object):
                     '\t' + surface.name + ',\t!- Name\n' + \
                     '\t' + scheduleName + ',\t!- Transmittance Schedule Name\n' + \
                     '\t' + `len(coordinates)` + ',\t!- Number of Vertices\n'    
-            str_2 = '\t';
-            for ptCount, pt in enumerate(coordinates):
-                if ptCount < len (coordinates) - 1:
-                    str_2 = str_2 + `pt.X` + ',\n\t' + `pt.Y` + ',\n\t' + `pt.Z` + ',\n\t'
-                else:
-                    str_2 = str_2 + `pt.X` + ',\n\t' + `pt.Y` + ',\n\t' + `pt.Z` + ';\n\n'
-            
-            fullString = fullString + str_1 + str_2
+            fullString = fullString + str_1 + self.EPVertices(coordinates)
         return fullString
     
     def EPInternalMass(self, zone, massName, srfArea, constructionName):
@@ -1126,26 +1152,11 @@ class WriteIDF(object):
         '\t' + activityScheduleName + ';!- Activity Level Schedule Name\n'
     
     def EPMaterialStr(self, materialName):
-        materialData = None
         materialName = materialName.strip()
-        if materialName in sc.sticky ["honeybee_windowMaterialLib"].keys():
-            materialData = sc.sticky ["honeybee_windowMaterialLib"][materialName]
-        elif materialName in sc.sticky ["honeybee_materialLib"].keys():
-            materialData = sc.sticky ["honeybee_materialLib"][materialName]
-        
-        if materialData!=None:
-            numberOfLayers = len(materialData.keys())
-            materialStr = materialData[0] + ",\n"
-            
-            # add the name
-            materialStr =  materialStr + "  " + materialName + ",   !- name\n"
-            for layer in range(1, numberOfLayers):
-                if layer < numberOfLayers-1:
-                    materialStr =  materialStr + "  " + str(materialData[layer][0]) + ",   !- " +  materialData[layer][1] + "\n"
-                else:
-                    materialStr =  materialStr + "  " + str(materialData[layer][0]) + ";   !- " +  materialData[layer][1] + "\n\n"
-            
-            return materialStr
+        if materialName in sc.sticky ["honeybee_windowMaterialLib"]:
+            return self.EPLibraryObjectStr("material", materialName, "honeybee_windowMaterialLib")
+        elif materialName in sc.sticky ["honeybee_materialLib"]:
+            return self.EPLibraryObjectStr("material", materialName, "honeybee_materialLib")
         else:
             warning = "Failed to find " + materialName + " in library."
             print warning
@@ -1154,24 +1165,12 @@ class WriteIDF(object):
        
     def EPConstructionStr(self, constructionName):
         constructionData = None
-        if constructionName in sc.sticky ["honeybee_constructionLib"].keys():
+        if constructionName in sc.sticky ["honeybee_constructionLib"]:
             constructionData = sc.sticky ["honeybee_constructionLib"][constructionName]
         
         if constructionData!=None:
-            materials = []
-            numberOfLayers = len(constructionData.keys())
-            constructionStr = constructionData[0] + ",\n"
-            # add the name
-            constructionStr =  constructionStr + "  " + constructionName + ",   !- name\n"
-            
-            for layer in range(1, numberOfLayers):
-                if layer < numberOfLayers-1:
-                    constructionStr =  constructionStr + "  " + constructionData[layer][0] + ",   !- " +  constructionData[layer][1] + "\n"
-                else:
-                    constructionStr =  constructionStr + "  " + constructionData[layer][0] + ";   !- " +  constructionData[layer][1] + "\n\n"
-                materials.append(constructionData[layer][0])
-                
-            return constructionStr, materials
+            materials = [constructionData[layer][0] for layer in range(1, len(constructionData.keys()))]
+            return self.EPLibraryObjectStr("construction", constructionName, "honeybee_constructionLib"), materials
         else:
             warning = "Failed to find " + constructionName + " in library."
             print warning
@@ -1240,25 +1239,63 @@ class WriteIDF(object):
 
             return scheduleStr
             
-        if scheduleName in sc.sticky ["honeybee_ScheduleLib"].keys():
-            scheduleData = sc.sticky ["honeybee_ScheduleLib"][scheduleName]
-        elif scheduleName in sc.sticky ["honeybee_ScheduleTypeLimitsLib"].keys():
-            scheduleData = sc.sticky["honeybee_ScheduleTypeLimitsLib"][scheduleName]
+        if scheduleName in sc.sticky ["honeybee_ScheduleLib"]:
+            return self.EPLibraryObjectStr("schedule", scheduleName, "honeybee_ScheduleLib")
+        elif scheduleName in sc.sticky ["honeybee_ScheduleTypeLimitsLib"]:
+            return self.EPLibraryObjectStr("schedule", scheduleName, "honeybee_ScheduleTypeLimitsLib")
+    
+    @classmethod
+    def getLibraryStrings(cls):
+        """
+        Return the strings of the library objects from the previous runs.
+        
+        The strings are removed when there are more than maxLibraryStrings of them.
+        """
+        libraryStrings = sc.sticky.get("honeybee_EPLibraryStrings")
+        if not isinstance(libraryStrings, dict) or not isinstance(libraryStrings.get("strings"), dict) or \
+           len(libraryStrings["strings"]) > cls.maxLibraryStrings:
+            libraryStrings = {"strings": {}}
+            sc.sticky["honeybee_EPLibraryStrings"] = libraryStrings
+        return libraryStrings["strings"]
+    
+    @staticmethod
+    def getLibraryVersion(library):
+        # plain dictionaries don't have a version so their strings can't be reused
+        if not hasattr(library, "version"): return None
+        return id(library), library.version
+    
+    def EPLibraryObjectStr(self, objectType, name, libraryName):
+        """
+        Write an object of the EnergyPlus libraries.
         
-        if scheduleData!=None:
-            numberOfLayers = len(scheduleData.keys())
-            scheduleStr = scheduleData[0] + ",\n"
-            if numberOfLayers == 1:
-                return scheduleStr  + "  " +  scheduleName + ";   !- name\n\n"
+        Strings are kept by library and name and are reused until the version of the library
+        changes. Objects should be replaced in the library and not changed in place for
+        their strings to be written again.
+        """
+        library = sc.sticky[libraryName]
+        objectData = library[name]
+        key = (libraryName, name)
+        version = self.getLibraryVersion(library)
+        if version is not None and key in self.libraryStrings and self.libraryStrings[key][0] == version:
+            return self.libraryStrings[key][1]
+        
+        numberOfLayers = len(objectData.keys())
+        lines = [objectData[0], ",\n"]
+        if numberOfLayers == 1 and objectType == "schedule":
+            lines.extend(["  ", name, ";   !- name\n\n"])
+        else:
             # add the name
-            scheduleStr =  scheduleStr  + "  " +  scheduleName + ",   !- name\n"
-            
-            for layer in range(1, numberOfLayers):
-                if layer < numberOfLayers - 1:
-                    scheduleStr =  scheduleStr + "  " + scheduleData[layer][0] + ",   !- " +  scheduleData[layer][1] + "\n"
-                else:
-                    scheduleStr =  scheduleStr + "  " + str(scheduleData[layer][0]) + ";   !- " +  scheduleData[layer][1] + "\n\n"
-            return scheduleStr
+            lines.extend(["  ", name, ",   !- name\n"])
+        
+        for layer in range(1, numberOfLayers):
+            if layer < numberOfLayers - 1:
+                lines.extend(["  ", str(objectData[layer][0]), ",   !- ", objectData[layer][1], "\n"])
+            else:
+                lines.extend(["  ", str(objectData[layer][0]), ";   !- ", objectData[layer][1], "\n\n"])
+        
+        objectStr = "".join(lines)
+        if version is not None: self.libraryStrings[key] = (version, objectStr)
+        return objectStr
     
     def requestSrfeio(self):
         return '\nOutput:Surfaces:List,\n' + \
@@ -1566,15 +1603,19 @@ class RunIDF(object):
         batchfile.close()
         
         #execute the batch file
-        if runInBackground:		
-            self.runCmd(batchFileAddress)		
-        else:		
-            os.system(batchFileAddress)		
-    
-    def runCmd(self, batchFileAddress, shellKey = True):
-        batchFileAddress.replace("\\", "/")		
-        p = subprocess.Popen(["cmd /c ", batchFileAddress], shell=shellKey, stdout=subprocess.PIPE, stderr=subprocess.PIPE)		
-        out, err = p.communicate()
+        return self.runBatchFile(batchFileAddress, runInBackground)
+    
+    def runBatchFile(self, batchFileAddress, runInBackground = False):
+        if runInBackground:
+            scheduler = sc.sticky["honeybee_JobScheduler"](shell = True, captureOutput = True)
+            job = scheduler.addJob(["cmd /c ", batchFileAddress], os.path.basename(batchFileAddress))
+        else:
+            scheduler = sc.sticky["honeybee_JobScheduler"]()
+            job = scheduler.addJob(batchFileAddress, os.path.basename(batchFileAddress))
+        
+        scheduler.run()
+        print "EnergyPlus ran in %.1f seconds with exit code %s."%(job.duration or 0, job.returnCode)
+        return job
 
 
 sc.sticky["honeybee_WriteIDF"] = WriteIDF
@@ -1698,7 +1739,7 @@ def main(north, epwFileAddress, EPParameters, analysisPeriod, HBZones, HBContext
     reEvaluate.evaluateZones()
     
     idfFileFullName = workingDir + "\\" + idfFileName
-    idfFile = open(idfFileFullName, "w")
+    idfFile = IDFFile(idfFileFullName)
     
     ################## HEADER ###################
     print "[1 of 8] Writing simulation parameters..."
@@ -1793,10 +1834,10 @@ def main(north, epwFileAddress, EPParameters, analysisPeriod, HBZones, HBContext
     # Geometry rules
     idfFile.write(hb_writeIDF.EPGeometryRules())
 
-    EPConstructionsCollection = []
-    EPMaterialCollection = []
-    EPScheduleCollection = []
-    shdCntrlCollection = []
+    EPConstructionsCollection = NameList()
+    EPMaterialCollection = NameList()
+    EPScheduleCollection = NameList()
+    shdCntrlCollection = NameList()
     
     # Shading Surfaces
     if HBContext and HBContext[0]!=None:
@@ -1864,7 +1905,7 @@ def main(north, epwFileAddress, EPParameters, analysisPeriod, HBZones, HBContext
         # create a unique key based on schedules and loads
         # zones with similar keys will be grouped
         key = ",".join(schedules.values() + loads.values())
-        if key not in ZoneCollectionBasedOnSchAndLoads.keys():
+        if key not in ZoneCollectionBasedOnSchAndLoads:
             ZoneCollectionBasedOnSchAndLoads[key] = []
         
         ZoneCollectionBasedOnSchAndLoads[key].append(zone)
@@ -2418,26 +2459,42 @@ def main(north, epwFileAddress, EPParameters, analysisPeriod, HBZones, HBContext
     studyFolder = None
     eioFileFullName = None
     rddFileName = None
+    errorFileFullName = None
     if runEnergyPlus:
-        print "Analysis is running!..."
-        # write the batch file
-        hb_runIDF.writeBatchFile(workingDir, idfFileName, epwFileAddress, sc.sticky["honeybee_folders"]["EPPath"], runEnergyPlus > 1)
-        resultFileFullName = idfFileFullName.replace('.idf', '.csv')
-        eioFileFullName = idfFileFullName.replace('.idf', '.eio')
-        performanceSummaryReport = idfFileFullName.replace('.idf', 'Table.html');
-        rddFileName = idfFileFullName.replace('.idf', '.rdd')
+        # skip the simulation if the same model is already simulated
+        hb_resultCache = sc.sticky["honeybee_EPResultCache"]()
+        cacheKey = hb_resultCache.getKey(idfFileFullName, epwFileAddress, \
+            sc.sticky["honeybee_folders"]["EPVersion"], simulationOutputs)
+        # the cached files stay in the cache while this component outputs their paths
+        resultFiles = hb_resultCache.get(cacheKey, str(ghenv.Component.InstanceGuid))
+        
+        if resultFiles is None:
+            print "Analysis is running!..."
+            # remove the results of an earlier run so they are not cached for this model
+            hb_resultCache.removeResultFiles(idfFileFullName, [workingDir + '\eplusout.csv'])
+            # write the batch file
+            job = hb_runIDF.writeBatchFile(workingDir, idfFileName, epwFileAddress, sc.sticky["honeybee_folders"]["EPPath"], runEnergyPlus > 1)
+            resultFiles = hb_resultCache.getResultFiles(idfFileFullName, job.startTime)
+            if hb_resultCache.isNewFile(workingDir + '\eplusout.csv', job.startTime):
+                resultFiles['.csv'] = workingDir + '\eplusout.csv'
+            if job.returnCode == 0 and job.startTime is not None:
+                hb_resultCache.add(cacheKey, resultFiles)
+            else:
+                print "EnergyPlus did not run successfully. The results are not added to the cache."
+        else:
+            print "The model is not changed since the last simulation. Results are loaded from the cache."
+        
+        resultFileFullName = resultFiles.get('.csv', idfFileFullName.replace('.idf', '.csv'))
+        eioFileFullName = resultFiles.get('.eio', idfFileFullName.replace('.idf', '.eio'))
+        performanceSummaryReport = resultFiles.get('Table.html', idfFileFullName.replace('.idf', 'Table.html'))
+        rddFileName = resultFiles.get('.rdd', idfFileFullName.replace('.idf', '.rdd'))
+        errorFileFullName = resultFiles.get('.err', idfFileFullName.replace('.idf', '.err'))
         studyFolder = originalWorkingDir
-        try:
-            test = open(workingDir + '\eplusout.csv', 'r')
-            test.close()
-            resultFileFullName = workingDir + '\eplusout.csv'
-        except:
-            pass
         print "...\n...\n\nDone! Read below for errors and warnings:\n\n"
     else:
         print "Set runEnergyPlus to True!"
         
-    return idfFileFullName, resultFileFullName, eioFileFullName, rddFileName, performanceSummaryReport, studyFolder
+    return idfFileFullName, resultFileFullName, eioFileFullName, rddFileName, performanceSummaryReport, studyFolder, errorFileFullName
 
 
 if _writeIdf == True and _epwFile and _HBZones and _HBZones[0]!=None:
@@ -2446,10 +2503,9 @@ if _writeIdf == True and _epwFile and _HBZones and _HBZones[0]!=None:
                   HBContext_, simulationOutputs_, _writeIdf, runEnergyPlus_,
                   _workingDir_, _idfFileName_, None)
     if result!= -1:
-        idfFileAddress, resultFileAddress, eioFileAddress, rddFileAddress, htmlReport, studyFolder = result
+        idfFileAddress, resultFileAddress, eioFileAddress, rddFileAddress, htmlReport, studyFolder, errorFileFullName = result
         if runEnergyPlus_:
             try:
-                errorFileFullName = idfFileAddress.replace('.idf', '.err')
                 errFile = open(errorFileFullName, 'r')
                 for line in errFile:
                     print line
@@ -39,11 +39,11 @@ Provided by Honeybee 0.0.65
 
 ghenv.Component.Name = "Honeybee_Call from EP Construction Library"
 ghenv.Component.NickName = 'callFromEPConstrLibrary'
-ghenv.Component.Message = 'VER 0.0.65\nJAN_01_2020'
+ghenv.Component.Message = 'VER 0.0.65\nOCT_17_2026'
 ghenv.Component.IconDisplayMode = ghenv.Component.IconDisplayMode.application
 ghenv.Component.Category = "Honeybee"
 ghenv.Component.SubCategory = "06 | Energy | Material | Construction"
-#compatibleHBVersion = VER 0.0.56\nFEB_01_2015
+#compatibleHBVersion = VER 0.0.65\nOCT_17_2026
 #compatibleLBVersion = VER 0.0.59\nFEB_01_2015
 try: ghenv.Component.AdditionalHelpFromDocStrings = "2"
 except: pass
@@ -67,10 +67,10 @@ if sc.sticky.has_key("honeybee_release") and sc.sticky.has_key("honeybee_constru
     ThermMaterials.sort()
     
     if len(keywords_)!=0 and keywords_[0]!=None:
-        EPConstructions = hb_EPMaterialAUX.searchListByKeyword(EPConstructions, keywords_)
-        EPMaterials = hb_EPMaterialAUX.searchListByKeyword(EPMaterials, keywords_)
-        EPWindowMaterials = hb_EPMaterialAUX.searchListByKeyword(EPWindowMaterials, keywords_)
-        ThermMaterials = hb_EPMaterialAUX.searchListByKeyword(ThermMaterials, keywords_)
+        EPConstructions = hb_EPMaterialAUX.searchListByKeyword(EPConstructions, keywords_, sc.sticky["honeybee_constructionLib"])
+        EPMaterials = hb_EPMaterialAUX.searchListByKeyword(EPMaterials, keywords_, sc.sticky["honeybee_materialLib"])
+        EPWindowMaterials = hb_EPMaterialAUX.searchListByKeyword(EPWindowMaterials, keywords_, sc.sticky["honeybee_windowMaterialLib"])
+        ThermMaterials = hb_EPMaterialAUX.searchListByKeyword(ThermMaterials, keywords_, sc.sticky["honeybee_thermMaterialLib"])
 else:
     print "You should first let the Honeybee fly..."
     w = gh.GH_RuntimeMessageLevel.Warning
@@ -37,11 +37,11 @@ Provided by Honeybee 0.0.65
 
 ghenv.Component.Name = "Honeybee_Call from EP Schedule Library"
 ghenv.Component.NickName = 'callFromEPSCHLibrary'
-ghenv.Component.Message = 'VER 0.0.65\nJAN_01_2020'
+ghenv.Component.Message = 'VER 0.0.65\nOCT_17_2026'
 ghenv.Component.IconDisplayMode = ghenv.Component.IconDisplayMode.application
 ghenv.Component.Category = "Honeybee"
 ghenv.Component.SubCategory = "07 | Energy | Schedule"
-#compatibleHBVersion = VER 0.0.56\nFEB_01_2015
+#compatibleHBVersion = VER 0.0.65\nOCT_17_2026
 #compatibleLBVersion = VER 0.0.59\nFEB_01_2015
 try: ghenv.Component.AdditionalHelpFromDocStrings = "1"
 except: pass
@@ -73,8 +73,8 @@ def main(keywords_):
         scheduleTypeLimits.sort()
         
         if len(keywords_)!=0 and keywords_[0]!=None:
-            scheduleList = hb_EPMaterialAUX.searchListByKeyword(scheduleList, keywords_)
-            scheduleTypeLimits = hb_EPMaterialAUX.searchListByKeyword(scheduleTypeLimits, keywords_)
+            scheduleList = hb_EPMaterialAUX.searchListByKeyword(scheduleList, keywords_, sc.sticky["honeybee_ScheduleLib"])
+            scheduleTypeLimits = hb_EPMaterialAUX.searchListByKeyword(scheduleTypeLimits, keywords_, sc.sticky["honeybee_ScheduleTypeLimitsLib"])
         
         return scheduleTypeLimits, scheduleList
     else:
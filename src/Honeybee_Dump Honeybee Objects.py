@@ -25,6 +25,7 @@ Dump Honeybee Objects
 
 Use this component to dump Honeybee objects to a file on your system.
 You can use load Honeybee objects to load the file to Grasshopper.
+The file is a binary file with a table of contents so load Honeybee objects can load only some of the zones.
 WARNING: This component does not write custom schedules or materials within the file but it does write the names of the constructions and schedules.
 Accordingly, to properly load objects agian, you must connect the full strings of these objects to a "Add to EnergyPlus Library" component in any GH cript that loads the HBZones from the file.
 
@@ -43,17 +44,16 @@ Provided by Honeybee 0.0.65
 
 ghenv.Component.Name = "Honeybee_Dump Honeybee Objects"
 ghenv.Component.NickName = 'dumpHBObjects'
-ghenv.Component.Message = 'VER 0.0.65\nFEB_06_2020'
+ghenv.Component.Message = 'VER 0.0.65\nOCT_17_2026'
 ghenv.Component.IconDisplayMode = ghenv.Component.IconDisplayMode.application
 ghenv.Component.Category = 'HB-Legacy'
 ghenv.Component.SubCategory = "00 | Honeybee"
-#compatibleHBVersion = VER 0.0.59\nDEC_15_2017
+#compatibleHBVersion = VER 0.0.65\nOCT_17_2026
 #compatibleLBVersion = VER 0.0.59\nFEB_01_2015
 try: ghenv.Component.AdditionalHelpFromDocStrings = "6"
 except: pass
 
 
-import cPickle as pickle
 import scriptcontext as sc
 import Grasshopper.Kernel as gh
 import os
@@ -66,6 +66,7 @@ def dumpHBObjects(HBObjects, fileName, workingDir=None):
     hb_ConstrLib = sc.sticky ["honeybee_constructionLib"]
     hb_EPScheduleAUX = sc.sticky["honeybee_EPScheduleAUX"]()
     hb_EPObjectsAux = sc.sticky["honeybee_EPObjectsAUX"]()
+    hb_HBFile = sc.sticky["honeybee_HBFile"]
     if workingDir == None:
         workingDir = sc.sticky["Honeybee_DefaultFolder"] 
     if not fileName.upper().endswith('.HB.'):
@@ -371,10 +372,8 @@ def dumpHBObjects(HBObjects, fileName, workingDir=None):
         assert id in keys,\
             " InputError: Adjacent object %s is not in the list of HBObjects."%name
     
-    HBData = {'ids':ids, 'objs': objs}
-    with open(filePath, "wb") as outf:
-        pickle.dump(HBData, outf)
-        print "Saved file to %s"%filePath
+    hb_HBFile.write(filePath, ids, objs)
+    print "Saved file to %s"%filePath
     return filePath
 
 
@@ -70,7 +70,7 @@ Provided by Honeybee 0.0.65
 
 ghenv.Component.Name = "Honeybee_Energy Shade Benefit Evaluator"
 ghenv.Component.NickName = 'EnergyShadeBenefit'
-ghenv.Component.Message = 'VER 0.0.65\nJAN_01_2020'
+ghenv.Component.Message = 'VER 0.0.65\nOCT_17_2026'
 ghenv.Component.IconDisplayMode = ghenv.Component.IconDisplayMode.application
 ghenv.Component.Category = "Honeybee"
 ghenv.Component.SubCategory = "10 | Energy | Energy"
@@ -537,6 +537,145 @@ def checkSkyResolution(skyResolution, allDataDict, analysisPeriod, latitude, lon
     return allDataDict, finalSunVecs
 
 
+def getMeshFaces(analysisMesh):
+    #Get the vertex coordinates of each mesh face as tuples so that they can be projected without calls to RhinoCommon.
+    meshFaces = []
+    for face in analysisMesh.Faces:
+        if face.IsQuad: vertIndices = [face.A, face.B, face.C, face.D]
+        else: vertIndices = [face.A, face.B, face.C]
+        meshFaces.append([(analysisMesh.Vertices[i].X, analysisMesh.Vertices[i].Y, analysisMesh.Vertices[i].Z) for i in vertIndices])
+    
+    return meshFaces
+
+
+def getShadePlanes(meshFaces, tolerance, maxPlanes = 8):
+    #Group the shade mesh faces by the plane that they lie in and bin their 2D outlines into a grid so that sun rays can be projected analytically.
+    #Return None if the shade is curved (or has too many planes) so that the MeshLine intersection can be used instead.
+    def dot(a, b): return a[0]*b[0] + a[1]*b[1] + a[2]*b[2]
+    def sub(a, b): return (a[0]-b[0], a[1]-b[1], a[2]-b[2])
+    def unitize(a):
+        length = math.sqrt(dot(a, a))
+        if length == 0: return None
+        return (a[0]/length, a[1]/length, a[2]/length)
+    
+    planes = []
+    for faceCount, verts in enumerate(meshFaces):
+        #Newell's method gives a robust normal for both triangles and quads.
+        normal = [0, 0, 0]
+        for i, v in enumerate(verts):
+            n = verts[(i+1)%len(verts)]
+            normal[0] += (v[1] - n[1]) * (v[2] + n[2])
+            normal[1] += (v[2] - n[2]) * (v[0] + n[0])
+            normal[2] += (v[0] - n[0]) * (v[1] + n[1])
+        normal = unitize(normal)
+        if normal == None: continue
+        
+        for v in verts:
+            if abs(dot(sub(v, verts[0]), normal)) > tolerance: return None
+        
+        facePlane = None
+        for plane in planes:
+            if abs(dot(plane["normal"], normal)) > 0.99999 and max([abs(dot(sub(v, plane["origin"]), plane["normal"])) for v in verts]) <= tolerance:
+                facePlane = plane
+                break
+        if facePlane == None:
+            if len(planes) == maxPlanes: return None
+            #Use the first edge from the origin that isn't degenerate and remove its part along the normal.
+            xAxis = None
+            for v in verts[1:]:
+                edge = sub(v, verts[0])
+                edgeNormal = dot(edge, normal)
+                xAxis = unitize((edge[0] - edgeNormal*normal[0], edge[1] - edgeNormal*normal[1], edge[2] - edgeNormal*normal[2]))
+                if xAxis != None: break
+            if xAxis == None: continue
+            yAxis = (normal[1]*xAxis[2] - normal[2]*xAxis[1], normal[2]*xAxis[0] - normal[0]*xAxis[2], normal[0]*xAxis[1] - normal[1]*xAxis[0])
+            facePlane = {"origin": verts[0], "normal": normal, "xAxis": xAxis, "yAxis": yAxis, "faces": []}
+            planes.append(facePlane)
+        
+        polygon = [(dot(sub(v, facePlane["origin"]), facePlane["xAxis"]), dot(sub(v, facePlane["origin"]), facePlane["yAxis"])) for v in verts]
+        facePlane["faces"].append((faceCount, polygon))
+    
+    #Bin the faces of each plane into a grid with cells about the size of a mesh face.
+    for plane in planes:
+        bounds = []
+        for faceCount, polygon in plane["faces"]:
+            us = [p[0] for p in polygon]
+            ws = [p[1] for p in polygon]
+            bounds.append((min(us), min(ws), max(us), max(ws)))
+        binSize = sum([max(b[2]-b[0], b[3]-b[1]) for b in bounds]) / len(bounds)
+        if binSize <= 0: binSize = 1
+        plane["binSize"] = binSize
+        plane["bins"] = {}
+        for (faceCount, polygon), b in zip(plane["faces"], bounds):
+            for i in range(int(math.floor(b[0]/binSize)), int(math.floor(b[2]/binSize)) + 1):
+                for j in range(int(math.floor(b[1]/binSize)), int(math.floor(b[3]/binSize)) + 1):
+                    plane["bins"].setdefault((i, j), []).append((faceCount, polygon))
+    
+    return planes
+
+
+def pointInPolygon(u, w, polygon):
+    inside = False
+    j = len(polygon) - 1
+    for i in range(len(polygon)):
+        ui, wi = polygon[i]
+        uj, wj = polygon[j]
+        if (wi > w) != (wj > w) and u < (uj - ui) * (w - wi) / (wj - wi) + ui:
+            inside = not inside
+        j = i
+    return inside
+
+
+def analytic_projection(shadePlanes, lineLength, windowTestPts, sunVectors, sunVisibility, runParallel):
+    #Project all of the window test points onto the shade planes for each sun vector at once and bin them into the shade cells.
+    #Returns a dictionary of {faceIndex: number of blocked test points} for each sun vector.
+    ptsProjected = []
+    for plane in shadePlanes:
+        o, n, x, y = plane["origin"], plane["normal"], plane["xAxis"], plane["yAxis"]
+        rel = [(p[0]-o[0], p[1]-o[1], p[2]-o[2]) for p in windowTestPts]
+        ptsProjected.append(([r[0]*n[0] + r[1]*n[1] + r[2]*n[2] for r in rel], \
+                             [r[0]*x[0] + r[1]*x[1] + r[2]*x[2] for r in rel], \
+                             [r[0]*y[0] + r[1]*y[1] + r[2]*y[2] for r in rel]))
+    
+    hourlyBlocked = [None] * len(sunVectors)
+    
+    def projectHour(hour):
+        vec = sunVectors[hour]
+        if sunVisibility != None: visiblePts = [ptCount for ptCount in range(len(windowTestPts)) if sunVisibility[ptCount][hour]]
+        else: visiblePts = range(len(windowTestPts))
+        
+        #Keep the closest shade cell that each sun ray hits.
+        closestHit = {}
+        for plane, (ptD, ptU, ptW) in zip(shadePlanes, ptsProjected):
+            n, x, y = plane["normal"], plane["xAxis"], plane["yAxis"]
+            vn = vec[0]*n[0] + vec[1]*n[1] + vec[2]*n[2]
+            if vn == 0: continue
+            vu = vec[0]*x[0] + vec[1]*x[1] + vec[2]*x[2]
+            vw = vec[0]*y[0] + vec[1]*y[1] + vec[2]*y[2]
+            ts = [(ptCount, -ptD[ptCount]/vn) for ptCount in visiblePts]
+            hits = [(ptCount, t, ptU[ptCount] + t*vu, ptW[ptCount] + t*vw) for ptCount, t in ts if 0 <= t <= lineLength]
+            
+            bins, binSize = plane["bins"], plane["binSize"]
+            for ptCount, t, u, w in hits:
+                if ptCount in closestHit and closestHit[ptCount][0] <= t: continue
+                for faceCount, polygon in bins.get((int(math.floor(u/binSize)), int(math.floor(w/binSize))), ()):
+                    if pointInPolygon(u, w, polygon):
+                        closestHit[ptCount] = (t, faceCount)
+                        break
+        
+        blocked = {}
+        for t, faceCount in closestHit.values():
+            blocked[faceCount] = blocked.get(faceCount, 0) + 1
+        hourlyBlocked[hour] = blocked
+    
+    if runParallel == True:
+        tasks.Parallel.ForEach(range(len(sunVectors)), projectHour)
+    else:
+        for hour in range(len(sunVectors)): projectHour(hour)
+    
+    return hourlyBlocked
+
+
 def nonparallel_projection(analysisMesh, sunLines, windowTestPts):
     #Intersect the sun lines with the test mesh
     faceInt = []
@@ -575,126 +714,118 @@ def parallel_projection(analysisMesh, sunLines, windowTestPts):
     return faceInt
 
 
-def valCalc(percentBlocked, ECool, EBeam, cellArea, extraDivisor):
-    #Multiply the Energy by the Percentage Blocked by the Shade
-    ECoolPercent = [a*b for a,b in zip(ECool,percentBlocked)]
-    EBeamPercent = [a*b for a,b in zip(EBeam,percentBlocked)]
-    
-    #Calculate the Thermal Effect of the Shade
-    NegBeam = []
-    for item in EBeamPercent:
-        NegBeam.append(item*(-1))
-    
-    BeamEffectCool = [item1 for item1, item2 in zip(EBeamPercent , ECoolPercent) if item1 < item2]
-    DeltaCool1 = sum(BeamEffectCool)
-    
-    BeamEffectHeat = [item1 for item1, item2 in zip(NegBeam , ECoolPercent) if item1 > item2]
-    DeltaHeat1 = sum(BeamEffectHeat)
-    
-    BeamEffectMid = [item1 for item1, item2, item3 in zip(ECoolPercent , EBeamPercent , NegBeam) if item1 < item2 and item1 > item3]
-    DeltaMidCoolList = []
-    DeltaMidHeatList = []
-    for item in BeamEffectMid:
-        if item > 0: DeltaMidCoolList.append(item)
-        else: DeltaMidHeatList.append(item)
-    
-    DeltaMidCool = sum(DeltaMidCoolList)
-    DeltaMidHeat = sum(DeltaMidHeatList)
-    
-    deltaCooling = DeltaCool1 + DeltaMidCool
-    deltaHeating = DeltaHeat1 + DeltaMidHeat
-    
-    netEffecting = deltaCooling + deltaHeating
+def shadeCoefficients(ECool, EBeam):
+    #Get the energy that shading the whole window would save (cooling) or cost (heating) in each hour.
+    #These are the terms that valCalc used to compare hour by hour, so they only need to be computed once per window.
+    coolCoef = []
+    heatCoef = []
+    for EC, EB in zip(ECool, EBeam):
+        cool = 0
+        heat = 0
+        if EB < EC: cool += EB
+        if -EB > EC: heat += -EB
+        if EC < EB and EC > -EB:
+            if EC > 0: cool += EC
+            else: heat += EC
+        coolCoef.append(cool)
+        heatCoef.append(heat)
+    
+    return coolCoef, heatCoef
+
+
+def valCalc(blockedCounts, testPtsCount, coolCoef, heatCoef, cellAreas, extraDivisor):
+    #Multiply the energy at stake in each hour by the fraction of the window that each cell blocks and sum it over the hours.
+    #blockedCounts has a dictionary of {hour: number of blocked test points} for each cell.
+    coolEffect = []
+    heatEffect = []
+    netEffect = []
+    for cell, cellArea in zip(blockedCounts, cellAreas):
+        #Normalize the effects by the area of the cell such that there is a consistent metric between cells of different areas.
+        #The percent blocked in each hour is count/testPtsCount so the number of test points is part of the divisor.
+        divisor = float(testPtsCount) * cellArea
+        
+        #If the sky resolution is greater than 4, divide the result by the number of additional timesteps that have been added.
+        if extraDivisor != 0: divisor = divisor * extraDivisor
+        
+        deltaCooling = sum([coolCoef[hour] * count for hour, count in cell.iteritems()]) / divisor
+        deltaHeating = sum([heatCoef[hour] * count for hour, count in cell.iteritems()]) / divisor
+        coolEffect.append(deltaCooling)
+        heatEffect.append(deltaHeating)
+        netEffect.append(deltaCooling + deltaHeating)
     
-    #Normalize the effects by the area of the cell such that there is a consistent metric between cells of different areas.
-    coolEffect = (deltaCooling/cellArea)
-    heatEffect = (deltaHeating/cellArea)
-    netEffect = (netEffecting/cellArea)
+    return coolEffect, heatEffect, netEffect
+
+
+def getSunVisibility(contextMesh, windowTestPts, sunVectors):
+    #Check which sun vectors are blocked by the context for each test point.
+    #This only depends on the window so it is done once for all of the shades in front of it.
+    if contextMesh == None: return None
     
-    #If the sky resolution is greater than 4, divide the result by the number of additional timesteps that have been added.
-    if extraDivisor != 0:
-        coolEffect = coolEffect/extraDivisor
-        heatEffect = heatEffect/extraDivisor
-        netEffect = netEffect/extraDivisor
+    sunVisibility = []
+    for pt in windowTestPts:
+        sunVisibility.append([rc.Geometry.Intersect.Intersection.MeshRay(contextMesh, rc.Geometry.Ray3d(pt, vec)) < 0 for vec in sunVectors])
     
-    return coolEffect, heatEffect, netEffect
+    return sunVisibility
+
 
-def evaluateShade(coolingLoad, heatingLoad, beamGain, analysisMesh, analysisAreas, windowMesh, windowTestPts, sunVectors, skyResolution):
+def evaluateShade(coolingLoad, heatingLoad, beamGain, analysisMesh, analysisAreas, windowMesh, windowTestPts, sunVectors, skyResolution, sunVisibility = None):
     #Determine the length to make the sun lines based on the scale of the bounding box around the input geometry.
-    def joinMesh(meshList):
-        joinedMesh = rc.Geometry.Mesh()
-        for m in meshList: joinedMesh.Append(m)
-        return joinedMesh
-    
-    joinedMesh = joinMesh([analysisMesh, windowMesh])
+    joinedMesh = rc.Geometry.Mesh()
+    joinedMesh.Append(analysisMesh)
+    joinedMesh.Append(windowMesh)
     
     boundBox = rc.Geometry.Mesh.GetBoundingBox(joinedMesh, rc.Geometry.Plane.WorldXY)
     
     #Multiply the largest dimension of the bounding box by 2 to ensure that the lines are definitely long enough to intersect the shade.
     lineLength = (max(boundBox.Max - boundBox.Min)) * 2
     
-    #Generate the sun lines for intersection and discount the vector if it intersects a context.
-    sunLines = []
-    if context_:
-        contextMeshes = []
-        for brep in context_:
-            contextMeshes.extend(rc.Geometry.Mesh.CreateFromBrep(brep, rc.Geometry.MeshingParameters.Default))
-        contextMesh = joinMesh(contextMeshes)
-    else: pass
-    
-    for pt in windowTestPts: sunLines.append([]) 
-    
-    for ptCount, pt in enumerate(windowTestPts):
-        for vec in sunVectors:
-            if context_:
-                if rc.Geometry.Intersect.Intersection.MeshRay(contextMesh, rc.Geometry.Ray3d(pt, vec)) < 0:
+    #Count the number of test points blocked by each mesh face for each hour of the year.
+    blockedCounts = []
+    for face in range(analysisMesh.Faces.Count): blockedCounts.append({})
+    
+    shadePlanes = getShadePlanes(getMeshFaces(analysisMesh), sc.doc.ModelAbsoluteTolerance)
+    if shadePlanes != None:
+        #The shade is made of a few planes so project the test points onto them directly.
+        pts = [(pt.X, pt.Y, pt.Z) for pt in windowTestPts]
+        vecs = [(vec.X, vec.Y, vec.Z) for vec in sunVectors]
+        hourlyBlocked = analytic_projection(shadePlanes, lineLength, pts, vecs, sunVisibility, parallel_)
+        for hour, blocked in enumerate(hourlyBlocked):
+            for faceCount, count in blocked.iteritems():
+                blockedCounts[faceCount][hour] = count
+    else:
+        #The shade is curved so intersect a sun line from each test point with the shade mesh.
+        sunLines = []
+        for ptCount, pt in enumerate(windowTestPts):
+            sunLines.append([])
+            for hour, vec in enumerate(sunVectors):
+                if sunVisibility == None or sunVisibility[ptCount][hour]:
                     sunLines[ptCount].append(rc.Geometry.Line(pt, lineLength * vec))
                 else: sunLines[ptCount].append(0)
-            else:
-                sunLines[ptCount].append(rc.Geometry.Line(pt, lineLength * vec))
-            
-    
-    #If parallel is true, then run the intersection through the parallel function.  If not, run it through the normal function.
-    if parallel_ == True:
-        faceInt = parallel_projection(analysisMesh, sunLines, windowTestPts)
-    else:
-        faceInt = nonparallel_projection(analysisMesh, sunLines, windowTestPts)
-    
-    #Convert the Number Of Intersections for Each Mesh Face into a Percent of Sun Blocked by Each Mesh Face for Each Hour of the Year.
-    percentBlocked = []
-    for face in range(analysisMesh.Faces.Count):
-        percentBlocked.append(len(sunVectors) *[0])
-    
-    testPtsCount = len(windowTestPts) 
-    # for each mesh surface,
-    for faceCount, faceData in enumerate(faceInt):
-        # check the number of intersections for each hour
-        counter= collections.Counter(faceData)
         
-        for hour in counter.keys():
-             # store the result in the new percentBlocked list
-             percentBlocked[faceCount][hour] = counter[hour]/testPtsCount
+        #If parallel is true, then run the intersection through the parallel function.  If not, run it through the normal function.
+        if parallel_ == True:
+            faceInt = parallel_projection(analysisMesh, sunLines, windowTestPts)
+        else:
+            faceInt = nonparallel_projection(analysisMesh, sunLines, windowTestPts)
+        
+        for faceCount, faceData in enumerate(faceInt):
+            blockedCounts[faceCount] = dict(collections.Counter(faceData))
     
     #Calculate ECool and EBeam, which signify the cooling energy at stake and the solar energy at stake respectively.
     ECool = [a-b for a,b in zip(coolingLoad,heatingLoad)]
     EBeam = beamGain
+    coolCoef, heatCoef = shadeCoefficients(ECool, EBeam)
     
     #Compare the percent blocked for each hour with the temperatre at that hour in relation to the balance point in order to determine the net value of shading.
     if skyResolution > 4: extraDivisor = (math.pow(2, (skyResolution-4)))
     else: extraDivisor = 0
-    shadeHelpfulness = []
-    shadeHarmfulness = []
-    shadeNetEffect = []
-    for cellCount, cell in enumerate(percentBlocked):
-        shadeHelp, shadeHarm, shadeNet = valCalc(cell, ECool, EBeam, analysisAreas[cellCount], extraDivisor)
-        shadeHelpfulness.append(shadeHelp)
-        shadeHarmfulness.append(shadeHarm)
-        shadeNetEffect.append(shadeNet)
+    shadeHelpfulness, shadeHarmfulness, shadeNetEffect = valCalc(blockedCounts, len(windowTestPts), coolCoef, heatCoef, analysisAreas, extraDivisor)
     
     return shadeHelpfulness, shadeHarmfulness, shadeNetEffect
 
 
 
+
 def main(allDataDict, sunVectors, skyResolution, legendPar, lb_preparation, lb_visualization):
     #Create lists to be filled.
     totalNetEffect = []
@@ -706,6 +837,13 @@ def main(allDataDict, sunVectors, skyResolution, legendPar, lb_preparation, lb_v
     shadeMeshList = []
     calcSuccess = True
     
+    #Mesh the context once since it is shared by all of the windows.
+    contextMesh = None
+    if context_:
+        contextMesh = rc.Geometry.Mesh()
+        for brep in context_:
+            for m in rc.Geometry.Mesh.CreateFromBrep(brep, rc.Geometry.MeshingParameters.Default): contextMesh.Append(m)
+    
     try:
         #Evaluate each shade.
         for windowCount, path in enumerate(allDataDict):
@@ -724,12 +862,13 @@ def main(allDataDict, sunVectors, skyResolution, legendPar, lb_preparation, lb_v
             
             windowMesh = rc.Geometry.Mesh.CreateFromBrep(allDataDict[path]["windowSrf"])[0]
             windowPoints = allDataDict[path]["windowPts"]
+            sunVisibility = getSunVisibility(contextMesh, windowPoints, sunVectors)
             
             for shadeCount, shadeMesh in enumerate(allDataDict[path]["shadeMesh"]):
                 totalShadeGeo.append(shadeMesh)
                 shadeMeshListInit[windowCount].append(shadeMesh)
                 shadeMeshAreas = allDataDict[path]["shadeMeshAreas"][shadeCount]
-                shadeHelpfulness, shadeHarmfulness, shadeNetEffect = evaluateShade(coolingLoad, heatingLoad, beamGain, shadeMesh, shadeMeshAreas, windowMesh, windowPoints, sunVectors, skyResolution)
+                shadeHelpfulness, shadeHarmfulness, shadeNetEffect = evaluateShade(coolingLoad, heatingLoad, beamGain, shadeMesh, shadeMeshAreas, windowMesh, windowPoints, sunVectors, skyResolution, sunVisibility)
                 
                 
                 for item in shadeNetEffect: totalNetEffect.append(item)
@@ -54,6 +54,7 @@ Provided by Honeybee 0.0.65
             1 = Run the OSM and IDF through EnergyPlus with a command prompt window that displays the progress of the simulation
             2 = Run the OSM and IDF through EnergyPlus in the background (without the command line popup window).
             3 = Generate an IDF from the OSM file but do not run it through EnergyPlus
+            If the IDF and the weather file have not changed since an earlier run, the results are loaded from the result cache and EnergyPlus will not run again.
         openOpenStudio_: Set to "True" to open the OSM file in the OpenStudio interface.  This is useful if you want to visualize the HVAC system in OpenStudio, you want to edit the HVAC further in OpenStudio, or just want to run the simulation from OpenStudio instead of Rhino/GH.  Note that, for this to work, you must have .osm files associated with the OpenStudio application.
         fileName_: Optional text which will be used to name your OSM, IDF and result files.  Change this to aviod over-writing results of previous energy simulations.
         workingDir_: An optional working directory to a folder on your system, into which your OSM, IDF and result files will be written.  NOTE THAT DIRECTORIES INPUT HERE SHOULD NOT HAVE ANY SPACES OR UNDERSCORES IN THE FILE PATH.
@@ -72,11 +73,11 @@ Provided by Honeybee 0.0.65
 
 ghenv.Component.Name = "Honeybee_Export To OpenStudio"
 ghenv.Component.NickName = 'exportToOpenStudio'
-ghenv.Component.Message = 'VER 0.0.65\nJAN_01_2020'
+ghenv.Component.Message = 'VER 0.0.65\nOCT_17_2026'
 ghenv.Component.IconDisplayMode = ghenv.Component.IconDisplayMode.application
 ghenv.Component.Category = "Honeybee"
 ghenv.Component.SubCategory = "10 | Energy | Energy"
-#compatibleHBVersion = VER 0.0.56\nMAY_18_2018
+#compatibleHBVersion = VER 0.0.65\nOCT_17_2026
 #compatibleLBVersion = VER 0.0.59\nJUL_24_2015
 ghenv.Component.AdditionalHelpFromDocStrings = "1"
 
@@ -5231,11 +5232,31 @@ class RunOPS(object):
             idfFolder = idfFold.split('ModelToIdf')[0]
         print 'OSM > IDF: ' + str(idfPath)
         
+        idfFilePath = os.path.join(idfFolder, "ModelToIdf", "in.idf")
+        self.errorFile = idfFilePath.replace('.idf', '.err')
         if runEnergyPlus < 3:
-            resultFile = self.writeBatchFile(idfFolder, "ModelToIdf\\in.idf", self.weatherFile, runEnergyPlus > 1)
-            return os.path.join(idfFolder, "ModelToIdf", "in.idf"), resultFile
+            # skip the simulation if the same model is already simulated
+            hb_resultCache = sc.sticky["honeybee_EPResultCache"]()
+            cacheKey = hb_resultCache.getKey(idfFilePath, self.weatherFile, sc.sticky["honeybee_folders"]["EPVersion"])
+            resultFiles = hb_resultCache.get(cacheKey, str(ghenv.Component.InstanceGuid))
+            if resultFiles is None:
+                # remove the results of an earlier run so they are not cached for this model
+                hb_resultCache.removeResultFiles(idfFilePath)
+                startTime = time.time()
+                resultFile = self.writeBatchFile(idfFolder, "ModelToIdf\\in.idf", self.weatherFile, runEnergyPlus > 1)
+                if self.EPReturnCode == 0:
+                    hb_resultCache.add(cacheKey, hb_resultCache.getResultFiles(idfFilePath, startTime))
+                else:
+                    print "EnergyPlus did not run successfully. The results are not added to the cache."
+            else:
+                print "The model is not changed since the last simulation. Results are loaded from the cache."
+                fullPath = idfFilePath.replace('.idf', '')
+                resultFile = tuple(resultFiles.get(extension, fullPath + extension) for extension in \
+                    ("Zsz.csv", ".sql", ".csv", ".rdd", ".eio", "Table.html"))
+                self.errorFile = resultFiles.get('.err', self.errorFile)
+            return idfFilePath, resultFile
         else:
-            return os.path.join(idfFolder, "ModelToIdf", "in.idf"), None
+            return idfFilePath, None
     
     def writeBatchFile(self, workingDir, idfFileName, epwFileAddress, runInBackground = False):
         EPDirectory = self.EPFolder
@@ -5257,9 +5278,9 @@ class RunOPS(object):
         
         #execute the batch file
         if runInBackground:
-            self.runCmd(batchFileAddress)
+            self.EPReturnCode = self.runCmd(batchFileAddress)
         else:
-            os.system(batchFileAddress)
+            self.EPReturnCode = os.system(batchFileAddress)
         
         return fullPath + "Zsz.csv",fullPath+".sql",fullPath+".csv", fullPath+".rdd", fullPath+".eio", fullPath+"Table.html"
     
@@ -5267,6 +5288,7 @@ class RunOPS(object):
         batchFileAddress.replace("\\", "/")
         p = subprocess.Popen(["cmd /c ", batchFileAddress], shell=shellKey, stdout=subprocess.PIPE, stderr=subprocess.PIPE)		
         out, err = p.communicate()
+        return p.returncode
 
 def checkUnits():
     units = sc.doc.ModelUnitSystem
@@ -5647,8 +5669,7 @@ def main(HBZones, HVACSystem, HBContext, north, epwWeatherFile, analysisPeriod,
         idfFile, resultFile = hb_runOPS.runAnalysis(fname, runIt, idfFileP, idfFold)
         if runIt < 3:
             try:
-                errorFileFullName = idfFile.replace('.idf', '.err')
-                errFile = open(errorFileFullName, 'r')
+                errFile = open(hb_runOPS.errorFile, 'r')
                 for line in errFile:
                     print line
                     if "**  Fatal  **" in line:
@@ -47,7 +47,7 @@ Provided by Honeybee 0.0.65
 
 ghenv.Component.Name = "Honeybee_Honeybee"
 ghenv.Component.NickName = 'Honeybee'
-ghenv.Component.Message = 'VER 0.0.65\nFEB_06_2020'
+ghenv.Component.Message = 'VER 0.0.65\nOCT_17_2026'
 ghenv.Component.IconDisplayMode = ghenv.Component.IconDisplayMode.icon
 ghenv.Component.Category = 'HB-Legacy'
 ghenv.Component.SubCategory = "00 | Honeybee"
@@ -78,10 +78,18 @@ import copy
 import urllib2 as urllib
 import cPickle as pickle
 import subprocess
+import hashlib
+import threading
 import uuid
 import re
+import StringIO
 import random
 import zipfile
+import zlib
+import array
+import struct
+import bisect
+import operator
 
 try:
     System.Net.ServicePointManager.SecurityProtocol = System.Net.SecurityProtocolType.Tls12
@@ -380,6 +388,239 @@ class hb_findFolders():
         return None, None
 
 
+class hb_KeywordIndex(object):
+    """
+    An inverted index of names for keyword search.
+    
+    Names are indexed in upper case by the three-character sequences that they include so
+    any part of a name can be looked up (e.g. WALL finds both EXTERIOR WALL and EXTWALL) and
+    the results are the same as calling find on every name. The index also keeps the climate
+    zones that are at the end of the names of the constructions and materials
+    (e.g. ASHRAE 90.1-2010 EXTWALL MASS CLIMATEZONE 1-2). Search results are cached until the
+    index changes so repeated queries for a standard or a surface type are set lookups.
+    """
+    
+    gramSize = 3
+    
+    def __init__(self, names = None):
+        self.names = set()
+        self.grams = {}
+        self.climateZones = {}
+        self.cache = {}
+        if names:
+            for name in names: self.add(name)
+    
+    @classmethod
+    def getGrams(cls, word):
+        return set([word[i:i + cls.gramSize] for i in xrange(len(word) - cls.gramSize + 1)])
+    
+    @staticmethod
+    def parseClimateZones(name):
+        """Return the climate zones of a name that ends with a zone or a range of zones (e.g. 1-2)."""
+        if name.find(" ") == -1: return []
+        clmZoneList = name.split(" ")[-1].split("-")
+        if len(clmZoneList) == 1: return clmZoneList
+        
+        try:
+            return [str(clmZone) for clmZone in range(int(clmZoneList[0]), int(clmZoneList[1]) + 1)]
+        except:
+            return [clmZoneList[0], clmZoneList[1]]
+    
+    def add(self, name):
+        name = name.upper()
+        if name in self.names: return
+        self.names.add(name)
+        for gram in self.getGrams(name):
+            self.grams.setdefault(gram, set()).add(name)
+        for clmZone in self.parseClimateZones(name):
+            self.climateZones.setdefault(clmZone, set()).add(name)
+        self.cache = {}
+    
+    def remove(self, name):
+        name = name.upper()
+        if name not in self.names: return
+        self.names.discard(name)
+        for gram in self.getGrams(name):
+            self.grams[gram].discard(name)
+        for clmZone in self.parseClimateZones(name):
+            self.climateZones[clmZone].discard(name)
+        self.cache = {}
+    
+    def sync(self, names):
+        """Add and remove names so the index has the same names as the input."""
+        names = set([name.upper() for name in names])
+        for name in self.names - names: self.remove(name)
+        for name in names - self.names: self.add(name)
+    
+    def search(self, word):
+        """Return the names that include a word."""
+        word = word.upper()
+        if word in self.cache: return self.cache[word]
+        
+        grams = self.getGrams(word)
+        if grams:
+            postings = sorted([self.grams.get(gram, set()) for gram in grams], key = len)
+            candidates = postings[0].intersection(*postings[1:])
+        else:
+            # the word is too short to use the index
+            candidates = self.names
+        
+        names = frozenset([name for name in candidates if name.find(word) != -1])
+        self.cache[word] = names
+        return names
+    
+    def searchAll(self, words):
+        """Return the names that include all the words."""
+        if not words: return frozenset(self.names)
+        results = sorted([self.search(word) for word in words], key = len)
+        return results[0].intersection(*results[1:])
+    
+    def getNamesInWord(self, word):
+        """Return the names that are part of a word."""
+        word = word.upper()
+        parts = set([word[i:j] for i in xrange(len(word)) for j in xrange(i + 1, len(word) + 1)])
+        return parts.intersection(self.names)
+    
+    def getNamesByClimateZone(self, climateZone):
+        """Return the names for a climate zone. Names for 3 are also returned for 3A."""
+        names = set(self.climateZones.get(climateZone, set()))
+        if climateZone: names.update(self.climateZones.get(climateZone[0], set()))
+        return names
+
+class hb_EPLibrary(dict):
+    """
+    A library of EnergyPlus objects of one type (e.g. materials) by name.
+    
+    This is a dictionary with case-insensitive names. Names are stored in upper case
+    and the library keeps an index of names by the class of the objects
+    (e.g. Material:NoMass) which is the first item of each object.
+    Use "name in library" and not "name in library.keys()" to check for an object.
+    The keyword index for searching the names is created the first time that it is
+    requested and is updated as objects are added or removed. version changes every time
+    that the library changes.
+    """
+    
+    def __init__(self, objects = None):
+        dict.__init__(self)
+        self.classIndex = {}
+        self.keywordIndex = None
+        self.version = 0
+        if objects: self.update(objects)
+    
+    @staticmethod
+    def normalizeName(name):
+        try: return name.upper()
+        except AttributeError: return name
+    
+    @staticmethod
+    def getObjectClass(EPObject):
+        try: return EPObject[0].upper()
+        except: return None
+    
+    def addToClassIndex(self, name, EPObject):
+        # the index may not be there yet while the library is being unpickled
+        classIndex = self.__dict__.setdefault("classIndex", {})
+        classIndex.setdefault(self.getObjectClass(EPObject), set()).add(name)
+        self.__dict__["version"] = self.__dict__.get("version", 0) + 1
+        keywordIndex = self.__dict__.get("keywordIndex")
+        if keywordIndex is not None: keywordIndex.add(name)
+    
+    def removeFromClassIndex(self, name):
+        classIndex = self.__dict__.setdefault("classIndex", {})
+        objClass = self.getObjectClass(dict.__getitem__(self, name))
+        if objClass in classIndex: classIndex[objClass].discard(name)
+        self.__dict__["version"] = self.__dict__.get("version", 0) + 1
+        keywordIndex = self.__dict__.get("keywordIndex")
+        if keywordIndex is not None: keywordIndex.remove(name)
+    
+    def __setitem__(self, name, EPObject):
+        name = self.normalizeName(name)
+        if dict.__contains__(self, name): self.removeFromClassIndex(name)
+        dict.__setitem__(self, name, EPObject)
+        self.addToClassIndex(name, EPObject)
+    
+    def __getitem__(self, name):
+        return dict.__getitem__(self, self.normalizeName(name))
+    
+    def __delitem__(self, name):
+        name = self.normalizeName(name)
+        if dict.__contains__(self, name): self.removeFromClassIndex(name)
+        dict.__delitem__(self, name)
+    
+    def __contains__(self, name):
+        return dict.__contains__(self, self.normalizeName(name))
+    
+    def has_key(self, name):
+        return self.__contains__(name)
+    
+    def get(self, name, default = None):
+        return dict.get(self, self.normalizeName(name), default)
+    
+    def setdefault(self, name, default = None):
+        if name not in self: self[name] = default
+        return self[name]
+    
+    def pop(self, name, *default):
+        name = self.normalizeName(name)
+        if dict.__contains__(self, name): self.removeFromClassIndex(name)
+        return dict.pop(self, name, *default)
+    
+    def update(self, objects = None, **kwargs):
+        if objects:
+            if hasattr(objects, "keys"): objects = [(name, objects[name]) for name in objects.keys()]
+            for name, EPObject in objects: self[name] = EPObject
+        for name, EPObject in kwargs.items(): self[name] = EPObject
+    
+    def clear(self):
+        dict.clear(self)
+        self.classIndex = {}
+        self.keywordIndex = None
+        self.version = self.__dict__.get("version", 0) + 1
+    
+    def copy(self):
+        return hb_EPLibrary(self)
+    
+    def getNamesByClass(self, objClass):
+        """Return the names of the objects of a class (e.g. Material:NoMass)."""
+        return sorted(self.__dict__.get("classIndex", {}).get(objClass.upper(), []))
+    
+    def getKeywordIndex(self):
+        """Return the hb_KeywordIndex of the names in the library."""
+        if self.__dict__.get("keywordIndex") is None:
+            self.keywordIndex = hb_KeywordIndex(self.keys())
+        return self.keywordIndex
+
+class hb_EPLibraries(object):
+    """Access to the EnergyPlus libraries in sc.sticky as hb_EPLibrary."""
+    
+    # the order is the order that names are searched in
+    libraryNames = ["honeybee_windowMaterialLib", "honeybee_materialLib", "honeybee_constructionLib",
+                    "honeybee_ScheduleLib", "honeybee_ScheduleTypeLimitsLib", "honeybee_WindowPropLib",
+                    "honeybee_SpectralDataLib", "honeybee_thermMaterialLib"]
+    
+    @classmethod
+    def install(cls, clean = False):
+        """Make sure all of the EnergyPlus libraries in sc.sticky are hb_EPLibrary."""
+        for libraryName in cls.libraryNames:
+            if clean or not sc.sticky.has_key(libraryName):
+                sc.sticky[libraryName] = hb_EPLibrary()
+            elif not isinstance(sc.sticky[libraryName], hb_EPLibrary):
+                sc.sticky[libraryName] = hb_EPLibrary(sc.sticky[libraryName])
+    
+    @classmethod
+    def find(cls, name, libraryNames = None):
+        """
+        Find an object by name in the libraries.
+        
+        Returns:
+            (libraryName, EPObject) or (None, None) if the object is not in any of the libraries.
+        """
+        if not libraryNames: libraryNames = cls.libraryNames
+        for libraryName in libraryNames:
+            library = sc.sticky[libraryName]
+            if name in library: return libraryName, library[name]
+        return None, None
+
 class PrepareTemplateEPLibFiles(object):
     """
     Download Template files and check for available libraries for EnergyPlus
@@ -387,17 +628,11 @@ class PrepareTemplateEPLibFiles(object):
     def __init__(self, downloadTemplate = False, workingDir = None):
         
         if not workingDir: workingDir = sc.sticky["Honeybee_DefaultFolder"]
-        if not sc.sticky.has_key("honeybee_constructionLib"): sc.sticky ["honeybee_constructionLib"] = {}
-        if not sc.sticky.has_key("honeybee_materialLib"): sc.sticky ["honeybee_materialLib"] = {}
-        if not sc.sticky.has_key("honeybee_windowMaterialLib"): sc.sticky ["honeybee_windowMaterialLib"] = {}
-        if not sc.sticky.has_key("honeybee_ScheduleLib"): sc.sticky["honeybee_ScheduleLib"] = {}
-        if not sc.sticky.has_key("honeybee_ScheduleTypeLimitsLib"): sc.sticky["honeybee_ScheduleTypeLimitsLib"] = {}
-        if not sc.sticky.has_key("honeybee_WindowPropLib"): sc.sticky["honeybee_WindowPropLib"] = {}
-        if not sc.sticky.has_key("honeybee_SpectralDataLib"): sc.sticky["honeybee_SpectralDataLib"] = {}
-        if not sc.sticky.has_key("honeybee_thermMaterialLib"): sc.sticky["honeybee_thermMaterialLib"] = {}
+        hb_EPLibraries.install()
         
         self.downloadTemplate = downloadTemplate
         self.workingDir = workingDir
+        self.standardsFilePath = None
         self.failureMsg = ""
         
     def downloadFile(self, url, workingDir):
@@ -406,16 +641,28 @@ class PrepareTemplateEPLibFiles(object):
         client.DownloadFile(url, localFilePath)
     
     def cleanHBLib(self):
-        sc.sticky ["honeybee_constructionLib"] = {}
-        sc.sticky ["honeybee_materialLib"] = {}
-        sc.sticky ["honeybee_windowMaterialLib"] = {}
-        sc.sticky["honeybee_ScheduleLib"] = {}
-        sc.sticky["honeybee_ScheduleTypeLimitsLib"] = {}
-        sc.sticky["honeybee_WindowPropLib"] = {}
-        sc.sticky["honeybee_SpectralDataLib"] = {}
+        sc.sticky ["honeybee_constructionLib"] = hb_EPLibrary()
+        sc.sticky ["honeybee_materialLib"] = hb_EPLibrary()
+        sc.sticky ["honeybee_windowMaterialLib"] = hb_EPLibrary()
+        sc.sticky["honeybee_ScheduleLib"] = hb_EPLibrary()
+        sc.sticky["honeybee_ScheduleTypeLimitsLib"] = hb_EPLibrary()
+        sc.sticky["honeybee_WindowPropLib"] = hb_EPLibrary()
+        sc.sticky["honeybee_SpectralDataLib"] = hb_EPLibrary()
     
     def cleanThermLib(self):
-        sc.sticky["honeybee_thermMaterialLib"] = {}
+        sc.sticky["honeybee_thermMaterialLib"] = hb_EPLibrary()
+    
+    def loadStandardsFile(self):
+        try:
+            with open(self.standardsFilePath) as jsondata:
+                openStudioStandardLib = json.load(jsondata)
+        except:
+            print 'Download failed!!! You need OpenStudio_Standards.json to use honeybee.' + \
+            '\nPlease check your internet connection, and try again!'
+            return -1
+        
+        print "Standard template file is loaded from %s"%self.standardsFilePath
+        return openStudioStandardLib
     
     def downloadTemplates(self):
         
@@ -476,18 +723,8 @@ class PrepareTemplateEPLibFiles(object):
                 '\nPlease check your internet connection, and try again!'
             return -1
         else:
-            # load the json file
-            filepath = os.path.join(workingDir, 'OpenStudio_Standards.json')
-            try:
-                with open(filepath) as jsondata:
-                    openStudioStandardLib = json.load(jsondata)
-                
-                sc.sticky ["honeybee_OpenStudioStandardsFile"] = openStudioStandardLib
-                print "Standard template file is loaded from %s"%filepath
-            except:
-                print 'Download failed!!! You need OpenStudio_Standards.json to use honeybee.' + \
-                '\nPlease check your internet connection, and try again!'
-                return -1
+            # the json file is loaded with the other libraries
+            self.standardsFilePath = os.path.join(workingDir, 'OpenStudio_Standards.json')
         
         # add custom library
         customEPLib = os.path.join(workingDir,"userCustomEPLibrary.idf")
@@ -535,6 +772,106 @@ class PrepareTemplateEPLibFiles(object):
         return libFilePaths
 
 
+class hb_IDFObject(object):
+    """
+    An EnergyPlus object that is read from an idf file by hb_IDFTokenizer.
+    
+    Attributes:
+        objClass: Class of the object as it is written in the file (e.g. Material).
+        fields: A list of (value, comment) for the fields after the class. The first
+            field is the name of the object. comment is the text after ! on the line
+            that the field ends in or an empty string.
+        offset: Byte offset of the first character of the object in the file.
+    """
+    
+    def __init__(self, objClass, fields, offset):
+        self.objClass = objClass
+        self.fields = fields
+        self.offset = offset
+    
+    @property
+    def name(self):
+        if self.fields: return self.fields[0][0]
+        return ""
+    
+    def __repr__(self):
+        return "%s: %s"%(self.objClass, self.name)
+
+class hb_IDFTokenizer(object):
+    """
+    Stream the objects of an idf file one at a time.
+    
+    Comments, several objects or fields on the same line and a last line without a
+    new line are supported. The file is read line by line so large files can be
+    scanned without loading them to memory.
+    
+    Args:
+        idfFile: Path to an idf file or an open file. Open files in binary mode
+            for the offsets to be the position of the objects in the file.
+    
+    Usage:
+        for EPObject in hb_IDFTokenizer(r"C:\ladybug\sample.idf"):
+            print EPObject.objClass, EPObject.name, EPObject.offset
+    """
+    
+    separators = re.compile(r"([,;])")
+    
+    def __init__(self, idfFile):
+        self.idfFile = idfFile
+    
+    def __iter__(self):
+        if isinstance(self.idfFile, basestring):
+            with open(self.idfFile, "rb") as inf:
+                for EPObject in self.tokenize(inf):
+                    yield EPObject
+        else:
+            for EPObject in self.tokenize(self.idfFile):
+                yield EPObject
+    
+    def tokenize(self, inf):
+        try: offset = inf.tell()
+        except: offset = 0
+        
+        fieldText = []
+        fields = []
+        objOffset = None
+        
+        for line in inf:
+            lineOffset = offset
+            offset += len(line)
+            
+            if "!" in line:
+                content, comment = line.split("!", 1)
+                comment = comment.rstrip("\r\n")
+            else:
+                content, comment = line, ""
+            
+            # fields and objects that end on this line get the comment of the line
+            lineFields = []
+            lineObjects = []
+            position = 0
+            for part in self.separators.split(content):
+                if part == "," or part == ";":
+                    field = ["".join(fieldText).strip(), ""]
+                    fieldText = []
+                    fields.append(field)
+                    lineFields.append(field)
+                    if part == ";":
+                        if fields[0][0] or len(fields) > 1:
+                            lineObjects.append(hb_IDFObject(fields[0][0], fields[1:], objOffset))
+                        fields = []
+                        objOffset = None
+                elif part:
+                    if objOffset is None and part.strip():
+                        objOffset = lineOffset + position + len(part) - len(part.lstrip())
+                    fieldText.append(part)
+                position += len(part)
+            
+            for field in lineFields: field[1] = comment
+            for EPObject in lineObjects:
+                EPObject.fields = [tuple(field) for field in EPObject.fields]
+                yield EPObject
+
 class HB_GetEPLibraries:
     
     def __init__(self):
@@ -600,72 +937,42 @@ class HB_GetEPLibraries:
             "MaterialProperty": {}
             }
             
-    # TODO: Support parsing for files with no next line
-    # TODO: Check if keys can be case insensitive
-    # TODO: Create EPObjects and not dictionaries
-    def loadEPConstructionsMaterialsAndSchedules(self, EPObjectsString, cleanCurrentLib = True):
+    def loadEPConstructionsMaterialsAndSchedules(self, EPObjects, cleanCurrentLib = True):
+        """
+        Add EnergyPlus objects to the libraries.
+        
+        Args:
+            EPObjects: A list of hb_IDFObject or EnergyPlus objects as strings.
+        """
         if cleanCurrentLib: self.cleanHBLibs()
         
-        for EPObjectStr in EPObjectsString:
-            rawLines = EPObjectStr.strip().split("\n")
-            lines = []
-            for line in rawLines:
-                if line.strip() == '' or line.startswith('!'): continue
-                lines.append(line)
-            
-            if not lines:
-                continue
-            
-            if lines[0].startswith('MaterialProperty:GlazingSpectralData'):
-                key = 'MaterialProperty:GlazingSpectralData'
-                shortKey = 'MaterialProperty'
-                name = lines[1].split(",")[0].strip().upper()
-                self.libraries[shortKey][name] = dict() # create an empty dictonary
-                self.libraries[shortKey][name][0] = key
-                # store the data into the dictionary
-                for lineCount, line in enumerate(lines):
-                    objValue = line.split("!")[0].strip()
-                    try: objDescription = line.split("!")[1].strip()
-                    except:  objDescription = ""
-                    if lineCount == 0:
-                        self.libraries[shortKey][name][lineCount] = objValue[:-1]
-                    elif lineCount == 1:
-                        pass # name is already there as the key
-                    elif objValue.endswith(","):
-                        self.libraries[shortKey][name][lineCount-1] = objValue[:-1], objDescription
-                    elif objValue.endswith(";"):
-                        self.libraries[shortKey][name][lineCount-1] = objValue[:-1], objDescription
+        for EPObject in EPObjects:
+            if isinstance(EPObject, basestring):
+                for EPSubObject in hb_IDFTokenizer(StringIO.StringIO(EPObject)):
+                    self.addEPObject(EPSubObject)
             else:
-                if len(lines) < 2: continue
-                
-                if lines[0].split(",")[0].strip().isupper():
-                    key = lines[0].split(",")[0].strip().title()
-                else:
-                    key = lines[0].split(",")[0].strip()
-                shortKey = key.split(":")[0]
-                
-                name = lines[1].split(",")[0].strip().upper()
-                values = lines[2:]
-                # it's a two line object such as Any Number scheduleTypeLimit
-                if values == []:
-                    name = lines[1].split(";")[0].strip().upper() # name is the last input
-                    
-                if shortKey in self.libraries:
-                    self.libraries[shortKey][name] = dict() # create an empty dictonary
-                    self.libraries[shortKey][name][0] = key
-                    
-                    count = 1
-                    delimiter = ","
-                    for value in values:
-                        if not len(value.strip()): continue #pass empty lines
-                        if count==len(values): delimiter = ";"
-                        v = value.split(delimiter)[0].strip() # find the  value
-                        if value.find("!")!= -1:
-                            c = value.split("!")[-1].rstrip() # find the  value
-                        else:
-                            c = ""
-                        self.libraries[shortKey][name][count] = v, c
-                        count += 1
+                self.addEPObject(EPObject)
+    
+    def addEPObject(self, EPObject):
+        if not EPObject.fields: return
+        
+        if EPObject.objClass.startswith('MaterialProperty:GlazingSpectralData'):
+            key = 'MaterialProperty:GlazingSpectralData'
+        elif EPObject.objClass.isupper():
+            key = EPObject.objClass.title()
+        else:
+            key = EPObject.objClass
+        shortKey = key.split(":")[0]
+        
+        if shortKey not in self.libraries: return
+        
+        name = EPObject.name.upper()
+        self.libraries[shortKey][name] = dict() # create an empty dictonary
+        self.libraries[shortKey][name][0] = key
+        
+        for count, (value, comment) in enumerate(EPObject.fields[1:]):
+            if comment: comment = comment.split("!")[-1].rstrip()
+            self.libraries[shortKey][name][count + 1] = value, comment
     
     def report(self): 
         # Report findings
@@ -701,25 +1008,21 @@ class HB_GetEPLibraries:
     
     def getEnergyPlusObjectsFromFile(self, epFilePath):
         """
-        Parse EnergyPlus file and return a list of objects as separate strings
-        
-        TODO: Create a class for each EnergyPlus object and return Python objects
-        instead of strings
+        Stream the objects of an EnergyPlus file
         
         Args:
             epFilePath: Path to EnergyPlus file
         
         Returns:
-            A list of strings. Each string represents a differnt Rdiance Object
+            An hb_IDFTokenizer that yields an hb_IDFObject for each EnergyPlus object
         
         Usage:
-            getEnergyPlusObjectsFromFile(r"C:\ladybug\21MAR900\imageBasedSimulation\21MAR900.rad")
+            getEnergyPlusObjectsFromFile(r"C:\ladybug\sample.idf")
         """
         if not os.path.isfile(epFilePath):
             raise ValueError("Can't find %s."%epFilePath)
         
-        with open(epFilePath, "r") as epFile:
-            return self.getEnergyPlusObjectsFromString("".join(epFile.readlines()))
+        return hb_IDFTokenizer(epFilePath)
     
     def getThermObjectsFromFile(self, matFile):
         if not os.path.isfile(matFile):
@@ -750,6 +1053,98 @@ class HB_GetEPLibraries:
                         self.libraries["ThermMaterial"][matName]["RGBColor"] = System.Drawing.ColorTranslator.FromHtml("#" + matPropLine[-2])
                     except: pass
 
+def replaceFile(tempFilePath, filePath):
+    """Move a fully written temp file to filePath. os.rename doesn't replace an existing file on Windows."""
+    if os.path.isfile(filePath): os.remove(filePath)
+    os.rename(tempFilePath, filePath)
+
+def removeTempFiles(tempFilePaths):
+    for tempFilePath in tempFilePaths:
+        try:
+            if os.path.isfile(tempFilePath): os.remove(tempFilePath)
+        except Exception:
+            pass
+
+class hb_EPLibrarySnapshot(object):
+    """
+    A binary snapshot of the parsed EnergyPlus and THERM libraries and the OpenStudio standards.
+    
+    The snapshot is keyed by the md5 hash of each source file and is ignored when any of
+    the source files or the format of the snapshot changes. Change version if the way that
+    HB_GetEPLibraries parses the files changes.
+    """
+    
+    version = 2
+    
+    def __init__(self, sourceFiles, snapshotFile = None):
+        self.sourceFiles = list(sourceFiles)
+        if not snapshotFile:
+            snapshotFile = os.path.join(os.path.dirname(self.sourceFiles[0]), "honeybeeLibraries.snapshot")
+        self.snapshotFile = snapshotFile
+        self.signature = None
+    
+    @staticmethod
+    def hashFile(filePath):
+        md5 = hashlib.md5()
+        with open(filePath, "rb") as inf:
+            while True:
+                chunk = inf.read(1048576)
+                if not chunk: break
+                md5.update(chunk)
+        return md5.hexdigest()
+    
+    def getSignature(self):
+        if self.signature is None:
+            self.signature = [self.version] + \
+                [(os.path.basename(filePath), self.hashFile(filePath)) for filePath in self.sourceFiles]
+        return self.signature
+    
+    def load(self, EPLibs):
+        """
+        Load the libraries of an HB_GetEPLibraries from the snapshot.
+        
+        Returns:
+            The OpenStudio standards library or None if the snapshot is missing or out of date.
+        """
+        if not os.path.isfile(self.snapshotFile): return None
+        
+        try:
+            with open(self.snapshotFile, "rb") as inf:
+                if pickle.load(inf) != self.getSignature(): return None
+                libraries, openStudioStandardLib = pickle.load(inf)
+        except Exception, e:
+            print "Failed to read the library snapshot: %s"%str(e)
+            return None
+        
+        # materials with no valid color in the source file have no RGBColor
+        for material in libraries["ThermMaterial"].values():
+            if material.get("RGBColor") is not None:
+                material["RGBColor"] = System.Drawing.ColorTranslator.FromHtml(material["RGBColor"])
+        
+        EPLibs.libraries = libraries
+        return openStudioStandardLib
+    
+    def save(self, EPLibs, openStudioStandardLib):
+        """Write the libraries of an HB_GetEPLibraries and the OpenStudio standards to the snapshot."""
+        # colors are saved as html strings
+        libraries = dict(EPLibs.libraries)
+        libraries["ThermMaterial"] = {}
+        for matName, material in EPLibs.libraries["ThermMaterial"].items():
+            material = dict(material)
+            if material.get("RGBColor") is not None:
+                material["RGBColor"] = System.Drawing.ColorTranslator.ToHtml(material["RGBColor"])
+            libraries["ThermMaterial"][matName] = material
+        
+        tempFile = self.snapshotFile + ".tmp"
+        try:
+            with open(tempFile, "wb") as outf:
+                pickle.dump(self.getSignature(), outf, pickle.HIGHEST_PROTOCOL)
+                pickle.dump((libraries, openStudioStandardLib), outf, pickle.HIGHEST_PROTOCOL)
+            replaceFile(tempFile, self.snapshotFile)
+        except Exception, e:
+            print "Failed to write the library snapshot: %s"%str(e)
+            removeTempFiles([tempFile])
+
 def checkUnits():
     units = sc.doc.ModelUnitSystem
     if `units` == 'Rhino.UnitSystem.Meters': conversionFactor = 1.00
@@ -818,6 +1213,7 @@ class RADMaterialAux(object):
         
         self.HoneybeeFolder = HoneybeeFolder
         self.radMaterialLibrary = materialLibrary
+        self.keywordIndex = hb_KeywordIndex(materialLibrary.keys())
         self.radMatTypes = ["plastic", "glass", "trans", "metal",
             "mirror", "texfunc", "mixedfunc", "dielectric", "transdata",
             "light", "glow", "BRTDfunc"]
@@ -1018,6 +1414,7 @@ class RADMaterialAux(object):
         
         # add to library
         self.radMaterialLibrary[radMaterial.name] = radMaterial
+        self.keywordIndex.add(radMaterial.name)
     
     def isMatrialExistInLibrary(self, materialName):
         return materialName in self.radMaterialLibrary
@@ -1191,20 +1588,24 @@ class RADMaterialAux(object):
         keywords = [kw.strip().upper() for kw in keywords]
         materialTypes = [mt.strip().upper() for mt in materialTypes]
         
+        # names that include the keyword or are part of the keyword
+        searchAll = len(keywords)== 0 or "*" in keywords
+        if not searchAll:
+            matches = [self.keywordIndex.search(keyword).union(self.keywordIndex.getNamesInWord(keyword)) \
+                       for keyword in keywords]
+        
         materials = []
         for radMaterial in self.radMaterialLibrary:
             materialName = radMaterial.upper()
-            materialType = self.getMaterialFromHBLibrary(radMaterial).type.upper()
+            if searchAll:
+                count = 1
+            else:
+                count = len([matchedNames for matchedNames in matches if materialName in matchedNames])
+                if count == 0: continue
             
+            materialType = self.getMaterialFromHBLibrary(radMaterial).type.upper()
             if len(materialTypes)==0 or materialType in materialTypes:
-                
-                if len(keywords)!= 0 and not "*" in keywords:
-                    for keyword in keywords:
-                        
-                        if materialName.find(keyword)!= -1 or keyword.find(materialName)!= -1:
-                            materials.append(radMaterial)
-                else:
-                    materials.append(radMaterial)
+                materials.extend(count * [radMaterial])
         
         return materials
     
@@ -1261,7 +1662,7 @@ class RADMaterialAux(object):
             # if it is just the name of the material make sure it is already defined
             if len(RADMaterial.split(" ")) == 1:
                 # if the material is not in the library add it to the library
-                if RADMaterial not in sc.sticky ["honeybee_RADMaterialLib"].keys():
+                if RADMaterial not in sc.sticky ["honeybee_RADMaterialLib"]:
                     warningMsg = "Can't find " + RADMaterial + " in RAD Material Library.\n" + \
                                 "Add the material to the library and try again."
                     component.AddRuntimeMessage(gh.GH_RuntimeMessageLevel.Warning, warningMsg)
@@ -1636,8 +2037,169 @@ class hb_MSHToRAD(object):
     
         return matFile, radFile
 
+class hb_Job(object):
+    """A command line job that is run by hb_JobScheduler."""
+    
+    def __init__(self, command, name = None):
+        self.command = command
+        if name: self.name = name
+        else: self.name = os.path.basename(str(command))
+        # waiting, running, done, failed, timeout or cancelled
+        self.status = "waiting"
+        self.returnCode = None
+        self.startTime = None
+        self.duration = None
+        self.output = None
+        self.error = None
+        self.process = None
+    
+    def __repr__(self):
+        return "%s: %s"%(self.name, self.status)
+
+class hb_JobScheduler(object):
+    """
+    Run command line jobs with a limited number of jobs running at the same time.
+    
+    Jobs are started in order as soon as a slot is free and each job blocks in its own
+    thread until its process ends, so nothing is polled. The exit code and the wall-clock
+    time of each job are recorded, and running jobs can be cancelled.
+    
+    Args:
+        maxPRuns: Max number of jobs that run at the same time (default = 1).
+        shell: Set to True if you do NOT want to see the cmd window while the jobs are running.
+        timeout: Optional time in seconds after which a running job is killed.
+        progressCallback: Optional function that is called with (finishedCount, totalCount, job)
+            every time a job ends.
+        captureOutput: Set to True to keep stdout and stderr of each job.
+        launchDelay: Time in seconds to wait after starting each job.
+    """
+    
+    def __init__(self, maxPRuns = 1, shell = False, timeout = None, progressCallback = None, \
+                 captureOutput = False, launchDelay = 0):
+        try: maxPRuns = int(maxPRuns)
+        except: maxPRuns = 1
+        self.maxPRuns = max(maxPRuns, 1)
+        self.shell = shell
+        self.timeout = timeout
+        self.progressCallback = progressCallback
+        self.captureOutput = captureOutput
+        self.launchDelay = launchDelay
+        self.jobs = []
+        self.cancelled = False
+        self.finishedCount = 0
+        self.lock = threading.Lock()
+    
+    def addJob(self, command, name = None):
+        """Add a job to the scheduler. command can be a string or a list of arguments."""
+        job = hb_Job(command, name)
+        self.jobs.append(job)
+        return job
+    
+    def run(self):
+        """Run all the waiting jobs and wait for them to end. Returns the list of jobs."""
+        self.cancelled = False
+        self.finishedCount = 0
+        slots = threading.BoundedSemaphore(self.maxPRuns)
+        threads = []
+        
+        for job in self.jobs:
+            if job.status != "waiting": continue
+            # wait for a free slot
+            slots.acquire()
+            if self.cancelled:
+                job.status = "cancelled"
+                slots.release()
+                continue
+            thread = threading.Thread(target = self.runJob, args = (job, slots))
+            thread.start()
+            threads.append(thread)
+        
+        for thread in threads: thread.join()
+        
+        return self.jobs
+    
+    def runJob(self, job, slots):
+        try:
+            if self.captureOutput: pipe = subprocess.PIPE
+            else: pipe = None
+            
+            job.startTime = time.time()
+            try:
+                job.process = subprocess.Popen(job.command, shell = self.shell, stdout = pipe, stderr = pipe)
+            except Exception, e:
+                job.status = "failed"
+                job.error = str(e)
+                return
+            
+            job.status = "running"
+            if self.launchDelay: time.sleep(self.launchDelay)
+            
+            timer = None
+            if self.timeout:
+                timer = threading.Timer(self.timeout, self.killJob, [job, "timeout"])
+                timer.start()
+            
+            job.output, processError = job.process.communicate()
+            if processError: job.error = processError
+            if timer: timer.cancel()
+            
+            job.returnCode = job.process.returncode
+            if job.status == "running":
+                if job.returnCode == 0: job.status = "done"
+                else: job.status = "failed"
+        finally:
+            if job.startTime: job.duration = time.time() - job.startTime
+            slots.release()
+            
+            with self.lock:
+                self.finishedCount += 1
+                finishedCount = self.finishedCount
+            
+            if self.progressCallback:
+                try: self.progressCallback(finishedCount, len(self.jobs), job)
+                except Exception, e: print "Failed to report the progress: %s"%str(e)
+    
+    def killJob(self, job, status = "cancelled"):
+        if job.process is None or job.process.poll() is not None: return
+        job.status = status
+        try:
+            if os.name == "nt":
+                # kill the whole process tree since batch files start their own processes
+                subprocess.call("taskkill /F /T /PID %d"%job.process.pid, shell = True)
+            else:
+                job.process.kill()
+        except Exception, e:
+            print "Failed to stop %s: %s"%(job.name, str(e))
+    
+    def cancel(self):
+        """Stop the running jobs and skip the ones that are not started yet."""
+        self.cancelled = True
+        for job in self.jobs:
+            if job.status == "running": self.killJob(job, "cancelled")
+    
+    def failedJobs(self):
+        return [job for job in self.jobs if job.status not in ("done", "waiting")]
+    
+    def report(self):
+        """Return a line for each job with its status, exit code and wall-clock time."""
+        lines = []
+        for job in self.jobs:
+            if job.duration is None: duration = "-"
+            else: duration = "%.2f s"%job.duration
+            lines.append("%s: %s (exit code: %s, time: %s)"%(job.name, job.status, job.returnCode, duration))
+        return lines
+
 class hb_WriteRAD(object):
     
+    # rad strings of the Honeybee objects from the previous exports by the hash of the objects
+    # and the export that last used them
+    RADFragments = {}
+    exportCount = 0
+    # fragments that are not used in this number of exports are removed
+    maxFragmentAge = 4
+    # keys of the fragments in the frozen octree of the last export. see splitRADFragments
+    staticRADKeys = set()
+    
     def __init__(self, component = ghenv.Component):
         
         self.component = component
@@ -1657,6 +2219,127 @@ class hb_WriteRAD(object):
         self.hb_DSLibPath = hb_folders["DSLibPath"]
         
         
+    @staticmethod
+    def getGeometryStamp(geometry):
+        """Return a string of the vertices, the edges and the faces of a Brep or a Mesh."""
+        if geometry is None: return "None"
+        values = [geometry.GetType().Name]
+        if isinstance(geometry, rc.Geometry.Brep):
+            for vertex in geometry.Vertices:
+                values.append("%r,%r,%r"%(vertex.Location.X, vertex.Location.Y, vertex.Location.Z))
+            for edge in geometry.Edges:
+                # mid point of the edge for curved edges
+                midPt = edge.PointAt(edge.Domain.Mid)
+                values.append("%d,%d,%r,%r,%r"%(edge.StartVertex.VertexIndex, edge.EndVertex.VertexIndex, \
+                                                 midPt.X, midPt.Y, midPt.Z))
+            for face in geometry.Faces:
+                values.append("%d,%d"%(face.Loops.Count, face.OrientationIsReversed))
+        elif isinstance(geometry, rc.Geometry.Mesh):
+            for vertex in geometry.Vertices:
+                values.append("%r,%r,%r"%(vertex.X, vertex.Y, vertex.Z))
+            for face in geometry.Faces:
+                values.append("%d,%d,%d,%d"%(face.A, face.B, face.C, face.D))
+        else:
+            # unknown geometry. use the identity so it is never reused by another object
+            values.append(`id(geometry)`)
+        return ";".join(values)
+    
+    @staticmethod
+    def getMeshingParametersStamp(meshParameters):
+        if meshParameters is None: return "None"
+        properties = ("GridAngle", "GridAspectRatio", "GridMaxCount", "GridMinCount", "MaximumEdgeLength", \
+                      "MinimumEdgeLength", "RefineGrid", "SimplePlanes", "Tolerance", "JaggedSeams")
+        return ",".join(`getattr(meshParameters, prop, None)` for prop in properties)
+    
+    def getRADObjectKey(self, HBObj, settings):
+        """
+        Hash of everything that changes the rad string of a Honeybee zone or surface.
+        
+        settings is a list of export options that change the string (e.g. north angle and the
+        surfaces of the zone that are written).
+        """
+        digest = hashlib.sha1()
+        digest.update("%s:%s\n"%(HBObj.objectType, HBObj.name))
+        for setting in settings:
+            digest.update("setting:%s\n"%str(setting))
+        
+        if HBObj.objectType == "HBZone":
+            HBSrfs = list(HBObj.surfaces)
+            digest.update("%s,%s\n"%(HBObj.hasNonPlanarSrf, HBObj.hasInternalEdge))
+        else:
+            HBSrfs = [HBObj]
+        
+        for HBSrf in HBSrfs:
+            for srf in [HBSrf] + list(getattr(HBSrf, "childSrfs", [])):
+                try: cnstrSet = sorted(srf.cnstrSet.items())
+                except AttributeError: cnstrSet = None
+                digest.update("srf:%s|%s|%s|%s|%s|%s|%s|%s\n"%(srf.name, srf.RadMaterial, \
+                              getattr(srf, "construction", None), getattr(srf, "type", None), cnstrSet, \
+                              getattr(srf, "isPlanar", None), getattr(srf, "hasInternalEdge", None), \
+                              getattr(srf, "isChild", None)))
+                digest.update(self.getGeometryStamp(srf.geometry) + "\n")
+                digest.update(self.getGeometryStamp(getattr(srf, "punchedGeometry", None)) + "\n")
+        
+        return digest.hexdigest()
+    
+    def getRADFragment(self, key):
+        """Return the rad string of an object from a previous export or None if it is not available."""
+        if key not in hb_WriteRAD.RADFragments: return None
+        fragment = hb_WriteRAD.RADFragments[key][0]
+        hb_WriteRAD.RADFragments[key] = fragment, hb_WriteRAD.exportCount
+        self.fragmentCount[0] += 1
+        return fragment
+    
+    def addRADFragment(self, key, fragment):
+        hb_WriteRAD.RADFragments[key] = fragment, hb_WriteRAD.exportCount
+        self.fragmentCount[1] += 1
+        return fragment
+    
+    @staticmethod
+    def splitRADFragments(exportedFragments):
+        """
+        Split the rad strings of an export to the ones for the frozen octree and the changed ones.
+        
+        The objects of the frozen octree stay the same as long as none of them changes or
+        is removed so the octree is taken from hb_OctreeCache and only the changed objects
+        are added to it. Once one of them changes, the objects that are reused from the
+        previous export (or all the objects if none is reused) become the new frozen set.
+        
+        Args:
+            exportedFragments: A list of (key, rad string, reused) for the objects of the export.
+        Returns:
+            Lists of the rad strings for the frozen octree and the changed objects.
+        """
+        exportKeys = set(key for key, fragment, reused in exportedFragments if key is not None)
+        staticKeys = hb_WriteRAD.staticRADKeys
+        if not staticKeys or not staticKeys.issubset(exportKeys):
+            staticKeys = set(key for key, fragment, reused in exportedFragments if reused)
+            if not staticKeys: staticKeys = exportKeys
+            hb_WriteRAD.staticRADKeys = staticKeys
+        
+        staticFragments = []
+        changedFragments = []
+        for key, fragment, reused in exportedFragments:
+            if key in staticKeys: staticFragments.append(fragment)
+            else: changedFragments.append(fragment)
+        return staticFragments, changedFragments
+    
+    def trimRADFragments(self):
+        """Remove the rad strings that are not used in the last maxFragmentAge exports."""
+        oldestExport = hb_WriteRAD.exportCount - self.maxFragmentAge
+        for key, (fragment, lastExport) in hb_WriteRAD.RADFragments.items():
+            if lastExport <= oldestExport: del hb_WriteRAD.RADFragments[key]
+    
+    def copyHBObject(self, hb_hive, HBObj):
+        """Copy an object from the hive before it is changed for the export."""
+        try:
+            return hb_hive.copyHBObject(HBObj)
+        except Exception, e:
+            print `e`
+            print "Failed to copy the object. Returning the original objects...\n" +\
+            "This can cause strange behaviour!"
+            return HBObj
+    
     def writeRADAndMaterialFiles(self, originalHBObjects, subWorkingDir, radFileName, \
                                  analysisRecipe, meshParameters, exportInteriorWalls):
         
@@ -1677,9 +2360,9 @@ class hb_WriteRAD(object):
         
         IESObjects = {}
         IESCount = 0    
-        # call the objects from the lib
+        # call the objects from the lib. objects are only copied if they should be written again
         hb_hive = sc.sticky["honeybee_Hive"]()
-        HBObjects = hb_hive.callFromHoneybeeHive(originalHBObjects)
+        HBObjects = hb_hive.callFromHoneybeeHive(originalHBObjects, readOnly = True)
         
         geoRadFile = open(radFileFullName, 'w')
         geoRadFile.write("#GENERATED BY HONEYBEE\n")
@@ -1687,6 +2370,9 @@ class hb_WriteRAD(object):
         customMixFunRadMat = {} # dictionary to collect the custom mixfunc material names
         surfaceList = []
         rotateObjects = False
+        hb_WriteRAD.exportCount += 1
+        self.fragmentCount = [0, 0] # reused, written
+        exportedFragments = [] # key, rad string and if it is reused for each object
         if len(HBObjects)!=0:
             # if this is an annual analysis and north is not 0 rotate all Honeybee objects
             if analysisRecipe.type == 2 and analysisRecipe.northDegrees!=0:
@@ -1696,17 +2382,16 @@ class hb_WriteRAD(object):
                             rc.Geometry.Point3d.Origin)
                 rotateObjects = True
             
+            # settings that change the rad string of all the objects
+            settings = [exportInteriorWalls, self.getMeshingParametersStamp(meshParameters)]
+            if rotateObjects: settings.append(analysisRecipe.northDegrees)
+            
             for objCount, HBObj in enumerate(HBObjects):
                 
-                if rotateObjects:
-                    HBObj.transform(transform, None, False)
-                
                 # check if the object is zone or a surface (?)
                 if HBObj.objectType == "HBZone":
-                    if HBObj.hasNonPlanarSrf or HBObj.hasInternalEdge:
-                        HBObj.prepareNonPlanarZone(meshParameters)
-                    
-                    for srf in HBObj.surfaces:
+                    srfIndices = []
+                    for srfCount, srf in enumerate(HBObj.surfaces):
                         # check if an interior wall
                         if not exportInteriorWalls and self.hb_writeRADAUX.isSrfAirWall(srf):
                             continue
@@ -1717,15 +2402,11 @@ class hb_WriteRAD(object):
                             continue
                         
                         surfaceList.append(srf.name)
+                        srfIndices.append(srfCount)
                         
                         # collect the custom material informations
                         if srf.RadMaterial!=None:
                             customRADMat, customMixFunRadMat = self.hb_RADMaterialAUX.addRADMatToDocumentDict(srf, customRADMat, customMixFunRadMat)
-                        # write the surfaces
-                        if srf.isPlanar and len(srf.childSrfs)<2:
-                            geoRadFile.write(self.RADSurface(srf))
-                        else:
-                            geoRadFile.write(self.RADNonPlanarSurface(srf))
                         
                         if srf.hasChild:
                             # collect the custom material informations
@@ -1733,10 +2414,35 @@ class hb_WriteRAD(object):
                                 
                                 if childSrf.RadMaterial!=None:
                                     customRADMat, customMixFunRadMat = self.hb_RADMaterialAUX.addRADMatToDocumentDict(childSrf, customRADMat, customMixFunRadMat)
+                    
+                    key = self.getRADObjectKey(HBObj, settings + srfIndices)
+                    fragment = self.getRADFragment(key)
+                    reused = fragment is not None
+                    if fragment is None:
+                        HBObj = self.copyHBObject(hb_hive, HBObj)
+                        if rotateObjects:
+                            HBObj.transform(transform, None, False)
+                        
+                        if HBObj.hasNonPlanarSrf or HBObj.hasInternalEdge:
+                            HBObj.prepareNonPlanarZone(meshParameters)
+                        
+                        fragment = []
+                        for srfCount in srfIndices:
+                            srf = HBObj.surfaces[srfCount]
+                            # write the surfaces
+                            if srf.isPlanar and len(srf.childSrfs)<2:
+                                fragment.append(self.RADSurface(srf))
+                            else:
+                                fragment.append(self.RADNonPlanarSurface(srf))
                             
-                            if not srf.isPlanar or len(srf.childSrfs) > 1:
-                                geoRadFile.write(self.RADNonPlanarChildSurface(srf))
-                            
+                            if srf.hasChild:
+                                if not srf.isPlanar or len(srf.childSrfs) > 1:
+                                    fragment.append(self.RADNonPlanarChildSurface(srf))
+                        
+                        fragment = self.addRADFragment(key, ''.join(fragment))
+                    
+                    geoRadFile.write(fragment)
+                    exportedFragments.append((key, fragment, reused))
                             
                 elif HBObj.objectType == "HBSurface":
                     
@@ -1763,16 +2469,33 @@ class hb_WriteRAD(object):
                                     print msg
                                     self.component.AddRuntimeMessage(gh.GH_RuntimeMessageLevel.Warning, msg)
                                     return -1                    
-
-                    if HBObj.isPlanar and (not HBObj.isChild and len(HBObj.childSrfs)<2):
-                        # check for rad material
-                        geoRadFile.write(self.RADSurface(HBObj))
-                    else:
-                        geoRadFile.write(self.RADNonPlanarSurface(HBObj))
-                        if not HBObj.isChild and HBObj.hasChild:
-                            geoRadFile.write(self.RADNonPlanarChildSurface(HBObj))
+                    
+                    key = self.getRADObjectKey(HBObj, settings)
+                    fragment = self.getRADFragment(key)
+                    reused = fragment is not None
+                    if fragment is None:
+                        HBObj = self.copyHBObject(hb_hive, HBObj)
+                        if rotateObjects:
+                            HBObj.transform(transform, None, False)
+                        
+                        if HBObj.isPlanar and (not HBObj.isChild and len(HBObj.childSrfs)<2):
+                            # check for rad material
+                            fragment = self.RADSurface(HBObj)
+                        else:
+                            fragment = self.RADNonPlanarSurface(HBObj)
+                            if not HBObj.isChild and HBObj.hasChild:
+                                fragment += self.RADNonPlanarChildSurface(HBObj)
+                        
+                        fragment = self.addRADFragment(key, fragment)
+                    
+                    geoRadFile.write(fragment)
+                    exportedFragments.append((key, fragment, reused))
                 
                 elif HBObj.objectType == "HBIES":
+                    HBObj = self.copyHBObject(hb_hive, HBObj)
+                    if rotateObjects:
+                        HBObj.transform(transform, None, False)
+                    
                     IESCount += 1
                     IESObjcIsFine = True
                     # check if the object has been move or scaled
@@ -1794,14 +2517,31 @@ class hb_WriteRAD(object):
                     # if it is all fine then write the geometry
                     if IESObjcIsFine:
                         IESName = HBObj.name + "_" + str(IESCount)
-                        geoRadFile.write( HBObj.getRADGeometryStr(IESName, originalHBObjects[objCount]))
+                        IESGeometry = HBObj.getRADGeometryStr(IESName, originalHBObjects[objCount])
+                        geoRadFile.write(IESGeometry)
+                        exportedFragments.append((None, IESGeometry, False))
                         # downlight_light polygon downlight.d
                         # add to IES Objects list so I can add the materials to the list later
                         if HBObj.name not in IESObjects.keys():
                             IESObjects[HBObj.name] = HBObj
+            
+            self.trimRADFragments()
+            print "%d objects are reused from the previous export and %d objects are written."% \
+                  (self.fragmentCount[0], self.fragmentCount[1])
                     
         geoRadFile.close()
         
+        # write the objects of the frozen octree and the changed objects to separate files
+        self.staticRadFile = os.path.join(subWorkingDir, radFileName + '_static.rad')
+        self.changedRadFile = os.path.join(subWorkingDir, radFileName + '_changed.rad')
+        staticFragments, changedFragments = self.splitRADFragments(exportedFragments)
+        for filePath, fragments in ((self.staticRadFile, staticFragments), (self.changedRadFile, changedFragments)):
+            with open(filePath, 'w') as fragmentFile:
+                fragmentFile.write("#GENERATED BY HONEYBEE\n")
+                fragmentFile.write(''.join(fragments))
+        if not staticFragments: self.staticRadFile = None
+        if not changedFragments: self.changedRadFile = None
+        
         ########################################################################
         ######################## GENERATE THE BASE RAD FILE ####################
         materialFileName = subWorkingDir + "\\material_" + radFileName + '.rad'
@@ -1930,7 +2670,14 @@ class hb_WriteRAD(object):
     
         return radFileFullName, materialFileName
     
-    def writeTestPtFile(self, subWorkingDir, radFileName, numOfCPUs, analysisRecipe):
+    def writeTestPtFile(self, subWorkingDir, radFileName, numOfCPUs, analysisRecipe, chunkSize = 0):
+        """
+        Write the test points to .pts files and return the points and the number of points of each file.
+        
+        By default there is one file for each cpu. If chunkSize is more than 0 the points are written
+        in chunks of about chunkSize points instead so a pool of numOfCPUs workers can run them one after
+        the other. The files are numbered in the order of the points in the .ptn file.
+        """
         
         if analysisRecipe.type == 0: return [], [] #image-based simulation
         
@@ -1959,7 +2706,11 @@ class hb_WriteRAD(object):
             for v in flattenPtsNormals: v.Transform(transform)    
     
         numOfPoints = len(flattenTestPoints)
-    
+        
+        # annual glare runs on a single heading file so it can't be chunked
+        if chunkSize > 0 and not (analysisRecipe.type == 2 and analysisRecipe.DSParameters.runAnnualGlare):
+            numOfCPUs = max(numOfCPUs, int(math.ceil(numOfPoints / float(chunkSize))))
+        
         if numOfCPUs > numOfPoints: numOfCPUs = numOfPoints
 
         if numOfCPUs > 1:
@@ -1978,6 +2729,7 @@ class hb_WriteRAD(object):
                 lenOfPts.append(ptsEachCpu)
         
         testPtsEachCPU = []
+        firstPt = 0
         
         for cpuCount in range(numOfCPUs):
             # write pts file
@@ -1986,12 +2738,13 @@ class hb_WriteRAD(object):
             
             ptsFile = open(ptsFileName, "w")
 
-            for ptCount in range(sum(lenOfPts[:cpuCount]), sum(lenOfPts[:cpuCount+1])):
+            for ptCount in range(firstPt, firstPt + lenOfPts[cpuCount]):
                 ptsFile.write(self.hb_writeRADAUX.testPtsStr(flattenTestPoints[ptCount], flattenPtsNormals[ptCount]))
                 ptsForThisCPU.append(flattenTestPoints[ptCount])
 
             ptsFile.close()
             
+            firstPt += lenOfPts[cpuCount]
             testPtsEachCPU.append(ptsForThisCPU)        
             
         return testPtsEachCPU, lenOfPts
@@ -2053,6 +2806,11 @@ class hb_WriteRAD(object):
             initBatchFile.write(pathStr)
             
             
+            # files of the scene for the key of the .dc files before they are rotated
+            sceneFiles = [materialFileName, radFileFullName] + [f for f in additionalRadFiles or [] if f]
+            DCCache = hb_DCCache()
+            self.DCCacheMisses = []
+            
             xformCmds = []
             if additionalRadFiles and northAngleRotation != 0:
                 # rotate additional radiance files:
@@ -2127,7 +2885,8 @@ class hb_WriteRAD(object):
                 heaFile.write(self.hb_writeDS.DSRADStr(analysisRecipe.radParameters))
                 
                 # dynamic simulaion options
-                heaFile.write(self.hb_writeDS.DSDynamicSimStr(dynamicShadingRecipes, projectName, subWorkingDir, testPtsEachCPU[cpuCount], cpuCount))
+                dynamicShadingStr = self.hb_writeDS.DSDynamicSimStr(dynamicShadingRecipes, projectName, subWorkingDir, testPtsEachCPU[cpuCount], cpuCount)
+                heaFile.write(dynamicShadingStr)
                 
                 # heaFile.write(hb_writeDS.resultStr(projectName, cpuCount))
                 heaFile.close()
@@ -2146,13 +2905,28 @@ class hb_WriteRAD(object):
                     #SET PATH = " + subWorkingDir + "\n" + workingDrive +"\n"
                     DSBatchFile.write(pathStr)
                     
-                    DSBatchStr = ':: Calculate Daylight Coefficient File (*.dc)\n' + \
-                                'gen_dc ' + heaFileName + ' -dif\n' + \
-                                'gen_dc ' + heaFileName + ' -dir\n' + \
-                                'gen_dc ' + heaFileName + ' -paste\n' + \
-                                '\n' + \
-                                ':: Generate Illuminance Files (*.ill)\n' + \
-                                'ds_illum  ' + heaFileName + '\n'
+                    # skip gen_dc if the daylight coefficients of the same scene and sensors are in the cache
+                    DCFiles = DCCache.getDCFiles(projectName, dynamicShadingStr, cpuCount)
+                    DCKey = DCCache.getKey(sceneFiles, os.path.join(subWorkingDir, projectName + '_' + `cpuCount` + '.pts'), \
+                                           dynamicShadingStr, DCFiles, \
+                                           [self.hb_DSPath, locationStr, northAngleRotation, \
+                                            self.hb_writeDS.DSAnalysisUnits(outputUnits, lenOfPts[cpuCount]), \
+                                            self.hb_writeDS.DSRADStr(analysisRecipe.radParameters)])
+                    
+                    if DCCache.copyTo(DCKey, DCFiles, subWorkingDir):
+                        print "Daylight coefficients of %s are loaded from the cache."%os.path.basename(heaFileName)
+                        DSBatchStr = ''
+                    else:
+                        self.DCCacheMisses.append((DCKey, dict((name, os.path.join(subWorkingDir, fileName)) \
+                                                               for name, fileName in DCFiles.iteritems())))
+                        DSBatchStr = ':: Calculate Daylight Coefficient File (*.dc)\n' + \
+                                    'gen_dc ' + heaFileName + ' -dif\n' + \
+                                    'gen_dc ' + heaFileName + ' -dir\n' + \
+                                    'gen_dc ' + heaFileName + ' -paste\n' + \
+                                    '\n'
+                    
+                    DSBatchStr += ':: Generate Illuminance Files (*.ill)\n' + \
+                                  'ds_illum  ' + heaFileName + '\n'
                     
                     DSBatchFile.write(DSBatchStr)
                                 
@@ -2194,15 +2968,22 @@ class hb_WriteRAD(object):
             
             # write OCT file
             # 3.2. oconv line
-            sceneRadFiles = [materialFileName, radSkyFileName, radFileFullName]
+            # the frozen octree only has the objects that are not changed since the last export
+            staticRadFile = getattr(self, "staticRadFile", None)
+            if staticRadFile:
+                sceneRadFiles = [materialFileName, staticRadFile]
+                changedRadFiles = [self.changedRadFile] if self.changedRadFile else []
+            else:
+                sceneRadFiles = [materialFileName, radFileFullName]
+                changedRadFiles = []
             
             if additionalRadFiles:
                 for additionalFile in additionalRadFiles:
                     if additionalFile!=None:
                         sceneRadFiles.append(additionalFile)
                 
-            OCTLine = self.hb_writeRADAUX.oconvLine(OCTFileName, sceneRadFiles)
-            if readyOCTFile ==None: batchFile.write(OCTLine)
+            if readyOCTFile ==None:
+                batchFile.write(self.getOctreeLines(subWorkingDir, OCTFileName, radSkyFileName, sceneRadFiles, changedRadFiles))
             
             if analysisRecipe.type == 0:
                 # add overture line in case it is an image-based analysis
@@ -2325,6 +3106,39 @@ class hb_WriteRAD(object):
             
             return initBatchFileName, batchFiles, fileNames, pcompFileName, RADResultFilesAddress
         
+    def getOctreeLines(self, subWorkingDir, OCTFileName, radSkyFileName, sceneRadFiles, changedRadFiles = None):
+        """
+        Return the oconv lines for the octree of a study.
+        
+        The frozen octree of the scene files without the sky is taken from hb_OctreeCache if
+        the scene files are not changed. Otherwise it is built in the init batch file and added
+        to the cache by runBatchFiles if the init batch file ends with no error. The changed
+        objects and the sky are then added to it with oconv -i. If oconv -i fails (e.g. a changed
+        object is out of the bounds of the frozen octree) the octree is built from all the files.
+        """
+        if not changedRadFiles: changedRadFiles = []
+        
+        sceneOCTFileName = OCTFileName + "_scene"
+        octreeCache = hb_OctreeCache()
+        key = octreeCache.getKey(sceneRadFiles, [self.hb_RADPath, self.hb_writeRADAUX.oconvLine("", [])])
+        
+        self.octreeCacheMiss = None
+        if octreeCache.copyTo(key, {"octree": sceneOCTFileName + ".oct"}, subWorkingDir):
+            print "Octree of the scene is loaded from the cache."
+            lines = ""
+        else:
+            lines = self.hb_writeRADAUX.oconvLine(sceneOCTFileName, sceneRadFiles)
+            lines += "if errorlevel 1 exit /b 1\n"
+            self.octreeCacheMiss = key, {"octree": os.path.join(subWorkingDir, sceneOCTFileName + ".oct")}
+        
+        addedFiles = ""
+        for address in changedRadFiles + [radSkyFileName]: addedFiles += address.replace("\\" , "/") + " "
+        fullOconvLine = self.hb_writeRADAUX.oconvLine(OCTFileName, sceneRadFiles + changedRadFiles + [radSkyFileName])
+        
+        lines += "oconv -f -i " + sceneOCTFileName + ".oct " + addedFiles + "> " + OCTFileName + ".oct || " + \
+                 fullOconvLine
+        return lines
+    
     def executeBatchFiles(self, batchFileNames, maxPRuns = None, shell = False, waitingTime = 0.5):
     
         """Run a number of batch files in parallel and
@@ -2334,58 +3148,72 @@ class hb_WriteRAD(object):
                 batchFileNames: List of batch files
                 maxPRuns: max number of files to be ran in parallel (default = 0)
                 shell: set to True if you do NOT want to see the cmd window while the analysis is runnig
+                waitingTime: time in seconds to wait after starting each batch file
+            
+            Returns:
+                A list of hb_Job with the exit code and the run time of each batch file
         """
-    
-        if not maxPRuns : maxPRuns = 1
-        maxPRuns = int(maxPRuns)
-        total = len(batchFileNames)
-        
-        if maxPRuns < 1: maxPRuns = 1
-        if maxPRuns > total: maxPRuns = total
         
-        running = 0
-        done = False
-        jobs = []
-        pid = 0
+        if not maxPRuns : maxPRuns = 1
         
         try:
-            while not done:
-                if running < maxPRuns and pid < total:
-                    # execute the files
-                    jobs.append(subprocess.Popen(batchFileNames[pid].replace("\\", "/") , shell = shell))
-                    pid+=1
-                    time.sleep(waitingTime)
-                
-                # count how many jobs are running and how many are done
-                running = 0
-                finished = 0
-                for job in jobs:
-                    if job.poll() is None:
-                        #one job is still running
-                        running += 1
-                    else:
-                        finished += 1
-        
-                if running == maxPRuns:
-                    # wait for half a second
-                    #print "waiting..."
-                    time.sleep(waitingTime)
-        
-                if finished ==  total:
-                    done = True
+            scheduler = hb_JobScheduler(maxPRuns, shell, launchDelay = waitingTime)
+            for batchFileName in batchFileNames:
+                scheduler.addJob(batchFileName.replace("\\", "/"), os.path.basename(batchFileName))
+            
+            jobs = scheduler.run()
+            for job in scheduler.failedJobs():
+                print "%s ended with exit code %s."%(job.name, job.returnCode)
+            return jobs
         
         except Exception, e:
-            print "Something went wrong: %s"%str(e) 
+            print "Something went wrong: %s"%str(e)
     
     def runBatchFiles(self, initBatchFileName, batchFileNames, fileNames, \
-                      pcompBatchFile, waitingTime, runInBackground = False):
+                      pcompBatchFile, waitingTime, runInBackground = False, maxPRuns = None):
+        """
+        Run the init batch file and then the batch files of the study.
         
-        self.executeBatchFiles([initBatchFileName], maxPRuns = 1, shell = runInBackground, waitingTime = waitingTime)
-        self.executeBatchFiles(batchFileNames, maxPRuns = len(batchFileNames), shell = runInBackground, waitingTime = waitingTime)
+        By default all the batch files run at the same time. Set maxPRuns to run the batch files
+        one after the other on that many workers, each taking the next file as soon as it is free.
+        Returns the list of hb_Job of the batch files of the study.
+        """
+        if not maxPRuns: maxPRuns = len(batchFileNames)
+        
+        initJobs = self.executeBatchFiles([initBatchFileName], maxPRuns = 1, shell = runInBackground, waitingTime = waitingTime)
+        
+        # keep the new octree of the scene for the next runs
+        if getattr(self, "octreeCacheMiss", None):
+            if initJobs and initJobs[0].returnCode == 0:
+                hb_OctreeCache().add(*self.octreeCacheMiss)
+            else:
+                print "Octree of the scene is not cached as the init batch file failed."
+            self.octreeCacheMiss = None
+        
+        jobs = self.executeBatchFiles(batchFileNames, maxPRuns = maxPRuns, shell = runInBackground, waitingTime = waitingTime)
         
         if pcompBatchFile!="":
             os.system(pcompBatchFile) # put all the files together
         
+        return jobs
+    
+    def writeRunTimes(self, subWorkingDir, radFileName, jobs, lenOfPts):
+        """Write the status and the run time of each batch file with its number of test points to a csv file."""
+        runTimesFileName = os.path.join(subWorkingDir, radFileName + '_runTimes.csv')
+        
+        with open(runTimesFileName, "w") as runTimesFile:
+            runTimesFile.write("batch file,test points,status,exit code,time (s),time per point (ms)\n")
+            for job, numOfPts in zip(jobs or [], lenOfPts):
+                if job.duration is None or numOfPts == 0:
+                    duration, timePerPoint = "", ""
+                else:
+                    duration = "%.2f"%job.duration
+                    timePerPoint = "%.3f"%(1000 * job.duration / numOfPts)
+                runTimesFile.write("%s,%d,%s,%s,%s,%s\n"%(job.name, numOfPts, job.status, \
+                                   job.returnCode, duration, timePerPoint))
+        
+        return runTimesFileName
+    
     def collectResults(self, subWorkingDir, radFileName, numOfCPUs, analysisRecipe, expectedResultFiles):
         
         if analysisRecipe.type == 2:
@@ -2418,6 +3246,15 @@ class hb_WriteRAD(object):
                     numDc == numOfCPUs * numOfIllFiles /2):
                     print "Can't find the results for the study"
                     DSResultFilesAddress = []
+                elif getattr(self, "DCCacheMisses", None):
+                    # keep the new daylight coefficients for the next runs
+                    DCCache = hb_DCCache()
+                    for DCKey, DCFiles in self.DCCacheMisses:
+                        DCCache.add(DCKey, DCFiles)
+                    self.DCCacheMisses = []
+                    stats = DCCache.stats()
+                    print "Daylight coefficient cache: %d entries, %.1f MB, %d hits, %d misses."% \
+                          (stats["entries"], stats["size"] / 1024.0 ** 2, stats["hits"], stats["misses"])
             
             # check for results of annual glare analysis if any
             annualGlareResults = {}
@@ -3184,8 +4021,12 @@ class hb_WriteRADAUX(object):
         else:
             # print "Fix this for radiation analysis"
             line0 = "rtrace -I "
+        
+        # binary results are written as floats after a header with the format
+        if radParameters.get("binaryResults"): line0 += " -faf"
+        else: line0 += " -h"
             
-        line1_1 = " -h -dp " + str(radParameters["_dp_"]) + \
+        line1_1 = " -dp " + str(radParameters["_dp_"]) + \
                 " -ds " + str(radParameters["_ds_"]) + " -dt " + str(radParameters["_dt_"]) + \
                 " -dc " + str(radParameters["_dc_"]) + " -dr " + str(radParameters["_dr_"]) + \
                 " -st " + str(radParameters["_st_"]) + " -lr " + str(radParameters["_lr_"]) + \
@@ -3326,7 +4167,7 @@ class hb_WriteDS(object):
                   '#################################\n'
         
         def checkkey(k):
-            return k.replace('_', '') not in ('xScale', 'yScale', 'additional')
+            return k.replace('_', '') not in ('xScale', 'yScale', 'additional', 'binaryResults')
             
         params = '\n'.join('{} {}'.format(k.replace('_', ''), v)
                            for k, v in radParameters.iteritems()
@@ -3619,29 +4460,697 @@ class hb_ReadAnnualResultsAux(object):
         
         return illFiles
 
-class hb_EnergySimulatioParameters(object):
+class hb_IllFile(object):
+    """
+    Random access to the values of a Daysim .ill file.
     
-    def readEPParams(self, EPParameters):
+    The first time a file is read the values are written into a binary sidecar
+    next to it (resultFile.ill.hbx) as a float64 hours x points matrix followed
+    by the same values as a points x hours matrix. Values of an hour or of a
+    point are then read with a single seek and read without parsing any text.
+    
+    The sidecar is written to a temp file and renamed once it is complete. It is
+    rebuilt when the size or the modification time of the .ill file changes. If
+    it can't be written (e.g. the folder is read-only) the values are kept in
+    memory for the session.
+    """
+    version = 2
+    # magic, version, hourCount, pointCount, illSize, illMTime
+    headerFormat = "<8sIIIqd"
+    headerSize = struct.calcsize(headerFormat)
+    # max size of the values that are read at once to write the points x hours matrix
+    transposeChunkSize = 32 * 1024 ** 2
+    
+    # files that are already loaded in this session
+    openFiles = {}
+    
+    def __init__(self, illFilePath):
+        self.illFilePath = os.path.normpath(illFilePath)
+        self.dataFilePath = self.illFilePath + ".hbx"
+        self.hourCount = 0
+        self.pointCount = 0
+        self.memoryRows = None
+        
+        if not self.load():
+            self.build()
+    
+    @classmethod
+    def fromFile(cls, illFilePath):
+        """Return the reader for an .ill file and reuse the one in memory if it is still valid."""
+        key = os.path.normpath(illFilePath)
+        illFile = cls.openFiles.get(key)
+        if illFile is None or not illFile.isUpToDate():
+            illFile = cls(illFilePath)
+            cls.openFiles[key] = illFile
+        return illFile
+    
+    def illSignature(self):
+        fileStat = os.stat(self.illFilePath)
+        return fileStat.st_size, fileStat.st_mtime
+    
+    def isUpToDate(self):
+        return (self.illSize, self.illMTime) == self.illSignature()
+    
+    @property
+    def pointsOffset(self):
+        """Position of the points x hours matrix in the sidecar."""
+        return self.headerSize + self.hourCount * self.pointCount * 8
+    
+    def load(self):
+        """Load the header of an existing sidecar. Return False if it is missing or outdated."""
+        if not os.path.isfile(self.dataFilePath):
+            return False
+        try:
+            with open(self.dataFilePath, "rb") as dataFile:
+                header = struct.unpack(self.headerFormat, dataFile.read(self.headerSize))
+        except Exception:
+            return False
         
-        if EPParameters == []:
-            timestep = 6
-            shadowPar = ["AverageOverDaysInFrequency", 30, 3000]
-            solarDistribution = "FullInteriorAndExteriorWithReflections"
-            simulationControl = [True, True, True, False, True, '', '']
-            ddyFile = None
-            terrain = 'City'
-            grndTemps = []
-            holidays = []
-            startDay = None
-            heatSizing = 1.25
-            coolSizing = 1.15
+        magic, version, hourCount, pointCount, illSize, illMTime = header
+        if magic != "HBILLMTX" or version != self.version: return False
+        if (illSize, illMTime) != self.illSignature(): return False
         
-        else:
-            timestep = int(EPParameters[0])
-            shadowPar = EPParameters[1:4]
-            solarDistribution = EPParameters[4]
-            simulationControl = EPParameters[5:12]
-            ddyFile = EPParameters[12]
+        # make sure the file is not truncated
+        if os.path.getsize(self.dataFilePath) != self.headerSize + 2 * hourCount * pointCount * 8:
+            return False
+        
+        self.hourCount = hourCount
+        self.pointCount = pointCount
+        self.illSize = illSize
+        self.illMTime = illMTime
+        return True
+    
+    @staticmethod
+    def parseLine(line):
+        """Return illuminance values of a line of an .ill file. First 4 items are the date and time."""
+        return [float(value) for value in line.strip().split(" ")[4:]]
+    
+    def parseRows(self):
+        """Yield values of the .ill file hour by hour as arrays."""
+        pointCount = None
+        with open(self.illFilePath, "r") as illFile:
+            for line in illFile:
+                if line.startswith("#") or not line.strip(): continue
+                values = self.parseLine(line)
+                if pointCount is None:
+                    pointCount = len(values)
+                elif len(values) != pointCount:
+                    raise ValueError("Number of values in hour %d of %s is not %d." \
+                                     % (self.hourCount + 1, self.illFilePath, pointCount))
+                self.pointCount = pointCount
+                self.hourCount += 1
+                yield array.array("d", values)
+    
+    def build(self):
+        """Convert the .ill file into the binary sidecar or load it to memory if the sidecar can't be written."""
+        self.illSize, self.illMTime = self.illSignature()
+        tempFilePath = self.dataFilePath + ".tmp"
+        try:
+            self.writeSidecar(tempFilePath)
+            replaceFile(tempFilePath, self.dataFilePath)
+        except ValueError:
+            removeTempFiles([tempFilePath])
+            raise
+        except (IOError, OSError), e:
+            print "Failed to write %s. Values are kept in memory: %s" % (self.dataFilePath, str(e))
+            removeTempFiles([tempFilePath])
+            self.hourCount = 0
+            self.pointCount = 0
+            self.memoryRows = list(self.parseRows())
+    
+    def writeSidecar(self, filePath):
+        self.hourCount = 0
+        self.pointCount = 0
+        with open(filePath, "w+b") as dataFile:
+            # write the header with no hours. it will be updated at the end
+            dataFile.write(struct.pack(self.headerFormat, "HBILLMTX", self.version, \
+                                       0, 0, self.illSize, self.illMTime))
+            for values in self.parseRows():
+                values.tofile(dataFile)
+            
+            # write the points x hours matrix from the hours x points matrix a few points at a time
+            chunkPointCount = max(1, self.transposeChunkSize // (8 * max(1, self.hourCount)))
+            rowSize = self.pointCount * 8
+            for firstPoint in xrange(0, self.pointCount, chunkPointCount):
+                count = min(chunkPointCount, self.pointCount - firstPoint)
+                chunk = array.array("d")
+                for hourCount in xrange(self.hourCount):
+                    dataFile.seek(self.headerSize + hourCount * rowSize + firstPoint * 8)
+                    chunk.fromfile(dataFile, count)
+                
+                dataFile.seek(self.pointsOffset + firstPoint * self.hourCount * 8)
+                for pointCount in xrange(count):
+                    chunk[pointCount::count].tofile(dataFile)
+            
+            dataFile.seek(0)
+            dataFile.write(struct.pack(self.headerFormat, "HBILLMTX", self.version, \
+                                       self.hourCount, self.pointCount, self.illSize, self.illMTime))
+    
+    def getHourValues(self, HOY):
+        """Return values of all the points for an hour of the year (1-8760)."""
+        if not 0 < HOY <= self.hourCount:
+            raise ValueError("HOY should be between 1 and %d." % self.hourCount)
+        if self.memoryRows is not None:
+            return self.memoryRows[HOY - 1].tolist()
+        values = array.array("d")
+        with open(self.dataFilePath, "rb") as dataFile:
+            dataFile.seek(self.headerSize + (HOY - 1) * self.pointCount * 8)
+            values.fromfile(dataFile, self.pointCount)
+        return values.tolist()
+    
+    def getPointValues(self, pointIndex):
+        """Return values of a point for all the hours of the year."""
+        if not 0 <= pointIndex < self.pointCount:
+            raise ValueError("Point index should be between 0 and %d." % (self.pointCount - 1))
+        if self.memoryRows is not None:
+            return [values[pointIndex] for values in self.memoryRows]
+        values = array.array("d")
+        with open(self.dataFilePath, "rb") as dataFile:
+            dataFile.seek(self.pointsOffset + pointIndex * self.hourCount * 8)
+            values.fromfile(dataFile, self.hourCount)
+        return values.tolist()
+    
+    def iterHours(self):
+        """Yield values of all the points for each hour."""
+        if self.memoryRows is not None:
+            for values in self.memoryRows:
+                yield values
+            return
+        with open(self.dataFilePath, "rb") as dataFile:
+            dataFile.seek(self.headerSize)
+            for hourCount in xrange(self.hourCount):
+                values = array.array("d")
+                values.fromfile(dataFile, self.pointCount)
+                yield values
+
+class hb_IllMatrix(object):
+    """
+    A points x hours view of the .ill files of a multi-CPU Daysim run.
+    
+    illFiles should be sorted based on CPU count (see hb_ReadAnnualResultsAux.sortIllFiles).
+    The points of each file are stitched after the points of the file before.
+    """
+    
+    def __init__(self, illFiles):
+        self.illFiles = [hb_IllFile.fromFile(illFile) for illFile in illFiles]
+        
+        self.firstPointIndex = []
+        pointCount = 0
+        for illFile in self.illFiles:
+            self.firstPointIndex.append(pointCount)
+            pointCount += illFile.pointCount
+        self.pointCount = pointCount
+        
+        hourCounts = set(illFile.hourCount for illFile in self.illFiles)
+        if len(hourCounts) > 1:
+            raise ValueError("Number of hours is not the same in all the .ill files.")
+        self.hourCount = hourCounts.pop() if hourCounts else 0
+    
+    def getHourValues(self, HOY):
+        """Return values of all the points for an hour of the year (1-8760)."""
+        values = []
+        for illFile in self.illFiles:
+            values.extend(illFile.getHourValues(HOY))
+        return values
+    
+    def getPointValues(self, pointIndex):
+        """Return values of a point for all the hours of the year."""
+        if not 0 <= pointIndex < self.pointCount:
+            raise ValueError("Point index should be between 0 and %d." % (self.pointCount - 1))
+        fileIndex = bisect.bisect_right(self.firstPointIndex, pointIndex) - 1
+        return self.illFiles[fileIndex].getPointValues(pointIndex - self.firstPointIndex[fileIndex])
+    
+    def iterHours(self):
+        """Yield values of all the points for each hour."""
+        readers = [illFile.iterHours() for illFile in self.illFiles]
+        for hourCount in xrange(self.hourCount):
+            values = array.array("d")
+            for reader in readers:
+                values.extend(reader.next())
+            yield values
+
+class hb_ShadingStateIllMatrix(object):
+    """
+    A points x hours view of the .ill files of a space with dynamic shading groups.
+    
+    For each hour the values of the state that is in effect are selected from the
+    shading profiles that Daysim writes to the annual profiles file (*_intgain.csv).
+    A group is in effect when its profile is more than 0 and the state is
+    round(number of states * profile). When more than one group is in effect the
+    last one is used. This is the same as Read All the Hourly Results from Annual
+    Daylight Study.
+    
+    Args:
+        stateIllFiles: A list of lists of .ill files. The first list is the .ill file
+            with no dynamic shading and each next list is the .ill files of the states
+            of a shading group.
+        shadingProfiles: A list of hourly values for each shading group.
+    """
+    
+    def __init__(self, stateIllFiles, shadingProfiles = None):
+        self.stateIllFiles = [list(illFiles) for illFiles in stateIllFiles]
+        self.shadingProfiles = list(shadingProfiles or [])
+        if len(self.shadingProfiles) < len(self.stateIllFiles) - 1:
+            raise ValueError("Number of shading profiles doesn't match the number of shading groups.")
+        self.pointCount = 0
+        for values in self.readRows(self.stateIllFiles[0][0]):
+            self.pointCount = len(values)
+            break
+    
+    @staticmethod
+    def readRows(illFilePath):
+        """Yield values of an .ill file hour by hour."""
+        with open(illFilePath, "r") as illFile:
+            for line in illFile:
+                if line.startswith("#") or not line.strip(): continue
+                yield hb_IllFile.parseLine(line)
+    
+    def getStateIndex(self, HOY):
+        """Return the index of the shading group and the state in effect for an hour (0-8759)."""
+        groupIndex, stateIndex = 0, 0
+        for groupCount, shadingProfile in enumerate(self.shadingProfiles[:len(self.stateIllFiles) - 1]):
+            if HOY < len(shadingProfile) and shadingProfile[HOY] > 0:
+                stateCount = len(self.stateIllFiles[groupCount + 1])
+                groupIndex = groupCount + 1
+                stateIndex = min(stateCount, max(1, int(round(stateCount * shadingProfile[HOY])))) - 1
+        return groupIndex, stateIndex
+    
+    def iterHours(self):
+        """Yield values of all the points of the state in effect for each hour."""
+        readers = [[self.readRows(illFile) for illFile in illFiles] for illFiles in self.stateIllFiles]
+        for HOY, values in enumerate(readers[0][0]):
+            stateValues = [[values]] + [[reader.next() for reader in groupReaders] for groupReaders in readers[1:]]
+            groupIndex, stateIndex = self.getStateIndex(HOY)
+            yield stateValues[groupIndex][stateIndex]
+
+class hb_AnnualDaylightMetrics(object):
+    """
+    Annual daylight metrics for all the points of the .ill files in a single pass.
+    
+    Counts the number of occupied hours above, below and between illuminance
+    thresholds and the continuous daylight autonomy credit of each point. For each
+    hour the values of all the points are compared to each threshold with map so the
+    comparison and the counting don't run a python loop for each value.
+    
+    Daylight autonomy, continuous daylight autonomy and useful daylight illuminance
+    are returned as the percentage of the occupied hours.
+    """
+    
+    def __init__(self, thresholds, occupancy = None, upperInclusive = False, continuousThresholds = None):
+        """
+        Args:
+            thresholds: List of illuminance thresholds.
+            occupancy: 0 or 1 for each hour of the study. Default is all the hours.
+            upperInclusive: Set to True to count a value which is equal to a threshold
+                as below the threshold. Default is False which is how Daylight
+                Autonomy is calculated (illuminance >= threshold).
+            continuousThresholds: Optional list of thresholds to calculate continuous
+                daylight autonomy for.
+        """
+        self.thresholds = sorted(set(float(threshold) for threshold in thresholds))
+        self.continuousThresholds = sorted(set(float(threshold) for threshold in continuousThresholds or []))
+        if self.continuousThresholds and self.continuousThresholds[0] <= 0:
+            raise ValueError("Thresholds of continuous daylight autonomy should be more than 0.")
+        if occupancy is None:
+            self.occupancy = None
+        else:
+            self.occupancy = array.array("B", [1 if occ else 0 for occ in occupancy])
+        self.upperInclusive = upperInclusive
+        self.pointCount = 0
+        self.occupiedHours = 0
+        self.aboveCounts = []
+        self.continuousCredits = []
+    
+    @staticmethod
+    def readOccupancyFile(occFilePath):
+        """Return 0 or 1 for each hour of a Daysim occupancy file (month,day,time,occupancy)."""
+        occupancy = []
+        with open(occFilePath, "r") as occFile:
+            for line in occFile:
+                if line.startswith("#") or not line.strip(): continue
+                occupancy.append(1 if float(line.split(",")[-1]) > 0 else 0)
+        return occupancy
+    
+    @staticmethod
+    def readAnnualProfiles(annualProfilesFile):
+        """
+        Return the occupancy and the shading profiles of an annual profiles file (*_intgain.csv).
+        
+        The occupancy is None if the file has no occupancy profile.
+        """
+        headings = []
+        columns = []
+        with open(annualProfilesFile, "r") as inf:
+            for lineCount, line in enumerate(inf):
+                if lineCount == 3:
+                    headings = [heading.strip() for heading in line.strip().split(",")[3:]]
+                    columns = [[] for heading in headings]
+                elif lineCount > 3 and line.strip():
+                    for count, value in enumerate(line.strip().split(",")[3:len(headings) + 3]):
+                        columns[count].append(float(value))
+        
+        occupancy = None
+        shadingProfiles = []
+        for heading, values in zip(headings, columns):
+            if heading.startswith("occ") and occupancy is None:
+                occupancy = [1 if value > 0 else 0 for value in values]
+            elif heading.startswith("blind"):
+                shadingProfiles.append(values)
+        return occupancy, shadingProfiles
+    
+    def calculate(self, illMatrix, workerCount = 1):
+        """
+        Count the occupied hours that each point is above each threshold.
+        
+        Args:
+            illMatrix: An object with pointCount and iterHours like hb_IllMatrix.
+            workerCount: Number of CPUs to use. The points are split into workerCount
+                chunks and the chunks of each hour are counted with Parallel.ForEach.
+        """
+        pointCount = illMatrix.pointCount
+        occupancy = self.occupancy
+        
+        # threshold < value or threshold <= value as a builtin method which map can call
+        if self.upperInclusive: isAbove = [threshold.__lt__ for threshold in self.thresholds]
+        else: isAbove = [threshold.__le__ for threshold in self.thresholds]
+        
+        chunkCount = max(1, min(workerCount, pointCount))
+        chunkSize = -(-pointCount // chunkCount)
+        chunks = [(start, min(start + chunkSize, pointCount)) for start in xrange(0, pointCount, chunkSize)] or [(0, 0)]
+        
+        # counts and the sum of min(value, threshold) for continuous daylight autonomy for each chunk
+        aboveCounts = [[[0] * (end - start) for start, end in chunks] for threshold in self.thresholds]
+        continuousSums = [[[0.0] * (end - start) for start, end in chunks] for threshold in self.continuousThresholds]
+        limits = [[[threshold] * (end - start) for start, end in chunks] for threshold in self.continuousThresholds]
+        occupiedHours = 0
+        
+        for hourCount, values in enumerate(illMatrix.iterHours()):
+            if occupancy is not None and (hourCount >= len(occupancy) or not occupancy[hourCount]):
+                continue
+            occupiedHours += 1
+            
+            def countChunk(chunkCount, values = values):
+                start, end = chunks[chunkCount]
+                chunkValues = values[start:end]
+                for count, above in enumerate(isAbove):
+                    counts = aboveCounts[count]
+                    counts[chunkCount] = map(operator.add, counts[chunkCount], map(above, chunkValues))
+                for count, sums in enumerate(continuousSums):
+                    sums[chunkCount] = map(operator.add, sums[chunkCount], map(min, chunkValues, limits[count][chunkCount]))
+            
+            if len(chunks) == 1: countChunk(0)
+            else: tasks.Parallel.ForEach(range(len(chunks)), countChunk)
+        
+        self.pointCount = pointCount
+        self.occupiedHours = occupiedHours
+        self.aboveCounts = [sum(counts, []) for counts in aboveCounts]
+        self.continuousCredits = [[value / threshold for value in sum(sums, [])] \
+                                  for threshold, sums in zip(self.continuousThresholds, continuousSums)]
+    
+    def thresholdIndex(self, threshold):
+        try:
+            return self.thresholds.index(float(threshold))
+        except ValueError:
+            raise ValueError("%s is not one of the thresholds: %s" % (threshold, self.thresholds))
+    
+    def hoursAbove(self, threshold):
+        """Number of hours for each point that the value is more than the threshold."""
+        return list(self.aboveCounts[self.thresholdIndex(threshold)])
+    
+    def hoursBelow(self, threshold):
+        """Number of hours for each point that the value is less than the threshold."""
+        occupiedHours = self.occupiedHours
+        return [occupiedHours - hourCount for hourCount in self.aboveCounts[self.thresholdIndex(threshold)]]
+    
+    def hoursInRange(self, lowerThreshold, upperThreshold):
+        """Number of hours for each point that the value is between the two thresholds."""
+        lowerCounts = self.aboveCounts[self.thresholdIndex(lowerThreshold)]
+        upperCounts = self.aboveCounts[self.thresholdIndex(upperThreshold)]
+        return [max(0, lowerCount - upperCount) for lowerCount, upperCount in zip(lowerCounts, upperCounts)]
+    
+    def toPercent(self, hours):
+        if not self.occupiedHours: return [0.0] * len(hours)
+        return [100.0 * hourCount / self.occupiedHours for hourCount in hours]
+    
+    def daylightAutonomy(self, threshold):
+        """Percentage of the occupied hours that each point is at or above the threshold."""
+        return self.toPercent(self.hoursAbove(threshold))
+    
+    def continuousDaylightAutonomy(self, threshold):
+        """
+        Same as daylight autonomy except that the hours below the threshold count as
+        illuminance / threshold.
+        """
+        try:
+            credits = self.continuousCredits[self.continuousThresholds.index(float(threshold))]
+        except ValueError:
+            raise ValueError("%s is not one of the continuous thresholds: %s" % (threshold, self.continuousThresholds))
+        return self.toPercent(credits)
+    
+    def usefulDaylightIlluminance(self, lowerThreshold = 100, upperThreshold = 2000):
+        """Percentage of the occupied hours that each point is below, between and above the thresholds."""
+        return self.toPercent(self.hoursBelow(lowerThreshold)), \
+               self.toPercent(self.hoursInRange(lowerThreshold, upperThreshold)), \
+               self.toPercent(self.hoursAbove(upperThreshold))
+
+class hb_MicroclimateMatrix(object):
+    """
+    A comfort result matrix that is read from a result csv file of the Microclimate Map Analysis.
+    
+    The file is scanned once for the position of each line and rows are only parsed
+    when they are requested. It can be used in place of a python matrix, where the
+    first item is the header and each of the next items are the values of an hour.
+    """
+    
+    def __init__(self, resultFilePath):
+        self.resultFilePath = resultFilePath
+        self.lineOffsets = []
+        self.parsedRows = {}
+        
+        offset = 0
+        with open(resultFilePath, "rb") as resultFile:
+            for lineCount, line in enumerate(resultFile):
+                if lineCount == 0: self.header = line.split('\n')[0].rstrip('\r')
+                elif line.strip(): self.lineOffsets.append(offset)
+                offset += len(line)
+    
+    def __len__(self):
+        return len(self.lineOffsets) + 1
+    
+    def getRow(self, rowIndex):
+        """Return the values of an hour. rowIndex starts from 0."""
+        return self.getRows([rowIndex + 1])[0]
+    
+    def getRows(self, indexes):
+        """Return the items of the matrix for a list of indexes. Rows that are not parsed yet are read with one file handle."""
+        indexes = [index + len(self) if index < 0 else index for index in indexes]
+        for index in indexes:
+            if not 0 <= index < len(self): raise IndexError("Matrix index out of range.")
+        
+        rowIndexes = sorted(set(index - 1 for index in indexes if index > 0 and index - 1 not in self.parsedRows))
+        if rowIndexes:
+            with open(self.resultFilePath, "rb") as resultFile:
+                for rowIndex in rowIndexes:
+                    resultFile.seek(self.lineOffsets[rowIndex])
+                    line = resultFile.readline()
+                    self.parsedRows[rowIndex] = [float(column) for column in line.split(',')]
+        
+        return [self.parsedRows[index - 1] if index > 0 else self.header for index in indexes]
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.getRows(range(*index.indices(len(self))))
+        if index < 0: index += len(self)
+        if index == 0: return self.header
+        if not 0 < index < len(self): raise IndexError("Matrix index out of range.")
+        return self.getRow(index - 1)
+    
+    def __iter__(self):
+        for row in self.getRows(range(len(self))):
+            yield row
+
+class hb_RayBVH(object):
+    """
+    A bounding volume hierarchy of triangles that finds the surfaces hit by rays.
+    
+    Triangles are three (x, y, z) tuples and each triangle carries the index of the surface
+    that it belongs to. The tree is built once and can be used for any number of rays.
+    The class doesn't use Rhino geometry.
+    """
+    
+    leafSize = 4
+    tolerance = 1e-12
+    
+    def __init__(self, triangles, surfaceIds):
+        self.triangles = []
+        self.surfaceIds = list(surfaceIds)
+        self.surfaceCount = len(set(self.surfaceIds))
+        
+        # nodes are stored in flat lists. leaf nodes have a left child of -1.
+        self.nodeMin = []
+        self.nodeMax = []
+        self.nodeLeft = []
+        self.nodeRight = []
+        self.nodeStart = []
+        self.nodeEnd = []
+        
+        triBounds = []
+        for a, b, c in triangles:
+            self.triangles.append((a[0], a[1], a[2], \
+                                   b[0] - a[0], b[1] - a[1], b[2] - a[2], \
+                                   c[0] - a[0], c[1] - a[1], c[2] - a[2]))
+            triBounds.append(([min(a[i], b[i], c[i]) for i in range(3)], \
+                              [max(a[i], b[i], c[i]) for i in range(3)], \
+                              [(a[i] + b[i] + c[i]) / 3.0 for i in range(3)]))
+        
+        self.order = range(len(self.triangles))
+        if self.triangles: self.buildNode(triBounds, 0, len(self.triangles))
+    
+    def buildNode(self, triBounds, start, end):
+        nodeIndex = len(self.nodeMin)
+        items = self.order[start:end]
+        self.nodeMin.append([min(triBounds[t][0][i] for t in items) for i in range(3)])
+        self.nodeMax.append([max(triBounds[t][1][i] for t in items) for i in range(3)])
+        self.nodeLeft.append(-1)
+        self.nodeRight.append(-1)
+        self.nodeStart.append(start)
+        self.nodeEnd.append(end)
+        
+        if end - start <= self.leafSize: return nodeIndex
+        
+        # split the triangles at the median of the longest axis of their centroids
+        centroidMin = [min(triBounds[t][2][i] for t in items) for i in range(3)]
+        centroidMax = [max(triBounds[t][2][i] for t in items) for i in range(3)]
+        extents = [centroidMax[i] - centroidMin[i] for i in range(3)]
+        axis = extents.index(max(extents))
+        if extents[axis] <= 0: return nodeIndex
+        
+        items.sort(key = lambda t: triBounds[t][2][axis])
+        self.order[start:end] = items
+        mid = (start + end) // 2
+        self.nodeLeft[nodeIndex] = self.buildNode(triBounds, start, mid)
+        self.nodeRight[nodeIndex] = self.buildNode(triBounds, mid, end)
+        return nodeIndex
+    
+    def rayHitsBox(self, nodeIndex, origin, invDirection, maxT):
+        """Return the distance that the ray enters the box of a node or None."""
+        tNear = 0.0
+        tFar = maxT
+        boxMin = self.nodeMin[nodeIndex]
+        boxMax = self.nodeMax[nodeIndex]
+        for i in range(3):
+            if invDirection[i] is None:
+                if origin[i] < boxMin[i] or origin[i] > boxMax[i]: return None
+                continue
+            t1 = (boxMin[i] - origin[i]) * invDirection[i]
+            t2 = (boxMax[i] - origin[i]) * invDirection[i]
+            if t1 > t2: t1, t2 = t2, t1
+            if t1 > tNear: tNear = t1
+            if t2 < tFar: tFar = t2
+            if tNear > tFar: return None
+        return tNear
+    
+    def rayHitsTriangle(self, triIndex, origin, direction):
+        """Return the ray parameter of the hit with a triangle or None."""
+        ax, ay, az, e1x, e1y, e1z, e2x, e2y, e2z = self.triangles[triIndex]
+        dx, dy, dz = direction
+        px = dy * e2z - dz * e2y
+        py = dz * e2x - dx * e2z
+        pz = dx * e2y - dy * e2x
+        det = e1x * px + e1y * py + e1z * pz
+        if -self.tolerance < det < self.tolerance: return None
+        invDet = 1.0 / det
+        tx = origin[0] - ax
+        ty = origin[1] - ay
+        tz = origin[2] - az
+        u = (tx * px + ty * py + tz * pz) * invDet
+        if u < 0 or u > 1: return None
+        qx = ty * e1z - tz * e1y
+        qy = tz * e1x - tx * e1z
+        qz = tx * e1y - ty * e1x
+        v = (dx * qx + dy * qy + dz * qz) * invDet
+        if v < 0 or u + v > 1: return None
+        t = (e2x * qx + e2y * qy + e2z * qz) * invDet
+        if t < 0: return None
+        return t
+    
+    def traverse(self, origin, direction, firstHit = False):
+        """Yield the ray parameter and the surface index of the triangles hit by a ray."""
+        if not self.triangles: return
+        invDirection = [1.0 / d if d != 0 else None for d in direction]
+        stack = [0]
+        while stack:
+            nodeIndex = stack.pop()
+            if self.rayHitsBox(nodeIndex, origin, invDirection, float("inf")) is None: continue
+            if self.nodeLeft[nodeIndex] != -1:
+                stack.append(self.nodeRight[nodeIndex])
+                stack.append(self.nodeLeft[nodeIndex])
+                continue
+            for triIndex in self.order[self.nodeStart[nodeIndex]:self.nodeEnd[nodeIndex]]:
+                t = self.rayHitsTriangle(triIndex, origin, direction)
+                if t is not None:
+                    yield t, self.surfaceIds[triIndex]
+                    if firstHit: return
+    
+    def closestHit(self, origin, direction):
+        """
+        Return the index of the closest surface that is hit by a ray or None.
+        
+        Surfaces that are hit at the same distance are resolved to the lower index.
+        """
+        closest = None
+        invDirection = [1.0 / d if d != 0 else None for d in direction]
+        stack = [0] if self.triangles else []
+        while stack:
+            nodeIndex = stack.pop()
+            maxT = closest[0] if closest else float("inf")
+            if self.rayHitsBox(nodeIndex, origin, invDirection, maxT) is None: continue
+            if self.nodeLeft[nodeIndex] != -1:
+                stack.append(self.nodeRight[nodeIndex])
+                stack.append(self.nodeLeft[nodeIndex])
+                continue
+            for triIndex in self.order[self.nodeStart[nodeIndex]:self.nodeEnd[nodeIndex]]:
+                t = self.rayHitsTriangle(triIndex, origin, direction)
+                if t is not None:
+                    hit = (t, self.surfaceIds[triIndex])
+                    if closest is None or hit < closest: closest = hit
+        
+        if closest is None: return None
+        return closest[1]
+    
+    def isHit(self, origin, direction):
+        """Return True if the ray hits any of the triangles."""
+        for hit in self.traverse(origin, direction, True):
+            return True
+        return False
+    
+    def hitSurfaces(self, origin, direction):
+        """Return the set of surface indices that are hit by a ray."""
+        return set(surfaceId for t, surfaceId in self.traverse(origin, direction))
+
+class hb_EnergySimulatioParameters(object):
+    
+    def readEPParams(self, EPParameters):
+        
+        if EPParameters == []:
+            timestep = 6
+            shadowPar = ["AverageOverDaysInFrequency", 30, 3000]
+            solarDistribution = "FullInteriorAndExteriorWithReflections"
+            simulationControl = [True, True, True, False, True, '', '']
+            ddyFile = None
+            terrain = 'City'
+            grndTemps = []
+            holidays = []
+            startDay = None
+            heatSizing = 1.25
+            coolSizing = 1.15
+        
+        else:
+            timestep = int(EPParameters[0])
+            shadowPar = EPParameters[1:4]
+            solarDistribution = EPParameters[4]
+            simulationControl = EPParameters[5:12]
+            ddyFile = EPParameters[12]
             terrain = EPParameters[13]
             grndTemps = EPParameters[14]
             holidays = EPParameters[15]
@@ -3651,6 +5160,982 @@ class hb_EnergySimulatioParameters(object):
         
         return timestep, shadowPar, solarDistribution, simulationControl, ddyFile, terrain, grndTemps, holidays, startDay, heatSizing, coolSizing
 
+class hb_EPResultHeader(object):
+    """
+    Parse the header of an EnergyPlus result csv file once and classify every column.
+    
+    Each column is stored as a (key, variable, units, timestep, category) record.
+    e.g. "ZONE_1:Zone Mean Air Temperature [C](Hourly)" will be
+    ("ZONE_1", "Zone Mean Air Temperature", "C", "Hourly", "zone")
+    
+    category is one of time, zone, surface, node, site or system.
+    
+    variableIndex is an inverted index from variable name to column ids so the
+    readers can find their columns without testing every column of the file.
+    """
+    
+    def __init__(self, headerLine):
+        self.headerLine = headerLine
+        self.columns = []
+        self.records = []
+        self.variableIndex = {}
+        
+        for columnCount, column in enumerate(headerLine.split(",")):
+            record = self.parseColumn(column)
+            self.columns.append(column)
+            self.records.append(record)
+            if record[1] not in self.variableIndex:
+                self.variableIndex[record[1]] = []
+            self.variableIndex[record[1]].append(columnCount)
+        
+        # upper case names for keyword search. created the first time they are needed
+        self.upperColumns = None
+    
+    @staticmethod
+    def parseColumn(column):
+        column = column.strip()
+        if column.endswith(")") and "(" in column:
+            timestep = column.split("(")[-1][:-1]
+            column = "(".join(column.split("(")[:-1])
+        else:
+            timestep = ""
+        
+        if column.endswith("]") and "[" in column:
+            units = column.split("[")[-1][:-1]
+            column = "[".join(column.split("[")[:-1]).strip()
+        else:
+            units = ""
+        
+        if ":" in column:
+            key = ":".join(column.split(":")[:-1])
+            variable = column.split(":")[-1]
+        else:
+            key = ""
+            variable = column
+        
+        return key, variable, units, timestep, hb_EPResultHeader.getCategory(key, variable)
+    
+    @staticmethod
+    def getCategory(key, variable):
+        if variable == "Date/Time": return "time"
+        elif variable.startswith("Zone "): return "zone"
+        elif variable.startswith("Surface "): return "surface"
+        elif variable.startswith("System Node "): return "node"
+        elif variable.startswith("Site "): return "site"
+        else: return "system"
+    
+    def getColumnsByVariable(self, variables):
+        """Return sorted ids of columns for a list of variable names."""
+        columnIds = []
+        for variable in variables:
+            columnIds.extend(self.variableIndex.get(variable, []))
+        return sorted(set(columnIds))
+    
+    def findColumnsByVariable(self, keywords):
+        """
+        Return sorted ids of columns that their variable name includes any of the keywords.
+        
+        The keywords are only tested against the unique variable names of the
+        file and not against every column.
+        """
+        keywords = [keyword.strip() for keyword in keywords]
+        columnIds = []
+        for variable, ids in self.variableIndex.items():
+            for keyword in keywords:
+                if keyword in variable:
+                    columnIds.extend(ids)
+                    break
+        return sorted(columnIds)
+    
+    def getColumnsByCategory(self, category):
+        return [count for count, record in enumerate(self.records) if record[4] == category]
+    
+    def searchColumns(self, keywords):
+        """
+        Return sorted ids of columns that match the keywords.
+        
+        Keywords follow the same rules as EPMaterialAux.searchListByKeyword. Each
+        keyword can include several words separated by space which all should be
+        in the column name. "*" returns all the columns.
+        """
+        if len(keywords) == 0 or "*" in keywords:
+            return range(len(self.columns))
+        
+        if self.upperColumns is None:
+            self.upperColumns = [column.upper() for column in self.columns]
+        
+        kWords = [kw.strip().upper().split(" ") for kw in keywords]
+        
+        columnIds = []
+        for columnCount, column in enumerate(self.upperColumns):
+            for keyword in kWords:
+                for word in keyword:
+                    if column.find(word) == -1: break
+                else:
+                    columnIds.append(columnCount)
+                    break
+        return columnIds
+
+class hb_EPResultStore(object):
+    """
+    Columnar binary cache for an EnergyPlus result .csv file.
+    
+    The csv file is converted once into two files next to it:
+        resultFile.csv.hbi: json index with the header, the time stamps and the
+                            size and modification time of the source csv.
+        resultFile.csv.hbd: float64 values stored column after column.
+    
+    Every column is a contiguous block in the data file so reading a column is
+    a single seek and read. The cache is rebuilt when the size or the
+    modification time of the csv file changes. Empty or non-numeric cells are
+    stored as nan.
+    
+    Stores are shared between the components for the session through fromFile
+    so the header is parsed into headerIndex (hb_EPResultHeader) only once.
+    """
+    version = 1
+    
+    # stores that are already loaded in this session
+    openStores = {}
+    
+    def __init__(self, csvFilePath):
+        self.csvFilePath = os.path.normpath(csvFilePath)
+        self.indexFilePath = self.csvFilePath + ".hbi"
+        self.dataFilePath = self.csvFilePath + ".hbd"
+        self.headerLine = ""
+        self.header = []
+        self.headerIndex = None
+        self.timeStamps = []
+        self.rowCount = 0
+        self.memoryColumns = None
+        
+        if not self.load():
+            self.build()
+    
+    @classmethod
+    def fromFile(cls, csvFilePath):
+        """Return the store for a csv file and reuse the one in memory if it is still valid."""
+        key = os.path.normpath(csvFilePath)
+        store = cls.openStores.get(key)
+        if store is None or not store.isUpToDate():
+            store = cls(csvFilePath)
+            cls.openStores[key] = store
+        return store
+    
+    @property
+    def columnCount(self):
+        return len(self.header)
+    
+    def csvSignature(self):
+        fileStat = os.stat(self.csvFilePath)
+        return fileStat.st_size, fileStat.st_mtime
+    
+    def isUpToDate(self, index = None):
+        if index is None:
+            index = {"version": self.version, "csvSize": self.csvSize, \
+                     "csvMTime": self.csvMTime}
+        if index.get("version") != self.version: return False
+        size, mTime = self.csvSignature()
+        return index.get("csvSize") == size and index.get("csvMTime") == mTime
+    
+    def load(self):
+        """Load the index of an existing cache. Return False if the cache is missing or outdated."""
+        if not os.path.isfile(self.indexFilePath) or not os.path.isfile(self.dataFilePath):
+            return False
+        try:
+            with open(self.indexFilePath, "r") as indexFile:
+                index = json.load(indexFile)
+        except Exception:
+            return False
+        
+        if not self.isUpToDate(index): return False
+        
+        self.setIndex(index)
+        
+        # make sure the data file is not truncated
+        expectedSize = self.rowCount * self.columnCount * 8
+        if os.path.getsize(self.dataFilePath) != expectedSize:
+            return False
+        
+        return True
+    
+    def setIndex(self, index):
+        self.csvSize = index["csvSize"]
+        self.csvMTime = index["csvMTime"]
+        self.rowCount = index["rowCount"]
+        self.headerLine = index["headerLine"]
+        self.header = self.headerLine.split(",")
+        self.headerIndex = hb_EPResultHeader(self.headerLine)
+        self.timeStamps = index["timeStamps"]
+    
+    def build(self):
+        """Convert the csv file into the columnar cache."""
+        self.csvSize, self.csvMTime = self.csvSignature()
+        nan = float("nan")
+        
+        with open(self.csvFilePath, "r") as csvFile:
+            headerLine = csvFile.readline()
+            columnCount = len(headerLine.split(","))
+            columns = [array.array("d") for count in range(columnCount)]
+            
+            # first column is Date/Time
+            timeStamps = []
+            rowCount = 0
+            for line in csvFile:
+                if not line.strip(): continue
+                values = line.split(",")
+                timeStamps.append(values[0].strip())
+                columns[0].append(nan)
+                for count in xrange(1, columnCount):
+                    try:
+                        columns[count].append(float(values[count]))
+                    except (ValueError, IndexError):
+                        columns[count].append(nan)
+                rowCount += 1
+        
+        index = {"version": self.version, "csvSize": self.csvSize, "csvMTime": self.csvMTime,
+                 "rowCount": rowCount, "headerLine": headerLine, "timeStamps": timeStamps}
+        
+        # both files are written to temp files and renamed once they are complete. the data is
+        # moved in place first and the index last so an index is never paired with partial data
+        tempDataFilePath = self.dataFilePath + ".tmp"
+        tempIndexFilePath = self.indexFilePath + ".tmp"
+        try:
+            with open(tempDataFilePath, "wb") as dataFile:
+                for column in columns:
+                    column.tofile(dataFile)
+            
+            with open(tempIndexFilePath, "w") as indexFile:
+                json.dump(index, indexFile)
+            
+            if os.path.isfile(self.indexFilePath):
+                os.remove(self.indexFilePath)
+            replaceFile(tempDataFilePath, self.dataFilePath)
+            replaceFile(tempIndexFilePath, self.indexFilePath)
+        except Exception, e:
+            # the folder is probably read-only. keep the values in memory for this session
+            print "Failed to write the result cache: " + `e`
+            removeTempFiles([tempDataFilePath, tempIndexFilePath])
+            self.memoryColumns = columns
+        
+        self.setIndex(index)
+    
+    def getColumn(self, columnIndex):
+        """Return values of a column as an array of floats."""
+        return self.getColumns([columnIndex])[columnIndex]
+    
+    def getColumns(self, columnIndexes):
+        """Return a dictionary of column index: values for several columns in one file read."""
+        columns = {}
+        if self.memoryColumns is not None:
+            for columnIndex in columnIndexes:
+                columns[columnIndex] = self.memoryColumns[columnIndex]
+            return columns
+        
+        with open(self.dataFilePath, "rb") as dataFile:
+            for columnIndex in sorted(set(columnIndexes)):
+                values = array.array("d")
+                dataFile.seek(columnIndex * self.rowCount * 8)
+                values.fromfile(dataFile, self.rowCount)
+                columns[columnIndex] = values
+        return columns
+    
+    def getRows(self, columnIndexes):
+        """
+        Yield values of the input columns row by row.
+        
+        Empty cells are yielded as "" so the readers can handle them exactly
+        like they handled the cells of the csv file.
+        """
+        columns = self.getColumns(columnIndexes)
+        columnIndexes = sorted(columns.keys())
+        for rowCount in xrange(self.rowCount):
+            row = {}
+            for columnIndex in columnIndexes:
+                value = columns[columnIndex][rowCount]
+                row[columnIndex] = value if value == value else ""
+            yield row
+
+class hb_EPResultCache(object):
+    """
+    Bounded on-disk cache of EnergyPlus results.
+    
+    Results are stored by a key that is a hash of the idf file, the epw file, the
+    EnergyPlus version and the requested outputs. The idf file is hashed without
+    comments and extra white spaces so rewriting the same model gives the same key.
+    
+    Every entry is a folder inside cacheFolder with a copy of the result files
+    (.csv, .eio, .rdd, .err, .sql, Table.html and Zsz.csv). The entries, their size,
+    the time they were last used and the hit and miss counts are kept in a json index
+    file. The least recently used entries are removed once the size of the cache is
+    larger than maxSize. Entries that a component is outputting the paths of are pinned
+    and aren't removed until the component gets other results (see pin).
+    
+    Args:
+        cacheFolder: Optional folder for the cache. Default is EPResultCache inside
+            the Honeybee default folder.
+        maxSize: Max size of the cache in bytes (default = 2 GB).
+    
+    Usage:
+        resultCache = hb_EPResultCache()
+        key = resultCache.getKey(idfFilePath, epwFilePath, EPVersion)
+        resultFiles = resultCache.get(key, str(ghenv.Component.InstanceGuid))
+        if resultFiles is None:
+            resultCache.removeResultFiles(idfFilePath)
+            startTime = time.time()
+            # run EnergyPlus and get its exit code
+            resultFiles = resultCache.getResultFiles(idfFilePath, startTime)
+            if exitCode == 0: resultFiles = resultCache.add(key, resultFiles)
+        csvFilePath = resultFiles[".csv"]
+    """
+    version = 1
+    resultExtensions = (".csv", ".eio", ".rdd", ".err", ".sql", "Table.html", "Zsz.csv")
+    
+    # digests of the files that are already hashed in this session
+    fileDigests = {}
+    
+    # owner: key of the entries that are in use in this session
+    pinnedKeys = {}
+    
+    def __init__(self, cacheFolder = None, maxSize = 2 * 1024 ** 3):
+        if cacheFolder is None:
+            cacheFolder = os.path.join(sc.sticky["Honeybee_DefaultFolder"], "EPResultCache")
+        self.cacheFolder = cacheFolder
+        self.indexFilePath = os.path.join(cacheFolder, "index.json")
+        self.maxSize = maxSize
+        self.index = self.loadIndex()
+    
+    def loadIndex(self):
+        if os.path.isfile(self.indexFilePath):
+            try:
+                with open(self.indexFilePath, "r") as indexFile:
+                    index = json.load(indexFile)
+                if index.get("version") == self.version: return index
+            except Exception:
+                pass
+        return {"version": self.version, "hits": 0, "misses": 0, "entries": {}}
+    
+    def saveIndex(self):
+        tempIndexFilePath = self.indexFilePath + ".tmp"
+        try:
+            if not os.path.isdir(self.cacheFolder): os.makedirs(self.cacheFolder)
+            with open(tempIndexFilePath, "w") as indexFile:
+                json.dump(self.index, indexFile)
+            replaceFile(tempIndexFilePath, self.indexFilePath)
+        except Exception, e:
+            print "Failed to write the result cache index: " + `e`
+            removeTempFiles([tempIndexFilePath])
+    
+    @classmethod
+    def getFileDigest(cls, filePath):
+        """sha1 of the content of a file. Digests are reused while the file is not changed."""
+        fileStat = os.stat(filePath)
+        signature = (os.path.normpath(filePath), fileStat.st_size, fileStat.st_mtime)
+        if signature not in cls.fileDigests:
+            digest = hashlib.sha1()
+            with open(filePath, "rb") as inf:
+                for chunk in iter(lambda: inf.read(1024 * 1024), ""):
+                    digest.update(chunk)
+            cls.fileDigests[signature] = digest.hexdigest()
+        return cls.fileDigests[signature]
+    
+    @classmethod
+    def getKey(cls, idfFilePath, epwFilePath, EPVersion, outputs = None):
+        """Hash of the idf file, the epw file, the EnergyPlus version and the requested outputs."""
+        digest = hashlib.sha1()
+        digest.update("version:%d\n"%cls.version)
+        digest.update("EnergyPlus:%s\n"%str(EPVersion))
+        digest.update("epw:%s\n"%cls.getFileDigest(epwFilePath))
+        for output in outputs or []:
+            if output: digest.update("output:%s\n"%str(output).strip())
+        
+        for EPObject in hb_IDFTokenizer(idfFilePath):
+            values = [value for value, comment in EPObject.fields]
+            digest.update(EPObject.objClass.lower() + "," + ",".join(values) + ";\n")
+            # the content of csv schedules is not in the idf file
+            if EPObject.objClass.lower() == "schedule:file":
+                for value in values:
+                    if value.lower().endswith(".csv") and os.path.isfile(value):
+                        digest.update("file:%s\n"%cls.getFileDigest(value))
+        
+        return digest.hexdigest()
+    
+    @classmethod
+    def getResultFiles(cls, idfFilePath, startTime = None):
+        """
+        Return a dictionary of extension: path for the result files next to an idf file.
+        
+        Args:
+            idfFilePath: Path to the idf file.
+            startTime: Optional time that the simulation started. Files that are not
+                modified after this time are left out since they are from an earlier run.
+        """
+        fullPath = os.path.splitext(idfFilePath)[0]
+        resultFiles = {}
+        for extension in cls.resultExtensions:
+            if cls.isNewFile(fullPath + extension, startTime):
+                resultFiles[extension] = fullPath + extension
+        return resultFiles
+    
+    @staticmethod
+    def isNewFile(filePath, startTime = None):
+        """Check that a file exists and is modified after startTime."""
+        if not os.path.isfile(filePath): return False
+        # one second of margin for the resolution of the file times
+        return startTime is None or os.path.getmtime(filePath) >= startTime - 1
+    
+    @classmethod
+    def removeResultFiles(cls, idfFilePath, otherFiles = ()):
+        """Remove the result files of an earlier simulation so they can't be taken for the results of the next one."""
+        fullPath = os.path.splitext(idfFilePath)[0]
+        for filePath in [fullPath + extension for extension in cls.resultExtensions] + list(otherFiles):
+            if os.path.isfile(filePath):
+                try: os.remove(filePath)
+                except Exception, e: print "Failed to remove %s: %s"%(filePath, `e`)
+    
+    @classmethod
+    def pin(cls, owner, key = None):
+        """
+        Keep an entry from being evicted while the paths of its files are in use.
+        
+        Each owner (e.g. the InstanceGuid of a component) pins one entry. Pinning another
+        key or None releases the entry that the owner pinned before. Pins are kept for the
+        Rhino session and don't stop purge from removing an entry.
+        """
+        if key is None: cls.pinnedKeys.pop(owner, None)
+        else: cls.pinnedKeys[owner] = key
+    
+    def get(self, key, owner = None):
+        """
+        Return a dictionary of extension: path for the cached result files or None if the results are not in the cache.
+        
+        Args:
+            key: Key of the simulation from getKey.
+            owner: Optional owner of the returned paths. The entry is pinned for the owner
+                and the entry that it pinned before is released.
+        """
+        if owner is not None: self.pin(owner)
+        entry = self.index["entries"].get(key)
+        if entry is not None:
+            resultFiles = {}
+            for extension, fileName in entry["files"].iteritems():
+                resultFiles[extension] = os.path.join(self.cacheFolder, key, fileName)
+            if all(os.path.isfile(filePath) for filePath in resultFiles.values()):
+                entry["lastUsed"] = time.time()
+                self.index["hits"] += 1
+                self.saveIndex()
+                if owner is not None: self.pin(owner, key)
+                return resultFiles
+            # files are removed outside the cache
+            self.removeEntry(key)
+        
+        self.index["misses"] += 1
+        self.saveIndex()
+        return None
+    
+    def add(self, key, resultFiles):
+        """
+        Copy the result files of a simulation to the cache.
+        
+        Args:
+            key: Key of the simulation from getKey.
+            resultFiles: A dictionary of extension: path for the result files.
+        Returns:
+            resultFiles with the path of the cached files. Failed simulations are not
+            added to the cache and the input resultFiles is returned.
+        """
+        if not self.isComplete(resultFiles): return resultFiles
+        
+        entryFolder = os.path.join(self.cacheFolder, key)
+        try:
+            if os.path.isdir(entryFolder): shutil.rmtree(entryFolder)
+            os.makedirs(entryFolder)
+            files = {}
+            size = 0
+            for extension, filePath in resultFiles.iteritems():
+                fileName = os.path.basename(filePath)
+                shutil.copy2(filePath, os.path.join(entryFolder, fileName))
+                files[extension] = fileName
+                size += os.path.getsize(filePath)
+        except Exception, e:
+            print "Failed to add the results to the cache: " + `e`
+            shutil.rmtree(entryFolder, True)
+            return resultFiles
+        
+        self.index["entries"][key] = {"files": files, "size": size, "lastUsed": time.time()}
+        self.evict()
+        self.saveIndex()
+        
+        if key not in self.index["entries"]: return resultFiles
+        return dict((extension, os.path.join(entryFolder, fileName)) \
+            for extension, fileName in files.iteritems())
+    
+    def copyTo(self, key, fileNames, targetFolder):
+        """
+        Copy the cached files of an entry to targetFolder.
+        
+        Args:
+            key: Key of the entry.
+            fileNames: A dictionary of name: file name for the copies. Names are the same
+                as the keys of the files that are added to the cache.
+            targetFolder: Folder for the copies.
+        Returns:
+            False if the files are not in the cache.
+        """
+        cachedFiles = self.get(key)
+        if cachedFiles is None or set(cachedFiles) != set(fileNames): return False
+        try:
+            for name, fileName in fileNames.iteritems():
+                shutil.copy2(cachedFiles[name], os.path.join(targetFolder, fileName))
+        except Exception, e:
+            print "Failed to copy the files from the cache: " + `e`
+            return False
+        return True
+    
+    @staticmethod
+    def isComplete(resultFiles):
+        """Check that the simulation ended without a fatal error and wrote the csv file."""
+        if ".csv" not in resultFiles: return False
+        if ".err" in resultFiles:
+            with open(resultFiles[".err"], "r") as errFile:
+                if "**  Fatal  **" in errFile.read(): return False
+        return True
+    
+    def evict(self):
+        """Remove the least recently used entries that aren't pinned until the cache is smaller than maxSize."""
+        entries = self.index["entries"]
+        pinnedKeys = set(self.pinnedKeys.values())
+        size = sum(entry["size"] for entry in entries.values())
+        for key in sorted(entries, key = lambda key: entries[key]["lastUsed"]):
+            if size <= self.maxSize: break
+            if key in pinnedKeys: continue
+            size -= entries[key]["size"]
+            self.removeEntry(key)
+    
+    def removeEntry(self, key):
+        self.index["entries"].pop(key, None)
+        shutil.rmtree(os.path.join(self.cacheFolder, key), True)
+    
+    def purge(self, olderThan = None):
+        """
+        Remove entries from the cache.
+        
+        Args:
+            olderThan: Optional number of days. Only the entries that are not used in
+                this number of days are removed. Default is to remove all the entries.
+        Returns:
+            Number of removed entries.
+        """
+        entries = self.index["entries"]
+        if olderThan is None: keys = entries.keys()
+        else:
+            limit = time.time() - olderThan * 86400
+            keys = [key for key in entries if entries[key]["lastUsed"] < limit]
+        
+        for key in keys:
+            self.removeEntry(key)
+        self.saveIndex()
+        return len(keys)
+    
+    def stats(self):
+        """Return a dictionary with the hit and miss counts, the number of entries and the size of the cache."""
+        entries = self.index["entries"]
+        return {"hits": self.index["hits"], "misses": self.index["misses"], \
+                "entries": len(entries), "size": sum(entry["size"] for entry in entries.values()), \
+                "maxSize": self.maxSize}
+
+class hb_DCCache(hb_EPResultCache):
+    """
+    Bounded on-disk cache of Daysim daylight coefficient (.dc) files.
+    
+    The .dc files of a heading file are stored by a key that is a hash of the Radiance
+    files of the scene, the sensor points, the geometry of the shading states, the
+    Radiance parameters and the location. Occupancy, lighting control, thresholds of
+    the shading controls and annual profiles don't change the .dc files and are not in
+    the key, so a rerun that only changes them can skip gen_dc and only run ds_illum.
+    
+    Entries, least recently used eviction, purge and stats work the same as
+    hb_EPResultCache. The files of an entry are stored by their name in the heading
+    file without the project name and the cpu count so they can be copied to another
+    study.
+    
+    Args:
+        cacheFolder: Optional folder for the cache. Default is DCCache inside the
+            Honeybee default folder.
+        maxSize: Max size of the cache in bytes (default = 5 GB).
+    """
+    version = 1
+    
+    def __init__(self, cacheFolder = None, maxSize = 5 * 1024 ** 3):
+        if cacheFolder is None:
+            cacheFolder = os.path.join(sc.sticky["Honeybee_DefaultFolder"], "DCCache")
+        hb_EPResultCache.__init__(self, cacheFolder, maxSize)
+    
+    @staticmethod
+    def getDCFiles(projectName, dynamicShadingStr, cpuCount = 0):
+        """Return a dictionary of name: file name for the .dc files of a heading file."""
+        suffix = "_" + `cpuCount` + ".dc"
+        DCFiles = {"project": projectName + suffix}
+        for word in dynamicShadingStr.split():
+            if word.endswith(suffix) and word != projectName + suffix:
+                DCFiles[word[:-len(suffix)]] = word
+        return DCFiles
+    
+    @classmethod
+    def getKey(cls, sceneFiles, ptsFile, dynamicShadingStr, DCFiles, settings):
+        """
+        Hash of the inputs of gen_dc.
+        
+        Args:
+            sceneFiles: List of Radiance files of the scene (materials, geometry and additional files).
+            ptsFile: Path to the sensor points.
+            dynamicShadingStr: Shading section of the heading file. Only the geometry of the
+                shading states is used for the key.
+            DCFiles: Names of the .dc files from getDCFiles.
+            settings: List of strings that change the .dc files (e.g. Radiance parameters,
+                location, output units and north angle).
+        """
+        digest = hashlib.sha1()
+        digest.update("version:%d\n"%cls.version)
+        for setting in settings:
+            digest.update("setting:%s\n"%str(setting).strip())
+        for filePath in sceneFiles:
+            if os.path.isfile(filePath): digest.update("scene:%s\n"%cls.getFileDigest(filePath))
+            else: digest.update("scene:%s\n"%filePath)
+        digest.update("sensors:%s\n"%cls.getFileDigest(ptsFile))
+        for name in sorted(DCFiles):
+            digest.update("dc:%s\n"%name)
+        for word in dynamicShadingStr.split():
+            if word.lower().endswith(".rad") and os.path.isfile(word):
+                digest.update("state:%s\n"%cls.getFileDigest(word))
+        
+        return digest.hexdigest()
+    
+    @staticmethod
+    def isComplete(resultFiles):
+        """Check that gen_dc wrote all the .dc files."""
+        return all(os.path.isfile(filePath) and os.path.getsize(filePath) > 0 \
+            for filePath in resultFiles.values())
+
+class hb_OctreeCache(hb_EPResultCache):
+    """
+    Bounded on-disk cache of frozen Radiance octrees of the scenes without the sky.
+    
+    Octrees are stored by a hash of the content of the scene files and the oconv
+    options. hb_WriteRAD only puts the objects that are not changed since the last export
+    in the scene files. The changed objects and the sky are added to a copy of the cached
+    octree with oconv -i so a study that only changes the sky or a few objects doesn't
+    rebuild the octree of the rest of the geometry.
+    Entries, least recently used eviction, purge and stats work the same as
+    hb_EPResultCache.
+    
+    Args:
+        cacheFolder: Optional folder for the cache. Default is OctreeCache inside the
+            Honeybee default folder.
+        maxSize: Max size of the cache in bytes (default = 2 GB).
+    """
+    version = 1
+    
+    def __init__(self, cacheFolder = None, maxSize = 2 * 1024 ** 3):
+        if cacheFolder is None:
+            cacheFolder = os.path.join(sc.sticky["Honeybee_DefaultFolder"], "OctreeCache")
+        hb_EPResultCache.__init__(self, cacheFolder, maxSize)
+    
+    @classmethod
+    def getKey(cls, sceneFiles, settings = None):
+        """Hash of the content of the scene files in order and the oconv settings."""
+        digest = hashlib.sha1()
+        digest.update("version:%d\n"%cls.version)
+        for setting in settings or []:
+            digest.update("setting:%s\n"%str(setting).strip())
+        for filePath in sceneFiles:
+            if os.path.isfile(filePath): digest.update("scene:%s\n"%cls.getFileDigest(filePath))
+            else: digest.update("scene:%s\n"%filePath)
+        return digest.hexdigest()
+    
+    @staticmethod
+    def isComplete(resultFiles):
+        """Check that oconv wrote the octree."""
+        return all(os.path.isfile(filePath) and os.path.getsize(filePath) > 0 \
+            for filePath in resultFiles.values())
+
+class hb_ParametricRun(object):
+    """
+    Run variants of an idf file and collect their results in a SQLite database.
+    
+    Variants are made by changing fields of the objects of a base idf file. Each
+    parameter is the address of a field as class|object name|field where field is
+    the field comment (e.g. U-Factor) or the number of the field (1 is the name).
+    Use * as the object name to change the field in all the objects of the class.
+    e.g. WindowMaterial:SimpleGlazingSystem|Glazing 1|U-Factor
+    
+    Variants run with hb_JobScheduler and the csv file of each variant is added to
+    the database as soon as its simulation is finished. A variant fails if its simulation
+    doesn't write a new csv file or has a fatal error. The database has two tables:
+        variants: id, idfFile, parameters (json), status, returnCode, duration
+        results:  variant, zone, variable, units, timestep, step, value
+    zone is the key of the column in the csv file (e.g. the zone, surface or node name).
+    
+    Args:
+        idfFilePath: Path to the base idf file.
+        epwFilePath: Path to the weather file.
+        workingDir: Folder for the variants. Each variant is written to its own sub-folder.
+        databasePath: Optional path to the SQLite database. Default is results.sqlite
+            inside workingDir.
+        maxPRuns: Max number of simulations that run at the same time (default = 1).
+        simulator: Optional function that gets the path to an idf file and the path to
+            the weather file and returns the command that runs the simulation. The result
+            files should be written next to the idf file. Default runs EnergyPlus.
+    """
+    
+    def __init__(self, idfFilePath, epwFilePath, workingDir, databasePath = None, maxPRuns = 1, simulator = None):
+        self.idfFilePath = idfFilePath
+        self.epwFilePath = epwFilePath
+        self.workingDir = workingDir
+        if databasePath is None: databasePath = os.path.join(workingDir, "results.sqlite")
+        self.databasePath = databasePath
+        self.maxPRuns = maxPRuns
+        if simulator is None: simulator = self.writeBatchFile
+        self.simulator = simulator
+        self.variants = []
+        self.jobVariants = {}
+        self.lock = threading.Lock()
+    
+    @staticmethod
+    def connect(databasePath):
+        try:
+            import sqlite3
+        except Exception:
+            raise Exception("Failed to import sqlite3. Make sure IronPython.SQLite.dll is available " + \
+                "to Rhino to write the result database.")
+        return sqlite3.connect(databasePath)
+    
+    @staticmethod
+    def parseParameterTable(lines):
+        """
+        Read variants from the lines of a comma separated table.
+        
+        The first line is the header with the parameters. If the first column is id
+        the values of this column are used as the ids of the variants.
+        
+        Returns:
+            A list of (variantId, {parameter: value}).
+        """
+        rows = [line.split(",") for line in lines if line and line.strip()]
+        if not rows: return []
+        
+        header = [parameter.strip() for parameter in rows[0]]
+        hasIds = header[0].lower() == "id"
+        
+        variants = []
+        for rowCount, row in enumerate(rows[1:]):
+            values = [value.strip() for value in row]
+            if hasIds: variantId = values[0]
+            else: variantId = "variant_%03d"%(rowCount + 1)
+            parameters = {}
+            for parameter, value in zip(header, values)[int(hasIds):]:
+                parameters[parameter] = value
+            variants.append((variantId, parameters))
+        
+        return variants
+    
+    @staticmethod
+    def parseParameter(parameter):
+        """Return (class, object name, field) for a parameter. field is an index or an upper case field comment."""
+        try:
+            objClass, objName, field = [part.strip() for part in parameter.split("|")]
+        except ValueError:
+            raise ValueError("%s is not a valid parameter. Use class|object name|field."%parameter)
+        if field.isdigit(): field = int(field) - 1
+        else: field = field.upper()
+        return objClass.lower(), objName.upper(), field
+    
+    @staticmethod
+    def getFieldName(comment):
+        # !- U-Factor {W/m2-K} > U-FACTOR
+        return re.sub(r"\{.*\}", "", comment).strip().lstrip("-").strip().upper()
+    
+    def addVariant(self, variantId, parameters):
+        variantId = re.sub(r"[^\w\-]", "_", str(variantId))
+        if variantId in [variant[0] for variant in self.variants]:
+            raise ValueError("Variant %s is already added."%variantId)
+        self.variants.append((variantId, parameters))
+        return variantId
+    
+    def writeVariant(self, variantId, parameters):
+        """Write the idf file of a variant and return its path."""
+        patches = [(self.parseParameter(parameter), value, parameter) \
+            for parameter, value in parameters.iteritems()]
+        appliedPatches = set()
+        
+        variantFolder = os.path.join(self.workingDir, variantId)
+        if not os.path.isdir(variantFolder): os.makedirs(variantFolder)
+        variantFilePath = os.path.join(variantFolder, variantId + ".idf")
+        
+        with open(variantFilePath, "w") as outf:
+            for EPObject in hb_IDFTokenizer(self.idfFilePath):
+                fields = EPObject.fields
+                for (objClass, objName, field), value, parameter in patches:
+                    if EPObject.objClass.lower() != objClass: continue
+                    if objName != "*" and EPObject.name.upper() != objName: continue
+                    
+                    if not isinstance(field, int):
+                        fieldNames = [self.getFieldName(comment) for fieldValue, comment in fields]
+                        if field not in fieldNames: continue
+                        fieldIndex = fieldNames.index(field)
+                    else:
+                        fieldIndex = field
+                    
+                    fields = list(fields)
+                    while len(fields) <= fieldIndex: fields.append(("", ""))
+                    fields[fieldIndex] = (value, fields[fieldIndex][1])
+                    appliedPatches.add(parameter)
+                
+                outf.write(self.getObjectString(EPObject.objClass, fields))
+        
+        missingPatches = [parameter for parameter in parameters if parameter not in appliedPatches]
+        if missingPatches:
+            raise ValueError("Failed to find these fields in %s:\n%s"%(self.idfFilePath, "\n".join(missingPatches)))
+        
+        return variantFilePath
+    
+    @staticmethod
+    def getObjectString(objClass, fields):
+        if not fields: return objClass + ";\n\n"
+        
+        lines = [objClass + ",\n"]
+        for count, (value, comment) in enumerate(fields):
+            if count < len(fields) - 1: separator = ","
+            else: separator = ";"
+            if comment: lines.append("  " + value + separator + "   !" + comment + "\n")
+            else: lines.append("  " + value + separator + "\n")
+        lines.append("\n")
+        return "".join(lines)
+    
+    def writeBatchFile(self, idfFilePath, epwFilePath):
+        """Write a batch file that runs an idf file through EnergyPlus and return the command for the batch file."""
+        EPDirectory = sc.sticky["honeybee_folders"]["EPPath"]
+        workingDir, idfFileName = os.path.split(idfFilePath)
+        workingDrive = workingDir[:2]
+        fullPath = os.path.splitext(idfFilePath)[0]
+        folderName = workingDir[2:].lstrip("\\")
+        
+        batchStr = workingDrive + '\ncd\\' +  folderName + '\n"' + EPDirectory + \
+                '\\Epl-run" ' + fullPath + ' ' + fullPath + ' idf ' + epwFilePath + ' EP N nolimit N N 0 Y'
+        
+        batchFileAddress = fullPath + '.bat'
+        with open(batchFileAddress, 'w') as batchfile:
+            batchfile.write(batchStr)
+        
+        return ["cmd /c ", batchFileAddress]
+    
+    def createDatabase(self):
+        connection = self.connect(self.databasePath)
+        try:
+            connection.execute("CREATE TABLE IF NOT EXISTS variants (id TEXT PRIMARY KEY, idfFile TEXT, " + \
+                "parameters TEXT, status TEXT, returnCode INTEGER, duration REAL)")
+            connection.execute("CREATE TABLE IF NOT EXISTS results (variant TEXT, zone TEXT, variable TEXT, " + \
+                "units TEXT, timestep TEXT, step INTEGER, value REAL)")
+            connection.execute("CREATE INDEX IF NOT EXISTS resultsIndex ON results (variant, zone, variable)")
+            connection.commit()
+        finally:
+            connection.close()
+    
+    def run(self):
+        """Write and run all the variants. Returns a dictionary of variant id: path to the csv file."""
+        if not os.path.isdir(self.workingDir): os.makedirs(self.workingDir)
+        self.createDatabase()
+        
+        scheduler = sc.sticky["honeybee_JobScheduler"](self.maxPRuns, shell = True, captureOutput = True, \
+            progressCallback = self.ingest)
+        
+        self.jobVariants = {}
+        resultFiles = {}
+        for variantId, parameters in self.variants:
+            variantFilePath = self.writeVariant(variantId, parameters)
+            # results of an earlier run can't be taken for the results of this run
+            hb_EPResultCache.removeResultFiles(variantFilePath)
+            job = scheduler.addJob(self.simulator(variantFilePath, self.epwFilePath), variantId)
+            self.jobVariants[job] = (variantId, parameters, variantFilePath)
+            resultFiles[variantId] = os.path.splitext(variantFilePath)[0] + ".csv"
+        
+        scheduler.run()
+        return resultFiles
+    
+    def ingest(self, finishedCount, totalCount, job):
+        """Add the results of a finished job to the database."""
+        variantId, parameters, variantFilePath = self.jobVariants[job]
+        resultFiles = hb_EPResultCache.getResultFiles(variantFilePath, job.startTime)
+        status = job.status
+        # the simulation should write a new csv file and no fatal errors
+        if status == "done" and not hb_EPResultCache.isComplete(resultFiles): status = "failed"
+        
+        with self.lock:
+            connection = self.connect(self.databasePath)
+            try:
+                connection.execute("DELETE FROM results WHERE variant = ?", (variantId,))
+                connection.execute("INSERT OR REPLACE INTO variants VALUES (?, ?, ?, ?, ?, ?)", \
+                    (variantId, variantFilePath, json.dumps(parameters), status, job.returnCode, job.duration))
+                if status == "done":
+                    connection.executemany("INSERT INTO results VALUES (?, ?, ?, ?, ?, ?, ?)", \
+                        self.readResults(variantId, resultFiles[".csv"]))
+                connection.commit()
+            finally:
+                connection.close()
+        
+        print "[%d of %d] %s: %s"%(finishedCount, totalCount, variantId, status)
+    
+    @staticmethod
+    def readResults(variantId, csvFilePath):
+        """Yield (variant, zone, variable, units, timestep, step, value) for the values of a csv file."""
+        with open(csvFilePath, "r") as csvFile:
+            records = hb_EPResultHeader(csvFile.readline()).records
+            step = 0
+            for line in csvFile:
+                if not line.strip(): continue
+                values = line.split(",")
+                for count in xrange(1, min(len(values), len(records))):
+                    try: value = float(values[count])
+                    except ValueError: continue
+                    key, variable, units, timestep, category = records[count]
+                    yield variantId, key, variable, units, timestep, step, value
+                step += 1
+    
+    def getValues(self, variable, zone = None, variantIds = None):
+        """Return a dictionary of variant id: values of a variable from the database."""
+        query = "SELECT variant, value FROM results WHERE variable = ?"
+        arguments = [variable]
+        if zone is not None:
+            query += " AND zone = ?"
+            arguments.append(zone)
+        if variantIds:
+            query += " AND variant IN (%s)"%",".join("?" * len(variantIds))
+            arguments.extend(variantIds)
+        query += " ORDER BY variant, zone, step"
+        
+        values = {}
+        connection = self.connect(self.databasePath)
+        try:
+            for variantId, value in connection.execute(query, arguments):
+                values.setdefault(variantId, []).append(value)
+        finally:
+            connection.close()
+        return values
+    
+    def report(self):
+        """Return a line for each variant with its status."""
+        connection = self.connect(self.databasePath)
+        try:
+            rows = connection.execute("SELECT id, status, returnCode, duration FROM variants ORDER BY id").fetchall()
+        finally:
+            connection.close()
+        lines = []
+        for variantId, status, returnCode, duration in rows:
+            if duration is None: duration = "-"
+            else: duration = "%.2f s"%duration
+            lines.append("%s: %s (exit code: %s, time: %s)"%(variantId, status, returnCode, duration))
+        return lines
+
 class EPMaterialAux(object):
     
     def __init__(self):
@@ -3856,8 +6341,12 @@ class EPMaterialAux(object):
             print "Failed to find " + cnstrName + " in the Honeybee construction library."
             return -1
        
-    def searchListByKeyword(self, inputList, keywords):
-        """ search inside a list of strings for keywords """
+    def searchListByKeyword(self, inputList, keywords, library = None):
+        """ search inside a list of strings for keywords
+            
+            If the list is the names in a hb_EPLibrary pass the library so the
+            keywords are looked up in the keyword index of the library.
+        """
         
         def checkMultipleKeywords(name, keywordlist):
             for kw in keywordlist:
@@ -3870,17 +6359,24 @@ class EPMaterialAux(object):
             kWords.append(kw.strip().upper().split(" "))
             
         selectedItems = []
-        alternateOptions = []
+        
+        if len(kWords)== 0 or "*" in keywords:
+            return list(inputList)
+        
+        if library is not None:
+            keywordIndex = library.getKeywordIndex()
+            matches = [keywordIndex.searchAll(keyword) for keyword in kWords]
         
         for item in inputList:
-            if len(kWords)!= 0 and not "*" in keywords:
-                for keyword in kWords:
-                    if len(keyword) > 1 and checkMultipleKeywords(item.ToUpper(), keyword):
-                        selectedItems.append(item)
-                    elif len(keyword) == 1 and item.ToUpper().find(keyword[0])!= -1:
+            if library is not None and item in library:
+                itemName = item.upper()
+                for matchedNames in matches:
+                    if itemName in matchedNames:
                         selectedItems.append(item)
             else:
-                selectedItems.append(item)
+                for keyword in kWords:
+                    if checkMultipleKeywords(item.ToUpper(), keyword):
+                        selectedItems.append(item)
     
         return selectedItems
     
@@ -3900,26 +6396,25 @@ class EPMaterialAux(object):
         
         selConstr =[]
         
-        filtConstr =self.searchListByKeyword(constrList, keywords)
+        # constructions from the library are filtered by set intersection in the keyword index
+        # and the rest of them are checked one by one
+        constrLib = sc.sticky["honeybee_constructionLib"]
+        filtConstr =self.searchListByKeyword(constrList, keywords, constrLib)
         
+        keywordIndex = constrLib.getKeywordIndex()
+        indexedConstr = keywordIndex.searchAll([standard, surfaceType])
+        if climateZone!="":
+            indexedConstr = indexedConstr.intersection(keywordIndex.getNamesByClimateZone(climateZone))
         
         for cnstrName in filtConstr:
-           if cnstrName.upper().find(standard.upper())!=-1 and cnstrName.upper().find(surfaceType.upper())!=-1:
+            if cnstrName in constrLib:
+                if cnstrName.upper() in indexedConstr:
+                    selConstr.append(cnstrName)
+            
+            elif cnstrName.upper().find(standard.upper())!=-1 and cnstrName.upper().find(surfaceType.upper())!=-1:
                 # check for climate zone
                 if climateZone!="":
-                    clmZones = []
-                    # split by space " "
-                    possibleAlt, zoneCode = cnstrName.split(" ")[-2:]
-                    clmZoneList = zoneCode.split("-")
-                    if len(clmZoneList) != 1:
-                        try:
-                            clmZoneRange = range(int(clmZoneList[0]), int(clmZoneList[1]) + 1)
-                            for clmZone in clmZoneRange: clmZones.append(str(clmZone))
-                        except:
-                            clmZones = [clmZoneList[0], clmZoneList[1]]
-                    else:
-                        clmZones = clmZoneList
-                        
+                    clmZones = keywordIndex.parseClimateZones(cnstrName)
                     if climateZone in clmZones:
                         selConstr.append(cnstrName)
                     elif climateZone[0] in clmZones:
@@ -3934,9 +6429,9 @@ class EPMaterialAux(object):
         """
         Check if material or construction exist
         """
-        if name in sc.sticky ["honeybee_constructionLib"].keys(): return True
-        if name in sc.sticky ["honeybee_materialLib"].keys(): return True
-        if name in sc.sticky ["honeybee_windowMaterialLib"].keys(): return True
+        if name in sc.sticky ["honeybee_constructionLib"]: return True
+        if name in sc.sticky ["honeybee_materialLib"]: return True
+        if name in sc.sticky ["honeybee_windowMaterialLib"]: return True
         
         return False
     
@@ -3945,15 +6440,15 @@ class EPMaterialAux(object):
         This function should work for materials, and counstructions
         """
         objectData = None
-        if objectName in sc.sticky ["honeybee_windowMaterialLib"].keys():
+        if objectName in sc.sticky ["honeybee_windowMaterialLib"]:
             objectData = sc.sticky ["honeybee_windowMaterialLib"][objectName]
-        elif objectName in sc.sticky ["honeybee_materialLib"].keys():
+        elif objectName in sc.sticky ["honeybee_materialLib"]:
             objectData = sc.sticky ["honeybee_materialLib"][objectName]
-        elif objectName in sc.sticky ["honeybee_constructionLib"].keys():
+        elif objectName in sc.sticky ["honeybee_constructionLib"]:
             objectData = sc.sticky ["honeybee_constructionLib"][objectName]
-        elif objectData in sc.sticky["honeybee_WindowPropLib"].keys():
+        elif objectData in sc.sticky["honeybee_WindowPropLib"]:
             objectData = sc.sticky["honeybee_WindowPropLib"][objectName]
-        elif objectName in sc.sticky["honeybee_SpectralDataLib"].keys():
+        elif objectName in sc.sticky["honeybee_SpectralDataLib"]:
             objectData = sc.sticky["honeybee_SpectralDataLib"][objectName]
         
         if objectData!=None:
@@ -4121,23 +6616,23 @@ class EPScheduleAux(object):
 class EPObjectsAux(object):
     
     def isEPMaterial(self, matName):
-        return matName.upper() in sc.sticky["honeybee_materialLib"].keys() or \
-               matName.upper() in sc.sticky["honeybee_windowMaterialLib"].keys()
+        return matName.upper() in sc.sticky["honeybee_materialLib"] or \
+               matName.upper() in sc.sticky["honeybee_windowMaterialLib"]
     
     def isEPConstruction(self, matName):
-        return matName.upper() in sc.sticky["honeybee_constructionLib"].keys()
+        return matName.upper() in sc.sticky["honeybee_constructionLib"]
     
     def isSchedule(self, scheduleName):
-        return scheduleName.upper() in sc.sticky["honeybee_ScheduleLib"].keys()
+        return scheduleName.upper() in sc.sticky["honeybee_ScheduleLib"]
     
     def isScheduleTypeLimits(self, scheduleName):
-        return scheduleName.upper() in sc.sticky["honeybee_ScheduleTypeLimitsLib"].keys()
+        return scheduleName.upper() in sc.sticky["honeybee_ScheduleTypeLimitsLib"]
     
     def isWindowProperty(self, winPropName):
-        return winPropName.upper() in sc.sticky["honeybee_WindowPropLib"].keys()
+        return winPropName.upper() in sc.sticky["honeybee_WindowPropLib"]
     
     def isSpectralData(self, spectName):
-        return spectName.upper() in sc.sticky["honeybee_SpectralDataLib"].keys()
+        return spectName.upper() in sc.sticky["honeybee_SpectralDataLib"]
     
     def customizeEPObject(self, EPObjectName, indexes, inValues):
         hb_EPScheduleAUX = EPScheduleAux()
@@ -4267,19 +6762,19 @@ class EPObjectsAux(object):
         
         objectName = objectName.upper()
         
-        if objectName in sc.sticky ["honeybee_windowMaterialLib"].keys():
+        if objectName in sc.sticky ["honeybee_windowMaterialLib"]:
             objectData = sc.sticky ["honeybee_windowMaterialLib"][objectName]
-        elif objectName in sc.sticky ["honeybee_materialLib"].keys():
+        elif objectName in sc.sticky ["honeybee_materialLib"]:
             objectData = sc.sticky ["honeybee_materialLib"][objectName]
-        elif objectName in sc.sticky ["honeybee_constructionLib"].keys():
+        elif objectName in sc.sticky ["honeybee_constructionLib"]:
             objectData = sc.sticky ["honeybee_constructionLib"][objectName]
-        elif objectName in sc.sticky["honeybee_ScheduleLib"].keys():
+        elif objectName in sc.sticky["honeybee_ScheduleLib"]:
             objectData = sc.sticky ["honeybee_ScheduleLib"][objectName]
-        elif objectName in sc.sticky["honeybee_ScheduleTypeLimitsLib"].keys():
+        elif objectName in sc.sticky["honeybee_ScheduleTypeLimitsLib"]:
             objectData = sc.sticky ["honeybee_ScheduleTypeLimitsLib"][objectName]
-        elif objectName in sc.sticky["honeybee_WindowPropLib"].keys():
+        elif objectName in sc.sticky["honeybee_WindowPropLib"]:
             objectData = sc.sticky["honeybee_WindowPropLib"][objectName]
-        elif objectName in sc.sticky["honeybee_SpectralDataLib"].keys():
+        elif objectName in sc.sticky["honeybee_SpectralDataLib"]:
             objectData = sc.sticky["honeybee_SpectralDataLib"][objectName]
         
         return objectData
@@ -4354,19 +6849,344 @@ class EPObjectsAux(object):
             component.AddRuntimeMessage(gh.GH_RuntimeMessageLevel.Warning, warningMsg)
             return
 
+class hb_CompiledSchedule(object):
+    """
+    An EnergyPlus schedule that is compiled to unique day profiles and the profile of each day.
+    
+    Attributes:
+        name: Schedule name.
+        schType: Schedule type in lower case (e.g. schedule:year).
+        unit: Unit type or numeric type of the schedule type limits.
+        timestep: Number of values per hour.
+        dayProfiles: A list of unique day profiles. Each profile is a tuple of 24 * timestep values.
+        dayIndex: A tuple of the index of the day profile for each day. It has 365 items for year
+            and compact schedules, 7 items for week schedules and 1 item for day schedules.
+        holidays: A list of (startDay, endDay, profile index) for the holiday schedules of a year schedule.
+        holidayIndex: Index of the profile of the holiday schedule of a week schedule.
+    
+    Values are tuples that are shared between all the users of the schedule and should not be changed.
+    """
+    
+    def __init__(self, name, schType, unit, timestep, dayProfiles, dayIndex, holidays = None, holidayIndex = None):
+        self.name = name
+        self.schType = schType
+        self.unit = unit
+        self.timestep = timestep
+        self.dayProfiles = dayProfiles
+        self.dayIndex = tuple(dayIndex)
+        self.holidays = holidays or []
+        self.holidayIndex = holidayIndex
+        self.values = None
+        self.annualValues = None
+    
+    @property
+    def endHOY(self):
+        return 24 * len(self.dayIndex)
+    
+    def getDayValues(self):
+        """Return a list with the day profile of each day."""
+        return [self.dayProfiles[profileIndex] for profileIndex in self.dayIndex]
+    
+    def getValues(self):
+        """Return the values of all the days of the schedule as a single tuple."""
+        if self.values is None:
+            values = []
+            for profileIndex in self.dayIndex: values.extend(self.dayProfiles[profileIndex])
+            self.values = tuple(values)
+        return self.values
+    
+    def getAnnualValues(self):
+        """Return the values for 365 days. Day and week schedules are repeated for the whole year."""
+        if self.annualValues is None:
+            if len(self.dayIndex) == 365:
+                self.annualValues = self.getValues()
+            else:
+                values = []
+                for day in xrange(365):
+                    values.extend(self.dayProfiles[self.dayIndex[day % len(self.dayIndex)]])
+                self.annualValues = tuple(values)
+        return self.annualValues
+    
+    def getHolidayValues(self):
+        """Return a list of [startDay, endDay, holiday day profile] for each week of a year schedule."""
+        return [[startDay, endDay, self.dayProfiles[profileIndex]] \
+                for startDay, endDay, profileIndex in self.holidays]
+
+
+class hb_ScheduleCompiler(object):
+    """
+    Compile the schedules in the Honeybee schedule library to hb_CompiledSchedule.
+    
+    Compiled schedules are kept until the schedule or the schedule type limits library changes.
+    Schedule:Year, Schedule:Week:Daily, Schedule:Compact, Schedule:Constant and
+    Schedule:Day:Interval, Schedule:Day:Hourly and Schedule:Day:List are supported.
+    """
+    
+    cache = {}
+    libraryVersion = None
+    
+    weekDays = ['sunday', 'monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday']
+    
+    def __init__(self, startDayOfTheWeek = 0, timestep = 1):
+        self.hb_EPScheduleAUX = EPScheduleAux()
+        self.lb_preparation = sc.sticky["ladybug_Preparation"]()
+        self.startDayOfTheWeek = startDayOfTheWeek
+        self.timestep = int(timestep)
+    
+    @classmethod
+    def getLibraryVersion(cls):
+        versions = []
+        for libraryName in ["honeybee_ScheduleLib", "honeybee_ScheduleTypeLimitsLib"]:
+            library = sc.sticky[libraryName]
+            versions.append((id(library), getattr(library, "version", None)))
+        return versions
+    
+    @classmethod
+    def clearCache(cls):
+        cls.cache = {}
+        cls.libraryVersion = None
+    
+    def compile(self, schName):
+        """
+        Return the hb_CompiledSchedule for a schedule in the library.
+        
+        Returns None if the schedule is not in the library.
+        """
+        libraryVersion = self.getLibraryVersion()
+        if libraryVersion != hb_ScheduleCompiler.libraryVersion:
+            hb_ScheduleCompiler.cache = {}
+            hb_ScheduleCompiler.libraryVersion = libraryVersion
+        
+        key = schName.upper(), self.startDayOfTheWeek, self.timestep
+        if key not in self.cache:
+            schedule = self.compileSchedule(schName)
+            if schedule is None: return None
+            self.cache[key] = schedule
+        return self.cache[key]
+    
+    def compileSchedule(self, schName):
+        values, comments = self.hb_EPScheduleAUX.getScheduleDataByName(schName.upper(), ghenv.Component)
+        if values is None: return None
+        
+        scheduleType = values[0].lower()
+        if scheduleType == "schedule:year":
+            return self.compileYearSchedule(schName, values)
+        elif scheduleType == "schedule:week:daily":
+            return self.compileWeekSchedule(schName, values)
+        elif scheduleType == "schedule:compact":
+            return self.compileCompactSchedule(schName, values)
+        elif scheduleType in ["schedule:day:interval", "schedule:day:hourly", \
+                              "schedule:day:list", "schedule:constant"]:
+            unit, numericType = self.getScheduleTypeLimits(values[1])
+            profile = self.getDayProfile(values, numericType)
+            return hb_CompiledSchedule(schName, scheduleType, unit, self.timestep, [profile], [0])
+        else:
+            raise ValueError("Honeybee doesn't support " + scheduleType + " currently." + \
+                  "Email us the type and we will try to add it to Honeybee.")
+    
+    def getScheduleTypeLimits(self, typeLimitName):
+        """Return unit and numeric type of schedule type limits."""
+        if not typeLimitName.strip(): return "unknown", "unknown"
+        schedule, comments = self.hb_EPScheduleAUX.getScheduleTypeLimitsDataByName(typeLimitName.upper(), ghenv.Component)
+        if schedule is None: return "unknown", "unknown"
+        
+        numericType = schedule[3] if len(schedule) > 3 else "unknown"
+        unitType = schedule[4] if len(schedule) > 4 else "unknown"
+        if unitType == "unknown": unitType = numericType
+        return unitType, numericType
+    
+    @staticmethod
+    def getMinute(untilTime):
+        """Return the minute of the day for a time like 7:30 or Until: 7:30."""
+        hour, minute = untilTime.split(":")[-2:]
+        return 60 * int(hour) + int(minute)
+    
+    def toProfile(self, minuteValues, interpolate, numericType):
+        """Convert 1440 values for the minutes of a day to values for the timesteps of the day."""
+        length = 60 // self.timestep
+        if interpolate.strip().lower() in ["yes", "average", "linear"]:
+            profile = [sum(minuteValues[i:i + length]) / length for i in xrange(0, 1440, length)]
+        else:
+            # use the value at the end of each timestep
+            profile = [minuteValues[i + length - 1] for i in xrange(0, 1440, length)]
+        
+        if numericType.strip().lower() == "district":
+            profile = map(int, profile)
+        return tuple(profile)
+    
+    def getUntilProfile(self, untilValues, interpolate, numericType):
+        """Return the day profile for a list of (Until time, value)."""
+        minuteValues = 1440 * [0.0]
+        startMinute = 0
+        for untilTime, value in untilValues:
+            endMinute = min(self.getMinute(untilTime), 1440)
+            minuteValues[startMinute:endMinute] = (endMinute - startMinute) * [float(value)]
+            startMinute = max(startMinute, endMinute)
+        return self.toProfile(minuteValues, interpolate, numericType)
+    
+    def getDayProfile(self, values, numericType):
+        scheduleType = values[0].lower()
+        if scheduleType == "schedule:day:interval":
+            # type, type limits, interpolate, until time 1, value 1, ...
+            untilValues = [(values[2 * i + 3], values[2 * i + 4]) for i in range(int((len(values) - 3) / 2))]
+            return self.getUntilProfile(untilValues, values[2], numericType)
+        elif scheduleType == "schedule:day:hourly":
+            # type, type limits, 24 hourly values
+            minuteValues = []
+            for value in values[2:26]: minuteValues.extend(60 * [float(value)])
+            return self.toProfile(minuteValues, "no", numericType)
+        elif scheduleType == "schedule:day:list":
+            # type, type limits, interpolate, minutes per item, values
+            minutesPerItem = int(float(values[3]))
+            minuteValues = []
+            for value in values[4:]: minuteValues.extend(minutesPerItem * [float(value)])
+            minuteValues = (minuteValues + 1440 * [minuteValues[-1]])[:1440]
+            return self.toProfile(minuteValues, values[2], numericType)
+        else:
+            # schedule:constant
+            return self.toProfile(1440 * [float(values[2])], "no", numericType)
+    
+    def compileWeekSchedule(self, schName, values):
+        """
+        Schedule:Week:Daily
+        ['Schedule Type', 'Sunday Schedule:Day Name', ..., 'Saturday Schedule:Day Name',
+        'Holiday Schedule:Day Name', 'SummerDesignDay Schedule:Day Name', 'WinterDesignDay Schedule:Day Name',
+        'CustomDay1 Schedule:Day Name', 'CustomDay2 Schedule:Day Name']
+        """
+        dayProfiles = []
+        profileIndex = {}
+        unit = None
+        dayIndex = []
+        for daySchName in values[1:9]:
+            daySchedule = self.compile(daySchName)
+            if daySchedule is None:
+                profile = 24 * self.timestep * (0.0,)
+            else:
+                profile = daySchedule.dayProfiles[0]
+                if unit is None: unit = daySchedule.unit
+            if profile not in profileIndex:
+                profileIndex[profile] = len(dayProfiles)
+                dayProfiles.append(profile)
+            dayIndex.append(profileIndex[profile])
+        
+        # the last item is the holiday schedule
+        holidayIndex = dayIndex.pop()
+        dayIndex = dayIndex[self.startDayOfTheWeek:] + dayIndex[:self.startDayOfTheWeek]
+        return hb_CompiledSchedule(schName, "schedule:week:daily", unit or "unknown", self.timestep, \
+                                   dayProfiles, dayIndex, holidayIndex = holidayIndex)
+    
+    def compileYearSchedule(self, schName, values):
+        """
+        Schedule:Year
+        ['Schedule Type', 'Schedule Type Limits Name', 'Schedule:Week Name 1', 'Start Month 1',
+        'Start Day 1', 'End Month 1', 'End Day 1', ...]
+        """
+        dayProfiles = [24 * self.timestep * (0.0,)]
+        profileIndex = {dayProfiles[0]: 0}
+        dayIndex = 365 * [0]
+        holidays = []
+        unit = None
+        
+        def addProfile(profile):
+            if profile not in profileIndex:
+                profileIndex[profile] = len(dayProfiles)
+                dayProfiles.append(profile)
+            return profileIndex[profile]
+        
+        for i in range(int((len(values) - 2) / 5)):
+            weekSchedule = self.compile(values[5 * i + 2])
+            if weekSchedule is None: continue
+            if unit is None: unit = weekSchedule.unit
+            
+            startDay = int(self.lb_preparation.getJD(int(values[5 * i + 3]), int(values[5 * i + 4])))
+            endDay = int(self.lb_preparation.getJD(int(values[5 * i + 5]), int(values[5 * i + 6])))
+            
+            weekIndex = [addProfile(weekSchedule.dayProfiles[index]) for index in weekSchedule.dayIndex]
+            for day in range(startDay - 1, endDay):
+                dayIndex[day] = weekIndex[day % 7]
+            
+            holidayProfile = weekSchedule.dayProfiles[weekSchedule.holidayIndex or 0]
+            holidays.append((startDay, endDay, addProfile(holidayProfile)))
+        
+        if unit is None: unit = self.getScheduleTypeLimits(values[1])[0]
+        return hb_CompiledSchedule(schName, "schedule:year", unit, self.timestep, dayProfiles, dayIndex, holidays)
+    
+    def compileCompactSchedule(self, schName, values):
+        """
+        Schedule:Compact
+        ['Schedule Type', 'Schedule Type Limits Name', 'Through: 12/31', 'For: Weekdays',
+        'Until: 08:00', '0', 'Until: 24:00', '1', 'For: AllOtherDays', 'Until: 24:00', '0', ...]
+        """
+        unit, numericType = self.getScheduleTypeLimits(values[1])
+        
+        dayProfiles = []
+        profileIndex = {}
+        dayIndex = 365 * [None]
+        
+        # collect the day schedules of each Through: period
+        periods = []
+        for val in values[2:]:
+            field = val.strip()
+            keyword = field.split(":")[0].strip().lower()
+            if keyword == "through":
+                month, day = field.split(":", 1)[1].strip().split("/")[:2]
+                periods.append([int(self.lb_preparation.getJD(int(month), int(day))), []])
+            elif keyword == "for":
+                if not periods: periods.append([365, []])
+                periods[-1][1].append([field.split(":", 1)[1].lower().split(), "no", []])
+            elif keyword == "interpolate":
+                if periods and periods[-1][1]: periods[-1][1][-1][1] = field.split(":", 1)[1]
+            elif keyword == "until":
+                if periods and periods[-1][1]: periods[-1][1][-1][2].append([field.split(":", 1)[1].strip(), None])
+            elif periods and periods[-1][1] and periods[-1][1][-1][2]:
+                periods[-1][1][-1][2][-1][1] = field
+        
+        startDay = 0
+        for endDay, daySchedules in periods:
+            weekVals = 7 * [None]
+            for dayTypes, interpolate, untilValues in daySchedules:
+                profile = self.getUntilProfile(untilValues, interpolate, numericType)
+                if profile not in profileIndex:
+                    profileIndex[profile] = len(dayProfiles)
+                    dayProfiles.append(profile)
+                index = profileIndex[profile]
+                
+                for dayType in dayTypes:
+                    if dayType == "alldays":
+                        weekVals = 7 * [index]
+                    elif dayType == "weekdays":
+                        weekVals[1:6] = 5 * [index]
+                    elif dayType == "weekends":
+                        weekVals[0] = weekVals[6] = index
+                    elif dayType in self.weekDays:
+                        weekVals[self.weekDays.index(dayType)] = index
+                    elif dayType == "allotherdays":
+                        weekVals = [index if val is None else val for val in weekVals]
+            
+            # days that are not assigned get the last day schedule of the period
+            weekVals = [len(dayProfiles) - 1 if val is None else val for val in weekVals]
+            for day in range(startDay, min(endDay, 365)):
+                dayIndex[day] = weekVals[(day + self.startDayOfTheWeek) % 7]
+            startDay = endDay
+        
+        if not dayProfiles: dayProfiles.append(24 * self.timestep * (0.0,))
+        dayIndex = [0 if index is None else index for index in dayIndex]
+        return hb_CompiledSchedule(schName, "schedule:compact", unit, self.timestep, dayProfiles, dayIndex)
+
 class ReadEPSchedules(object):
     
-    def __init__(self, schName, startDayOfTheWeek):
+    def __init__(self, schName, startDayOfTheWeek, timestep = 1):
         self.hb_EPScheduleAUX = sc.sticky["honeybee_EPScheduleAUX"]()
         self.hb_EPObjectsAUX = sc.sticky["honeybee_EPObjectsAUX"]()
         self.lb_preparation = sc.sticky["ladybug_Preparation"]()
+        self.scheduleCompiler = hb_ScheduleCompiler(startDayOfTheWeek, timestep)
         self.schName = schName
         self.startDayOfTheWeek = startDayOfTheWeek
+        self.timestep = timestep
         self.count = 0
         self.startHOY = 1
         self.endHOY = 24
         self.unit = "unknown"
-        self.comapctKeywords = ['Weekdays', 'Weekends', 'Alldays', 'AllOtherDays', 'Sunday', 'Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday']
     
     def getScheduleTypeLimitsData(self, schName):
         
@@ -4385,264 +7205,54 @@ class ReadEPSchedules(object):
         
         return lowerLimit, upperLimit, numericType, unitType
     
-    
-    def getDayEPScheduleValues(self, schName = None):
-        
+    def getCompiledSchedule(self, schName = None):
+        """Return the hb_CompiledSchedule of a schedule or None if it is not in the library."""
         if schName == None:
             schName = self.schName
-            
-        values, comments = self.hb_EPScheduleAUX.getScheduleDataByName(schName.upper(), ghenv.Component)
-        typeLimitName = values[1]
-        lowerLimit, upperLimit, numericType, unitType = \
-                self.getScheduleTypeLimitsData(typeLimitName)
-                
-        numberOfDaySch = int((len(values) - 3) /2)
+        if not self.hb_EPObjectsAUX.isSchedule(schName): return None
         
-        hourlyValues = range(24)
-        startHour = 0
-        for i in range(numberOfDaySch):
-            value = float(values[2 * i + 4])
-            untilTime = map(int, values[2 * i + 3].split(":"))
-            endHour = int(untilTime[0] +  untilTime[1]/60)
-            for hour in range(startHour, endHour):
-                hourlyValues[hour] = value
-            
-            startHour = endHour
+        try:
+            schedule = self.scheduleCompiler.compile(schName)
+        except ValueError, e:
+            print str(e)
+            return None
         
-        if numericType.strip().lower() == "district":
-            hourlyValues = map(int, hourlyValues)
-            
-        return hourlyValues
-    
+        if schedule is not None:
+            if self.count == 0:
+                self.schType = schedule.schType
+                self.endHOY = schedule.endHOY
+            self.unit = schedule.unit
+            self.count += 1
+        return schedule
     
-    def getWeeklyEPScheduleValues(self, schName = None):
-        """
-        Schedule:Week:Daily
-        ['Schedule Type', 'Sunday Schedule:Day Name', 'Monday Schedule:Day Name',
-        'Tuesday Schedule:Day Name', 'Wednesday Schedule:Day Name', 'Thursday Schedule:Day Name',
-        'Friday Schedule:Day Name', 'Saturday Schedule:Day Name', 'Holiday Schedule:Day Name',
-        'SummerDesignDay Schedule:Day Name', 'WinterDesignDay Schedule:Day Name',
-        'CustomDay1 Schedule:Day Name', 'CustomDay2 Schedule:Day Name']
+    def getScheduleValues(self, schName = None):
         """
+        Return the values of a schedule.
         
-        if schName == None:
-            schName = self.schName
-            
-        values, comments = self.hb_EPScheduleAUX.getScheduleDataByName(schName.upper(), ghenv.Component)
-        
-        if self.count == 1:
-            # set the last date of the schedule to one week
-            self.endHOY = 24 * 7
-        
-        sundaySchedule = self.getScheduleValues(values[1])
-        mondaySchedule = self.getScheduleValues(values[2])
-        tuesdaySchedule = self.getScheduleValues(values[3])
-        wednesdaySchedule = self.getScheduleValues(values[4])
-        thursdaySchedule = self.getScheduleValues(values[5])
-        fridaySchedule = self.getScheduleValues(values[6])
-        saturdaySchedule = self.getScheduleValues(values[7])
-        
-        holidaySchedule = self.getScheduleValues(values[8])
-        summerDesignDaySchedule = self.getScheduleValues(values[9])
-        winterDesignDaySchedule = self.getScheduleValues(values[10])
-        customDay1Schedule = self.getScheduleValues(values[11])
-        customDay2Schedule = self.getScheduleValues(values[12])
-        
-        hourlyValues = [sundaySchedule, mondaySchedule, tuesdaySchedule, \
-                       wednesdaySchedule, thursdaySchedule, fridaySchedule, \
-                       saturdaySchedule]
-        
-        hourlyValues = hourlyValues[self.startDayOfTheWeek:] + \
-                       hourlyValues[:self.startDayOfTheWeek]
-        
-        return hourlyValues
-    
-    
-    def getConstantEPScheduleValues(self, schName):
+        Returns a list of 24 values for a day schedule, a list of 7 day values for a week schedule
+        and a list of 365 day values for a year schedule. Compact schedules return all the
+        hourly values of the year as a single list.
         """
-        'Schedule:Constant'
-        ['Schedule Type', 'Schedule Type Limits Name', 'Hourly Value']
-        """
-        
-        if schName == None:
-            schName = self.schName
-            
-        values, comments = self.hb_EPScheduleAUX.getScheduleDataByName(schName.upper(), ghenv.Component)
-        typeLimitName = values[1]
-        lowerLimit, upperLimit, numericType, unitType = \
-                self.getScheduleTypeLimitsData(typeLimitName)
-        
-        hourlyValues = [float(values[2])]
-        
-        if numericType.strip().lower() == "district":
-            hourlyValues = map(int, hourlyValues)
-        return scheduleConstant
-    
-    
-    def getCompactEPScheduleValues(self, schName):
-        
-        if schName == None: schName = self.schName
-        
-        values, comments = self.hb_EPScheduleAUX.getScheduleDataByName(schName.upper(), ghenv.Component)
-        typeLimitName = values[1]
-        lowerLimit, upperLimit, numericType, unitType = \
-                self.getScheduleTypeLimitsData(typeLimitName)
-        
-        #Separate out the different periods.
-        totalValues = []
-        periodValues = []
-        headerDone = False
-        for val in values:
-            newPeriod = False
-            for word in self.comapctKeywords:
-                if word in val: newPeriod = True
-            if newPeriod == True:
-                if headerDone == True:
-                    totalValues.append(periodValues)
-                periodValues = [val]
-                headerDone = True
-            elif headerDone == True:
-                periodValues.append(val)
-        totalValues.append(periodValues)
-        
-        #For each day period, construct a day schedule.
-        dayType = []
-        dayValues = []
-        for dayVals in totalValues:
-            dayType.append(dayVals[0].title().split('For: ')[-1])
-            numberOfDaySch = int((len(dayVals) - 1) /2)
-            
-            hourlyValues = range(24)
-            startHour = 0
-            for i in range(numberOfDaySch):
-                value = float(dayVals[2 * i + 2])
-                untilTime = map(int, dayVals[2 * i + 1].split(":")[1:])
-                endHour = int(untilTime[0] +  untilTime[1]/60)
-                for hour in range(startHour, endHour):
-                    hourlyValues[hour] = value
-                
-                startHour = endHour
-            dayValues.append(hourlyValues)
-        
-        #Construct a week schedule from the day schedules.
-        #Map the dayTypes to the days of the week.
-        ['Weekdays', 'Weekends', 'Alldays', 'AllOtherDays', 'Sunday', 'Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday']
-        weekVals = [-1, -1, -1, -1, -1, -1, -1]
-        for typeCount, type in enumerate(dayType):
-            if type == 'Alldays':
-                for count, val in enumerate(weekVals):
-                    weekVals[count] = typeCount
-            elif type == 'Weekdays':
-                for count, val in enumerate(weekVals):
-                    if count < 6 and count != 0: weekVals[count] = typeCount
-            elif type == 'Weekends':
-                weekVals[0] = typeCount
-                weekVals[-1] = typeCount
-            elif type == 'Sunday': weekVals[0] = typeCount
-            elif type == 'Monday': weekVals[1] = typeCount
-            elif type == 'Tuesday': weekVals[2] = typeCount
-            elif type == 'Wednesday': weekVals[3] = typeCount
-            elif type == 'Thursday': weekVals[4] = typeCount
-            elif type == 'Friday': weekVals[5] = typeCount
-            elif type == 'Saturday': weekVals[6] = typeCount
-            elif type == 'Allotherdays':
-                for count, val in enumerate(weekVals):
-                    if val == -1: weekVals[count] = typeCount
-        
-        #Turn the week schedule into a year schedule.
-        hourlyValues = []
-        dayVals = []
-        dayofWeek = -1
-        for day in range(365):
-            if dayofWeek == 6: dayofWeek = 0
-            else: dayofWeek += 1
-            dayVals.append(weekVals[dayofWeek])
-        for day in dayVals:
-            hourlyValues.extend(dayValues[day])
-        
-        print hourlyValues
-        return hourlyValues
-    
-    
-    def getYearlyEPScheduleValues(self, schName = None):
-        # place holder for 365 days
-        hourlyValues = range(365)
-        
-        # update last day of schedule
-        self.endHOY = 8760
-        
-        if schName == None:
-            schName = self.schName
-        
-        values, comments = self.hb_EPScheduleAUX.getScheduleDataByName(schName.upper(), ghenv.Component)
+        schedule = self.getCompiledSchedule(schName)
+        if schedule is None: return []
         
-        # generate weekly schedules
-        numOfWeeklySchedules = int((len(values)-2)/5)
-        
-        for i in range(numOfWeeklySchedules):
-            weekDayScheduleName = values[5 * i + 2]
-            
-            startDay = int(self.lb_preparation.getJD(int(values[5 * i + 3]), int(values[5 * i + 4])))
-            endDay = int(self.lb_preparation.getJD(int(values[5 * i + 5]), int(values[5 * i + 6])))
-            
-            # 7 list for 7 days of the week
-            hourlyValuesForTheWeek = self.getScheduleValues(weekDayScheduleName)
-            
-            for day in range(startDay-1, endDay):
-                hourlyValues[day] = hourlyValuesForTheWeek[day%7]
-            
-        return hourlyValues
-    
+        if len(schedule.dayIndex) == 1:
+            return schedule.dayProfiles[0]
+        elif schedule.schType == "schedule:compact":
+            return schedule.getValues()
+        else:
+            return schedule.getDayValues()
     
-    def getScheduleValues(self, schName = None):
-        if schName == None:
-            schName = self.schName
-        if self.hb_EPObjectsAUX.isSchedule(schName):
-            scheduleValues, comments = self.hb_EPScheduleAUX.getScheduleDataByName(schName.upper(), ghenv.Component)
-            
-            scheduleType = scheduleValues[0].lower()
-            if self.count == 0:
-                self.schType = scheduleType
-            
-            self.count += 1
-            
-            if scheduleType == "schedule:year":
-                hourlyValues = self.getYearlyEPScheduleValues(schName)
-            elif scheduleType == "schedule:day:interval":
-                hourlyValues = self.getDayEPScheduleValues(schName)
-            elif scheduleType == "schedule:week:daily":
-                hourlyValues = self.getWeeklyEPScheduleValues(schName)
-            elif scheduleType == "schedule:constant":
-                hourlyValues = self.getConstantEPScheduleValues(schName)
-            elif scheduleType == "schedule:compact":
-                hourlyValues = self.getCompactEPScheduleValues(schName)
-            else:
-                print "Honeybee doesn't support " + scheduleType + " currently." + \
-                      "Email us the type and we will try to add it to Honeybee."
-                      
-                hourlyValues = []
-            
-            return hourlyValues
+    def getHourlyValues(self, schName = None):
+        """Return the values of a schedule for the whole year as a single tuple."""
+        schedule = self.getCompiledSchedule(schName)
+        if schedule is None: return ()
+        return schedule.getAnnualValues()
     
     def getHolidaySchedValues(self, schName = None):
-        hourlyValues = []
-        if schName == None:
-            schName = self.schName
-        if self.hb_EPObjectsAUX.isSchedule(schName):
-            values, comments = self.hb_EPScheduleAUX.getScheduleDataByName(schName.upper(), ghenv.Component)
-            scheduleType = values[0].lower()
-            if scheduleType == "schedule:year":
-                # generate weekly schedules
-                numOfWeeklySchedules = int((len(values)-2)/5)
-                for i in range(numOfWeeklySchedules):
-                    weekDayScheduleName = values[5 * i + 2]
-                    startDay = int(self.lb_preparation.getJD(int(values[5 * i + 3]), int(values[5 * i + 4])))
-                    endDay = int(self.lb_preparation.getJD(int(values[5 * i + 5]), int(values[5 * i + 6])))
-                    weekValues, comments = self.hb_EPScheduleAUX.getScheduleDataByName(weekDayScheduleName.upper(), ghenv.Component)
-                    holidaySchedule = self.getScheduleValues(weekValues[8])
-                    hourlyValues.append([startDay,endDay,holidaySchedule])
-        
-        return hourlyValues
+        schedule = self.getCompiledSchedule(schName)
+        if schedule is None: return []
+        return schedule.getHolidayValues()
 
 class EPTypes(object):
     def __init__(self):
@@ -5111,7 +7721,8 @@ class EPZone(object):
         if self.illumCntrlSensorPt != None:
             self.illumCntrlSensorPt.Transform(transform)
         
-        #Transform the geometry.
+        #Transform the geometry. It can be shared with the objects in Honeybee hive.
+        self.geometry = self.geometry.Duplicate()
         self.geometry.Transform(transform)
         self.cenPt.Transform(transform)
         if flip == True:
@@ -5251,6 +7862,7 @@ class EPZone(object):
                 if cenpt.X <= HBSrf.cenPt.X +tol and cenpt.X >= HBSrf.cenPt.X - tol and cenpt.Y <= HBSrf.cenPt.Y +tol and cenpt.Y >= HBSrf.cenPt.Y - tol and cenpt.Z <= HBSrf.cenPt.Z +tol and cenpt.Z >= HBSrf.cenPt.Z - tol:
                     if nVecs[count] != HBSrf.normalVector:
                         print "Normal direction for " + HBSrf.name + " is fixed by Honeybee!"
+                        HBSrf.geometry = HBSrf.geometry.Duplicate()
                         HBSrf.geometry.Flip()
                         HBSrf.normalVector.Reverse()
                         HBSrf.basePlane.Flip()
@@ -5261,12 +7873,15 @@ class EPZone(object):
                             elif int(HBSrf.type) == 1 or int(HBSrf.type) == 3:
                                 HBSrf.setType(2)
                         
-                        try: HBSrf.punchedGeometry.Flip()
+                        try:
+                            HBSrf.punchedGeometry = HBSrf.punchedGeometry.Duplicate()
+                            HBSrf.punchedGeometry.Flip()
                         except: pass
                         if HBSrf.hasChild and HBSrf.isPlanar:
                             for childSrf in HBSrf.childSrfs:
                                 if childSrf.normalVector != nVecs[count]:
                                     print "Normal direction for " + childSrf.name + " is fixed by Honeybee!"
+                                    childSrf.geometry = childSrf.geometry.Duplicate()
                                     childSrf.geometry.Flip()
                                     childSrf.normalVector.Reverse()
                                     childSrf.basePlane.Flip()
@@ -5280,6 +7895,7 @@ class EPZone(object):
                                 vecAngleDiff = math.degrees(rc.Geometry.Vector3d.VectorAngle(nVecs[count], childSrf.normalVector))
                                 if vecAngleDiff > 45:
                                     print "Normal direction for " + childSrf.name + " is fixed by Honeybee!"
+                                    childSrf.geometry = childSrf.geometry.Duplicate()
                                     childSrf.geometry.Flip()
                                     childSrf.normalVector.Reverse()
         
@@ -6478,14 +9094,12 @@ class hb_EPSurface(object):
         #print self.meshedFace.Faces.Count
     
     def disposeCurrentMeshes(self):
-        if self.meshedFace.Faces.Count>0:
-            self.meshedFace.Dispose()
-            self.meshedFace = rc.Geometry.Mesh()
+        # meshes can be shared with the objects in Honeybee hive so they are
+        # replaced and not disposed
+        self.meshedFace = rc.Geometry.Mesh()
         if self.hasChild:
             for fenSrf in self.childSrfs:
-                if fenSrf.meshedFace.Faces.Count>0:
-                    fenSrf.meshedFace.Dispose()
-                    fenSrf.meshedFace = rc.Geometry.Mesh()
+                fenSrf.meshedFace = rc.Geometry.Mesh()
     
     def getSrfCenPtandNormalAlternate(self):
         brepFace = self.geometry.Faces[0]
@@ -6621,6 +9235,9 @@ class hb_EPSurface(object):
                 self.name += newKey
         except:
             pass
+        # geometries can be shared with the objects in Honeybee hive
+        self.geometry = self.geometry.Duplicate()
+        self.meshedFace = self.meshedFace.Duplicate()
         self.geometry.Transform(transform)
         self.meshedFace.Transform(transform)
         # move center point and normal
@@ -6650,6 +9267,7 @@ class hb_EPSurface(object):
             pass
         
         if not self.isChild and self.hasChild:
+            self.punchedGeometry = self.punchedGeometry.Duplicate()
             self.punchedGeometry.Transform(transform)
             if flip: self.punchedGeometry.Flip()
             
@@ -7952,8 +10570,8 @@ class thermPolygon(object):
         self.warning = None
         
         #Check if the material exists in the THERM Library and, if not, add it.
-        if material.upper() in sc.sticky["honeybee_materialLib"].keys() or material.upper() in sc.sticky["honeybee_windowMaterialLib"].keys(): material = self.makeThermMatFromEPMat(material, RGBColor)
-        elif material.upper() in sc.sticky["honeybee_thermMaterialLib"].keys():
+        if material.upper() in sc.sticky["honeybee_materialLib"] or material.upper() in sc.sticky["honeybee_windowMaterialLib"]: material = self.makeThermMatFromEPMat(material, RGBColor)
+        elif material.upper() in sc.sticky["honeybee_thermMaterialLib"]:
             if RGBColor == None: RGBColor = sc.sticky["honeybee_thermMaterialLib"][material.upper()]["RGBColor"]
             elif sc.sticky["honeybee_thermMaterialLib"][material.upper()]["RGBColor"] == RGBColor: pass
             else:
@@ -8309,6 +10927,23 @@ class hb_Hive(object):
                 del(sc.sticky['HBHive'][baseKey])
             sc.sticky['HBHive'][baseKey] = {}
     
+        # joined geometries of this component from this solution and the one before. The
+        # geometries that a joined geometry is made from are its version stamp. Geometries are
+        # never changed in place after they are added to the hive so if they are the same
+        # objects the joined geometry is valid.
+        if not sc.sticky.has_key('HBHiveGeometry'):
+            sc.sticky['HBHiveGeometry'] = {}
+        componentId = str(Component.InstanceGuid)
+        if removeCurrent and Component.RunCount == 1:
+            hb_Hive.removeDeletedComponentsGeometry()
+            if componentId in sc.sticky['HBHiveGeometry']:
+                previousGeometry = sc.sticky['HBHiveGeometry'][componentId][1]
+            else: previousGeometry = {}
+            sc.sticky['HBHiveGeometry'][componentId] = docId, {}, previousGeometry
+        elif componentId not in sc.sticky['HBHiveGeometry']:
+            sc.sticky['HBHiveGeometry'][componentId] = docId, {}, {}
+        docId, geometryCache, previousGeometry = sc.sticky['HBHiveGeometry'][componentId]
+        
         # create an empty dictionary for this component
         outGeometry = []
         for HBObject in HBObjects:
@@ -8320,37 +10955,26 @@ class hb_Hive(object):
             
             # calculate punched geometry if HBobject has a child surface
             try:
-                if HBObject.objectType != "HBZone" and HBObject.hasChild:
-                    # Honeybee surface with openings
-                    if HBObject.punchedGeometry == None:
-                        HBObject.calculatePunchedSurface()
+                sources = hb_Hive.getJoinedGeometrySources(HBObject)
+                if sources:
+                    stamp = tuple([id(source) for source in sources])
+                    geometry = None
+                    for cache in (geometryCache, previousGeometry):
+                        if stamp in cache and all([a is b for a, b in zip(cache[stamp][0], sources)]):
+                            geometry = cache[stamp][1]
+                            break
                     
-                    geometries = [childObject.geometry for childObject in HBObject.childSrfs]
-                    geometries.append(HBObject.punchedGeometry)
-                    # join geometries into a single surface
-                    geometry = rc.Geometry.Brep.JoinBreps(geometries, sc.doc.ModelAbsoluteTolerance)[0]
-                
-                elif HBObject.objectType == "HBZone":
-                    srfs = []
-                    zoneHasChildSrf = False
-                    for HBSrf in HBObject.surfaces:
-                        if HBSrf.hasChild:
-                            zoneHasChildSrf = True
-                            srfs.append(HBSrf.punchedGeometry)
-                            for childObject in HBSrf.childSrfs:
-                                srfs.append(childObject.geometry)
-                        else:
-                            srfs.append(HBSrf.geometry)
-                            
-                    if zoneHasChildSrf:
-                        geometry = rc.Geometry.Brep.JoinBreps(srfs, sc.doc.ModelAbsoluteTolerance)[0]
-                    else:
-                        geometry = HBObject.geometry
+                    if geometry is None:
+                        # join geometries into a single surface
+                        geometry = rc.Geometry.Brep.JoinBreps(sources, sc.doc.ModelAbsoluteTolerance)[0]
+                    geometryCache[stamp] = sources, geometry
                 else:
                     # if there is not child object use the geometry as it is
                     geometry = HBObject.geometry
                 
-                # assign the key to surface
+                # the geometry can be shared with other Honeybee objects so
+                # assign the key to a duplicate of the geometry
+                geometry = geometry.Duplicate()
                 geometry.UserDictionary.Set('HBID', '{}#{}'.format(baseKey, key))
                 outGeometry.append(geometry)
             except Exception as e:
@@ -8359,6 +10983,54 @@ class hb_Hive(object):
         # return geometry with the ID
         return outGeometry
     
+    @staticmethod
+    def removeDeletedComponentsGeometry():
+        """Remove the joined geometries of the components that are not in an open document anymore."""
+        if not sc.sticky.has_key('HBHiveGeometry'): return
+        documents = {}
+        for document in Grasshopper.Instances.DocumentServer:
+            documents[str(document.DocumentID)] = document
+        
+        for componentId, cacheEntry in sc.sticky['HBHiveGeometry'].items():
+            # entries from older versions of Honeybee are not tuples
+            if not isinstance(cacheEntry, tuple):
+                del(sc.sticky['HBHiveGeometry'][componentId])
+                continue
+            document = documents.get(str(cacheEntry[0]))
+            if document is None or document.FindObject(System.Guid(componentId), True) is None:
+                del(sc.sticky['HBHiveGeometry'][componentId])
+    
+    @staticmethod
+    def getJoinedGeometrySources(HBObject):
+        """Return the geometries that should be joined to visualize a Honeybee object.
+        
+        Returns an empty list if the geometry of the object can be used as it is.
+        """
+        if HBObject.objectType != "HBZone" and HBObject.hasChild:
+            # Honeybee surface with openings
+            if HBObject.punchedGeometry == None:
+                HBObject.calculatePunchedSurface()
+            
+            geometries = [childObject.geometry for childObject in HBObject.childSrfs]
+            geometries.append(HBObject.punchedGeometry)
+            return geometries
+        
+        elif HBObject.objectType == "HBZone":
+            srfs = []
+            zoneHasChildSrf = False
+            for HBSrf in HBObject.surfaces:
+                if HBSrf.hasChild:
+                    zoneHasChildSrf = True
+                    srfs.append(HBSrf.punchedGeometry)
+                    for childObject in HBSrf.childSrfs:
+                        srfs.append(childObject.geometry)
+                else:
+                    srfs.append(HBSrf.geometry)
+            
+            if zoneHasChildSrf: return srfs
+        
+        return []
+    
     def addNonGeoObjToHive(self, HBObject, Component):
         docId = Component.OnPingDocument().DocumentID
         baseKey = '{}_{}'.format(docId, Component.InstanceGuid)
@@ -8368,7 +11040,56 @@ class hb_Hive(object):
         HBID = '{}#{}'.format(baseKey, key)
         return 'Honeybee View Factor Info - ' + HBID
     
-    def callFromHoneybeeHive(self, geometryList):
+    @staticmethod
+    def shareGeometry(HBObject, memo):
+        """Add Rhino geometries and boundary condition objects of a Honeybee object to a
+        deepcopy memo so the copy shares the geometries with the original object and gets a
+        shallow copy of the boundary condition objects.
+        
+        Shared geometries are copied on write. Honeybee methods that change a geometry in
+        place (e.g. transform) duplicate the geometry first.
+        """
+        HBObjects = [HBObject]
+        try: HBObjects.extend(HBObject.surfaces)
+        except AttributeError: pass
+        for HBSrf in list(HBObjects):
+            try: HBObjects.extend(HBSrf.childSrfs)
+            except AttributeError: pass
+        
+        objectIds = set([id(obj) for obj in HBObjects])
+        for obj in HBObjects:
+            try: attributes = obj.__dict__.values()
+            except AttributeError: continue
+            
+            for value in attributes:
+                if isinstance(value, (list, tuple)):
+                    for item in value:
+                        if isinstance(item, rc.Geometry.GeometryBase): memo[id(item)] = item
+                elif isinstance(value, rc.Geometry.GeometryBase):
+                    memo[id(value)] = value
+            
+            # boundary condition objects are part of other zones and a deepcopy will copy
+            # the whole model. A shallow copy lets components change the adjacent surface
+            # of the copy without changing the original.
+            BCObject = obj.__dict__.get("BCObject")
+            if BCObject is not None and id(BCObject) not in objectIds and id(BCObject) not in memo:
+                memo[id(BCObject)] = copy.copy(BCObject)
+    
+    def copyHBObject(self, HBObject):
+        """Copy a Honeybee object. Rhino geometries are shared with the original object until they change."""
+        memo = {}
+        self.shareGeometry(HBObject, memo)
+        return copy.deepcopy(HBObject, memo)
+    
+    def callFromHoneybeeHive(self, geometryList, readOnly = False):
+        """Get Honeybee objects from the hive.
+        
+        Args:
+            geometryList: Output geometries of a Honeybee component.
+            readOnly: Set to True to get the objects in the hive and not a copy of them. The
+                objects should not be changed or added to the hive. Use it in components
+                that only read the objects (Default: False).
+        """
         HBObjects = []
         for geometry in geometryList:
             try:
@@ -8390,63 +11111,12 @@ class hb_Hive(object):
                 except:
                     pass
                 
+                if readOnly:
+                    HBObjects.append(HBObject)
+                    continue
+                
                 try:
-                    # after the first round meshedFace makes copy.deepcopy crash
-                    # so I need to regenerate meshFaces
-                    bc = []
-                    if HBObject.objectType == "HBZone":
-                        for surface in HBObject.surfaces:
-                            newMesh = rc.Geometry.Mesh()
-                            newMesh.Append(surface.meshedFace)
-                            surface.meshedFace = newMesh
-                            
-                            # keep track of boundary conditions
-                            # and then set them to None not to create
-                            # memory issues for large models.
-                            bc.append(copy.copy(surface.BCObject))
-                            surface.BCObject = None
-                            for csrf in surface.childSrfs:
-                                bc.append(copy.copy(csrf.BCObject))
-                                csrf.BCObject = None
-                                
-                    elif HBObject.objectType == "HBSurface": 
-                        newMesh = rc.Geometry.Mesh()
-                        newMesh.Append(HBObject.meshedFace)
-                        HBObject.meshedFace = newMesh
-                        # keep track of boundary conditions
-                        # and then set them to None not to create
-                        # memory issues for large models.
-                        bc.append(copy.copy(HBObject.BCObject))
-                        HBObject.BCObject = None
-                        for csrf in HBObject.childSrfs:
-                            bc.append(copy.copy(csrf.BCObject))
-                            csrf.BCObject = None                    
-                    
-                    newObject = copy.deepcopy(HBObject)
-                    
-                    # put the boundary condition objects back
-                    count = 0
-                    if HBObject.objectType == "HBZone":
-                        for c, surface in enumerate(newObject.surfaces):
-                            surface.BCObject = bc[count]
-                            HBObject.surfaces[c].BCObject = bc[count]
-                            count += 1
-                            for cc, csrf in enumerate(surface.childSrfs):
-                                csrf.BCObject = bc[count]
-                                HBObject.surfaces[c].childSrfs[cc].BCObject = bc[count]
-                                count += 1
-                                
-                    elif HBObject.objectType == "HBSurface": 
-                        newObject.BCObject = bc[count]
-                        HBObject.BCObject = bc[count]
-                        count += 1
-                        for cc, csrf in enumerate(newObject.childSrfs):
-                            csrf.BCObject = bc[count]
-                            HBObject.childSrfs[cc].BCObject = bc[count]
-                            count += 1
-                    
-                    HBObjects.append(newObject)
-                    del(bc)
+                    HBObjects.append(self.copyHBObject(HBObject))
                 except Exception, e:
                     print `e`
                     print "Failed to copy the object. Returning the original objects...\n" +\
@@ -8563,44 +11233,77 @@ class CalculateGridBasedDLAnalysisResults(object):
         
     def getResults(self):
         resultValues = []
-        studyType= self.analysisType
-        for fileCount, resultFile in enumerate(self.resultFiles):
-            if studyType == 0 or studyType == 2:
-                #illuminance / luminance
-                resultValues.extend(self.readDLResult(resultFile))
-            elif studyType == 1:
-                # radiation
-                resultValues.extend(self.readRadiationResult(resultFile))
-            elif studyType == 3 or studyType == 4:
-                resultValues.extend(self.readDFResult(resultFile))
+        for values in self.iterResults():
+            resultValues.extend(values)
         
         return resultValues
     
+    def iterResults(self):
+        """Yield the values of each result file in the order of the cpu count of the files."""
+        for resultFile in self.sortResultFiles(self.resultFiles):
+            yield self.readResult(resultFile)
+    
+    @staticmethod
+    def sortResultFiles(resultFiles):
+        # files are named projectName_cpuCount.res. sorting them by name puts _10 before _2
+        pattern = re.compile(r"^(.*)_(\d+)\.res$", re.IGNORECASE)
+        keys = [pattern.match(resultFile) for resultFile in resultFiles]
+        if None in keys: return list(resultFiles)
+        keys = [(key.group(1), int(key.group(2))) for key in keys]
+        return [resultFile for key, resultFile in sorted(zip(keys, resultFiles))]
+    
+    def readResult(self, resultFile):
+        studyType = self.analysisType
+        if studyType == 0 or studyType == 2:
+            #illuminance / luminance
+            return self.readDLResult(resultFile)
+        elif studyType == 1:
+            # radiation
+            return self.readRadiationResult(resultFile)
+        elif studyType == 3 or studyType == 4:
+            return self.readDFResult(resultFile)
+        return []
+    
+    @staticmethod
+    def readRGB(resultFile):
+        """
+        Read the red, green and blue values of an rtrace result file.
+        
+        Binary files (rtrace -faf) start with a Radiance header and are decoded in one go
+        as an array of floats. Text files (rtrace -h) are split in one go.
+        """
+        with open(resultFile, "rb") as inf:
+            data = inf.read()
+        
+        if data.startswith("#?RADIANCE"):
+            headerEnd = re.search("\r?\n\r?\n", data)
+            if headerEnd is None:
+                raise ValueError("Failed to find the end of the header in %s."%resultFile)
+            header = data[:headerEnd.start()]
+            if "FORMAT=double" in header: values = array.array("d")
+            else: values = array.array("f")
+            body = data[headerEnd.end():]
+            values.fromstring(body[:len(body) - len(body) % values.itemsize])
+            if "BIGENDIAN=" in header and \
+                ("BIGENDIAN=1" in header) != (sys.byteorder == "big"):
+                values.byteswap()
+        else:
+            values = map(float, data.split())
+        
+        return values[0::3], values[1::3], values[2::3]
+    
     def readRadiationResult(self, resultFile):
-        result = []
-        resultFile = open(resultFile,"r")
-        for line in resultFile:
-            result.append(float(line.split('	')[0]))
-        return result
+        R, G, B = self.readRGB(resultFile)
+        return list(R)
     
     def readDLResult(self, resultFile):
-        result = []
-        resultFile = open(resultFile,"r")
-        for line in resultFile:
-            R, G, B = line.split('	')[0:3]
-            result.append(179*(.265 * float(R) + .67 * float(G) + .065 * float(B)))
-        return result
+        R, G, B = self.readRGB(resultFile)
+        return map(lambda r, g, b: 179*(.265 * r + .67 * g + .065 * b), R, G, B)
     
     def readDFResult(self, resultFile):
-        result = []
-        resultFile = open(resultFile,"r")
-        for line in resultFile:
-            R, G, B = line.split('	')[0:3]
-            # divide by the sky horizontal illuminance = 100000
-            res = 17900*(.265 * float(R) + .67 * float(G) + .065 * float(B))/100000
-            if res > 100: res = 100
-            result.append(res)
-        return result
+        R, G, B = self.readRGB(resultFile)
+        # divide by the sky horizontal illuminance = 100000
+        return map(lambda r, g, b: min(17900*(.265 * r + .67 * g + .065 * b)/100000, 100), R, G, B)
 
 class SerializeObjects(object):
     
@@ -8616,6 +11319,487 @@ class SerializeObjects(object):
         with open(self.filePath, 'rb') as inf:
             self.data = pickle.load(inf)
 
+class hb_GeometryArrays(object):
+    """
+    Planar polygonal Breps and meshes stored as flat vertex and face arrays.
+    
+    vertices has the x, y, z of the points of every geometry followed by the normal
+    of each Brep face. faces has the type, the number of points and the number of
+    faces of every geometry followed by the loops of each face as point indices.
+    add returns the address of the geometry in the arrays and get reads it back.
+    """
+    brepType = 0
+    meshType = 1
+    
+    def __init__(self, vertices = None, faces = None):
+        if vertices is None: vertices = array.array("d")
+        if faces is None: faces = array.array("i")
+        self.vertices = vertices
+        self.faces = faces
+    
+    def add(self, geometry):
+        """Add a geometry to the arrays. Return None if the geometry can't be stored as polygons."""
+        if isinstance(geometry, rc.Geometry.Brep):
+            geometryType = self.brepType
+            polygons = self.getBrepPolygons(geometry)
+        elif isinstance(geometry, rc.Geometry.Mesh):
+            geometryType = self.meshType
+            polygons = self.getMeshPolygons(geometry)
+        else:
+            return None
+        
+        if polygons is None: return None
+        
+        address = (len(self.vertices), len(self.faces))
+        pointIndex = {}
+        points = []
+        faces = [geometryType, 0, len(polygons)]
+        for loops, normal in polygons:
+            faces.append(len(loops))
+            for loop in loops:
+                faces.append(len(loop))
+                for point in loop:
+                    key = (point.X, point.Y, point.Z)
+                    if key not in pointIndex:
+                        pointIndex[key] = len(points)
+                        points.append(key)
+                    faces.append(pointIndex[key])
+        faces[1] = len(points)
+        
+        for point in points:
+            self.vertices.extend(point)
+        if geometryType == self.brepType:
+            for loops, normal in polygons:
+                self.vertices.extend((normal.X, normal.Y, normal.Z))
+        self.faces.extend(faces)
+        
+        return address
+    
+    @staticmethod
+    def getBrepPolygons(brep):
+        tolerance = sc.doc.ModelAbsoluteTolerance
+        polygons = []
+        for face in brep.Faces:
+            if not face.IsPlanar(tolerance): return None
+            
+            # outer loop first
+            loops = [face.OuterLoop] + [loop for loop in face.Loops \
+                if loop.LoopType == rc.Geometry.BrepLoopType.Inner]
+            
+            polylines = []
+            for loop in loops:
+                curve = loop.To3dCurve()
+                if curve is None: return None
+                success, polyline = curve.TryGetPolyline()
+                if not success: return None
+                points = list(polyline)
+                if len(points) > 1 and points[0].DistanceTo(points[-1]) <= tolerance:
+                    points = points[:-1]
+                if len(points) < 3: return None
+                polylines.append(points)
+            
+            normal = face.NormalAt(face.Domain(0).Mid, face.Domain(1).Mid)
+            polygons.append((polylines, normal))
+        
+        return polygons
+    
+    @staticmethod
+    def getMeshPolygons(mesh):
+        vertices = mesh.Vertices
+        polygons = []
+        for face in mesh.Faces:
+            if face.IsQuad: indices = (face.A, face.B, face.C, face.D)
+            else: indices = (face.A, face.B, face.C)
+            polygons.append(([[vertices[index] for index in indices]], None))
+        return polygons
+    
+    def get(self, address):
+        """Create the geometry at an address."""
+        vertexStart, faceStart = address
+        geometryType, pointCount, faceCount = self.faces[faceStart:faceStart + 3]
+        
+        vertices = self.vertices
+        points = []
+        for count in xrange(vertexStart, vertexStart + 3 * pointCount, 3):
+            points.append(rc.Geometry.Point3d(vertices[count], vertices[count + 1], vertices[count + 2]))
+        
+        index = faceStart + 3
+        polygons = []
+        for faceIndex in range(faceCount):
+            loops = []
+            loopCount = self.faces[index]
+            index += 1
+            for loopIndex in range(loopCount):
+                indexCount = self.faces[index]
+                loops.append(list(self.faces[index + 1:index + 1 + indexCount]))
+                index += 1 + indexCount
+            polygons.append(loops)
+        
+        if geometryType == self.meshType:
+            return self.createMesh(points, polygons)
+        
+        normals = []
+        for count in range(len(polygons)):
+            start = vertexStart + 3 * (pointCount + count)
+            normals.append(rc.Geometry.Vector3d(vertices[start], vertices[start + 1], vertices[start + 2]))
+        
+        return self.createBrep(points, polygons, normals)
+    
+    @staticmethod
+    def createMesh(points, polygons):
+        mesh = rc.Geometry.Mesh()
+        for point in points:
+            mesh.Vertices.Add(point)
+        for loops in polygons:
+            mesh.Faces.AddFace(*loops[0])
+        mesh.Normals.ComputeNormals()
+        return mesh
+    
+    @staticmethod
+    def createBrep(points, polygons, normals):
+        tolerance = sc.doc.ModelAbsoluteTolerance
+        faces = []
+        for loops, normal in zip(polygons, normals):
+            curves = []
+            for loop in loops:
+                curves.append(rc.Geometry.Polyline([points[index] for index in loop + loop[:1]]).ToNurbsCurve())
+            face = rc.Geometry.Brep.CreatePlanarBreps(curves)[0]
+            
+            # make sure the face is looking the same direction as the original face
+            brepFace = face.Faces[0]
+            faceNormal = brepFace.NormalAt(brepFace.Domain(0).Mid, brepFace.Domain(1).Mid)
+            if rc.Geometry.Vector3d.Multiply(faceNormal, normal) < 0:
+                face.Flip()
+            faces.append(face)
+        
+        if len(faces) == 1: return faces[0]
+        
+        joinedBreps = rc.Geometry.Brep.JoinBreps(faces, tolerance)
+        if joinedBreps and len(joinedBreps) == 1: return joinedBreps[0]
+        
+        # keep all the faces in one Brep like the original geometry
+        brep = rc.Geometry.Brep()
+        for face in faces:
+            brep.Append(face)
+        return brep
+
+class hb_HBFile(object):
+    """
+    Binary container for Honeybee objects (.HB files).
+    
+    The file starts with a fixed size header (magic, version and the offset of the
+    table of contents) which is followed by these sections:
+        libraries: constructions, materials, schedules, shading controls and RAD
+                   materials. Each library object is stored once for the whole file.
+        common:    objects that don't belong to a zone (HVAC systems, shading
+                   surfaces, stand-alone surfaces and view factor info).
+        zones:     one record for each zone with the zone, its surfaces and their
+                   fenestration surfaces.
+        vertices:  float64 coordinates of the geometries (hb_GeometryArrays).
+        faces:     int32 face indices of the geometries.
+        toc:       table of contents with the offsets of the sections and the name
+                   and the programs of every zone.
+    
+    Records are compressed pickles of the object dictionaries that are collected by
+    Dump Honeybee Objects. Planar polygonal Breps and meshes are moved to the vertex
+    and face arrays and every other geometry stays in its record. The geometry of
+    each zone is a contiguous block of the arrays so a zone can be read without
+    reading the rest of the file.
+    
+    Files are shared between the components for the session through fromFile so
+    the table of contents is only read once.
+    """
+    magic = "HBFILE"
+    version = 1
+    headerFormat = "<6sHQ"
+    libraryTypes = ('HBConstr', 'HBMat', 'HBsched', 'HBShdCntrl', 'HBRadMat')
+    
+    # files that are already opened in this session
+    openFiles = {}
+    
+    def __init__(self, filePath):
+        self.filePath = os.path.normpath(filePath)
+        self.signature = self.fileSignature(self.filePath)
+        
+        damagedMsg = "%s is incomplete or damaged. Dump the Honeybee objects again."%self.filePath
+        with open(self.filePath, "rb") as inf:
+            header = inf.read(struct.calcsize(self.headerFormat))
+            if not header.startswith(self.magic):
+                raise ValueError("%s is not a Honeybee binary file."%self.filePath)
+            if len(header) < struct.calcsize(self.headerFormat):
+                raise ValueError(damagedMsg)
+            magic, version, tocOffset = struct.unpack(self.headerFormat, header)
+            if version > self.version:
+                raise ValueError("%s is written by a newer version of Honeybee."%self.filePath)
+            
+            # the offset of the table of contents is written after the rest of the file
+            if tocOffset == 0: raise ValueError(damagedMsg)
+            inf.seek(tocOffset)
+            try:
+                self.toc = self.unpack(inf.read())
+            except Exception:
+                raise ValueError(damagedMsg)
+    
+    @classmethod
+    def fromFile(cls, filePath):
+        """Return the file and reuse the one in memory if the file has not changed."""
+        key = os.path.normpath(filePath)
+        HBFile = cls.openFiles.get(key)
+        if HBFile is None or HBFile.signature != cls.fileSignature(key):
+            HBFile = cls(key)
+            cls.openFiles[key] = HBFile
+        return HBFile
+    
+    @classmethod
+    def isHBFile(cls, filePath):
+        """Check if a file is a binary .HB file. Older .HB files are plain pickles."""
+        with open(filePath, "rb") as inf:
+            return inf.read(len(cls.magic)) == cls.magic
+    
+    @staticmethod
+    def fileSignature(filePath):
+        fileStat = os.stat(filePath)
+        return fileStat.st_size, fileStat.st_mtime
+    
+    @staticmethod
+    def pack(data):
+        return zlib.compress(pickle.dumps(data))
+    
+    @staticmethod
+    def unpack(data):
+        return pickle.loads(zlib.decompress(data))
+    
+    @classmethod
+    def write(cls, filePath, ids, objs):
+        """
+        Write Honeybee objects to a file.
+        
+        Args:
+            filePath: Path to the .HB file.
+            ids: IDs of the input objects in order.
+            objs: A dictionary of id: object dictionary for all the objects and the
+                library objects as they are collected by Dump Honeybee Objects.
+        """
+        libraries = {}
+        for id, obj in objs.iteritems():
+            if obj['objectType'] in cls.libraryTypes:
+                libraries[id] = obj
+        
+        # collect the zones with their surfaces
+        zoneIds = []
+        for id in ids + objs.keys():
+            if id not in zoneIds and id in objs and objs[id]['objectType'] == 'HBZone':
+                zoneIds.append(id)
+        
+        zoneRecords = []
+        zoneObjIds = set()
+        for zoneId in zoneIds:
+            records = {zoneId: objs[zoneId]}
+            srfIds = list(objs[zoneId]['surfaces'])
+            while srfIds:
+                srfId = srfIds.pop()
+                if srfId in records or srfId not in objs: continue
+                HBSurface = objs[srfId]
+                records[srfId] = HBSurface
+                if not HBSurface.get('isChild') and HBSurface.get('hasChild'):
+                    srfIds.extend(HBSurface['childSrfs'])
+            zoneRecords.append(records)
+            zoneObjIds.update(records.keys())
+        
+        commonRecords = {}
+        for id, obj in objs.iteritems():
+            if id not in libraries and id not in zoneObjIds:
+                commonRecords[id] = obj
+        
+        # remove the file from the session so it is read again
+        cls.openFiles.pop(os.path.normpath(filePath), None)
+        
+        vertices = array.array("d")
+        faces = array.array("i")
+        
+        with open(filePath, "wb") as outf:
+            outf.write(struct.pack(cls.headerFormat, cls.magic, cls.version, 0))
+            
+            data = cls.pack(libraries)
+            toc = {'version': cls.version, 'byteOrder': sys.byteorder, 'ids': ids, \
+                   'libraries': (outf.tell(), len(data)), 'zones': []}
+            outf.write(data)
+            
+            toc['common'] = cls.writeRecords(outf, commonRecords, vertices, faces)
+            
+            for records in zoneRecords:
+                entry = cls.writeRecords(outf, records, vertices, faces)
+                zoneId = [id for id in records if records[id]['objectType'] == 'HBZone'][0]
+                HBZone = records[zoneId]
+                entry['id'] = zoneId
+                entry['name'] = HBZone.get('name')
+                entry['bldgProgram'] = HBZone.get('bldgProgram')
+                entry['zoneProgram'] = HBZone.get('zoneProgram')
+                toc['zones'].append(entry)
+            
+            toc['vertices'] = outf.tell()
+            vertices.tofile(outf)
+            toc['faces'] = outf.tell()
+            faces.tofile(outf)
+            
+            tocOffset = outf.tell()
+            outf.write(cls.pack(toc))
+            
+            outf.seek(0)
+            outf.write(struct.pack(cls.headerFormat, cls.magic, cls.version, tocOffset))
+        
+        return filePath
+    
+    @classmethod
+    def writeRecords(cls, outf, records, vertices, faces):
+        """Write a set of records and add their geometries to the vertices and the faces."""
+        geometryArrays = hb_GeometryArrays()
+        packedRecords = {}
+        geometries = {}
+        for id, record in records.iteritems():
+            record = dict(record)
+            addresses = {}
+            for key, value in record.items():
+                if isinstance(value, (list, tuple)):
+                    itemAddresses = {}
+                    for count, item in enumerate(value):
+                        address = geometryArrays.add(item)
+                        if address is not None:
+                            itemAddresses[count] = address
+                    if itemAddresses:
+                        items = list(value)
+                        for count in itemAddresses:
+                            items[count] = None
+                        record[key] = type(value)(items)
+                        addresses[key] = itemAddresses
+                else:
+                    address = geometryArrays.add(value)
+                    if address is not None:
+                        record[key] = None
+                        addresses[key] = address
+            
+            packedRecords[id] = record
+            if addresses: geometries[id] = addresses
+        
+        data = cls.pack({'records': packedRecords, 'geometries': geometries})
+        entry = {'offset': outf.tell(), 'length': len(data), \
+                 'vertices': (len(vertices), len(geometryArrays.vertices)), \
+                 'faces': (len(faces), len(geometryArrays.faces))}
+        outf.write(data)
+        
+        vertices.extend(geometryArrays.vertices)
+        faces.extend(geometryArrays.faces)
+        
+        return entry
+    
+    def getZoneNames(self):
+        return [entry['name'] for entry in self.toc['zones']]
+    
+    def getZonePrograms(self):
+        return ["::".join([str(entry['bldgProgram']), str(entry['zoneProgram'])]) \
+            for entry in self.toc['zones']]
+    
+    def getZoneEntries(self, names = None, programs = None):
+        """
+        Find the zones by name and program.
+        
+        Args:
+            names: Optional list of zone names.
+            programs: Optional list of programs. A program can be a building program
+                and a zone program (e.g. Office::OpenOffice) or only one of them.
+        Returns:
+            Table of contents entries of the zones that match both inputs.
+        """
+        names = set(name.upper() for name in (names or []) if name)
+        programs = set(program.upper() for program in (programs or []) if program)
+        
+        zoneEntries = []
+        for entry in self.toc['zones']:
+            if names and str(entry['name']).upper() not in names:
+                continue
+            if programs:
+                bldgProgram = str(entry['bldgProgram']).upper()
+                zoneProgram = str(entry['zoneProgram']).upper()
+                if not programs.intersection((bldgProgram, zoneProgram, \
+                    bldgProgram + "::" + zoneProgram)):
+                    continue
+            zoneEntries.append(entry)
+        return zoneEntries
+    
+    def load(self, names = None, programs = None):
+        """
+        Read the objects from the file.
+        
+        Args:
+            names: Optional list of zone names. Only these zones are read from the file.
+            programs: Optional list of zone programs. Only the zones with these programs
+                are read from the file.
+        Returns:
+            A dictionary with ids and objs in the same format that older versions of
+            Dump Honeybee Objects pickled to the file.
+        """
+        zoneEntries = self.getZoneEntries(names, programs)
+        
+        objs = {}
+        with open(self.filePath, "rb") as inf:
+            offset, length = self.toc['libraries']
+            inf.seek(offset)
+            objs.update(self.unpack(inf.read(length)))
+            
+            for entry in [self.toc['common']] + zoneEntries:
+                objs.update(self.readRecords(inf, entry))
+        
+        if len(zoneEntries) != len(self.toc['zones']):
+            self.removeMissingAdjacencies(objs)
+        
+        ids = [id for id in self.toc['ids'] if id in objs]
+        return {'ids': ids, 'objs': objs}
+    
+    def readRecords(self, inf, entry):
+        inf.seek(entry['offset'])
+        data = self.unpack(inf.read(entry['length']))
+        records = data['records']
+        if not data['geometries']: return records
+        
+        vertices = array.array("d")
+        start, count = entry['vertices']
+        inf.seek(self.toc['vertices'] + start * vertices.itemsize)
+        vertices.fromfile(inf, count)
+        
+        faces = array.array("i")
+        start, count = entry['faces']
+        inf.seek(self.toc['faces'] + start * faces.itemsize)
+        faces.fromfile(inf, count)
+        
+        if self.toc['byteOrder'] != sys.byteorder:
+            vertices.byteswap()
+            faces.byteswap()
+        
+        geometryArrays = hb_GeometryArrays(vertices, faces)
+        for id, addresses in data['geometries'].iteritems():
+            record = records[id]
+            for key, address in addresses.iteritems():
+                if isinstance(address, dict):
+                    items = list(record[key])
+                    for count, itemAddress in address.iteritems():
+                        items[count] = geometryArrays.get(itemAddress)
+                    record[key] = type(record[key])(items)
+                else:
+                    record[key] = geometryArrays.get(address)
+        
+        return records
+    
+    @staticmethod
+    def removeMissingAdjacencies(objs):
+        """Set surfaces that are adjacent to the surfaces of the zones that are not loaded to adiabatic."""
+        for id, obj in objs.iteritems():
+            if obj['objectType'] != 'HBSurface' or obj.get('type') == 6: continue
+            if str(obj.get('BC')).lower() != 'surface' or obj.get('BCObject') in objs: continue
+            obj['BC'] = 'Adiabatic'
+            obj['BCObject'] = 'Outdoors'
+            obj['sunExposure'] = 'NoSun'
+            obj['windExposure'] = 'NoWind'
+
 
 
 class hb_hvacProperties(object):
@@ -8741,7 +11925,7 @@ class hb_hvacProperties(object):
         error = None
         schedule= schedule.upper()
         
-        if schedule!=None and not schedule.lower().endswith(".csv") and schedule not in sc.sticky["honeybee_ScheduleLib"].keys():
+        if schedule!=None and not schedule.lower().endswith(".csv") and schedule not in sc.sticky["honeybee_ScheduleLib"]:
             error = "Cannot find " + schedule + " in Honeybee schedule library."
             return False, error
         elif schedule!=None and schedule.lower().endswith(".csv"):
@@ -9734,16 +12918,31 @@ if checkIn.letItFly:
             EPLibs = HB_GetEPLibraries()
             
             try:
-                for pathCount, path in enumerate(libFilePaths):
-                    if "honeybee_Hive" not in sc.sticky:
-                        # This is first time loading so clean the library
-                        cleanLibs = True if pathCount == 0 else False
-                    else:
-                        cleanLibs = False
-                    if path.endswith('.csv'): isMatFile = True
-                    else: isMatFile = False
+                startTime = time.time()
+                # load the parsed libraries from the snapshot if none of the files has changed
+                librarySnapshot = hb_EPLibrarySnapshot(libFilePaths + [templateFilesPrep.standardsFilePath])
+                openStudioStandardLib = librarySnapshot.load(EPLibs)
+                
+                if openStudioStandardLib is not None:
+                    print "EP and THERM libraries are loaded from %s"%librarySnapshot.snapshotFile
+                else:
+                    for pathCount, path in enumerate(libFilePaths):
+                        if "honeybee_Hive" not in sc.sticky:
+                            # This is first time loading so clean the library
+                            cleanLibs = True if pathCount == 0 else False
+                        else:
+                            cleanLibs = False
+                        if path.endswith('.csv'): isMatFile = True
+                        else: isMatFile = False
+                        
+                        EPLibs.importEPLibrariesFromFile(path, isMatFile, cleanLibs, False)                
                     
-                    EPLibs.importEPLibrariesFromFile(path, isMatFile, cleanLibs, False)                
+                    openStudioStandardLib = templateFilesPrep.loadStandardsFile()
+                    if openStudioStandardLib != -1: librarySnapshot.save(EPLibs, openStudioStandardLib)
+                
+                if openStudioStandardLib != -1:
+                    sc.sticky ["honeybee_OpenStudioStandardsFile"] = openStudioStandardLib
+                print "Libraries are loaded in %.2f seconds."%(time.time() - startTime)
                 
                 EPLibs.report()
                 sc.sticky["honeybee_materialLib"].update(EPLibs.getEPMaterials())
@@ -9765,12 +12964,15 @@ if checkIn.letItFly:
         sc.sticky["honeybee_Hive"] = hb_Hive
         sc.sticky["honeybee_generationHive"] = generationhb_hive
         sc.sticky["honeybee_GetEPLibs"] = HB_GetEPLibraries
+        sc.sticky["honeybee_EPLibraries"] = hb_EPLibraries
+        sc.sticky["honeybee_IDFTokenizer"] = hb_IDFTokenizer
         sc.sticky["honeybee_DefaultMaterialLib"] = materialLibrary
         sc.sticky["honeybee_DefaultSurfaceLib"] = EPSurfaceLib
         sc.sticky["honeybee_EPMaterialAUX"] = EPMaterialAux
         sc.sticky["honeybee_EPScheduleAUX"] = EPScheduleAux
         sc.sticky["honeybee_EPObjectsAUX"] = EPObjectsAux
         sc.sticky["honeybee_ReadSchedules"] = ReadEPSchedules
+        sc.sticky["honeybee_ScheduleCompiler"] = hb_ScheduleCompiler
         sc.sticky["honeybee_BuildingProgramsLib"] = BuildingProgramsLib
         sc.sticky["honeybee_EPTypes"] = EPTypes()
         sc.sticky["honeybee_EPZone"] = EPZone
@@ -9801,13 +13003,27 @@ if checkIn.letItFly:
         sc.sticky["honeybee_DLAnalysisRecipe"] = DLAnalysisRecipe
         sc.sticky["honeybee_MeshToRAD"] = hb_MSHToRAD
         sc.sticky["honeybee_WriteRAD"] = hb_WriteRAD
+        sc.sticky["honeybee_JobScheduler"] = hb_JobScheduler
         sc.sticky["honeybee_WriteRADAUX"] = hb_WriteRADAUX
         sc.sticky["honeybee_WriteDS"] = hb_WriteDS
         sc.sticky["honeybee_RADParameters"] = hb_RADParameters
         sc.sticky["honeybee_DSParameters"] = hb_DSParameters
         sc.sticky["honeybee_ReadAnnualResultsAux"] = hb_ReadAnnualResultsAux
+        sc.sticky["honeybee_IllFile"] = hb_IllFile
+        sc.sticky["honeybee_IllMatrix"] = hb_IllMatrix
+        sc.sticky["honeybee_ShadingStateIllMatrix"] = hb_ShadingStateIllMatrix
+        sc.sticky["honeybee_AnnualDaylightMetrics"] = hb_AnnualDaylightMetrics
+        sc.sticky["honeybee_MicroclimateMatrix"] = hb_MicroclimateMatrix
+        sc.sticky["honeybee_RayBVH"] = hb_RayBVH
         sc.sticky["honeybee_EPParameters"] = hb_EnergySimulatioParameters
+        sc.sticky["honeybee_EPResultStore"] = hb_EPResultStore
+        sc.sticky["honeybee_EPResultHeader"] = hb_EPResultHeader
+        sc.sticky["honeybee_EPResultCache"] = hb_EPResultCache
+        sc.sticky["honeybee_DCCache"] = hb_DCCache
+        sc.sticky["honeybee_OctreeCache"] = hb_OctreeCache
+        sc.sticky["honeybee_ParametricRun"] = hb_ParametricRun
         sc.sticky["honeybee_SerializeObjects"] = SerializeObjects
+        sc.sticky["honeybee_HBFile"] = hb_HBFile
         sc.sticky["honeybee_GridBasedDLResults"] = CalculateGridBasedDLAnalysisResults
         sc.sticky["honeybee_DLAnalaysisTypes"] = {0: ["0: illuminance" , "lux"],
                                                   1: ["1: radiation" , "wh/m2"],
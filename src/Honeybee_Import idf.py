@@ -12,11 +12,11 @@ Constructions, schedules and systems will be neglected
 """
 ghenv.Component.Name = "Honeybee_Import idf"
 ghenv.Component.NickName = 'importIdf'
-ghenv.Component.Message = 'VER 0.0.65\nJAN_01_2020'
+ghenv.Component.Message = 'VER 0.0.65\nOCT_17_2026'
 ghenv.Component.IconDisplayMode = ghenv.Component.IconDisplayMode.application
 ghenv.Component.Category = "Honeybee"
 ghenv.Component.SubCategory = "13 | WIP"
-#compatibleHBVersion = VER 0.0.56\nDEC_15_2017
+#compatibleHBVersion = VER 0.0.65\nOCT_17_2026
 #compatibleLBVersion = VER 0.0.59\nFEB_01_2015
 ghenv.Component.AdditionalHelpFromDocStrings = "1"
 
@@ -34,7 +34,7 @@ tolerance = sc.doc.ModelAbsoluteTolerance
 import math
 
 
-def createEPObject(idfFile, resultDict, key, type = None):
+def createEPObject(EPObject, resultDict, key):
     if key=="Zone,": key = "EPZONES"
     
     # This function creates a dictionary from EPObjects
@@ -42,93 +42,23 @@ def createEPObject(idfFile, resultDict, key, type = None):
         # create an empty dictionary for the key
         resultDict[key] = {}
     
-    # store the data into the dictionary
-    inLine = 0
-    recounter = 0
-    for lineCount, line in enumerate(idfFile):
-        if line.strip().startswith("!"):
-            recounter -= 1
-            continue
-        elif lineCount == 0:
-            # first line is the name of the object
-            nameKey = line.split("!")[0].strip()[:-1].strip()
-            if nameKey in resultDict[key].keys():
-                # this means the object is already in the library
-                warning = "The " + key + ": " + nameKey + " already exists in the libaray.\n" + \
-                          "You need to rename the " + key + "."
-                print warning
-                break
-            else:
-                # add the material to the library
-                resultDict[key][nameKey] = {}
-                if type!=None:
-                    resultDict[key][nameKey][0] = type
-                
-        else:
-            objValues = line.split("!")[0].strip().split(",")
-            
-            try: objDescription = line.split("!")[1].strip()
-            except:  objDescription = ""
-            objKey = lineCount + recounter #+ '_' + line.split("!-")[1].strip()
-            for objCount, objValue in enumerate(objValues):
-                if not objValue.endswith(";"):
-                    if objCount == 0 or len(objValue.strip())!=0: # get rid of empty items
-                        #print objValue
-                        if objCount!=0:inLine+=1
-                        resultDict[key][nameKey][objKey + inLine] = objValue, objDescription
-                elif objValue.endswith(";"):
-                    if objCount!=0: inLine+=1
-                    resultDict[key][nameKey][objKey + inLine] = objValue[:-1], objDescription
-                    
-                    return resultDict
-
-def createEPObjectDB(idfFile, resultDict, key, type = None, nameKey = None):
-    if key=="Zone,": key = "EPZONES"
-    
-    # This function creates a dictionary from EPObjects
-    if key not in resultDict.keys():
-        # create an empty dictionary for the key
-        resultDict[key] = {}
-    
-    if nameKey in resultDict[key].keys():
+    nameKey = EPObject.name
+    if nameKey in resultDict[key]:
         # this means the object is already in the library
-        warning = "The " + key + ": " + nameKey + " is already existed in the libaray.\n" + \
+        warning = "The " + key + ": " + nameKey + " already exists in the libaray.\n" + \
                   "You need to rename the " + key + "."
         print warning
-    else:
-        # add the material to the library
-        resultDict[key][nameKey] = {}
-        if type!=None: resultDict[key][nameKey][0] = type
+        return resultDict
+    
+    # add the object to the library
+    resultDict[key][nameKey] = {}
+    resultDict[key][nameKey][0] = EPObject.objClass + ','
     
     # store the data into the dictionary
-    inLine = 0
-    recounter = 0
-    for lineCount, line in enumerate(idfFile):
-        if line.strip().startswith("!"):
-            recounter -= 1
-            continue
-        else:
-            objValues = line.split("!")[0].strip().split(",")
-            
-            try: objDescription = line.split("!")[1].strip()
-            except:  objDescription = ""
-            objKey = lineCount + recounter #+ '_' + line.split("!-")[1].strip()
-            if objKey == 0:
-                recounter += 1
-                objKey += 1
-            for objCount, objValue in enumerate(objValues):
-                if not objValue.endswith(";"):
-                    if objCount == 0 or len(objValue.strip())!=0: # get rid of empty items
-                        #print objValue
-                        if objCount!=0:
-                            inLine+=1
-                            if lineCount == 1: recounter +=1
-                        resultDict[key][nameKey][objKey + inLine] = objValue, objDescription
-                elif objValue.endswith(";"):
-                    if objCount!=0: inLine+=1
-                    resultDict[key][nameKey][objKey + inLine] = objValue[:-1], objDescription
-                    
-                    return resultDict
+    for objKey, (objValue, objDescription) in enumerate(EPObject.fields[1:]):
+        resultDict[key][nameKey][objKey + 1] = objValue, objDescription.split("!")[0].strip()
+    
+    return resultDict
 
 
 # 4 represents an Air Wall
@@ -189,6 +119,7 @@ def main(idfFile, importEPObjects = False):
         hb_EPSHDSurface = sc.sticky["honeybee_EPShdSurface"]
         
         hb_GetEPLibs = sc.sticky["honeybee_GetEPLibs"]
+        hb_IDFTokenizer = sc.sticky["honeybee_IDFTokenizer"]
         
     else:
         print "You should first let both Ladybug and Honeybee to fly..."
@@ -215,17 +146,12 @@ def main(idfFile, importEPObjects = False):
     EPKeys.extend(["Material,", "WindowMaterial,", "Construction,"])
     idfFileDict = {}
     
-    with open(idfFile, 'r') as inf:
-        for line in inf:
-            for key in EPKeys:
-                if line.strip().ToUpper().startswith(key.ToUpper()):
-                    objTypeInit = line.strip()[:-1].split(',')
-                    objType = objTypeInit[0] + ','
-                    if (len(objTypeInit) == 2 and '!' in objTypeInit[1]) or (len(objTypeInit) == 1):
-                        idfFileDict = createEPObject(inf, idfFileDict, key, objType)
-                    else:
-                        objName = objTypeInit[1].strip()
-                        idfFileDict = createEPObjectDB(inf, idfFileDict, key, objType, objName)
+    # stream the objects of the file
+    for EPObject in hb_IDFTokenizer(idfFile):
+        for key in EPKeys:
+            if (EPObject.objClass + ',').ToUpper().startswith(key.ToUpper()):
+                idfFileDict = createEPObject(EPObject, idfFileDict, key)
+                break
     
     outputs = {"Material" : [],
             "WindowMaterial" : [],
@@ -58,11 +58,11 @@ Provided by Honeybee 0.0.65
 
 ghenv.Component.Name = "Honeybee_Indoor View Factor Calculator"
 ghenv.Component.NickName = 'IndoorViewFactor'
-ghenv.Component.Message = 'VER 0.0.65\nJAN_01_2020'
+ghenv.Component.Message = 'VER 0.0.65\nOCT_17_2026'
 ghenv.Component.IconDisplayMode = ghenv.Component.IconDisplayMode.application
 ghenv.Component.Category = "Honeybee"
 ghenv.Component.SubCategory = "10 | Energy | Energy"
-#compatibleHBVersion = VER 0.0.56\nDEC_15_2017
+#compatibleHBVersion = VER 0.0.65\nOCT_17_2026
 #compatibleLBVersion = VER 0.0.59\nJUN_25_2015
 try: ghenv.Component.AdditionalHelpFromDocStrings = "6"
 except: pass
@@ -76,7 +76,6 @@ from Grasshopper.Kernel.Data import GH_Path
 import Rhino as rc
 import rhinoscriptsyntax as rs
 import scriptcontext as sc
-import operator
 import System.Threading.Tasks as tasks
 import time
 
@@ -1257,45 +1256,82 @@ def checkViewResolution(viewResolution, lb_preparation):
     
     return newVecs, skyViewVecs, newVecsAreas, skyViewVecsAreas
 
-def allSame(items):
-    return all(x == items[0] for x in items)
+def meshTriangles(meshes):
+    #Split the faces of each mesh into triangles that carry the index of their mesh.
+    triangles = []
+    surfaceIds = []
+    for srfCount, mesh in enumerate(meshes):
+        vertices = [(vertex.X, vertex.Y, vertex.Z) for vertex in mesh.Vertices]
+        for face in mesh.Faces:
+            triangles.append((vertices[face.A], vertices[face.B], vertices[face.C]))
+            surfaceIds.append(srfCount)
+            if face.IsQuad:
+                triangles.append((vertices[face.A], vertices[face.C], vertices[face.D]))
+                surfaceIds.append(srfCount)
+    return triangles, surfaceIds
+
+def buildRayBVH(meshes):
+    #Build the ray tree of a list of meshes once so that it can be used for all of the points of a zone.
+    hb_RayBVH = sc.sticky["honeybee_RayBVH"]
+    triangles, surfaceIds = meshTriangles(meshes)
+    return hb_RayBVH(triangles, surfaceIds)
+
+def pointViewFactors(srfBVH, srfCount, viewVectors, point):
+    #Count the rays that hit each surface first.
+    srfHits = [0] * srfCount
+    divisor = len(viewVectors)
+    origin = (point.X, point.Y, point.Z)
+    
+    #A zone with a single surface has never been given a view factor to it.
+    if srfCount > 1:
+        for vec in viewVectors:
+            minIndex = srfBVH.closestHit(origin, (vec.X, vec.Y, vec.Z))
+            if minIndex != None: srfHits[minIndex] += 1
+    
+    #Divide by the total rays to get the view factor.
+    return [hitCount/divisor for hitCount in srfHits]
+
+def pointSkyView(opaqueBVH, windowBVH, skyViewVecs, point, zoneWindowTransmiss, zoneHasWindows, zoneWindowNames):
+    divisor = len(skyViewVecs)
+    origin = (point.X, point.Y, point.Z)
+    
+    finalViewCount = []
+    finalWindowNameCount = []
+    for vec in skyViewVecs:
+        direction = (vec.X, vec.Y, vec.Z)
+        if not opaqueBVH.isHit(origin, direction):
+            if zoneHasWindows == 2:
+                finalViewCount.append(1) #This is the code to indicate that the point is outside and there is no need to calculate a window transmissivity.
+                finalWindowNameCount.append(0)
+            else:
+                #The ray is not blocked but it is hitting a window and so we need to factor in the window transmissivity.
+                transmiss = 1
+                winNameList = []
+                hitWindows = windowBVH.hitSurfaces(origin, direction)
+                for winCount in range(len(zoneWindowTransmiss)):
+                    if winCount in hitWindows:
+                        transmiss = transmiss * zoneWindowTransmiss[winCount]
+                        winNameList.append(zoneWindowNames[winCount].upper())
+                finalViewCount.append(transmiss)
+                finalWindowNameCount.append(winNameList)
+        else:
+            #The ray has been blocked by an opaque surface.
+            finalViewCount.append(0)
+            finalWindowNameCount.append(0)
+    
+    #Sum up the lists and divide by the total rays to get the view factor.
+    return sum(finalViewCount)/divisor, finalViewCount, finalWindowNameCount
 
 def parallel_projection(zoneSrfsMesh, viewVectors, pointList):
     #Placeholder for the outcome of the parallel projection.
     pointIntList = []
     for point in pointList: pointIntList.append([])
     
-    #Keep track of the divisor.
-    divisor = len(viewVectors)
+    #Build the ray tree of the zone once for all of the points.
+    srfBVH = buildRayBVH(zoneSrfsMesh)
     
     def intersect(i):
-        point = pointList[i]
-        #Create the rays to be projected from each point.
-        pointRays = []
-        for vec in viewVectors: pointRays.append(rc.Geometry.Ray3d(point, vec))
-        
-        #Create a list that will hold the intersection hits of each surface
-        srfHits = []
-        for srf in zoneSrfsMesh: srfHits.append([])
-        
-        #Perform the intersection of the rays with the mesh.
-        pointIntersectList = []
-        for rayCount, ray in enumerate(pointRays):
-            pointIntersectList.append([])
-            for srf in zoneSrfsMesh:
-                intersect = rc.Geometry.Intersect.Intersection.MeshRay(srf, ray)
-                if intersect == -1: intersect = "N"
-                pointIntersectList[rayCount].append(intersect)
-        
-        #Find the intersection that was the closest for each ray.
-        for list in pointIntersectList:
-            if allSame(list) == False:
-                minIndex, minValue = min(enumerate(list), key=operator.itemgetter(1))
-                srfHits[minIndex].append(1)
-        
-        #Sum up the lists and divide by the total rays to get the view factor.
-        for hitList in srfHits:
-            pointIntList[i].append(sum(hitList)/divisor)
+        pointIntList[i] = pointViewFactors(srfBVH, len(zoneSrfsMesh), viewVectors, pointList[i])
     
     tasks.Parallel.ForEach(range(len(pointList)), intersect)
     
@@ -1312,58 +1348,12 @@ def parallel_skyProjection(zoneOpaqueMesh, skyViewVecs, skyViewVecsAreas, pointL
         skyBlockedList.append([])
         skyBlockWindowNameCount.append([])
     
-    #Keep track of the divisor.
-    divisor = len(skyViewVecs)
+    #Build the ray trees of the zone once for all of the points.
+    opaqueBVH = buildRayBVH(zoneOpaqueMesh)
+    windowBVH = buildRayBVH(zoneWindowMesh)
     
     def intersect(i):
-        point = pointList[i]
-        #Create the rays to be projected from each point.
-        pointRays = []
-        for vec in skyViewVecs: pointRays.append(rc.Geometry.Ray3d(point, vec))
-        
-        #Perform the intersection of the rays with the opaque mesh.
-        pointIntersectList = []
-        for rayCount, ray in enumerate(pointRays):
-            pointIntersectList.append([])
-            for srf in zoneOpaqueMesh:
-                intersect = rc.Geometry.Intersect.Intersection.MeshRay(srf, ray)
-                if intersect == -1: pass
-                else: pointIntersectList[rayCount].append(1)
-        
-        #See if the ray passed all of the context meshes.
-        finalIntersectList = []
-        for ray in pointRays:
-            finalIntersectList.append([])
-        for listCt, rayList in enumerate(pointIntersectList):
-            for intersect in rayList:
-                finalIntersectList[listCt].append(intersect)
-        
-        finalViewCount = []
-        finalWindowNameCount = []
-        for rayListCount, rayList in enumerate(finalIntersectList):
-            if sum(rayList) == 0:
-                if zoneHasWindows == 2:
-                    finalViewCount.append(1)
-                    finalWindowNameCount.append(0)
-                else:
-                    transmiss = 1
-                    winNameList = []
-                    for winCount, winMesh in enumerate(zoneWindowMesh):
-                        intersect = rc.Geometry.Intersect.Intersection.MeshRay(winMesh, pointRays[rayListCount])
-                        if intersect == -1: pass
-                        else:
-                            transmiss = transmiss * zoneWindowTransmiss[winCount]
-                            winNameList.append(zoneWindowNames[winCount].upper())
-                    finalViewCount.append(transmiss)
-                    finalWindowNameCount.append(winNameList)
-            else:
-                finalViewCount.append(0)
-                finalWindowNameCount.append(0)
-        
-        #Sum up the lists and divide by the total rays to get the view factor.
-        skyBlockedList[i] = finalViewCount
-        skyBlockWindowNameCount[i] = finalWindowNameCount
-        pointIntList[i] = sum(finalViewCount)/divisor
+        pointIntList[i], skyBlockedList[i], skyBlockWindowNameCount[i] = pointSkyView(opaqueBVH, windowBVH, skyViewVecs, pointList[i], zoneWindowTransmiss, zoneHasWindows, zoneWindowNames)
     
     tasks.Parallel.ForEach(range(len(pointList)), intersect)
     
@@ -1392,58 +1382,12 @@ def skyViewCalc(testPts, zoneOpaqueMesh, skyViewVecs, skyViewVecsAreas, zoneHasW
                 testPtSkyView.append([])
                 testPtSkyBlockedList.append([])
                 testPtBlockName.append([])
+                opaqueBVH = buildRayBVH(zoneOpaqueMesh[zoneCount])
+                windowBVH = buildRayBVH(zoneWindowMesh[zoneCount])
                 for pointCount, point in enumerate(pointList):
-                    #Make the list that will eventually hold the view factors of each surface.
-                    divisor = len(skyViewVecs)
-                    
-                    #Create the rays to be projected from each point.
-                    pointRays = []
-                    for vec in skyViewVecs: pointRays.append(rc.Geometry.Ray3d(point, vec))
-                    
-                    #Perform the intersection of the rays with the opaque mesh.
-                    pointIntersectList = []
-                    for rayCount, ray in enumerate(pointRays):
-                        pointIntersectList.append([])
-                        for srf in zoneOpaqueMesh[zoneCount]:
-                            intersect = rc.Geometry.Intersect.Intersection.MeshRay(srf, ray)
-                            if intersect == -1: pointIntersectList[rayCount].append(0)
-                            else: pointIntersectList[rayCount].append(1)
-                    
-                    #See if the ray passed all of the context meshes.
-                    finalIntersectList = []
-                    for ray in pointRays:
-                        finalIntersectList.append([])
-                    for listCt, rayList in enumerate(pointIntersectList):
-                        for intersect in rayList:
-                            finalIntersectList[listCt].append(intersect)
-                    
-                    finalViewCount = []
-                    finalWindowNameCount = []
-                    for rayListCount, rayList in enumerate(finalIntersectList):
-                        if sum(rayList) == 0:
-                            if zoneHasWindows[zoneCount] == 2:
-                                finalViewCount.append(1) #This is the code to indicate that the point is outside and there is no need to calculate a window transmissivity.
-                                finalWindowNameCount.append(0)
-                            else:
-                                #The ray is not blocked but it is hitting a window and so we need to factor in the window transmissivity.
-                                transmiss = 1
-                                winNameList = []
-                                for winCount, winMesh in enumerate(zoneWindowMesh[zoneCount]):
-                                    intersect = rc.Geometry.Intersect.Intersection.MeshRay(winMesh, pointRays[rayListCount])
-                                    if intersect == -1: pass
-                                    else:
-                                        transmiss = transmiss * zoneWindowTransmiss[zoneCount][winCount]
-                                        winNameList.append(zoneWindowNames[zoneCount][winCount].upper())
-                                finalViewCount.append(transmiss)
-                                finalWindowNameCount.append(winNameList)
-                        else:
-                            #The ray has been blocked by an opaque surface.
-                            finalViewCount.append(0)
-                            finalWindowNameCount.append(0)
-                    
-                    #Sum up the lists and divide by the total rays to get the view factor.
+                    skyView, finalViewCount, finalWindowNameCount = pointSkyView(opaqueBVH, windowBVH, skyViewVecs, point, zoneWindowTransmiss[zoneCount], zoneHasWindows[zoneCount], zoneWindowNames[zoneCount])
                     testPtSkyBlockedList[zoneCount].append(finalViewCount)
-                    testPtSkyView[zoneCount].append(sum(finalViewCount)/divisor)
+                    testPtSkyView[zoneCount].append(skyView)
                     testPtBlockName[zoneCount].append(finalWindowNameCount)
         else:
             testPtSkyView.append(0)
@@ -1462,39 +1406,9 @@ def main(testPts, zoneSrfsMesh, viewVectors, includeOutdoor):
             testPtViewFactor.append(viewFactors)
         else:
             testPtViewFactor.append([])
+            srfBVH = buildRayBVH(zoneSrfsMesh[zoneCount])
             for pointCount, point in enumerate(pointList):
-                #Make the list that will eventually hold the view factors of each surface.
-                testPtViewFactor[zoneCount].append([])
-                divisor = len(viewVectors)
-                
-                #Create the rays to be projected from each point.
-                pointRays = []
-                for vec in viewVectors: pointRays.append(rc.Geometry.Ray3d(point, vec))
-                
-                #Create a list that will hold the intersection hits of each surface
-                srfHits = []
-                for srf in zoneSrfsMesh[zoneCount]: srfHits.append([])
-                
-                #Perform the intersection of the rays with the mesh.
-                pointIntersectList = []
-                for rayCount, ray in enumerate(pointRays):
-                    pointIntersectList.append([])
-                    for srf in zoneSrfsMesh[zoneCount]:
-                        intersect = rc.Geometry.Intersect.Intersection.MeshRay(srf, ray)
-                        if intersect == -1: intersect = "N"
-                        pointIntersectList[rayCount].append(intersect)
-                
-                #Find the intersection that was the closest for each ray.
-                for list in pointIntersectList:
-                    try:
-                        if allSame(list) == False:
-                            minIndex, minValue = min(enumerate(list), key=operator.itemgetter(1))
-                            srfHits[minIndex].append(1)
-                    except: pass
-                
-                #Sum up the lists and divide by the total rays to get the view factor.
-                for hitList in srfHits:
-                    testPtViewFactor[zoneCount][pointCount].append(sum(hitList)/divisor)
+                testPtViewFactor[zoneCount].append(pointViewFactors(srfBVH, len(zoneSrfsMesh[zoneCount]), viewVectors, point))
     
     
     return testPtViewFactor
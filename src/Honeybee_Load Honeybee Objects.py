@@ -25,12 +25,16 @@ Load Honeybee Objects
 
 Use this component to load Honeybee objects from a file on your system.
 The valid files are created by dump Honeybee objects component.
+Zones are stored separately in the file so you can load only some of the zones by name or by program.
 -
 Provided by Honeybee 0.0.65
 
     Args:
         _HBObjects: A list of Honeybee objects
         _filePath: A valid path to a file on your drive (e.g. c:\ladybug\20ZonesExample.HB)
+        zoneNames_: An optional list of zone names. Only these zones will be loaded from the file.
+        zonePrograms_: An optional list of zone programs (e.g. Office::OpenOffice, OpenOffice or Office). Only the zones with these programs will be loaded from the file.
+            Surfaces that are adjacent to the zones that are not loaded will be set to adiabatic.
         _load: Set to True to load the objects from the file
     Returns:
         readMe!: ...
@@ -38,11 +42,11 @@ Provided by Honeybee 0.0.65
 
 ghenv.Component.Name = "Honeybee_Load Honeybee Objects"
 ghenv.Component.NickName = 'loadHBObjects'
-ghenv.Component.Message = 'VER 0.0.65\nFEB_06_2020'
+ghenv.Component.Message = 'VER 0.0.65\nOCT_17_2026'
 ghenv.Component.IconDisplayMode = ghenv.Component.IconDisplayMode.application
 ghenv.Component.Category = 'HB-Legacy'
 ghenv.Component.SubCategory = "00 | Honeybee"
-#compatibleHBVersion = VER 0.0.59\nDEC_15_2017
+#compatibleHBVersion = VER 0.0.65\nOCT_17_2026
 #compatibleLBVersion = VER 0.0.59\nFEB_01_2015
 try: ghenv.Component.AdditionalHelpFromDocStrings = "6"
 except: pass
@@ -242,10 +246,28 @@ def loadHBObjects(HBData):
         return hb_hive.addNonGeoObjToHive([HBObjects[id] for id in HBData["ids"]][0], ghenv.Component)
 
 
-def main(filePath):
+def main(filePath, zoneNames, zonePrograms):
     if not os.path.isfile(filePath):
         raise ValueError("Can't find %s"%filePath)
     
+    hb_HBFile = sc.sticky["honeybee_HBFile"]
+    if hb_HBFile.isHBFile(filePath):
+        HBFile = hb_HBFile.fromFile(filePath)
+        HBData = HBFile.load(zoneNames, zonePrograms)
+        if HBData["ids"] == []:
+            warning = "None of the zones in the file matches zoneNames_ and zonePrograms_.\n" + \
+                "Zones in the file are:\n" + "\n".join(HBFile.getZoneNames())
+            print warning
+            ghenv.Component.AddRuntimeMessage(gh.GH_RuntimeMessageLevel.Warning, warning)
+            return -1
+        return loadHBObjects(HBData)
+    
+    # files that are written by older versions of Honeybee
+    if zoneNames or zonePrograms:
+        warning = "This file is written by an older version of Honeybee.\n" + \
+            "zoneNames_ and zonePrograms_ will be ignored and all the objects will be loaded."
+        ghenv.Component.AddRuntimeMessage(gh.GH_RuntimeMessageLevel.Warning, warning)
+    
     with open(filePath, "rb") as inf:
         return loadHBObjects(pickle.load(inf))
 
@@ -269,6 +291,12 @@ else:
         "into canvas and try again."
         ghenv.Component.AddRuntimeMessage(w, warning)
 
+# zoneNames_ and zonePrograms_ are not inputs of the components from older versions of Honeybee
+try: zoneNames_
+except NameError: zoneNames_ = []
+try: zonePrograms_
+except NameError: zonePrograms_ = []
+
 if initCheck == True and _filePath != None and _load == True:
-    results = main(_filePath)
+    results = main(_filePath, zoneNames_, zonePrograms_)
     HBObjects = results if results!= -1 else None
@@ -37,15 +37,16 @@ Provided by Honeybee 0.0.65
         _ar_: Ambient resolution. "This number will determine the maximum density of ambient values used in interpolation. Error will start to increase on surfaces spaced closer than the scene size divided by the ambient resolution. The maximum ambient value density is the scene size times the ambient accuracy."
         _aa_: Ambient accuracy. "This value will approximately equal the error from indirect illuminance interpolation. A value of zero implies no interpolation"
         additionalP_: Use this input to set other Radiance parameters as needed. You need to follow Radiance's standard syntax (e.g. -ps 1 -lw 0.01)
+        binaryResults_: Set to True to write the results of grid-based studies as binary floats (rtrace -faf). Binary result files are smaller and much faster to read back for large grids. Default is False.
 """
 
 ghenv.Component.Name = "Honeybee_RADParameters"
 ghenv.Component.NickName = 'RADParameters'
-ghenv.Component.Message = 'VER 0.0.65\nJAN_01_2020'
+ghenv.Component.Message = 'VER 0.0.65\nOCT_17_2026'
 ghenv.Component.IconDisplayMode = ghenv.Component.IconDisplayMode.application
 ghenv.Component.Category = "Honeybee"
 ghenv.Component.SubCategory = "03 | Daylight | Recipes"
-#compatibleHBVersion = VER 0.0.56\nDEC_12_2015
+#compatibleHBVersion = VER 0.0.65\nOCT_17_2026
 #compatibleLBVersion = VER 0.0.59\nFEB_01_2015
 try: ghenv.Component.AdditionalHelpFromDocStrings = "2"
 except: pass
@@ -179,6 +180,14 @@ def main():
                 radPar["additional"].append(par)
                 print par
         
+        # binaryResults_ is not an input of the components from older versions of Honeybee
+        try: binaryResults = binaryResults_
+        except NameError: binaryResults = False
+        
+        if binaryResults:
+            radPar["binaryResults"] = True
+            print "binary results = True"
+        
         return dictToClass(radPar)
 
 
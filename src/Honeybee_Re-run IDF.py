@@ -30,22 +30,27 @@ Provided by Ladybug 0.0.45
     Args:
         _idfFilePath: The full file path to the idf file on your system that you would like to run (e.g. C:\ladybug\sample1.idf).
         _epwFileAddress: The full file path to epw weather file that you would like the simulation to run with.
-        parallel_: Set to "True" to run multiple IDFs using multiple CPUs.  Note that this input is only relevant when you have plugged in a list of IDF file addresses.
+        parallel_: Set to "True" to run multiple IDFs using multiple CPUs.  Note that this input is only relevant when you have plugged in a list of IDF file addresses or parameters_.
+        parameters_: An optional comma separated table to run variants of the IDF file.  The first line is the header with the fields that change and every other line is a variant.
+            Fields are written as class|object name|field where field is the field comment in the IDF file or the number of the field (e.g. WindowMaterial:SimpleGlazingSystem|Glazing 1|U-Factor).  Use * as the object name to change all the objects of the class.
+            If the first column of the header is id, the values of this column will be used as the names of the variants.
+            Variants are written to a folder next to the IDF file and the results of all the variants are collected in a SQLite database as soon as each simulation is finished.
         runIt_: Set to 'True' to run the simulation.  You can also connect a 2 to run the simulation in the background.
     Returns:
         report: Report!
         resultFileAddress: The address of the EnergyPlus result file.
         eioFileAddress:  The file path of the EIO file that has been generated on your machine.  This file contains information about the sizes of all HVAC equipment from the simulation.  This file is only generated when you set "runSimulation_" to "True."
         rddFileAddress: The file path of the Result Data Dictionary (.rdd) file that is generated after running the file through EnergyPlus.  This file contains all possible outputs that can be requested from the EnergyPlus model.  Use the "Honeybee_Read Result Dictionary" to see what outputs can be requested.
+        resultDatabase: The file path of the SQLite database with the results of all the variants when parameters_ are connected.  Results are stored in the results table by variant, zone and variable.
 """
 
 ghenv.Component.Name = "Honeybee_Re-run IDF"
 ghenv.Component.NickName = 'Re-Run IDF'
-ghenv.Component.Message = 'VER 0.0.65\nJAN_01_2020'
+ghenv.Component.Message = 'VER 0.0.65\nOCT_17_2026'
 ghenv.Component.IconDisplayMode = ghenv.Component.IconDisplayMode.application
 ghenv.Component.Category = "Honeybee"
 ghenv.Component.SubCategory = "10 | Energy | Energy"
-#compatibleHBVersion = VER 0.0.56\nJUL_24_2016
+#compatibleHBVersion = VER 0.0.65\nOCT_17_2026
 #compatibleLBVersion = VER 0.0.59\nFEB_01_2015
 ghenv.Component.AdditionalHelpFromDocStrings = "0"
 
@@ -54,9 +59,6 @@ import scriptcontext as sc
 import os
 import shutil
 import Grasshopper.Kernel as gh
-import time
-import subprocess
-import System.Threading.Tasks as tasks
 
 def checkTheInputs(idfFileName, epwWeatherFile):
     w = gh.GH_RuntimeMessageLevel.Warning
@@ -139,17 +141,26 @@ def writeBatchFile(workingDir, idfFilePath, epwFileAddress, EPDirectory):
     
     return batchFileAddress, newIDFPath, idfFileName
 
-def runCmd(batchFileAddress, shellKey = True):
-    batchFileAddress.replace("\\", "/")		
-    p = subprocess.Popen(["cmd /c ", batchFileAddress], shell=shellKey, stdout=subprocess.PIPE, stderr=subprocess.PIPE)		
-    out, err = p.communicate()
+def runBatchFiles(batchFileAddresses, runInBackground, maxPRuns = 1):
+    #execute the batch files with a limited number of simulations running at the same time.
+    if runInBackground > 1:
+        scheduler = sc.sticky["honeybee_JobScheduler"](maxPRuns, shell = True, captureOutput = True)
+        for batchFileAddress in batchFileAddresses:
+            scheduler.addJob(["cmd /c ", batchFileAddress], os.path.basename(batchFileAddress))
+    else:
+        scheduler = sc.sticky["honeybee_JobScheduler"](maxPRuns)
+        for batchFileAddress in batchFileAddresses:
+            scheduler.addJob(batchFileAddress, os.path.basename(batchFileAddress))
+    
+    jobs = scheduler.run()
+    for job in jobs:
+        print "%s ran in %.1f seconds."%(job.name, job.duration or 0)
+    for job in scheduler.failedJobs():
+        print "%s ended with exit code %s."%(job.name, job.returnCode)
+    return jobs
 
 def runBatchFile(batchFileAddress, runInBackground):
-    #execute the batch file
-    if runInBackground > 1:		
-        runCmd(batchFileAddress)		
-    else:
-        os.system(batchFileAddress)
+    return runBatchFiles([batchFileAddress], runInBackground)[0]
 
 def runParallelIDFs(idfFilePaths, epwFileAddress, runIt, parallel):
     # placeholders for final lists.
@@ -157,35 +168,71 @@ def runParallelIDFs(idfFilePaths, epwFileAddress, runIt, parallel):
     eioFileAddress = [None for x in idfFilePaths]
     rddFileAddress = [None for x in idfFilePaths]
     
-    reunInBackground = runIt
+    runInBackground = runIt
+    maxPRuns = 1
     if parallel == True:
         runInBackground = 2
+        try: maxPRuns = int(os.environ["NUMBER_OF_PROCESSORS"])
+        except: maxPRuns = 1
     
-    def runEP(i):
-        epPath = checkTheInputs(idfFilePaths[i], _epwFileAddress)
+    # write all of the batch files first.
+    batchFileAddresses = []
+    runInfo = []
+    for i, idfFilePath in enumerate(idfFilePaths):
+        epPath = checkTheInputs(idfFilePath, _epwFileAddress)
         if epPath != -1:
-            workingDir = "\\".join(idfFilePaths[i].split('\\')[:-1])
-            batchFileAddress, newIDFPath, idfFileName = writeBatchFile(workingDir, idfFilePaths[i], _epwFileAddress, epPath)
-            runBatchFile(batchFileAddress, runInBackground)
-            try:
-                os.remove(newIDFPath)
-            except:
-                pass
-            
-            shIdfFileName = idfFileName.replace('.idf', '')
-            resultFileAddress[i] = str(workingDir) + '\\' + str(shIdfFileName) + '.csv'
-            eioFileAddress[i] = resultFileAddress[i].replace('.csv', '.eio')
-            rddFileAddress[i] = resultFileAddress[i].replace('.csv', '.rdd')
+            workingDir = "\\".join(idfFilePath.split('\\')[:-1])
+            batchFileAddress, newIDFPath, idfFileName = writeBatchFile(workingDir, idfFilePath, _epwFileAddress, epPath)
+            batchFileAddresses.append(batchFileAddress)
+            runInfo.append((i, workingDir, newIDFPath, idfFileName))
     
-    if parallel == True:
-        tasks.Parallel.ForEach(range(len(idfFilePaths)), runEP)
-    else:
-        for x in range(len(idfFilePaths)):
-            runEP(x)
+    # run them with a limited number of simulations at the same time.
+    runBatchFiles(batchFileAddresses, runInBackground, maxPRuns)
     
+    for i, workingDir, newIDFPath, idfFileName in runInfo:
+        try:
+            os.remove(newIDFPath)
+        except:
+            pass
+        
+        shIdfFileName = idfFileName.replace('.idf', '')
+        resultFileAddress[i] = str(workingDir) + '\\' + str(shIdfFileName) + '.csv'
+        eioFileAddress[i] = resultFileAddress[i].replace('.csv', '.eio')
+        rddFileAddress[i] = resultFileAddress[i].replace('.csv', '.rdd')
     
     return resultFileAddress, eioFileAddress, rddFileAddress
 
+def runParametricIDFs(idfFilePath, epwFileAddress, parameters, parallel):
+    epPath = checkTheInputs(idfFilePath, epwFileAddress)
+    if epPath == -1: return -1
+    
+    maxPRuns = 1
+    if parallel == True:
+        try: maxPRuns = int(os.environ["NUMBER_OF_PROCESSORS"])
+        except: maxPRuns = 1
+    
+    workingDir = os.path.splitext(idfFilePath)[0] + "_variants"
+    hb_parametricRun = sc.sticky["honeybee_ParametricRun"](idfFilePath, epwFileAddress, workingDir, maxPRuns = maxPRuns)
+    try:
+        for variantId, variantParameters in hb_parametricRun.parseParameterTable(parameters):
+            hb_parametricRun.addVariant(variantId, variantParameters)
+        
+        resultFiles = hb_parametricRun.run()
+    except ValueError, e:
+        # invalid class|name|field parameters or fields which are not in the idf file
+        print str(e)
+        ghenv.Component.AddRuntimeMessage(gh.GH_RuntimeMessageLevel.Warning, str(e))
+        return -1
+    for line in hb_parametricRun.report():
+        print line
+    
+    variantIds = [variant[0] for variant in hb_parametricRun.variants]
+    resultFileAddress = [resultFiles[variantId] for variantId in variantIds]
+    eioFileAddress = [address.replace('.csv', '.eio') for address in resultFileAddress]
+    rddFileAddress = [address.replace('.csv', '.rdd') for address in resultFileAddress]
+    
+    return resultFileAddress, eioFileAddress, rddFileAddress, hb_parametricRun.databasePath
+
 
 #Honeybee check.
 initCheck = True
@@ -210,7 +257,20 @@ else:
         ghenv.Component.AddRuntimeMessage(w, warning)
 
 
-if initCheck and _runIt > 0:
+# parameters_ is not an input of the components from older versions of Honeybee
+try: parameters_
+except NameError: parameters_ = []
+
+if initCheck and _runIt > 0 and parameters_ != [] and parameters_[0] != None:
+    if len(_idfFilePath) != 1:
+        warning = "Connect only one IDF file to run it with parameters_."
+        print warning
+        ghenv.Component.AddRuntimeMessage(gh.GH_RuntimeMessageLevel.Warning, warning)
+    else:
+        results = runParametricIDFs(_idfFilePath[0], _epwFileAddress, parameters_, parallel_)
+        if results != -1:
+            resultFileAddress, eioFileAddress, rddFileAddress, resultDatabase = results
+elif initCheck and _runIt > 0:
     if len(_idfFilePath) == 1:
         epPath = checkTheInputs(_idfFilePath[0], _epwFileAddress)
         if epPath != -1:
@@ -46,11 +46,11 @@ Provided by Honeybee 0.0.65
 """
 ghenv.Component.Name = "Honeybee_Read Annual Result I"
 ghenv.Component.NickName = 'readAnnualResultsI'
-ghenv.Component.Message = 'VER 0.0.65\nJAN_01_2020'
+ghenv.Component.Message = 'VER 0.0.65\nOCT_17_2026'
 ghenv.Component.IconDisplayMode = ghenv.Component.IconDisplayMode.application
 ghenv.Component.Category = "Honeybee"
 ghenv.Component.SubCategory = "04 | Daylight | Daylight"
-#compatibleHBVersion = VER 0.0.57\nNOV_03_2015
+#compatibleHBVersion = VER 0.0.65\nOCT_17_2026
 #compatibleLBVersion = VER 0.0.59\nFEB_01_2015
 try: ghenv.Component.AdditionalHelpFromDocStrings = "2"
 except: pass
@@ -64,9 +64,8 @@ from Grasshopper.Kernel.Data import GH_Path
 import Rhino as rc
 import scriptcontext as sc
 import os
-import subprocess
-import time
 import shutil
+import json
 
 """
     def testPtsStr(self, testPoint, ptsNormal):
@@ -93,50 +92,90 @@ def executeBatchFiles(batchFileNames, maxPRuns = None, shell = False, waitingTim
             batchFileNames: List of batch files
             maxPRuns: max number of files to be ran in parallel (default = 0)
             shell: set to True if you do NOT want to see the cmd window while the analysis is runnig
+            waitingTime: time in seconds to wait after starting each batch file
     """
 
     if not maxPRuns : maxPRuns = 1
-    maxPRuns = int(maxPRuns)
-    total = len(batchFileNames)
-    
-    if maxPRuns < 1: maxPRuns = 1
-    if maxPRuns > total: maxPRuns = total
-    
-    running = 0
-    done = False
-    jobs = []
-    pid = 0
     
     try:
-        while not done:
-            if running < maxPRuns and pid < total:
-                # execute the files
-                jobs.append(subprocess.Popen(batchFileNames[pid].replace("\\", "/") , shell = shell))
-                pid+=1
-                time.sleep(waitingTime)
-            
-            # count how many jobs are running and how many are done
-            running = 0
-            finished = 0
-            for job in jobs:
-                if job.poll() is None:
-                    #one job is still running
-                    running += 1
-                else:
-                    finished += 1
-    
-            if running == maxPRuns:
-                # wait for half a second
-                #print "waiting..."
-                time.sleep(waitingTime)
-    
-            if finished ==  total:
-                done = True
+        scheduler = sc.sticky["honeybee_JobScheduler"](maxPRuns, shell, launchDelay = waitingTime)
+        for batchFileName in batchFileNames:
+            scheduler.addJob(batchFileName.replace("\\", "/"), os.path.basename(batchFileName))
+        
+        scheduler.run()
+        for job in scheduler.failedJobs():
+            print "%s ended with exit code %s."%(job.name, job.returnCode)
     
     except Exception, e:
         print "Something went wrong: %s"%str(e) 
 
 
+def getDcFileName(illFile):
+    if illFile.endswith("_up.ill"):
+        return illFile.replace("_up.ill", ".dc")
+    elif illFile.endswith("_down.ill"):
+        return illFile.replace("_down.ill", ".dc")
+    else:
+        return illFile.replace(".ill", ".dc")
+
+
+def getMergeSignature(shadingStateFiles, numOfPtsInEachSpace):
+    """Number of points in each space and size and modified time of the source files."""
+    signature = [numOfPtsInEachSpace]
+    for illFile in shadingStateFiles:
+        for sourceFile in (illFile, getDcFileName(illFile)):
+            fileStat = os.stat(sourceFile)
+            signature.append([sourceFile, fileStat.st_size, fileStat.st_mtime])
+    return signature
+
+
+def getSpaceIllFileName(illFile, spaceCount):
+    return illFile.split(".ill")[0] + "_space_" + str(spaceCount) + ".ill"
+
+
+def readDSStandardResults(filePath):
+    results = []
+    with open(filePath, "r") as inf:
+        for line in inf:
+            if not line.startswith("#"):
+                results.append(float(line.split("\t")[-1]))
+    return results
+
+
+def calculateDaylightMetrics(stateIllFiles, annualProfilesFile, occFile, threshold, workerCount = 1):
+    """
+    Calculate DA, UDI < 100, UDI 100-2000, UDI > 2000 and CDA for the points of a space.
+    
+    The occupancy and the shading profiles are read from the annual profiles file of
+    ds_el_lighting so the hours and the state of the blinds are the same as Daysim.
+    The occupancy file is only used if the annual profiles file has no occupancy.
+    """
+    metricsEngine = sc.sticky["honeybee_AnnualDaylightMetrics"]
+    occupancy, shadingProfiles = None, []
+    if annualProfilesFile and os.path.isfile(annualProfilesFile):
+        occupancy, shadingProfiles = metricsEngine.readAnnualProfiles(annualProfilesFile)
+    if occupancy is None:
+        occupancy = metricsEngine.readOccupancyFile(occFile)
+    
+    illMatrix = sc.sticky["honeybee_ShadingStateIllMatrix"](stateIllFiles, shadingProfiles)
+    metrics = metricsEngine([100, threshold, 2000], occupancy, continuousThresholds = [threshold])
+    metrics.calculate(illMatrix, workerCount)
+    
+    underUDLI, inRangeUDLI, overUDLI = metrics.usefulDaylightIlluminance(100, 2000)
+    return metrics.daylightAutonomy(threshold), underUDLI, inRangeUDLI, overUDLI, \
+           metrics.continuousDaylightAutonomy(threshold)
+
+
+def getMaxDifference(values, resultFile):
+    """Largest difference between the values and the values of a Daysim result file."""
+    try:
+        DSValues = readDSStandardResults(resultFile)
+    except Exception:
+        return None
+    if len(DSValues) != len(values): return None
+    return max([abs(value - DSValue) for value, DSValue in zip(values, DSValues)] or [0])
+
+
 def convertIllFileDaraTreeIntoSortedDictionary(illFilesAddress):
     
     # I should move this function into Honeybee_Honeybee #BadPractice!
@@ -191,10 +230,7 @@ def convertEPScheduleToDSSchedule(scheduleName, folder):
           "# month,day,time,occupancy (1=present/0=absent)\n"
 
     readSchedules = sc.sticky["honeybee_ReadSchedules"](scheduleName, 0)
-    dailyValues  = readSchedules.getScheduleValues()
-        
-    hourlyValues = []
-    for values in dailyValues: hourlyValues.extend(values)
+    hourlyValues = readSchedules.getHourlyValues()
     
     # create a temp folder inside folder will .ill files
     if not os.path.isdir(folder): os.mkdir(folder)
@@ -517,22 +553,42 @@ def main(illFilesAddress, testPts, testVecs, occFiles, lightingControlGroups, SH
     # available files
     
     # generate new files for each space
-    # check if the files are already generated once
-    # not a good idea at all - many users don't really change the file name and run several
-    # studies with the same name in this case, results will always stay the same! Oops...
+    # the files of a shading state are only generated again if the source files or
+    # the number of points in the spaces have changed since the last run. The signature
+    # of the last run is saved next to the files so running several studies with the
+    # same name doesn't return the old results.
     firstRun = True
-
+    
+    mergeSignatures = {}
+    upToDateStates = []
     newIllFileNamesDict = {}
     for shdGroupCounter, illFileList in originalIllFilesSorted.items():
         newIllFileNamesDict[shdGroupCounter] = []
         for shadingStateCount in range(len(illFileList)):
+            stateUpToDate = True
             for spaceCount in range(numOfSpaces):
                 newIllFileName  = illFileList[shadingStateCount][0].split(".ill")[0] + "_space_" + str(spaceCount) + ".ill"
                 newDcFileName  = illFileList[shadingStateCount][0].split(".ill")[0] + "_space_" + str(spaceCount) + ".dc"
                 newIllFileNamesDict[shdGroupCounter].append(newIllFileName) #collect ill files to calculate sDA
-                #if not (os.path.isfile(newIllFileName) and os.path.isfile(newDcFileName)):
-                #   firstRun = True
-                #   break
+                if not (os.path.isfile(newIllFileName) and os.path.isfile(newDcFileName)):
+                    stateUpToDate = False
+            
+            signatureFile = illFileList[shadingStateCount][0].split(".ill")[0] + "_spaces.json"
+            signature = getMergeSignature(illFileList[shadingStateCount], numOfPtsInEachSpace)
+            mergeSignatures[signatureFile] = signature
+            
+            if stateUpToDate and os.path.isfile(signatureFile):
+                try:
+                    with open(signatureFile, "r") as signatureInf:
+                        stateUpToDate = json.load(signatureInf) == signature
+                except:
+                    stateUpToDate = False
+            else:
+                stateUpToDate = False
+            
+            if stateUpToDate:
+                upToDateStates.append((shdGroupCounter, shadingStateCount))
+                del mergeSignatures[signatureFile]
     
 
     # open all the available ill files and put them in the dictionary
@@ -543,6 +599,9 @@ def main(illFilesAddress, testPts, testVecs, occFiles, lightingControlGroups, SH
         for shdGroupCounter, illFileList in originalIllFilesSorted.items():
             
             for shadingStateCount, shadingStateFiles in enumerate(illFileList):
+                # the files from the last run can be used
+                if (shdGroupCounter, shadingStateCount) in upToDateStates: continue
+                
                 # create a place holder for new .ill files for each shading group
                 newIllFileNamesDict[shdGroupCounter] = []
                 
@@ -589,18 +648,13 @@ def main(illFilesAddress, testPts, testVecs, occFiles, lightingControlGroups, SH
         for shdGroupCounter, illFileList in originalIllFilesSorted.items():
             
             for shadingStateCount, shadingStateFiles in enumerate(illFileList):
+                if (shdGroupCounter, shadingStateCount) in upToDateStates: continue
+                
                 #illFileDict[shaidngGroupCounter]
                 lenOfDCFiles = []
                 for counter, illFile in enumerate(shadingStateFiles):
-                    if illFile.endswith("_up.ill"):
-                        dcFile = illFile.replace("_up.ill", ".dc")
-                        
-                    elif illFile.endswith("_down.ill"):
-                        dcFile = illFile.replace("_down.ill", ".dc")
-                        
-                    else:
-                        dcFile = illFile.replace(".ill", ".dc")
-
+                    dcFile = getDcFileName(illFile)
+                    
                     lenOfDCFile = getFilelength(dcFile) - 6 #Daysim files has 6 lines as header
                     lenOfDCFiles.append(lenOfDCFile)
                     dcfile = open(dcFile, "r")
@@ -640,6 +694,14 @@ def main(illFilesAddress, testPts, testVecs, occFiles, lightingControlGroups, SH
                 for dcFileKey in dcFilesDict.keys(): dcFilesDict[dcFileKey].close()
                 for dcFileKey in newDcFilesDict.keys(): newDcFilesDict[dcFileKey].close()
         
+        # save the signature of the new files for the next run
+        for signatureFile, signature in mergeSignatures.items():
+            try:
+                with open(signatureFile, "w") as signatureOutf:
+                    json.dump(signature, signatureOutf)
+            except:
+                pass
+        
 
     heaFileNames = []
     # write point files and heading files
@@ -889,7 +951,41 @@ def main(illFilesAddress, testPts, testVecs, occFiles, lightingControlGroups, SH
     try: overUDLILists = sorted(overUDLILists, key=lambda fileName: int(fileName.split(".")[-2].split("_")[-4]))
     except: pass
     
-    return None, [DLALists, underUDLILists, inRangeUDLILists, overUDLILists, CDALists, EPLSchLists, htmLists]
+    # calculate the metrics from the .ill files of each space. ds_el_lighting is still
+    # used for the annual profiles which also have the state of the blinds for each hour
+    daylightMetrics = []
+    for spaceCount in range(numOfSpaces):
+        stateIllFiles = []
+        for shdGroupCounter in sorted(originalIllFilesSorted.keys()):
+            stateIllFiles.append([getSpaceIllFileName(shadingStateFiles[0], spaceCount) \
+                                  for shadingStateFiles in originalIllFilesSorted[shdGroupCounter]])
+        
+        try: annualProfilesFile = EPLSchLists[spaceCount]
+        except IndexError: annualProfilesFile = None
+        try: occFileFullPath = occFiles[spaceCount]
+        except: occFileFullPath = occFiles[0]
+        try: illumT = DLAIllumThresholds[spaceCount]
+        except: illumT = DLAIllumThresholds[0]
+        
+        try:
+            spaceMetrics = calculateDaylightMetrics(stateIllFiles, annualProfilesFile, occFileFullPath, illumT, ncpus)
+        except ValueError, e:
+            msg = "Failed to calculate the daylight metrics of space %d: %s" % (spaceCount, str(e))
+            return msg, None
+        daylightMetrics.append(spaceMetrics)
+        
+        # check the results against the result files of ds_el_lighting
+        for values, resultFiles, metricName in zip(spaceMetrics, \
+            [DLALists, underUDLILists, inRangeUDLILists, overUDLILists, CDALists], \
+            ["DLA", "UDLI_Less_100", "UDLI_100_2000", "UDLI_More_2000", "CDA"]):
+            try: maxDifference = getMaxDifference(values, resultFiles[spaceCount])
+            except IndexError: maxDifference = None
+            if maxDifference is not None and maxDifference > 1:
+                warning = "%s of space %d is up to %.1f percent different from the results of Daysim." \
+                          % (metricName, spaceCount, maxDifference)
+                ghenv.Component.AddRuntimeMessage(gh.GH_RuntimeMessageLevel.Warning, warning)
+    
+    return None, [daylightMetrics, EPLSchLists, htmLists]
 
 def isAllNone(dataList):
     for item in dataList.AllData():
@@ -917,7 +1013,7 @@ if _runIt and not isAllNone(_illFilesAddress) and not isAllNone(_testPoints):
             ghenv.Component.AddRuntimeMessage(w, msg)
             
         else:
-            DLALists, underUDLILists, inRangeUDLILists, overUDLILists, CDALists, EPLSchLists, htmLists = results
+            daylightMetrics, EPLSchLists, htmLists = results
             DLA = DataTree[Object]()
             UDLI_Less_100 = DataTree[Object]()    
             UDLI_100_2000 = DataTree[Object]()
@@ -927,14 +1023,6 @@ if _runIt and not isAllNone(_illFilesAddress) and not isAllNone(_testPoints):
             sDA = DataTree[Object]()
             htmReport = DataTree[Object]()
             
-            def readDSStandardResults(filePath):
-                results = []
-                with open(filePath, "r") as inf:
-                    for line in inf:
-                        if not line.startswith("#"):
-                            results.append(float(line.split("\t")[-1]))
-                return results
-            
             def getsDA(DLARes, threshold = 50):
                 moreThan = 0
                 for res in DLARes:
@@ -945,12 +1033,12 @@ if _runIt and not isAllNone(_illFilesAddress) and not isAllNone(_testPoints):
             
             for branchNum in range(_testPoints.BranchCount):
                 p = GH_Path(branchNum)
-                DLARes = readDSStandardResults(DLALists[branchNum])
+                DLARes, underUDLIRes, inRangeUDLIRes, overUDLIRes, CDARes = daylightMetrics[branchNum]
                 DLA.AddRange(DLARes, p)
-                UDLI_Less_100.AddRange(readDSStandardResults(underUDLILists[branchNum]), p)
-                UDLI_100_2000.AddRange(readDSStandardResults(inRangeUDLILists[branchNum]), p)
-                UDLI_More_2000.AddRange(readDSStandardResults(overUDLILists[branchNum]), p)
-                CDA.AddRange(readDSStandardResults(CDALists[branchNum]), p)
+                UDLI_Less_100.AddRange(underUDLIRes, p)
+                UDLI_100_2000.AddRange(inRangeUDLIRes, p)
+                UDLI_More_2000.AddRange(overUDLIRes, p)
+                CDA.AddRange(CDARes, p)
                 annualProfiles.Add(EPLSchLists[branchNum], p)
                 sDA.Add(getsDA(DLARes), p)
                 htmReport.Add(htmLists[branchNum], p)
@@ -42,11 +42,11 @@ Provided by Honeybee 0.0.65
 """
 ghenv.Component.Name = "Honeybee_Read Annual Result II"
 ghenv.Component.NickName = 'readAnnualResultsII'
-ghenv.Component.Message = 'VER 0.0.65\nJAN_01_2020'
+ghenv.Component.Message = 'VER 0.0.65\nOCT_17_2026'
 ghenv.Component.IconDisplayMode = ghenv.Component.IconDisplayMode.application
 ghenv.Component.Category = "Honeybee"
 ghenv.Component.SubCategory = "04 | Daylight | Daylight"
-#compatibleHBVersion = VER 0.0.56\nFEB_01_2015
+#compatibleHBVersion = VER 0.0.65\nOCT_17_2026
 #compatibleLBVersion = VER 0.0.59\nFEB_01_2015
 try: ghenv.Component.AdditionalHelpFromDocStrings = "2"
 except: pass
@@ -59,6 +59,7 @@ AddReference('Grasshopper')
 import Grasshopper.Kernel as gh
 from Grasshopper import DataTree
 from Grasshopper.Kernel.Data import GH_Path
+import scriptcontext as sc
 
 
 def isAllNone(dataList):
@@ -66,7 +67,11 @@ def isAllNone(dataList):
         if item!=None: return False
     return True
 
-if _runIt and (testPts.DataCount!=0 or not isAllNone(testPts.AllData())) \
+if not sc.sticky.has_key('honeybee_release'):
+    print "You should first let Honeybee fly..."
+    w = gh.GH_RuntimeMessageLevel.Warning
+    ghenv.Component.AddRuntimeMessage(w, "You should first let Honeybee fly...")
+elif _runIt and (testPts.DataCount!=0 or not isAllNone(testPts.AllData())) \
    and resultFilesAddress and resultFilesAddress[0]!=None:
     
     numOfPts = 0
@@ -101,31 +106,20 @@ if _runIt and (testPts.DataCount!=0 or not isAllNone(testPts.AllData())) \
     if not maxThreshold: maxThreshold = float('+Inf')
     print 'Maximum threshold is set to ' + `maxThreshold`
     
-    underValues = [0] * numOfPts
-    values = [0] * numOfPts
-    overValues = [0] * numOfPts
-    
     # number of study hours during a year
     studyHours = ((lunchStHour - stHour) + (endHour - lunchEndHour)) * 365
     
-    totalPtCount = 0
-    ptsCountSoFar = 0
-    for resultFile in resultFilesAddress:
-        result = open(resultFile, 'r')
-        for hour, line in enumerate(result):
-            line = line.replace('\n', '', 10)
-            lineSeg = line.Split(' ')
-            #if len(lineSeg)!= len(testPts) + 4: print 'ERROR!'
-            for ptCount, hourLuxValue in enumerate(lineSeg[4:]):
-                if hour == 0: totalPtCount += 1
-                if  stHour <= (hour + 1)%24 < lunchStHour or lunchEndHour <= (hour + 1)%24 < endHour:
-                    if float(hourLuxValue) <= minThreshold: underValues[ptsCountSoFar + ptCount] += 1
-                    elif minThreshold <= float(hourLuxValue) <= maxThreshold: values[ptsCountSoFar + ptCount] += 1
-                    elif maxThreshold <= float(hourLuxValue): overValues[ptsCountSoFar + ptCount] += 1
-        result.close()
-        ptsCountSoFar = ptsCountSoFar + (len(lineSeg) - 4)
-        
+    illMatrix = sc.sticky["honeybee_IllMatrix"](resultFilesAddress)
+    studyHoursMask = [stHour <= (hour + 1)%24 < lunchStHour or lunchEndHour <= (hour + 1)%24 < endHour \
+                      for hour in range(illMatrix.hourCount)]
+    
+    # values which are equal to a threshold belong to the range below the threshold
+    metrics = sc.sticky["honeybee_AnnualDaylightMetrics"]([minThreshold, maxThreshold], studyHoursMask, upperInclusive = True)
+    metrics.calculate(illMatrix)
     
+    underValues = metrics.hoursBelow(minThreshold)
+    values = metrics.hoursInRange(minThreshold, maxThreshold)
+    overValues = metrics.hoursAbove(max(minThreshold, maxThreshold))
     
     # Change values to %
     for ptCount, v in enumerate(values):
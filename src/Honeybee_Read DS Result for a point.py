@@ -39,11 +39,11 @@ Provided by Honeybee 0.0.65
 """
 ghenv.Component.Name = "Honeybee_Read DS Result for a point"
 ghenv.Component.NickName = 'readDSHourlyResults'
-ghenv.Component.Message = 'VER 0.0.65\nJAN_01_2020'
+ghenv.Component.Message = 'VER 0.0.65\nOCT_17_2026'
 ghenv.Component.IconDisplayMode = ghenv.Component.IconDisplayMode.application
 ghenv.Component.Category = "Honeybee"
 ghenv.Component.SubCategory = "04 | Daylight | Daylight"
-#compatibleHBVersion = VER 0.0.56\nFEB_01_2015
+#compatibleHBVersion = VER 0.0.65\nOCT_17_2026
 #compatibleLBVersion = VER 0.0.59\nFEB_01_2015
 try: ghenv.Component.AdditionalHelpFromDocStrings = "0"
 except: pass
@@ -182,35 +182,15 @@ def main(illFilesAddress, testPoints, targetPoint, annualProfiles):
             targetPtIndex+=1
         if pointFound ==True: break
     
-    # check number of points in each of the ill files
-    # number of points should be the same in all the illfile lists
-    # that's why I just try the first list of the ill files
-    numOfPtsInEachFile = []
-    for illFile in illFileSets[0][0]:
-        with open(illFile, "r") as illInf:
-            for lineCount, line in enumerate(illInf):
-                if not line.startswith("#"):
-                    numOfPtsInEachFile.append(len(line.strip().split(" ")) - 4)
-                    break
-    
-    # find the right ill file(s) to look into and read the results
-    # print targetPtIndex
-    targetListNumber = None
-    targetIndexNumber = None
-    for listCount, numOfPts in enumerate(numOfPtsInEachFile):
-        if sum(numOfPtsInEachFile[:listCount]) >= targetPtIndex + 1:
-            targetListNumber = listCount - 1
-            targetIndexNumber = targetPtIndex - sum(numOfPtsInEachFile[:listCount-1])
-            #print "list number is: ", listCount - 1
-            #print "index number is:", targetPtIndex - sum(numOfPtsInEachFile[:listCount-1])
-            break
-    
-    # Probably this is not the best way but I really want to get it done tonight!
-    if targetListNumber == None:
-        targetListNumber = len(numOfPtsInEachFile)-1
-        targetIndexNumber = targetPtIndex - sum(numOfPtsInEachFile[:targetListNumber])
+    # the ill files of each state are stitched together so the point can be
+    # found with its index in the list of all the test points
+    illMatrices = {}
+    for shadingGroupCount in illFileSets.keys():
+        illMatrices[shadingGroupCount] = []
+        for targetIllFiles in illFileSets[shadingGroupCount]:
+            illMatrices[shadingGroupCount].append(sc.sticky["honeybee_IllMatrix"](targetIllFiles))
     
-    if targetIndexNumber < 0:
+    if not pointFound or targetPtIndex >= illMatrices[0][0].pointCount:
         msg = "The target point is not inside the point list"
         return msg, None, None
     
@@ -239,20 +219,19 @@ def main(illFilesAddress, testPoints, targetPoint, annualProfiles):
     
     
     for shadingGroupCount in illFileSets.keys():
-        for stateCount, targetIllFiles in enumerate(illFileSets[shadingGroupCount]):
-            targetIllFile = targetIllFiles[targetListNumber]
-            result = open(targetIllFile, 'r')
-            for lineCount, line in enumerate(result):
-                hourLuxValue = line.strip().split(" ")[targetIndexNumber + 4]
-                illuminanceValues[shadingGroupCount][stateCount].append(float(hourLuxValue))
-            result.close()
+        for stateCount, illMatrix in enumerate(illMatrices[shadingGroupCount]):
+            illuminanceValues[shadingGroupCount][stateCount].extend(illMatrix.getPointValues(targetPtIndex))
             
                 
     return msg, illuminanceValues, shadingProfiles[branch]
 
 
 
-if _targetPoint!=None and not isAllNone(_illFilesAddress) and not isAllNone(_testPoints):
+if not sc.sticky.has_key('honeybee_release'):
+    print "You should first let Honeybee fly..."
+    w = gh.GH_RuntimeMessageLevel.Warning
+    ghenv.Component.AddRuntimeMessage(w, "You should first let Honeybee fly...")
+elif _targetPoint!=None and not isAllNone(_illFilesAddress) and not isAllNone(_testPoints):
     
     _testPoints.SimplifyPaths()
     _illFilesAddress.SimplifyPaths()
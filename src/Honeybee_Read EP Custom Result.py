@@ -37,11 +37,11 @@ Provided by Honeybee 0.0.65
 
 ghenv.Component.Name = "Honeybee_Read EP Custom Result"
 ghenv.Component.NickName = 'EPCustomResult'
-ghenv.Component.Message = 'VER 0.0.65\nJAN_01_2020'
+ghenv.Component.Message = 'VER 0.0.65\nOCT_17_2026'
 ghenv.Component.IconDisplayMode = ghenv.Component.IconDisplayMode.application
 ghenv.Component.Category = "Honeybee"
 ghenv.Component.SubCategory = "10 | Energy | Energy"
-#compatibleHBVersion = VER 0.0.56\nFEB_01_2015
+#compatibleHBVersion = VER 0.0.65\nOCT_17_2026
 #compatibleLBVersion = VER 0.0.59\nFEB_01_2015
 ghenv.Component.AdditionalHelpFromDocStrings = "4"
 
@@ -54,6 +54,7 @@ import scriptcontext as sc
 import copy
 import os
 
+w = gh.GH_RuntimeMessageLevel.Warning
 
 #Honeybee check.
 hbCheck = True
@@ -141,8 +142,6 @@ def makeHeader(resultList, path, timestep, name, units):
 
 # PARSE THE RESULT FILE.
 if hbCheck and _resultFileAddress and _keywords and _resultFileAddress != None:
-    # Call the class that searches.
-    hb_EPMaterialAUX = sc.sticky["honeybee_EPMaterialAUX"]()
     # If anyone has connected the full name of the output, let's format the keyword correcly for them.
     keywords = []
     for word in _keywords:
@@ -153,44 +152,28 @@ if hbCheck and _resultFileAddress and _keywords and _resultFileAddress != None:
             keywords.append(word)
     
     try:
-        result = open(_resultFileAddress, 'r')
+        resultStore = sc.sticky["honeybee_EPResultStore"].fromFile(_resultFileAddress)
         
-        for lineCount, line in enumerate(result):
-            if lineCount == 0:
-                # PARSE THE FILE HEADING
-                colHeaders = []
-                for column in line.split(','):
-                    colHeaders.append(column)
-                # SEARCH THROUGH THE FILE HEADING
-                simOutputs = hb_EPMaterialAUX.searchListByKeyword(colHeaders, keywords)
-                simOutLower = []
-                for outp in simOutputs:
-                    simOutLower.append(outp.lower())
-                key = []
-                path = []
-                for outp in colHeaders:
-                    if outp.lower() in simOutLower:
-                        outpName = outp.split(' [')[0]
-                        timestep = outp.split('(')[-1].split(')')[0]
-                        units = outp.split('[')[-1].split(']')[0]
-                        makeHeader(results, resultCount, timestep, outpName, units)
-                        key.append(0)
-                        path.append(resultCount)
-                        resultCount += 1
-                    else:
-                        key.append(-1)
-                        path.append(-1)
-            else:
-                for columnCount, column in enumerate(line.split(',')):
-                    p = GH_Path(int(path[columnCount]))
-                    
-                    if key[columnCount] != -1:
-                        results.Add(float(column), p)
-        result.close()
+        # SEARCH THROUGH THE FILE HEADING
+        headerIndex = resultStore.headerIndex
+        dataColumns = headerIndex.searchColumns(keywords)
+        path = {}
+        for columnCount in dataColumns:
+            outp = headerIndex.columns[columnCount]
+            outpName = outp.split(' [')[0]
+            timestep = outp.split('(')[-1].split(')')[0]
+            units = outp.split('[')[-1].split(']')[0]
+            makeHeader(results, resultCount, timestep, outpName, units)
+            path[columnCount] = resultCount
+            resultCount += 1
+        
+        # READ THE VALUES OF THE SELECTED COLUMNS
+        for row in resultStore.getRows(dataColumns):
+            for columnCount in dataColumns:
+                p = GH_Path(int(path[columnCount]))
+                results.Add(float(row[columnCount]), p)
         parseSuccess = True
     except:
-        try: result.close()
-        except: pass
         parseSuccess = False
         warn = 'Failed to parse the result file.'
         print warn
@@ -28,12 +28,12 @@ Provided by Honeybee 0.0.65
     Args:
         _comfResultFileAddress: Any one of the result file addresses that comes out of the 'Honeybee_Microclimate Map Analysis' component or the 'Honeybee_Thermal Comfort Autonomy Analysis' component.
     Returns:
-        comfResultsMtx: A matrix of comfort data that can be plugged into the "Visualize Comfort Results" component.
+        comfResultsMtx: A matrix of comfort data that can be plugged into the "Visualize Comfort Results" component.  Note that for long analysis periods you can also connect the result file address directly to the 'Honeybee_Visualize Microclimate Map' component, which only reads the hours that it needs.
 """
 
 ghenv.Component.Name = "Honeybee_Read Microclimate Matrix"
 ghenv.Component.NickName = 'readMicroclimateMtx'
-ghenv.Component.Message = 'VER 0.0.65\nJAN_01_2020'
+ghenv.Component.Message = 'VER 0.0.65\nOCT_17_2026'
 ghenv.Component.IconDisplayMode = ghenv.Component.IconDisplayMode.application
 ghenv.Component.Category = "Honeybee"
 ghenv.Component.SubCategory = "10 | Energy | Energy"
@@ -53,10 +53,7 @@ if _comfResultFileAddress:
             if lineCount == 0: comfResultsMtx.append(line.split('\n')[0])
             else:
                 #Pull out the data.
-                hourData = []
-                for columnCount, column in enumerate(line.split(',')):
-                    hourData.append(float(column))
-                comfResultsMtx.append(hourData)
+                comfResultsMtx.append([float(column) for column in line.split(',')])
         result.close()
     except:
         try: result.close()
@@ -39,7 +39,7 @@ Provided by Honeybee 0.0.65
 """
 ghenv.Component.Name = "Honeybee_Read RAD Result"
 ghenv.Component.NickName = 'readRADResults'
-ghenv.Component.Message = 'VER 0.0.65\nJAN_01_2020'
+ghenv.Component.Message = 'VER 0.0.65\nOCT_17_2026'
 ghenv.Component.IconDisplayMode = ghenv.Component.IconDisplayMode.application
 ghenv.Component.Category = "Honeybee"
 ghenv.Component.SubCategory = "04 | Daylight | Daylight"
@@ -92,25 +92,30 @@ if _testPts and _resultFiles and _analysisType and _resultFiles[0]!=None and not
     analysisType = int(_analysisType.split(":")[0].strip()[0])
     
     resultValues = main(_resultFiles, analysisType)
+    if resultValues == -1: resultValues = None
     
-    if resultValues:
+    if resultValues and len(resultValues) < sum(numOfPts):
+        msg = "Number of results is less than the number of test points. Check the result files."
+        w = gh.GH_RuntimeMessageLevel.Warning
+        ghenv.Component.AddRuntimeMessage(w, msg)
+    elif resultValues:
         # re-branching the results
         values = DataTree[System.Object]()
         totalPtsCount = 0
-        resultValuesForFile = ""
+        resultValuesForFile = []
         
         for branchNum in range(numOfBranches):
             p = GH_Path(branchNum)
-            for ptCount in range(numOfPts[branchNum]):
-                resValue = "%.2f"%resultValues[totalPtsCount]
-                values.Add(resValue, p)
-                if writeToFile_ == True: resultValuesForFile += resValue + "\n"
-                totalPtsCount += 1
+            branchValues = ["%.2f"%resValue for resValue in \
+                            resultValues[totalPtsCount:totalPtsCount + numOfPts[branchNum]]]
+            values.AddRange(branchValues, p)
+            if writeToFile_ == True: resultValuesForFile.extend(branchValues)
+            totalPtsCount += numOfPts[branchNum]
         
         if writeToFile_ == True:
             resFileName = "_".join(".".join(_resultFiles[0].split(".")[:-1]).split("_")[:-1]) + "_result.txt"
             with open(resFileName, "w") as resFile: 
-                resFile.write(resultValuesForFile)
+                resFile.write("".join(resValue + "\n" for resValue in resultValuesForFile))
             print "Result file path: " + resFileName
         
         # add analysis type
@@ -39,6 +39,7 @@ Provided by Honeybee 0.0.65
         additionalRadFiles_: A list of fullpath to valid radiance files which will be added to the scene
         exportAirWalls_: Set to True if you want to export air walls as surfaces and False if you don't want air walls be exported.  The default is set to False.
         overwriteResults_: Set to False if you want the component create a copy of all the results. Default is True
+        chunkSize_: Optional number of test points in each chunk for grid-based and annual studies. By default the test points are split in one block for each CPU and a block that covers a complex part of the model can take much longer than the others. When a chunk size is set the points are split in smaller chunks and each CPU runs the next chunk as soon as it is done. The run time of each chunk is written to projectName_runTimes.csv in the study folder to help you tune the chunk size.
         
     Returns:
         readMe!: ...
@@ -54,11 +55,11 @@ Provided by Honeybee 0.0.65
 
 ghenv.Component.Name = "Honeybee_Run Daylight Simulation"
 ghenv.Component.NickName = 'runDaylightAnalysis'
-ghenv.Component.Message = 'VER 0.0.65\nJAN_01_2020'
+ghenv.Component.Message = 'VER 0.0.65\nOCT_17_2026'
 ghenv.Component.IconDisplayMode = ghenv.Component.IconDisplayMode.application
 ghenv.Component.Category = "Honeybee"
 ghenv.Component.SubCategory = "04 | Daylight | Daylight"
-#compatibleHBVersion = VER 0.0.56\nDEC_21_2015
+#compatibleHBVersion = VER 0.0.65\nOCT_17_2026
 #compatibleLBVersion = VER 0.0.59\nFEB_01_2015
 try: ghenv.Component.AdditionalHelpFromDocStrings = "1"
 except: pass
@@ -80,7 +81,7 @@ ghenv.Component.Params.Output[3].NickName = "results"
 ghenv.Component.Params.Output[3].Name = "results"
 results = []
 
-def main(north, originalHBObjects, analysisRecipe, runRad, numOfCPUs, workingDir, radFileName, meshParameters, waitingTime, additionalRadFiles, overwriteResults, exportAirWalls):
+def main(north, originalHBObjects, analysisRecipe, runRad, numOfCPUs, workingDir, radFileName, meshParameters, waitingTime, additionalRadFiles, overwriteResults, exportAirWalls, chunkSize):
     # import the classes
     w = gh.GH_RuntimeMessageLevel.Warning
     
@@ -194,10 +195,12 @@ def main(north, originalHBObjects, analysisRecipe, runRad, numOfCPUs, workingDir
     ######################## GENERATE POINT FILES #######################
     # test points should be generated if the study is grid based
     # except image-based simulation
-    testPtsEachCPU, lenOfPts = hb_writeRAD.writeTestPtFile(subWorkingDir, radFileName, numOfCPUs, analysisRecipe)
+    numOfWorkers = numOfCPUs
+    testPtsEachCPU, lenOfPts = hb_writeRAD.writeTestPtFile(subWorkingDir, radFileName, numOfCPUs, analysisRecipe, chunkSize)
     
     if len(testPtsEachCPU)!=0: # make sure it is a grid based analysis
-        numOfCPUs = len(testPtsEachCPU) #in case number of CPUs are more than number of test points
+        numOfCPUs = len(testPtsEachCPU) #in case number of CPUs are more than number of test points or points are chunked
+        numOfWorkers = min(numOfWorkers, numOfCPUs)
     
     ######################## WRITE BATCH FILES #######################
     # if analysis type is annual this function will write hea files too
@@ -208,8 +211,12 @@ def main(north, originalHBObjects, analysisRecipe, runRad, numOfCPUs, workingDir
                             additionalRadFiles)
     
     if runRad:
-        hb_writeRAD.runBatchFiles(initBatchFileName, batchFilesName, \
-                                  fileNames, pcompBatchFile, waitingTime, runRad > 1)
+        jobs = hb_writeRAD.runBatchFiles(initBatchFileName, batchFilesName, \
+                                  fileNames, pcompBatchFile, waitingTime, runRad > 1, numOfWorkers)
+        
+        if chunkSize and len(testPtsEachCPU)!=0:
+            print "Run time of each chunk is written to " + \
+                  hb_writeRAD.writeRunTimes(subWorkingDir, radFileName, jobs, lenOfPts)
         
         results = hb_writeRAD.collectResults(subWorkingDir, radFileName, \
                                 numOfCPUs, analysisRecipe, expectedResultFiles)
@@ -248,11 +255,12 @@ if _writeRad == True and _analysisRecipe!=None and ((len(_HBObjects)!=0 and _HBO
               "\nHoneybee set the number of CPUs to " + str(ncpus) + ".\n"
         numOfCPUs = ncpus
         
-    
+    try: chunkSize = max(int(chunkSize_), 0)
+    except: chunkSize = 0
     
     result = main(north_, _HBObjects, _analysisRecipe, runRad_, numOfCPUs, \
                   _workingDir_, _radFileName_, meshSettings_, waitingTime, \
-                  additionalRadFiles_, overwriteResults_, exportAirWalls_)
+                  additionalRadFiles_, overwriteResults_, exportAirWalls_, chunkSize)
     
     if result!= -1:
         
@@ -305,15 +313,17 @@ if _writeRad == True and _analysisRecipe!=None and ((len(_HBObjects)!=0 and _HBO
             for branchNum in range(numOfBranches):
                 numOfPts.append(len(testPts.Branch(branchNum)))
             
-            exec(resultsOutputName + "= DataTree[System.Object]()")
+            resultsTree = DataTree[System.Object]()
+            exec(resultsOutputName + "= resultsTree")
             totalPtsCount = 0
             try:
+                if len(values) < sum(numOfPts):
+                    raise ValueError("Number of results is less than the number of test points.")
                 for branchNum in range(numOfBranches):
                     p = GH_Path(branchNum)
-                    for ptCount in range(numOfPts[branchNum]):
-                        resValue = "%.2f"%values[totalPtsCount]
-                        exec(resultsOutputName + ".Add(resValue, p)")
-                        totalPtsCount += 1
+                    resultsTree.AddRange(["%.2f"%resValue for resValue in \
+                                          values[totalPtsCount:totalPtsCount + numOfPts[branchNum]]], p)
+                    totalPtsCount += numOfPts[branchNum]
                 
             except:
                 # Failed to load the results - check the error log
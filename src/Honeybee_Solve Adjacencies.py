@@ -40,7 +40,7 @@ Provided by Honeybee 0.0.65
 """
 ghenv.Component.Name = "Honeybee_Solve Adjacencies"
 ghenv.Component.NickName = 'solveAdjc'
-ghenv.Component.Message = 'VER 0.0.65\nFEB_06_2020'
+ghenv.Component.Message = 'VER 0.0.65\nOCT_17_2026'
 ghenv.Component.IconDisplayMode = ghenv.Component.IconDisplayMode.application
 ghenv.Component.Category = 'HB-Legacy'
 ghenv.Component.SubCategory = "00 | Honeybee"
@@ -54,6 +54,7 @@ import Rhino as rc
 import scriptcontext as sc
 import Grasshopper.Kernel as gh
 import uuid
+import math
 
 def shootIt(rayList, geometry, tol = 0.01, bounce =1):
    # shoot a list of rays from surface to geometry
@@ -179,6 +180,67 @@ def updateAdj(surface1, surface2, altConstruction, altBC, altWinConstr, tol):
                           '\t-> is adjacent to <-\t' + childSurface2.BCObject.name + '.'
         
 
+class SurfaceGrid(object):
+    """Bin the surfaces of the zones in a grid based on their bounding boxes."""
+    
+    def __init__(self, HBZoneObjects, tol):
+        self.tol = tol
+        self.surfaces = []
+        self.boxes = []
+        for zone in HBZoneObjects:
+            for surface in zone.surfaces:
+                self.surfaces.append((zone, surface))
+                self.boxes.append(surface.geometry.GetBoundingBox(True))
+        
+        # use the median size of the surfaces as the size of the cells
+        sizes = sorted(max(box.Max.X - box.Min.X, box.Max.Y - box.Min.Y, box.Max.Z - box.Min.Z) for box in self.boxes)
+        if sizes: self.cellSize = max(sizes[len(sizes) // 2], 10 * tol)
+        else: self.cellSize = 1
+        
+        self.cells = {}
+        for srfIndex, box in enumerate(self.boxes):
+            for cell in self.getCells(box.Min, box.Max):
+                self.cells.setdefault(cell, []).append(srfIndex)
+    
+    def getCells(self, minPt, maxPt):
+        cellRanges = []
+        for minValue, maxValue in ((minPt.X, maxPt.X), (minPt.Y, maxPt.Y), (minPt.Z, maxPt.Z)):
+            cellRanges.append(range(int(math.floor((minValue - self.tol) / self.cellSize)), \
+                                    int(math.floor((maxValue + self.tol) / self.cellSize)) + 1))
+        return [(x, y, z) for x in cellRanges[0] for y in cellRanges[1] for z in cellRanges[2]]
+    
+    def neighbours(self, points):
+        """Return (zone, surface) for surfaces with a bounding box within tolerance of the points in the original order."""
+        box = rc.Geometry.BoundingBox(points)
+        srfIndices = set()
+        for cell in self.getCells(box.Min, box.Max):
+            srfIndices.update(self.cells.get(cell, []))
+        
+        neighbourSrfs = []
+        for srfIndex in sorted(srfIndices):
+            srfBox = self.boxes[srfIndex]
+            if srfBox.Min.X - self.tol > box.Max.X or srfBox.Max.X + self.tol < box.Min.X: continue
+            if srfBox.Min.Y - self.tol > box.Max.Y or srfBox.Max.Y + self.tol < box.Min.Y: continue
+            if srfBox.Min.Z - self.tol > box.Max.Z or srfBox.Max.Z + self.tol < box.Min.Z: continue
+            neighbourSrfs.append(self.surfaces[srfIndex])
+        return neighbourSrfs
+
+def isFacing(srf, surface):
+    # extra check for normal direction
+    normalAngle = abs(rc.Geometry.Vector3d.VectorAngle(surface.normalVector, srf.normalVector))
+    revNormalAngle = abs(rc.Geometry.Vector3d.VectorAngle(surface.normalVector, -srf.normalVector))
+    return normalAngle==0  or revNormalAngle <= sc.doc.ModelAngleToleranceRadians
+
+def isCoplanar(surface, testPts, tol):
+    # a planar surface can only be within tolerance of a point that is within tolerance of its plane
+    if not getattr(surface, 'isPlanar', False): return True
+    normal = rc.Geometry.Vector3d(surface.normalVector)
+    normal.Unitize()
+    maxDist = tol + sc.doc.ModelAbsoluteTolerance
+    for pt in testPts:
+        if abs((pt - surface.cenPt) * normal) <= maxDist: return True
+    return False
+
 def notTheSameZone(targetZone, testZone):
     if hasattr(testZone, 'cenPt')and hasattr(targetZone, 'cenPt'):
         return targetZone.name != testZone.name and targetZone.cenPt.DistanceTo(testZone.cenPt) > sc.doc.ModelAbsoluteTolerance
@@ -235,6 +297,9 @@ def main(HBZones, altConstruction, altWinConstr, altBC, tol, remCurrent):
                     srf.setBC('OUTDOORS')
                     srf.setBCObjectToOutdoors()
     
+    # bin the surfaces of all zones so that each surface is only tested against its neighbours
+    srfGrid = SurfaceGrid(HBZoneObjects, tol)
+    
     # solve it zone by zone
     for testZone in HBZoneObjects:
         # mesh each surface and test if it will be adjacent to any surface
@@ -260,33 +325,33 @@ def main(HBZones, altConstruction, altWinConstr, altBC, tol, remCurrent):
                     
                     raysDict[meshSrfCen] = rc.Geometry.Ray3d(meshSrfCen, srfNormal)
                 
-                for targetZone in HBZoneObjects:
-                    if notTheSameZone(targetZone, testZone):
-                        # check ray intersection to see if this zone is next to the surface
-                        if shootIt(raysDict.values(), [targetZone.geometry], tol + sc.doc.ModelAbsoluteTolerance):
-                            for surface in targetZone.surfaces:
-                                # check if z value of center points matches
-                                #print abs(surface.cenPt.Z - srf.cenPt.Z)
-                                #if abs(surface.cenPt.Z - srf.cenPt.Z) < tol:
-                                # check distance with the nearest point on each surface
-                                for pt in raysDict.keys():
-                                    if surface.geometry.ClosestPoint(pt).DistanceTo(pt) <= tol:
-                                        # extra check for normal direction
-                                        normalAngle = abs(rc.Geometry.Vector3d.VectorAngle(surface.normalVector, srf.normalVector))
-                                        revNormalAngle = abs(rc.Geometry.Vector3d.VectorAngle(surface.normalVector, -srf.normalVector))
-                                        #print normalAngle
-                                        #print revNormalAngle
-                                        if normalAngle==0  or revNormalAngle <= sc.doc.ModelAngleToleranceRadians:
-                                            print 'Surface ' + srf.name + ' which is a ' + srf.srfType[srf.type] + \
-                                                  '\t-> is adjacent to <-\t' + surface.name + ' which is a ' + \
-                                                  surface.srfType[surface.type] + '.'
-                                            
-                                            updateAdj(srf, surface, altConstruction, altBC, altWinConstr, tol)                                        
-                                            if surface.type == 4:
-                                                flowRate = updateZoneMixing(surface, testZone, targetZone)
-                                                print "Air has been mixed between " + testZone.name + " and " + targetZone.name + " with a flow rate of " + str(flowRate) + " m3/s."
-                                            
-                                            break
+                testPts = raysDict.keys()
+                
+                # only keep the coplanar surfaces of other zones that face this surface
+                candidates = []
+                for targetZone, surface in srfGrid.neighbours(testPts):
+                    if not notTheSameZone(targetZone, testZone): continue
+                    if not isFacing(srf, surface) or not isCoplanar(surface, testPts, tol): continue
+                    if candidates and candidates[-1][0] is targetZone: candidates[-1][1].append(surface)
+                    else: candidates.append((targetZone, [surface]))
+                
+                for targetZone, surfaces in candidates:
+                    # check ray intersection to see if this zone is next to the surface
+                    if shootIt(raysDict.values(), [targetZone.geometry], tol + sc.doc.ModelAbsoluteTolerance):
+                        for surface in surfaces:
+                            # check distance with the nearest point on each surface
+                            for pt in testPts:
+                                if surface.geometry.ClosestPoint(pt).DistanceTo(pt) <= tol:
+                                    print 'Surface ' + srf.name + ' which is a ' + srf.srfType[srf.type] + \
+                                          '\t-> is adjacent to <-\t' + surface.name + ' which is a ' + \
+                                          surface.srfType[surface.type] + '.'
+                                    
+                                    updateAdj(srf, surface, altConstruction, altBC, altWinConstr, tol)
+                                    if surface.type == 4:
+                                        flowRate = updateZoneMixing(surface, testZone, targetZone)
+                                        print "Air has been mixed between " + testZone.name + " and " + targetZone.name + " with a flow rate of " + str(flowRate) + " m3/s."
+                                    
+                                    break
     
     # add zones to memory
     ModifiedHBZones  = hb_hive.addToHoneybeeHive(HBZoneObjects, ghenv.Component)
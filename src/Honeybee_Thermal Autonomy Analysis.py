@@ -64,11 +64,11 @@ Provided by Honeybee 0.0.65
 
 ghenv.Component.Name = "Honeybee_Thermal Autonomy Analysis"
 ghenv.Component.NickName = 'ThermalAutonomy'
-ghenv.Component.Message = 'VER 0.0.65\nJAN_01_2020'
+ghenv.Component.Message = 'VER 0.0.65\nOCT_17_2026'
 ghenv.Component.IconDisplayMode = ghenv.Component.IconDisplayMode.application
 ghenv.Component.Category = "Honeybee"
 ghenv.Component.SubCategory = "10 | Energy | Energy"
-#compatibleHBVersion = VER 0.0.56\nFEB_01_2015
+#compatibleHBVersion = VER 0.0.65\nOCT_17_2026
 #compatibleLBVersion = VER 0.0.59\nFEB_01_2015
 try: ghenv.Component.AdditionalHelpFromDocStrings = "6"
 except: pass
@@ -114,7 +114,7 @@ def recallHBZoneProperties(HOYs, occupancyThere):
     HBScheduleList = sc.sticky["honeybee_ScheduleLib"].keys()
     
     for zoneCount, HZone in enumerate(_HBZones):
-        zone = hb_hive.callFromHoneybeeHive([HZone])[0]
+        zone = hb_hive.callFromHoneybeeHive([HZone], True)[0]
         zoneNames.append(zone.name)
         values = []
         if occupancyThere == False:
@@ -128,7 +128,7 @@ def recallHBZoneProperties(HOYs, occupancyThere):
                     checkZones = False
                 else:
                     readSchedules = sc.sticky["honeybee_ReadSchedules"](zoneOccSched, 0)
-                    values  = readSchedules.getScheduleValues()
+                    values  = readSchedules.getHourlyValues()
             elif zoneOccSched.lower().endswith(".csv"):
                 # check if csv file exists.
                 if not os.path.isfile(zoneOccSched):
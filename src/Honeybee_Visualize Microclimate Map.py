@@ -27,7 +27,7 @@ Use this component to produce a colored mesh from a comfResultsMtx.
 Provided by Honeybee 0.0.65
     
     Args:
-        _comfResultsMtx: Any matrix output from the 'Honeybee_Microclimate Map Analysis' component, the 'Honeybee_Thermal Comfort Autonomy Analysis' component, or the 'Honeybee_Read Microclimate Matrix' component.
+        _comfResultsMtx: Any matrix output from the 'Honeybee_Microclimate Map Analysis' component, the 'Honeybee_Thermal Comfort Autonomy Analysis' component, or the 'Honeybee_Read Microclimate Matrix' component.  You can also connect a result file address from the 'Honeybee_Microclimate Map Analysis' component and only the hours that are needed will be read from the file.
         _viewFactorMesh: The list of view factor meshes that comes out of the  "Honeybee_Indoor View Factor Calculator".  These will be colored with result data.
         ===========: ...
         analysisPeriod_: Note that that connecting a value to 'stepOfSimulation_' will override this input.
@@ -49,7 +49,7 @@ Provided by Honeybee 0.0.65
 
 ghenv.Component.Name = "Honeybee_Visualize Microclimate Map"
 ghenv.Component.NickName = 'VisualizeMicroclimate'
-ghenv.Component.Message = 'VER 0.0.65\nJAN_01_2020'
+ghenv.Component.Message = 'VER 0.0.65\nOCT_17_2026'
 ghenv.Component.IconDisplayMode = ghenv.Component.IconDisplayMode.application
 ghenv.Component.Category = "Honeybee"
 ghenv.Component.SubCategory = "10 | Energy | Energy"
@@ -68,6 +68,7 @@ from Grasshopper.Kernel.Data import GH_Path
 import Rhino as rc
 import scriptcontext as sc
 import math
+import os
 
 
 w = gh.GH_RuntimeMessageLevel.Warning
@@ -75,7 +76,7 @@ w = gh.GH_RuntimeMessageLevel.Warning
 
 inputsDict = {
     
-0: ["_comfResultsMtx", "Any matrix output from the 'Honeybee_Microclimate Map Analysis' component, the 'Honeybee_Thermal Comfort Autonomy Analysis' component, or the 'Honeybee_Read Microclimate Matrix' component."],
+0: ["_comfResultsMtx", "Any matrix output from the 'Honeybee_Microclimate Map Analysis' component, the 'Honeybee_Thermal Comfort Autonomy Analysis' component, or the 'Honeybee_Read Microclimate Matrix' component.  You can also connect a result file address from the 'Honeybee_Microclimate Map Analysis' component and only the hours that are needed will be read from the file."],
 1: ["_viewFactorMesh", "The list of view factor meshes that comes out of the  'Honeybee_Indoor View Factor Calculator'.  These will be colored with result data."],
 2: ["===========", "..."],
 3: ["analysisPeriod_", "Optional analysisPeriod_ to take a slice out of the data stream.  Note that that connecting a value to 'stepOfSimulation_' will override this input."],
@@ -178,6 +179,14 @@ def restoreInputOutput():
         ghenv.Component.Params.Input[input].Description = inputsDict[input][1]
 
 
+def selectRows(comfResultsMtx, rowIndexes):
+    #Return the rows of the matrix for the indexes that are inside the matrix.
+    #The rows of a result file are read with a single file handle.
+    rowIndexes = [count for count in sorted(set(rowIndexes)) if 0 <= count < len(comfResultsMtx)]
+    if hasattr(comfResultsMtx, "getRows"): return comfResultsMtx.getRows(rowIndexes)
+    return [comfResultsMtx[count] for count in rowIndexes]
+
+
 def computeComfValues(comfResultsMtx, analysisP, comfMtxAnalysisP, stepOfSimulation, annualData, simStepPossible, occDataType, percentOrTotal, totalAble, lb_preparation):
     #Create a list to be filled with values of comfort.
     comfortFactorVals = []
@@ -189,9 +198,7 @@ def computeComfValues(comfResultsMtx, analysisP, comfMtxAnalysisP, stepOfSimulat
         HOYS, months, days = lb_preparation.getHOYsBasedOnPeriod(analysisP, 1)
         
         #Pick out just the hours that are in the analysis period.
-        newcomfResultsMtx = []
-        for lineCount, line in enumerate(comfResultsMtx):
-            if lineCount in HOYS: newcomfResultsMtx.append(line)
+        newcomfResultsMtx = selectRows(comfResultsMtx, HOYS)
         
         #Transpose the matrix
         newcomfResultsMtx2 = zip(*newcomfResultsMtx)
@@ -227,9 +234,7 @@ def computeComfValues(comfResultsMtx, analysisP, comfMtxAnalysisP, stepOfSimulat
         #Check to see if the hours of the requested analysis period are in the comfResultsMtx.
         periodsAlign = True
         for hour in HOYS:
-            if hour < 0: periodsAlign = False
-            try: comfResultsMtx[hour]
-            except: periodsAlign = False
+            if not 0 <= hour < len(comfResultsMtx): periodsAlign = False
         
         if periodsAlign == False:
             warning = 'The analysis period of the confResultsMtx and that which is plugged into this component do not align.'
@@ -238,10 +243,7 @@ def computeComfValues(comfResultsMtx, analysisP, comfMtxAnalysisP, stepOfSimulat
         else:
             
             #Pick out just the hours that are in the analysis period.
-            newcomfResultsMtx = []
-            for lineCount, line in enumerate(comfResultsMtx):
-                if lineCount in HOYS:
-                    newcomfResultsMtx.append(line)
+            newcomfResultsMtx = selectRows(comfResultsMtx, HOYS)
             
             #Transpose the matrix
             newcomfResultsMtx2 = zip(*newcomfResultsMtx)
@@ -471,6 +473,15 @@ else:
     w = gh.GH_RuntimeMessageLevel.Warning
     ghenv.Component.AddRuntimeMessage(w, "You should let the Ladybug fly first...")
 
+#A result file of the 'Honeybee_Microclimate Map Analysis' can be connected in place of the matrix.
+#In this case only the hours that are needed are read from the file.
+if len(_comfResultsMtx) == 1 and isinstance(_comfResultsMtx[0], str) and os.path.isfile(_comfResultsMtx[0]):
+    if sc.sticky.has_key('honeybee_release'):
+        _comfResultsMtx = sc.sticky["honeybee_MicroclimateMatrix"](_comfResultsMtx[0])
+    else:
+        print "You should first let Honeybee fly to read a result file..."
+        ghenv.Component.AddRuntimeMessage(w, "You should first let Honeybee fly to read a result file...")
+
 checkData = False
 annualData = True
 simStepPossible = True
@@ -57,11 +57,11 @@ from shutil import copyfile
 
 ghenv.Component.Name = 'Honeybee_Write THERM File'
 ghenv.Component.NickName = 'writeTHERM'
-ghenv.Component.Message = 'VER 0.0.65\nJAN_01_2020'
+ghenv.Component.Message = 'VER 0.0.65\nOCT_17_2026'
 ghenv.Component.IconDisplayMode = ghenv.Component.IconDisplayMode.application
 ghenv.Component.Category = "Honeybee"
 ghenv.Component.SubCategory = "11 | THERM"
-#compatibleHBVersion = VER 0.0.56\nMAY_12_2017
+#compatibleHBVersion = VER 0.0.65\nOCT_17_2026
 #compatibleLBVersion = VER 0.0.59\nFEB_01_2015
 try: ghenv.Component.AdditionalHelpFromDocStrings = "1"
 except: pass
@@ -266,6 +266,7 @@ def checkTheInputs():
             if abs(polyNormalRev.X - basePlaneNormal.X)< tol and abs(polyNormalRev.Y - basePlaneNormal.Y) < tol and abs(polyNormalRev.Z - basePlaneNormal.Z) < tol:
                 polygon.normalVector = polyNormalRev
                 polygon.plane.Flip()
+                polygon.geometry = polygon.geometry.Duplicate()
                 polygon.geometry.Flip()
             else:
                 checkData = False
@@ -532,7 +533,10 @@ def runTHERMSim(workingDir, xmlFile, errorLogFile, batchFileAddress, thermDir, t
     
     # Run the batch file.
     print "\nStarting simulation..."
-    os.system(batchFileAddress)
+    scheduler = sc.sticky["honeybee_JobScheduler"]()
+    job = scheduler.addJob(batchFileAddress, os.path.basename(batchFileAddress))
+    scheduler.run()
+    print "THERM ran in %.1f seconds with exit code %s."%(job.duration or 0, job.returnCode)
     
     return errorLogFile
 
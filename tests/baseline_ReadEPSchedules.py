@@ -0,0 +1,295 @@
+"""
+ReadEPSchedules from before the schedules were compiled by hb_ScheduleCompiler.
+
+This is only used by the tests as the reference for the values of the compiled schedules.
+The class is the same as the original except for a print of all the values of compact schedules.
+"""
+
+class ReadEPSchedules(object):
+    
+    def __init__(self, schName, startDayOfTheWeek):
+        self.hb_EPScheduleAUX = sc.sticky["honeybee_EPScheduleAUX"]()
+        self.hb_EPObjectsAUX = sc.sticky["honeybee_EPObjectsAUX"]()
+        self.lb_preparation = sc.sticky["ladybug_Preparation"]()
+        self.schName = schName
+        self.startDayOfTheWeek = startDayOfTheWeek
+        self.count = 0
+        self.startHOY = 1
+        self.endHOY = 24
+        self.unit = "unknown"
+        self.comapctKeywords = ['Weekdays', 'Weekends', 'Alldays', 'AllOtherDays', 'Sunday', 'Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday']
+    
+    def getScheduleTypeLimitsData(self, schName):
+        
+        if schName == None: schName = self.schName
+            
+        schedule, comments = self.hb_EPScheduleAUX.getScheduleTypeLimitsDataByName(schName.upper(), ghenv.Component)
+        try:
+            lowerLimit, upperLimit, numericType, unitType = schedule[1:]
+        except:
+            lowerLimit, upperLimit, numericType = schedule[1:]
+            unitType = "unknown"
+        
+        self.unit = unitType
+        if self.unit == "unknown":
+            self.unit = numericType
+        
+        return lowerLimit, upperLimit, numericType, unitType
+    
+    
+    def getDayEPScheduleValues(self, schName = None):
+        
+        if schName == None:
+            schName = self.schName
+            
+        values, comments = self.hb_EPScheduleAUX.getScheduleDataByName(schName.upper(), ghenv.Component)
+        typeLimitName = values[1]
+        lowerLimit, upperLimit, numericType, unitType = \
+                self.getScheduleTypeLimitsData(typeLimitName)
+                
+        numberOfDaySch = int((len(values) - 3) /2)
+        
+        hourlyValues = range(24)
+        startHour = 0
+        for i in range(numberOfDaySch):
+            value = float(values[2 * i + 4])
+            untilTime = map(int, values[2 * i + 3].split(":"))
+            endHour = int(untilTime[0] +  untilTime[1]/60)
+            for hour in range(startHour, endHour):
+                hourlyValues[hour] = value
+            
+            startHour = endHour
+        
+        if numericType.strip().lower() == "district":
+            hourlyValues = map(int, hourlyValues)
+            
+        return hourlyValues
+    
+    
+    def getWeeklyEPScheduleValues(self, schName = None):
+        """
+        Schedule:Week:Daily
+        ['Schedule Type', 'Sunday Schedule:Day Name', 'Monday Schedule:Day Name',
+        'Tuesday Schedule:Day Name', 'Wednesday Schedule:Day Name', 'Thursday Schedule:Day Name',
+        'Friday Schedule:Day Name', 'Saturday Schedule:Day Name', 'Holiday Schedule:Day Name',
+        'SummerDesignDay Schedule:Day Name', 'WinterDesignDay Schedule:Day Name',
+        'CustomDay1 Schedule:Day Name', 'CustomDay2 Schedule:Day Name']
+        """
+        
+        if schName == None:
+            schName = self.schName
+            
+        values, comments = self.hb_EPScheduleAUX.getScheduleDataByName(schName.upper(), ghenv.Component)
+        
+        if self.count == 1:
+            # set the last date of the schedule to one week
+            self.endHOY = 24 * 7
+        
+        sundaySchedule = self.getScheduleValues(values[1])
+        mondaySchedule = self.getScheduleValues(values[2])
+        tuesdaySchedule = self.getScheduleValues(values[3])
+        wednesdaySchedule = self.getScheduleValues(values[4])
+        thursdaySchedule = self.getScheduleValues(values[5])
+        fridaySchedule = self.getScheduleValues(values[6])
+        saturdaySchedule = self.getScheduleValues(values[7])
+        
+        holidaySchedule = self.getScheduleValues(values[8])
+        summerDesignDaySchedule = self.getScheduleValues(values[9])
+        winterDesignDaySchedule = self.getScheduleValues(values[10])
+        customDay1Schedule = self.getScheduleValues(values[11])
+        customDay2Schedule = self.getScheduleValues(values[12])
+        
+        hourlyValues = [sundaySchedule, mondaySchedule, tuesdaySchedule, \
+                       wednesdaySchedule, thursdaySchedule, fridaySchedule, \
+                       saturdaySchedule]
+        
+        hourlyValues = hourlyValues[self.startDayOfTheWeek:] + \
+                       hourlyValues[:self.startDayOfTheWeek]
+        
+        return hourlyValues
+    
+    
+    def getConstantEPScheduleValues(self, schName):
+        """
+        'Schedule:Constant'
+        ['Schedule Type', 'Schedule Type Limits Name', 'Hourly Value']
+        """
+        
+        if schName == None:
+            schName = self.schName
+            
+        values, comments = self.hb_EPScheduleAUX.getScheduleDataByName(schName.upper(), ghenv.Component)
+        typeLimitName = values[1]
+        lowerLimit, upperLimit, numericType, unitType = \
+                self.getScheduleTypeLimitsData(typeLimitName)
+        
+        hourlyValues = [float(values[2])]
+        
+        if numericType.strip().lower() == "district":
+            hourlyValues = map(int, hourlyValues)
+        return scheduleConstant
+    
+    
+    def getCompactEPScheduleValues(self, schName):
+        
+        if schName == None: schName = self.schName
+        
+        values, comments = self.hb_EPScheduleAUX.getScheduleDataByName(schName.upper(), ghenv.Component)
+        typeLimitName = values[1]
+        lowerLimit, upperLimit, numericType, unitType = \
+                self.getScheduleTypeLimitsData(typeLimitName)
+        
+        #Separate out the different periods.
+        totalValues = []
+        periodValues = []
+        headerDone = False
+        for val in values:
+            newPeriod = False
+            for word in self.comapctKeywords:
+                if word in val: newPeriod = True
+            if newPeriod == True:
+                if headerDone == True:
+                    totalValues.append(periodValues)
+                periodValues = [val]
+                headerDone = True
+            elif headerDone == True:
+                periodValues.append(val)
+        totalValues.append(periodValues)
+        
+        #For each day period, construct a day schedule.
+        dayType = []
+        dayValues = []
+        for dayVals in totalValues:
+            dayType.append(dayVals[0].title().split('For: ')[-1])
+            numberOfDaySch = int((len(dayVals) - 1) /2)
+            
+            hourlyValues = range(24)
+            startHour = 0
+            for i in range(numberOfDaySch):
+                value = float(dayVals[2 * i + 2])
+                untilTime = map(int, dayVals[2 * i + 1].split(":")[1:])
+                endHour = int(untilTime[0] +  untilTime[1]/60)
+                for hour in range(startHour, endHour):
+                    hourlyValues[hour] = value
+                
+                startHour = endHour
+            dayValues.append(hourlyValues)
+        
+        #Construct a week schedule from the day schedules.
+        #Map the dayTypes to the days of the week.
+        ['Weekdays', 'Weekends', 'Alldays', 'AllOtherDays', 'Sunday', 'Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday']
+        weekVals = [-1, -1, -1, -1, -1, -1, -1]
+        for typeCount, type in enumerate(dayType):
+            if type == 'Alldays':
+                for count, val in enumerate(weekVals):
+                    weekVals[count] = typeCount
+            elif type == 'Weekdays':
+                for count, val in enumerate(weekVals):
+                    if count < 6 and count != 0: weekVals[count] = typeCount
+            elif type == 'Weekends':
+                weekVals[0] = typeCount
+                weekVals[-1] = typeCount
+            elif type == 'Sunday': weekVals[0] = typeCount
+            elif type == 'Monday': weekVals[1] = typeCount
+            elif type == 'Tuesday': weekVals[2] = typeCount
+            elif type == 'Wednesday': weekVals[3] = typeCount
+            elif type == 'Thursday': weekVals[4] = typeCount
+            elif type == 'Friday': weekVals[5] = typeCount
+            elif type == 'Saturday': weekVals[6] = typeCount
+            elif type == 'Allotherdays':
+                for count, val in enumerate(weekVals):
+                    if val == -1: weekVals[count] = typeCount
+        
+        #Turn the week schedule into a year schedule.
+        hourlyValues = []
+        dayVals = []
+        dayofWeek = -1
+        for day in range(365):
+            if dayofWeek == 6: dayofWeek = 0
+            else: dayofWeek += 1
+            dayVals.append(weekVals[dayofWeek])
+        for day in dayVals:
+            hourlyValues.extend(dayValues[day])
+        
+        return hourlyValues
+    
+    
+    def getYearlyEPScheduleValues(self, schName = None):
+        # place holder for 365 days
+        hourlyValues = range(365)
+        
+        # update last day of schedule
+        self.endHOY = 8760
+        
+        if schName == None:
+            schName = self.schName
+        
+        values, comments = self.hb_EPScheduleAUX.getScheduleDataByName(schName.upper(), ghenv.Component)
+        
+        # generate weekly schedules
+        numOfWeeklySchedules = int((len(values)-2)/5)
+        
+        for i in range(numOfWeeklySchedules):
+            weekDayScheduleName = values[5 * i + 2]
+            
+            startDay = int(self.lb_preparation.getJD(int(values[5 * i + 3]), int(values[5 * i + 4])))
+            endDay = int(self.lb_preparation.getJD(int(values[5 * i + 5]), int(values[5 * i + 6])))
+            
+            # 7 list for 7 days of the week
+            hourlyValuesForTheWeek = self.getScheduleValues(weekDayScheduleName)
+            
+            for day in range(startDay-1, endDay):
+                hourlyValues[day] = hourlyValuesForTheWeek[day%7]
+            
+        return hourlyValues
+    
+    
+    def getScheduleValues(self, schName = None):
+        if schName == None:
+            schName = self.schName
+        if self.hb_EPObjectsAUX.isSchedule(schName):
+            scheduleValues, comments = self.hb_EPScheduleAUX.getScheduleDataByName(schName.upper(), ghenv.Component)
+            
+            scheduleType = scheduleValues[0].lower()
+            if self.count == 0:
+                self.schType = scheduleType
+            
+            self.count += 1
+            
+            if scheduleType == "schedule:year":
+                hourlyValues = self.getYearlyEPScheduleValues(schName)
+            elif scheduleType == "schedule:day:interval":
+                hourlyValues = self.getDayEPScheduleValues(schName)
+            elif scheduleType == "schedule:week:daily":
+                hourlyValues = self.getWeeklyEPScheduleValues(schName)
+            elif scheduleType == "schedule:constant":
+                hourlyValues = self.getConstantEPScheduleValues(schName)
+            elif scheduleType == "schedule:compact":
+                hourlyValues = self.getCompactEPScheduleValues(schName)
+            else:
+                print "Honeybee doesn't support " + scheduleType + " currently." + \
+                      "Email us the type and we will try to add it to Honeybee."
+                      
+                hourlyValues = []
+            
+            return hourlyValues
+    
+    def getHolidaySchedValues(self, schName = None):
+        hourlyValues = []
+        if schName == None:
+            schName = self.schName
+        if self.hb_EPObjectsAUX.isSchedule(schName):
+            values, comments = self.hb_EPScheduleAUX.getScheduleDataByName(schName.upper(), ghenv.Component)
+            scheduleType = values[0].lower()
+            if scheduleType == "schedule:year":
+                # generate weekly schedules
+                numOfWeeklySchedules = int((len(values)-2)/5)
+                for i in range(numOfWeeklySchedules):
+                    weekDayScheduleName = values[5 * i + 2]
+                    startDay = int(self.lb_preparation.getJD(int(values[5 * i + 3]), int(values[5 * i + 4])))
+                    endDay = int(self.lb_preparation.getJD(int(values[5 * i + 5]), int(values[5 * i + 6])))
+                    weekValues, comments = self.hb_EPScheduleAUX.getScheduleDataByName(weekDayScheduleName.upper(), ghenv.Component)
+                    holidaySchedule = self.getScheduleValues(weekValues[8])
+                    hourlyValues.append([startDay,endDay,holidaySchedule])
+        
+        return hourlyValues
@@ -0,0 +1,32 @@
+"""
+Load classes from the Honeybee source files without Rhino and Grasshopper.
+
+The components run inside Grasshopper so they can't be imported. The classes
+that only use the python standard library are cut out of the source file and
+executed in a namespace with the modules that they need.
+"""
+import ast
+import os
+
+srcFolder = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+
+def loadClasses(names, namespace = None, fileName = "Honeybee_Honeybee.py"):
+    """Return a namespace with the top level classes and functions in names."""
+    if namespace is None: namespace = {}
+    with open(os.path.join(srcFolder, fileName), "r") as sourceFile:
+        source = sourceFile.read()
+    
+    lines = source.splitlines(True)
+    body = ast.parse(source).body
+    found = []
+    for count, node in enumerate(body):
+        if not isinstance(node, (ast.ClassDef, ast.FunctionDef)) or node.name not in names: continue
+        if count + 1 < len(body): end = body[count + 1].lineno - 1
+        else: end = len(lines)
+        exec "".join(lines[node.lineno - 1:end]) in namespace
+        found.append(node.name)
+    
+    missing = set(names) - set(found)
+    if missing: raise NameError("%s not found in %s"%(", ".join(sorted(missing)), fileName))
+    return namespace
@@ -0,0 +1,129 @@
+"""Tests for hb_AnnualDaylightMetrics and hb_ShadingStateIllMatrix against the metric definitions."""
+import array
+import operator
+import os
+import random
+import shutil
+import tempfile
+import unittest
+
+from hbsource import loadClasses
+
+class SerialParallel(object):
+    """Runs Parallel.ForEach one item after the other."""
+    @staticmethod
+    def ForEach(items, function):
+        for item in items: function(item)
+
+
+class Tasks(object):
+    Parallel = SerialParallel
+
+hb = loadClasses(["hb_IllFile", "hb_ShadingStateIllMatrix", "hb_AnnualDaylightMetrics"], \
+                 {"os": os, "array": array, "operator": operator, "struct": __import__("struct"), "tasks": Tasks})
+hb_ShadingStateIllMatrix = hb["hb_ShadingStateIllMatrix"]
+hb_AnnualDaylightMetrics = hb["hb_AnnualDaylightMetrics"]
+
+
+class RowMatrix(object):
+    def __init__(self, rows):
+        self.rows = rows
+        self.pointCount = len(rows[0])
+    
+    def iterHours(self):
+        return iter(self.rows)
+
+
+def referenceMetrics(rows, occupancy, threshold):
+    """DA, UDI < 100, UDI 100-2000, UDI > 2000 and CDA with a loop for each value."""
+    occupiedRows = [row for row, occ in zip(rows, occupancy) if occ]
+    hours = float(len(occupiedRows))
+    results = [[], [], [], [], []]
+    for point in range(len(rows[0])):
+        values = [row[point] for row in occupiedRows]
+        results[0].append(100 * sum(1 for value in values if value >= threshold) / hours)
+        results[1].append(100 * sum(1 for value in values if value < 100) / hours)
+        results[2].append(100 * sum(1 for value in values if 100 <= value < 2000) / hours)
+        results[3].append(100 * sum(1 for value in values if value >= 2000) / hours)
+        results[4].append(100 * sum(min(float(value) / threshold, 1) for value in values) / hours)
+    return results
+
+
+class AnnualDaylightMetricsTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+    
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+    
+    def writeFile(self, fileName, content):
+        filePath = os.path.join(self.folder, fileName)
+        with open(filePath, "w") as outf:
+            outf.write(content)
+        return filePath
+    
+    def writeIll(self, fileName, rows):
+        return self.writeFile(fileName, "".join("1 1 %d.5 0 "%hour + " ".join("%.2f"%value for value in row) + "\n" \
+                                                for hour, row in enumerate(rows)))
+    
+    def test_metricsMatchDefinitions(self):
+        random.seed(1)
+        rows = [[random.choice([0, 50, 99.99, 100, 300, 1999.99, 2000, 5000, random.uniform(0, 3000)]) \
+                 for point in range(6)] for hour in range(48)]
+        occupancy = [random.choice([0, 1]) for hour in range(48)]
+        
+        # one chunk and points split into chunks for the workers
+        for workerCount in (1, 4):
+            metrics = hb_AnnualDaylightMetrics([100, 300, 2000], occupancy, continuousThresholds = [300])
+            metrics.calculate(RowMatrix(rows), workerCount)
+            results = [metrics.daylightAutonomy(300)] + list(metrics.usefulDaylightIlluminance(100, 2000)) + \
+                      [metrics.continuousDaylightAutonomy(300)]
+            
+            for values, expectedValues in zip(results, referenceMetrics(rows, occupancy, 300)):
+                self.assertEqual(len(values), 6)
+                for value, expectedValue in zip(values, expectedValues):
+                    self.assertAlmostEqual(value, expectedValue)
+            self.assertEqual(metrics.occupiedHours, sum(occupancy))
+    
+    def test_noOccupiedHours(self):
+        metrics = hb_AnnualDaylightMetrics([300], [0, 0], continuousThresholds = [300])
+        metrics.calculate(RowMatrix([[500.0], [500.0]]))
+        self.assertEqual(metrics.daylightAutonomy(300), [0.0])
+        self.assertEqual(metrics.continuousDaylightAutonomy(300), [0.0])
+        self.assertRaises(ValueError, metrics.continuousDaylightAutonomy, 500)
+        self.assertRaises(ValueError, hb_AnnualDaylightMetrics, [300], continuousThresholds = [0])
+    
+    def test_readOccupancyAndAnnualProfiles(self):
+        occFile = self.writeFile("occ.csv", "# Daysim occupancy file,,,\n# time_step 60,,\n" + \
+                                 "# month,day,time,occupancy (1=present/0=absent)\n" + \
+                                 "1,1,0.5,0\n1,1,1.5,1\n1,1,2.5,0.5\n")
+        self.assertEqual(hb_AnnualDaylightMetrics.readOccupancyFile(occFile), [0, 1, 1])
+        
+        profilesFile = self.writeFile("test_intgain.csv", "# Daysim annual profiles\n#\n#\n" + \
+                                      "month,day,time,occupancy,lighting group 1,blind group 1,blind group 2\n" + \
+                                      "1,1,0.5,0,0,0,0\n1,1,1.5,1,1,1,0\n1,1,2.5,1,0,0.5,1\n")
+        occupancy, shadingProfiles = hb_AnnualDaylightMetrics.readAnnualProfiles(profilesFile)
+        self.assertEqual(occupancy, [0, 1, 1])
+        self.assertEqual(shadingProfiles, [[0, 1, 0.5], [0, 0, 1]])
+    
+    def test_stateOfEachHourIsSelected(self):
+        base = [[100, 200], [100, 200], [100, 200], [100, 200]]
+        groupIState1 = [[11, 12]] * 4
+        groupIState2 = [[21, 22]] * 4
+        groupII = [[31, 32]] * 4
+        stateIllFiles = [[self.writeIll("base.ill", base)], \
+                         [self.writeIll("g1_1.ill", groupIState1), self.writeIll("g1_2.ill", groupIState2)], \
+                         [self.writeIll("g2_1.ill", groupII)]]
+        # no blind, group I state 1, group I state 2, group II over group I
+        shadingProfiles = [[0, 0.5, 1, 1], [0, 0, 0, 1]]
+        matrix = hb_ShadingStateIllMatrix(stateIllFiles, shadingProfiles)
+        
+        self.assertEqual(matrix.pointCount, 2)
+        self.assertEqual([list(values) for values in matrix.iterHours()], \
+                         [[100, 200], [11, 12], [21, 22], [31, 32]])
+        self.assertRaises(ValueError, hb_ShadingStateIllMatrix, stateIllFiles, shadingProfiles[:1])
+
+
+if __name__ == "__main__":
+    unittest.main()
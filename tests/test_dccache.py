@@ -0,0 +1,101 @@
+"""Tests for the keys of the Daysim daylight coefficient cache hb_DCCache."""
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+import time
+import unittest
+
+from hbsource import loadClasses
+
+hb = loadClasses(["replaceFile", "removeTempFiles", "hb_IDFObject", "hb_IDFTokenizer", "hb_EPResultCache", \
+                  "hb_DCCache"], {"os": os, "re": re, "json": json, "shutil": shutil, "time": time, "hashlib": hashlib})
+hb_DCCache = hb["hb_DCCache"]
+
+
+class DCCacheKeyTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        hb_DCCache.fileDigests.clear()
+        self.sceneFiles = [self.writeFile("materials.rad", "void plastic wall 0 0 5 0.5 0.5 0.5 0 0\n"), \
+                           self.writeFile("geometry.rad", "wall polygon floor 0 0 12 0 0 0 1 0 0 1 1 0 0 1 0\n")]
+        self.ptsFile = self.writeFile("room.pts", "0.5 0.5 0.8 0 0 1\n0.5 0.6 0.8 0 0 1\n")
+        self.stateFile = self.writeFile("blind_state1.rad", "void plastic blind 0 0 5 0.8 0.8 0.8 0 0\n")
+        self.settings = ["-ab 2 -ad 1000", "latitude 42.3", "north 0"]
+    
+    def tearDown(self):
+        hb_DCCache.fileDigests.clear()
+        shutil.rmtree(self.folder)
+    
+    def writeFile(self, fileName, content):
+        filePath = os.path.join(self.folder, fileName)
+        # a new modification time so the digest of the earlier content isn't reused
+        modifiedTime = os.path.getmtime(filePath) + 10 if os.path.isfile(filePath) else None
+        with open(filePath, "w") as outf:
+            outf.write(content)
+        if modifiedTime is not None: os.utime(filePath, (modifiedTime, modifiedTime))
+        return filePath
+    
+    def shadingStr(self, threshold = 50):
+        return "shading -1\n1 blind blind.dc\n%s room_blind_0.dc room_blind_0.ill\n%d\n"%(self.stateFile, threshold)
+    
+    def getKey(self, dynamicShadingStr = None, settings = None):
+        if dynamicShadingStr is None: dynamicShadingStr = self.shadingStr()
+        DCFiles = hb_DCCache.getDCFiles("room", dynamicShadingStr)
+        return hb_DCCache.getKey(self.sceneFiles, self.ptsFile, dynamicShadingStr, DCFiles, \
+                                 settings or self.settings)
+    
+    def test_sameInputsGiveSameKey(self):
+        key = self.getKey()
+        self.assertEqual(self.getKey(), key)
+        
+        # the key doesn't depend on the session digests
+        hb_DCCache.fileDigests.clear()
+        self.assertEqual(self.getKey(), key)
+    
+    def test_sameContentInAnotherFolder(self):
+        key = self.getKey()
+        otherFolder = os.path.join(self.folder, "copy")
+        os.makedirs(otherFolder)
+        sceneFiles = []
+        for filePath in self.sceneFiles:
+            shutil.copy(filePath, otherFolder)
+            sceneFiles.append(os.path.join(otherFolder, os.path.basename(filePath)))
+        self.sceneFiles = sceneFiles
+        self.assertEqual(self.getKey(), key)
+    
+    def test_sensorPointsChange(self):
+        key = self.getKey()
+        self.writeFile("room.pts", "0.5 0.5 0.8 0 0 1\n0.5 0.7 0.8 0 0 1\n")
+        self.assertNotEqual(self.getKey(), key)
+    
+    def test_shadingStateChange(self):
+        key = self.getKey()
+        self.writeFile("blind_state1.rad", "void plastic blind 0 0 5 0.2 0.2 0.2 0 0\n")
+        self.assertNotEqual(self.getKey(), key)
+    
+    def test_sceneChange(self):
+        key = self.getKey()
+        self.writeFile("geometry.rad", "wall polygon floor 0 0 12 0 0 0 2 0 0 2 2 0 0 2 0\n")
+        self.assertNotEqual(self.getKey(), key)
+    
+    def test_settingsChange(self):
+        key = self.getKey()
+        self.assertNotEqual(self.getKey(settings = ["-ab 3 -ad 1000", "latitude 42.3", "north 0"]), key)
+        self.assertNotEqual(self.getKey(settings = ["-ab 2 -ad 1000", "latitude 42.3", "north 90"]), key)
+        self.assertEqual(self.getKey(settings = [" -ab 2 -ad 1000 ", "latitude 42.3", "north 0"]), key)
+    
+    def test_shadingThresholdsDontChangeKey(self):
+        # thresholds of the shading control only change ds_illum
+        self.assertEqual(self.getKey(self.shadingStr(300)), self.getKey(self.shadingStr(50)))
+    
+    def test_DCFiles(self):
+        self.assertEqual(hb_DCCache.getDCFiles("room", self.shadingStr()), \
+                         {"project": "room_0.dc", "room_blind": "room_blind_0.dc"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+"""Tests for the eviction of the entries of hb_EPResultCache."""
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+import time
+import unittest
+
+from hbsource import loadClasses
+
+hb = loadClasses(["replaceFile", "removeTempFiles", "hb_IDFObject", "hb_IDFTokenizer", "hb_EPResultCache"], \
+    {"os": os, "re": re, "json": json, "shutil": shutil, "time": time, "hashlib": hashlib})
+hb_EPResultCache = hb["hb_EPResultCache"]
+
+
+class EPResultCacheTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.cacheFolder = os.path.join(self.folder, "cache")
+        hb_EPResultCache.pinnedKeys.clear()
+        self.clock = 1000.0
+    
+    def tearDown(self):
+        hb_EPResultCache.pinnedKeys.clear()
+        shutil.rmtree(self.folder)
+    
+    def addResults(self, resultCache, key, size = 100):
+        """Add a simulation with a csv file of size bytes to the cache."""
+        csvFilePath = os.path.join(self.folder, key + ".csv")
+        with open(csvFilePath, "w") as outf:
+            outf.write(size * "0")
+        resultFiles = resultCache.add(key, {".csv": csvFilePath})
+        # make the order of the entries independent of the resolution of the clock
+        if key in resultCache.index["entries"]:
+            self.clock += 1
+            resultCache.index["entries"][key]["lastUsed"] = self.clock
+        return resultFiles
+    
+    def test_leastRecentlyUsedIsEvicted(self):
+        resultCache = hb_EPResultCache(self.cacheFolder, maxSize = 250)
+        self.addResults(resultCache, "a")
+        self.addResults(resultCache, "b")
+        self.addResults(resultCache, "c")
+        self.assertEqual(sorted(resultCache.index["entries"]), ["b", "c"])
+        self.assertFalse(os.path.isdir(os.path.join(self.cacheFolder, "a")))
+    
+    def test_pinnedEntryIsNotEvicted(self):
+        resultCache = hb_EPResultCache(self.cacheFolder, maxSize = 250)
+        self.addResults(resultCache, "a")
+        resultFiles = resultCache.get("a", "component1")
+        self.addResults(resultCache, "b")
+        self.addResults(resultCache, "c")
+        
+        # the component still outputs the path of the csv file of a
+        self.assertTrue(os.path.isfile(resultFiles[".csv"]))
+        self.assertEqual(sorted(resultCache.index["entries"]), ["a", "c"])
+    
+    def test_cacheCanBeLargerThanMaxSizeWithPinnedEntries(self):
+        resultCache = hb_EPResultCache(self.cacheFolder, maxSize = 250)
+        self.addResults(resultCache, "a")
+        self.addResults(resultCache, "b")
+        resultCache.get("a", "component1")
+        resultCache.get("b", "component2")
+        
+        # the new entry is the only one that can be evicted
+        csvFilePath = os.path.join(self.folder, "c.csv")
+        self.assertEqual(self.addResults(resultCache, "c"), {".csv": csvFilePath})
+        self.assertEqual(sorted(resultCache.index["entries"]), ["a", "b"])
+    
+    def test_newResultsReleaseThePin(self):
+        resultCache = hb_EPResultCache(self.cacheFolder, maxSize = 250)
+        self.addResults(resultCache, "a")
+        self.addResults(resultCache, "b")
+        resultCache.get("a", "component1")
+        resultCache.get("b", "component1")
+        self.assertEqual(hb_EPResultCache.pinnedKeys, {"component1": "b"})
+        
+        # a miss releases the pin of the component since it outputs the new results
+        self.assertEqual(resultCache.get("c", "component1"), None)
+        self.assertEqual(hb_EPResultCache.pinnedKeys, {})
+    
+    def test_pinsAreSharedInTheSession(self):
+        resultCache = hb_EPResultCache(self.cacheFolder, maxSize = 250)
+        self.addResults(resultCache, "a")
+        resultCache.get("a", "component1")
+        
+        resultCache = hb_EPResultCache(self.cacheFolder, maxSize = 250)
+        self.addResults(resultCache, "b")
+        self.addResults(resultCache, "c")
+        self.assertTrue("a" in resultCache.index["entries"])
+    
+    def test_purgeRemovesPinnedEntries(self):
+        resultCache = hb_EPResultCache(self.cacheFolder)
+        self.addResults(resultCache, "a")
+        resultCache.get("a", "component1")
+        self.assertEqual(resultCache.purge(), 1)
+        self.assertEqual(resultCache.get("a"), None)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+"""Tests for the columnar cache of EnergyPlus result csv files in hb_EPResultStore."""
+import array
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from hbsource import loadClasses
+
+hb = loadClasses(["replaceFile", "removeTempFiles", "hb_EPResultHeader", "hb_EPResultStore"], \
+                 {"os": os, "json": json, "array": array})
+hb_EPResultStore = hb["hb_EPResultStore"]
+
+csvContent = """Date/Time,ZONE1:Zone Air Temperature [C](Hourly),ZONE1:Zone Mean Radiant Temperature [C](Hourly)
+ 01/01  01:00:00,20.5,19.0
+ 01/01  02:00:00,21.0,
+ 01/01  03:00:00,21.5,19.5
+"""
+
+
+class EPResultStoreTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.csvFilePath = os.path.join(self.folder, "eplusout.csv")
+        with open(self.csvFilePath, "w") as csvFile:
+            csvFile.write(csvContent)
+        hb_EPResultStore.openStores = {}
+    
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+    
+    def test_buildAndLoad(self):
+        store = hb_EPResultStore(self.csvFilePath)
+        self.assertEqual(store.rowCount, 3)
+        self.assertEqual(list(store.getColumn(1)), [20.5, 21.0, 21.5])
+        self.assertEqual([row[2] for row in store.getRows([2])], [19.0, "", 19.5])
+        self.assertEqual(sorted(os.listdir(self.folder)), ["eplusout.csv", "eplusout.csv.hbd", "eplusout.csv.hbi"])
+        
+        # the second store is loaded from the files on disk
+        loadedStore = hb_EPResultStore(self.csvFilePath)
+        self.assertTrue(loadedStore.memoryColumns is None)
+        self.assertEqual(loadedStore.timeStamps, store.timeStamps)
+        self.assertEqual(list(loadedStore.getColumn(1)), [20.5, 21.0, 21.5])
+    
+    def test_truncatedDataIsRebuilt(self):
+        store = hb_EPResultStore(self.csvFilePath)
+        with open(store.dataFilePath, "r+b") as dataFile:
+            dataFile.truncate(8)
+        
+        store = hb_EPResultStore(self.csvFilePath)
+        self.assertEqual(os.path.getsize(store.dataFilePath), 3 * 3 * 8)
+        self.assertEqual(list(store.getColumn(1)), [20.5, 21.0, 21.5])
+    
+    def test_failedWriteKeepsValuesInMemory(self):
+        # a folder in place of the temp file makes the write fail
+        os.mkdir(os.path.join(self.folder, "eplusout.csv.hbd.tmp"))
+        store = hb_EPResultStore(self.csvFilePath)
+        
+        self.assertTrue(store.memoryColumns is not None)
+        self.assertEqual(list(store.getColumn(1)), [20.5, 21.0, 21.5])
+        self.assertFalse(os.path.exists(store.dataFilePath))
+        self.assertFalse(os.path.exists(store.indexFilePath))
+        self.assertFalse(os.path.exists(store.indexFilePath + ".tmp"))
+
+
+if __name__ == "__main__":
+    unittest.main()
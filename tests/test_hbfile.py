@@ -0,0 +1,248 @@
+"""Write and read tests for the binary .HB files of hb_HBFile."""
+import array
+import cPickle as pickle
+import os
+import shutil
+import struct
+import sys
+import tempfile
+import unittest
+import zlib
+
+from hbsource import loadClasses
+
+
+class Point3d(object):
+    def __init__(self, x, y, z):
+        self.X, self.Y, self.Z = x, y, z
+
+
+class MeshFace(object):
+    def __init__(self, *indices):
+        self.IsQuad = len(indices) == 4
+        self.A, self.B, self.C = indices[:3]
+        self.D = indices[-1]
+
+
+class MeshVertices(list):
+    def Add(self, point):
+        self.append(point)
+
+
+class MeshFaces(list):
+    def AddFace(self, *indices):
+        self.append(MeshFace(*indices))
+
+
+class MeshNormals(object):
+    def ComputeNormals(self):
+        pass
+
+
+class Mesh(object):
+    def __init__(self):
+        self.Vertices = MeshVertices()
+        self.Faces = MeshFaces()
+        self.Normals = MeshNormals()
+
+
+class Brep(object):
+    pass
+
+
+class Curve(object):
+    """A geometry that can't be stored in the arrays and stays in the record."""
+    def __init__(self, name):
+        self.name = name
+    
+    def __eq__(self, other):
+        return isinstance(other, Curve) and self.name == other.name
+
+
+class Geometry(object):
+    Point3d = Point3d
+    Mesh = Mesh
+    Brep = Brep
+
+
+class Rhino(object):
+    Geometry = Geometry
+
+
+hb = loadClasses(["hb_GeometryArrays", "hb_HBFile"], {"os": os, "sys": sys, "struct": struct, \
+    "zlib": zlib, "pickle": pickle, "array": array, "rc": Rhino})
+hb_HBFile = hb["hb_HBFile"]
+
+
+def mesh(points, faces):
+    geometry = Mesh()
+    for point in points: geometry.Vertices.Add(Point3d(*point))
+    for face in faces: geometry.Faces.AddFace(*face)
+    return geometry
+
+
+def meshFaces(geometry):
+    """Return the coordinates of the points of each face."""
+    faces = []
+    for face in geometry.Faces:
+        indices = (face.A, face.B, face.C, face.D) if face.IsQuad else (face.A, face.B, face.C)
+        vertices = [geometry.Vertices[index] for index in indices]
+        faces.append([(point.X, point.Y, point.Z) for point in vertices])
+    return faces
+
+
+def box(x):
+    points = [(x, 0, 0), (x + 1, 0, 0), (x + 1, 1, 0), (x, 1, 0),
+              (x, 0, 1), (x + 1, 0, 1), (x + 1, 1, 1), (x, 1, 1)]
+    return mesh(points, [(0, 3, 2, 1), (4, 5, 6, 7), (0, 1, 5, 4), (1, 2, 6), (2, 6, 5), (0, 4, 7, 3)])
+
+
+def surface(zoneId, x, BCObject = "Outdoors"):
+    return {'objectType': 'HBSurface', 'parent': zoneId, 'type': 0, 'hasChild': False, 'isChild': False, \
+            'geometry': box(x), 'meshedFace': [box(x + 0.5), "not a geometry"], \
+            'BC': 'Surface' if BCObject != "Outdoors" else 'Outdoors', 'BCObject': BCObject, \
+            'sunExposure': 'SunExposed', 'windExposure': 'WindExposed'}
+
+
+def model():
+    objs = {
+        'zone1': {'objectType': 'HBZone', 'name': 'Zone1', 'surfaces': ['srf1', 'srf2'], \
+                  'bldgProgram': 'Office', 'zoneProgram': 'OpenOffice'},
+        'zone2': {'objectType': 'HBZone', 'name': 'Zone2', 'surfaces': ['srf3'], \
+                  'bldgProgram': 'Office', 'zoneProgram': 'Corridor'},
+        'srf1': surface('zone1', 0),
+        'srf2': surface('zone1', 2, 'srf3'),
+        'srf3': surface('zone2', 4, 'srf2'),
+        'shade': {'objectType': 'HBSurface', 'type': 6, 'geometry': box(8), 'curve': Curve('edge')},
+        'wall': {'objectType': 'HBConstr', 'name': 'WALL', 'layers': ['BRICK']}}
+    return ['zone1', 'zone2', 'shade'], objs
+
+
+class HBFileTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.filePath = os.path.join(self.folder, "model.HB")
+        hb_HBFile.openFiles.clear()
+    
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+    
+    def assertSameObject(self, loaded, original):
+        self.assertEqual(sorted(loaded.keys()), sorted(original.keys()))
+        for key, value in original.items():
+            if isinstance(value, Mesh):
+                self.assertEqual(meshFaces(loaded[key]), meshFaces(value))
+            elif isinstance(value, list) and value and isinstance(value[0], Mesh):
+                self.assertEqual(meshFaces(loaded[key][0]), meshFaces(value[0]))
+                self.assertEqual(loaded[key][1:], value[1:])
+            else:
+                self.assertEqual(loaded[key], value)
+    
+    def test_roundTrip(self):
+        ids, objs = model()
+        hb_HBFile.write(self.filePath, ids, objs)
+        self.assertTrue(hb_HBFile.isHBFile(self.filePath))
+        
+        HBData = hb_HBFile(self.filePath).load()
+        self.assertEqual(HBData['ids'], ids)
+        self.assertEqual(sorted(HBData['objs'].keys()), sorted(objs.keys()))
+        for id in objs:
+            self.assertSameObject(HBData['objs'][id], objs[id])
+    
+    def test_writeDoesNotChangeObjects(self):
+        ids, objs = model()
+        geometry = objs['srf1']['geometry']
+        hb_HBFile.write(self.filePath, ids, objs)
+        self.assertTrue(objs['srf1']['geometry'] is geometry)
+        self.assertTrue(isinstance(objs['srf1']['meshedFace'][0], Mesh))
+    
+    def test_zoneRecords(self):
+        ids, objs = model()
+        hb_HBFile.write(self.filePath, ids, objs)
+        HBFile = hb_HBFile(self.filePath)
+        self.assertEqual(HBFile.getZoneNames(), ['Zone1', 'Zone2'])
+        self.assertEqual(HBFile.getZonePrograms(), ['Office::OpenOffice', 'Office::Corridor'])
+        
+        # each zone has its own block of vertices and faces
+        zone1, zone2 = HBFile.toc['zones']
+        self.assertEqual(zone1['vertices'][1], 3 * (8 + 8 + 8 + 8))
+        self.assertEqual(zone1['vertices'][0] + zone1['vertices'][1], zone2['vertices'][0])
+        self.assertEqual(zone1['faces'][0] + zone1['faces'][1], zone2['faces'][0])
+    
+    def test_loadOneZone(self):
+        ids, objs = model()
+        hb_HBFile.write(self.filePath, ids, objs)
+        HBData = hb_HBFile(self.filePath).load(names = ['zone2'])
+        self.assertEqual(HBData['ids'], ['zone2', 'shade'])
+        self.assertEqual(sorted(HBData['objs'].keys()), ['shade', 'srf3', 'wall', 'zone2'])
+        self.assertSameObject(HBData['objs']['shade'], objs['shade'])
+        self.assertEqual(meshFaces(HBData['objs']['srf3']['geometry']), meshFaces(objs['srf3']['geometry']))
+        
+        # srf2 is not loaded so srf3 is not adjacent to it anymore
+        srf3 = HBData['objs']['srf3']
+        self.assertEqual((srf3['BC'], srf3['BCObject']), ('Adiabatic', 'Outdoors'))
+    
+    def test_loadByProgram(self):
+        ids, objs = model()
+        hb_HBFile.write(self.filePath, ids, objs)
+        HBFile = hb_HBFile(self.filePath)
+        self.assertEqual(HBFile.load(programs = ['Office::OpenOffice'])['ids'], ['zone1', 'shade'])
+        self.assertEqual(HBFile.load(programs = ['office'])['ids'], ['zone1', 'zone2', 'shade'])
+        self.assertEqual(HBFile.load(names = ['zone1'], programs = ['corridor'])['ids'], ['shade'])
+    
+    def test_fromFileIsReadAgainAfterWrite(self):
+        ids, objs = model()
+        hb_HBFile.write(self.filePath, ids, objs)
+        HBFile = hb_HBFile.fromFile(self.filePath)
+        self.assertTrue(hb_HBFile.fromFile(self.filePath) is HBFile)
+        
+        del objs['zone2']
+        hb_HBFile.write(self.filePath, ['zone1'], objs)
+        self.assertEqual(hb_HBFile.fromFile(self.filePath).getZoneNames(), ['Zone1'])
+    
+    def test_header(self):
+        ids, objs = model()
+        hb_HBFile.write(self.filePath, ids, objs)
+        with open(self.filePath, "rb") as inf:
+            magic, version, tocOffset = struct.unpack("<6sHQ", inf.read(16))
+        self.assertEqual((magic, version), ("HBFILE", hb_HBFile.version))
+        self.assertTrue(16 < tocOffset < os.path.getsize(self.filePath))
+    
+    def test_newerVersion(self):
+        ids, objs = model()
+        hb_HBFile.write(self.filePath, ids, objs)
+        with open(self.filePath, "r+b") as outf:
+            outf.seek(6)
+            outf.write(struct.pack("<H", hb_HBFile.version + 1))
+        self.assertRaises(ValueError, hb_HBFile, self.filePath)
+    
+    def test_olderPickleFile(self):
+        with open(self.filePath, "wb") as outf:
+            pickle.dump({'ids': [], 'objs': {}}, outf)
+        self.assertFalse(hb_HBFile.isHBFile(self.filePath))
+        self.assertRaises(ValueError, hb_HBFile, self.filePath)
+    
+    def test_truncatedFile(self):
+        ids, objs = model()
+        hb_HBFile.write(self.filePath, ids, objs)
+        with open(self.filePath, "rb") as inf:
+            data = inf.read()
+        
+        for length in [10, 16, len(data) // 2, len(data) - 1]:
+            with open(self.filePath, "wb") as outf:
+                outf.write(data[:length])
+            self.assertRaises(ValueError, hb_HBFile, self.filePath)
+    
+    def test_unfinishedFile(self):
+        # the offset of the table of contents is 0 until the file is written
+        ids, objs = model()
+        hb_HBFile.write(self.filePath, ids, objs)
+        with open(self.filePath, "r+b") as outf:
+            outf.seek(8)
+            outf.write(struct.pack("<Q", 0))
+        self.assertRaises(ValueError, hb_HBFile, self.filePath)
+
+
+if __name__ == "__main__":
+    unittest.main()
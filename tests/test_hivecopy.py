@@ -0,0 +1,90 @@
+"""Tests for copying Honeybee objects from the hive with hb_Hive.copyHBObject."""
+import copy
+import unittest
+
+from hbsource import loadClasses
+
+
+class GeometryBase(object):
+    pass
+
+
+class Geometry(object):
+    GeometryBase = GeometryBase
+
+
+class Rhino(object):
+    Geometry = Geometry
+
+
+class Surface(object):
+    def __init__(self, name, EPConstruction = "WALL"):
+        self.name = name
+        self.objectType = "HBSurface"
+        self.geometry = GeometryBase()
+        self.EPConstruction = EPConstruction
+        self.BCObject = None
+        self.childSrfs = []
+    
+    def setEPConstruction(self, EPConstruction):
+        self.EPConstruction = EPConstruction
+
+
+class Zone(object):
+    def __init__(self, name, surfaces):
+        self.name = name
+        self.objectType = "HBZone"
+        self.surfaces = surfaces
+        for surface in surfaces: surface.parent = self
+
+
+hb = loadClasses(["hb_Hive"], {"copy": copy, "rc": Rhino})
+hb_Hive = hb["hb_Hive"]
+
+
+def adjacentZones():
+    zone1 = Zone("zone1", [Surface("wall1"), Surface("wall2")])
+    zone2 = Zone("zone2", [Surface("wall3")])
+    # wall2 and wall3 are adjacent
+    zone1.surfaces[1].BCObject = zone2.surfaces[0]
+    zone2.surfaces[0].BCObject = zone1.surfaces[1]
+    return zone1, zone2
+
+
+class HiveCopyTest(unittest.TestCase):
+    
+    def test_geometryIsShared(self):
+        zone1, zone2 = adjacentZones()
+        zoneCopy = hb_Hive().copyHBObject(zone1)
+        self.assertTrue(zoneCopy is not zone1)
+        self.assertTrue(zoneCopy.surfaces[0] is not zone1.surfaces[0])
+        self.assertTrue(zoneCopy.surfaces[0].geometry is zone1.surfaces[0].geometry)
+    
+    def test_adjacentZoneIsNotCopied(self):
+        zone1, zone2 = adjacentZones()
+        BCObject = hb_Hive().copyHBObject(zone1).surfaces[1].BCObject
+        self.assertEqual(BCObject.name, "wall3")
+        # the adjacent surface is a shallow copy and still points to the original zone
+        self.assertTrue(BCObject.parent is zone2)
+        self.assertTrue(BCObject.geometry is zone2.surfaces[0].geometry)
+    
+    def test_changingBCObjectOfCopyKeepsSource(self):
+        zone1, zone2 = adjacentZones()
+        zoneCopy = hb_Hive().copyHBObject(zone1)
+        # Set EP Zone Underground Construction assigns the construction of the adjacent surface
+        zoneCopy.surfaces[1].BCObject.setEPConstruction("UNDERGROUND WALL")
+        self.assertEqual(zoneCopy.surfaces[1].BCObject.EPConstruction, "UNDERGROUND WALL")
+        self.assertEqual(zone2.surfaces[0].EPConstruction, "WALL")
+        self.assertTrue(zone1.surfaces[1].BCObject is zone2.surfaces[0])
+    
+    def test_BCObjectInCopiedZoneIsCopied(self):
+        zone = Zone("zone", [Surface("wall1"), Surface("wall2")])
+        zone.surfaces[0].BCObject = zone.surfaces[1]
+        zone.surfaces[1].BCObject = zone.surfaces[0]
+        zoneCopy = hb_Hive().copyHBObject(zone)
+        self.assertTrue(zoneCopy.surfaces[0].BCObject is zoneCopy.surfaces[1])
+        self.assertTrue(zoneCopy.surfaces[1].BCObject is zoneCopy.surfaces[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+"""Tests for streaming the objects of an idf file with hb_IDFTokenizer."""
+import os
+import re
+import shutil
+import tempfile
+import unittest
+from StringIO import StringIO
+
+from hbsource import loadClasses
+
+hb = loadClasses(["hb_IDFObject", "hb_IDFTokenizer"], {"os": os, "re": re})
+hb_IDFTokenizer = hb["hb_IDFTokenizer"]
+
+
+def tokenize(text):
+    return list(hb_IDFTokenizer(StringIO(text)))
+
+
+class IDFTokenizerTest(unittest.TestCase):
+    
+    def test_fieldsAndComments(self):
+        text = "Material,\n" \
+               "  Brick,                  !- Name\n" \
+               "  Rough,                  !- Roughness\n" \
+               "  0.1;                    !- Thickness {m}\n"
+        objects = tokenize(text)
+        self.assertEqual(len(objects), 1)
+        self.assertEqual(objects[0].objClass, "Material")
+        self.assertEqual(objects[0].name, "Brick")
+        self.assertEqual(objects[0].fields,
+            [("Brick", "- Name"), ("Rough", "- Roughness"), ("0.1", "- Thickness {m}")])
+        self.assertEqual(objects[0].offset, 0)
+    
+    def test_commentWithSeparators(self):
+        text = "! header; with, separators\n" \
+               "Version,8.1;   !- Version; Identifier, text\n" \
+               "Timestep,\n" \
+               "  6;   ! a, b; c\n"
+        objects = tokenize(text)
+        self.assertEqual([EPObject.objClass for EPObject in objects], ["Version", "Timestep"])
+        self.assertEqual(objects[0].fields, [("8.1", "- Version; Identifier, text")])
+        self.assertEqual(objects[1].fields, [("6", " a, b; c")])
+        self.assertEqual(objects[0].offset, text.index("Version"))
+        self.assertEqual(objects[1].offset, text.index("Timestep"))
+    
+    def test_severalObjectsOnOneLine(self):
+        text = "  Version,8.1; Timestep,6;Building,\n  Office;\n"
+        objects = tokenize(text)
+        self.assertEqual([(EPObject.objClass, EPObject.fields) for EPObject in objects],
+            [("Version", [("8.1", "")]), ("Timestep", [("6", "")]), ("Building", [("Office", "")])])
+        self.assertEqual([EPObject.offset for EPObject in objects],
+            [text.index("Version"), text.index("Timestep"), text.index("Building")])
+    
+    def test_missingTrailingNewLine(self):
+        text = "Version,8.1;\nTimestep,6; !- last"
+        objects = tokenize(text)
+        self.assertEqual(len(objects), 2)
+        self.assertEqual(objects[1].fields, [("6", "- last")])
+        self.assertEqual(objects[1].offset, text.index("Timestep"))
+    
+    def test_unfinishedObjectIsIgnored(self):
+        self.assertEqual([EPObject.objClass for EPObject in tokenize("Version,8.1;\nTimestep,6")],
+            ["Version"])
+    
+    def test_windowsNewLines(self):
+        text = "Version,8.1;\r\n" \
+               "Material,\r\n" \
+               "  Brick,   !- Name\r\n" \
+               "  0.1;     !- Thickness\r\n"
+        objects = tokenize(text)
+        self.assertEqual(objects[1].fields, [("Brick", "- Name"), ("0.1", "- Thickness")])
+        self.assertEqual(objects[1].offset, text.index("Material"))
+    
+    def test_offsetsInFile(self):
+        text = "! sample\r\nVersion,8.1;\r\n\r\nMaterial,\r\n  Brick,\r\n  0.1;\r\nTimestep,6;"
+        folder = tempfile.mkdtemp()
+        try:
+            idfFile = os.path.join(folder, "sample.idf")
+            with open(idfFile, "wb") as outf:
+                outf.write(text)
+            objects = list(hb_IDFTokenizer(idfFile))
+            with open(idfFile, "rb") as inf:
+                for EPObject in objects:
+                    inf.seek(EPObject.offset)
+                    self.assertEqual(inf.read(len(EPObject.objClass)), EPObject.objClass)
+        finally:
+            shutil.rmtree(folder)
+        self.assertEqual([EPObject.objClass for EPObject in objects], ["Version", "Material", "Timestep"])
+    
+    def test_offsetOfOpenFile(self):
+        inf = StringIO("Version,8.1;\nTimestep,6;\n")
+        inf.readline()
+        objects = list(hb_IDFTokenizer(inf))
+        self.assertEqual([(EPObject.objClass, EPObject.offset) for EPObject in objects], [("Timestep", 13)])
+
+
+if __name__ == "__main__":
+    unittest.main()
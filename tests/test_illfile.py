@@ -0,0 +1,89 @@
+"""Tests for the binary sidecar of Daysim .ill files in hb_IllFile and hb_IllMatrix."""
+import array
+import bisect
+import os
+import shutil
+import struct
+import tempfile
+import unittest
+
+from hbsource import loadClasses
+
+hb = loadClasses(["replaceFile", "removeTempFiles", "hb_IllFile", "hb_IllMatrix"], \
+                 {"os": os, "array": array, "bisect": bisect, "struct": struct})
+hb_IllFile = hb["hb_IllFile"]
+hb_IllMatrix = hb["hb_IllMatrix"]
+
+
+def illLines(hourCount, pointCount, firstValue = 0):
+    lines = []
+    for hour in range(hourCount):
+        values = [firstValue + hour * 100 + point + 0.5 for point in range(pointCount)]
+        lines.append("1 1 %.3f 0 "%(hour + 0.5) + " ".join("%.3f"%value for value in values) + "\n")
+    return "".join(lines)
+
+
+class IllFileTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        hb_IllFile.openFiles = {}
+    
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+        hb_IllFile.transposeChunkSize = 32 * 1024 ** 2
+    
+    def writeIll(self, fileName, content):
+        illFilePath = os.path.join(self.folder, fileName)
+        with open(illFilePath, "w") as illFile:
+            illFile.write(content)
+        return illFilePath
+    
+    def test_hourAndPointValues(self):
+        # a small chunk size makes the points x hours matrix to be written in several chunks
+        hb_IllFile.transposeChunkSize = 3 * 8 * 5
+        illFile = hb_IllFile(self.writeIll("test.ill", illLines(5, 7)))
+        
+        self.assertEqual((illFile.hourCount, illFile.pointCount), (5, 7))
+        self.assertEqual(illFile.getHourValues(2), [100.5 + point for point in range(7)])
+        self.assertEqual(illFile.getPointValues(6), [hour * 100 + 6.5 for hour in range(5)])
+        self.assertEqual([list(values) for values in illFile.iterHours()], \
+                         [illFile.getHourValues(hour + 1) for hour in range(5)])
+        self.assertEqual(os.path.getsize(illFile.dataFilePath), hb_IllFile.headerSize + 2 * 5 * 7 * 8)
+        self.assertRaises(ValueError, illFile.getHourValues, 6)
+        self.assertRaises(ValueError, illFile.getPointValues, 7)
+        
+        # the second reader uses the sidecar
+        loadedFile = hb_IllFile(illFile.illFilePath)
+        self.assertTrue(loadedFile.load())
+        self.assertEqual(loadedFile.getPointValues(3), illFile.getPointValues(3))
+    
+    def test_invalidFileLeavesNoSidecar(self):
+        illFilePath = self.writeIll("test.ill", illLines(3, 4) + "1 1 3.5 0 1.0 2.0\n")
+        self.assertRaises(ValueError, hb_IllFile, illFilePath)
+        self.assertEqual(os.listdir(self.folder), ["test.ill"])
+    
+    def test_valuesAreKeptInMemoryIfSidecarCantBeWritten(self):
+        illFilePath = self.writeIll("test.ill", illLines(4, 3))
+        # a folder in place of the temp file makes the write fail
+        os.mkdir(illFilePath + ".hbx.tmp")
+        illFile = hb_IllFile(illFilePath)
+        
+        self.assertFalse(os.path.exists(illFile.dataFilePath))
+        self.assertEqual((illFile.hourCount, illFile.pointCount), (4, 3))
+        self.assertEqual(illFile.getHourValues(4), [300.5, 301.5, 302.5])
+        self.assertEqual(illFile.getPointValues(1), [1.5, 101.5, 201.5, 301.5])
+        self.assertEqual(len(list(illFile.iterHours())), 4)
+    
+    def test_matrixStitchesPoints(self):
+        firstFile = self.writeIll("test_1.ill", illLines(3, 2))
+        secondFile = self.writeIll("test_2.ill", illLines(3, 3, 1000))
+        matrix = hb_IllMatrix([firstFile, secondFile])
+        
+        self.assertEqual(matrix.pointCount, 5)
+        self.assertEqual(matrix.getHourValues(1), [0.5, 1.5, 1000.5, 1001.5, 1002.5])
+        self.assertEqual(matrix.getPointValues(3), [1001.5, 1101.5, 1201.5])
+
+
+if __name__ == "__main__":
+    unittest.main()
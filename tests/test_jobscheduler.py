@@ -0,0 +1,118 @@
+"""Tests for hb_Job and hb_JobScheduler with stub executables that sleep and exit."""
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+from hbsource import loadClasses
+
+hb = loadClasses(["hb_Job", "hb_JobScheduler"], \
+                 {"os": os, "subprocess": subprocess, "threading": threading, "time": time})
+hb_JobScheduler = hb["hb_JobScheduler"]
+
+stubSource = """import sys, time
+time.sleep(float(sys.argv[1]))
+sys.exit(int(sys.argv[2]))
+"""
+
+
+class JobSchedulerTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.stub = os.path.join(self.folder, "stub.py")
+        with open(self.stub, "w") as stubFile:
+            stubFile.write(stubSource)
+    
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+    
+    def stubCommand(self, seconds, exitCode = 0):
+        return [sys.executable, self.stub, str(seconds), str(exitCode)]
+    
+    def maxRunningJobs(self, jobs):
+        # the number of jobs that were running at the same time from their start and end times
+        events = []
+        for job in jobs:
+            events.append((job.startTime, 1))
+            events.append((job.startTime + job.duration, -1))
+        running = maxRunning = 0
+        for eventTime, change in sorted(events):
+            running += change
+            maxRunning = max(maxRunning, running)
+        return maxRunning
+    
+    def test_maxPRuns(self):
+        scheduler = hb_JobScheduler(maxPRuns = 2)
+        for count in range(5): scheduler.addJob(self.stubCommand(.3), "job_%d"%count)
+        jobs = scheduler.run()
+        
+        self.assertEqual(self.maxRunningJobs(jobs), 2)
+        self.assertEqual([job.status for job in jobs], ["done"] * 5)
+    
+    def test_maxPRunsOne(self):
+        scheduler = hb_JobScheduler(maxPRuns = 0)
+        self.assertEqual(scheduler.maxPRuns, 1)
+        for count in range(3): scheduler.addJob(self.stubCommand(.1))
+        self.assertEqual(self.maxRunningJobs(scheduler.run()), 1)
+    
+    def test_launchDelay(self):
+        scheduler = hb_JobScheduler(maxPRuns = 3, launchDelay = .4)
+        for count in range(3): scheduler.addJob(self.stubCommand(0))
+        jobs = scheduler.run()
+        
+        # the slot of each job is kept for the delay even if the job ends before it
+        for job in jobs: self.assertGreaterEqual(job.duration, .4)
+        self.assertEqual([job.status for job in jobs], ["done"] * 3)
+    
+    def test_exitCodeAndDuration(self):
+        scheduler = hb_JobScheduler(maxPRuns = 2)
+        okJob = scheduler.addJob(self.stubCommand(.2, 0))
+        failedJob = scheduler.addJob(self.stubCommand(.5, 3))
+        scheduler.run()
+        
+        self.assertEqual(okJob.returnCode, 0)
+        self.assertEqual(okJob.status, "done")
+        self.assertEqual(failedJob.returnCode, 3)
+        self.assertEqual(failedJob.status, "failed")
+        self.assertGreaterEqual(okJob.duration, .2)
+        self.assertGreaterEqual(failedJob.duration, .5)
+        self.assertIn("exit code: 3", scheduler.report()[1])
+    
+    def test_failedJobs(self):
+        scheduler = hb_JobScheduler(maxPRuns = 2)
+        scheduler.addJob(self.stubCommand(0, 0), "ok")
+        scheduler.addJob(self.stubCommand(0, 1), "exitOne")
+        scheduler.addJob([os.path.join(self.folder, "missing.exe")], "missing")
+        scheduler.run()
+        
+        failedJobs = scheduler.failedJobs()
+        self.assertEqual(sorted(job.name for job in failedJobs), ["exitOne", "missing"])
+        missingJob = [job for job in failedJobs if job.name == "missing"][0]
+        self.assertIsNone(missingJob.returnCode)
+        self.assertTrue(missingJob.error)
+    
+    def test_timeout(self):
+        scheduler = hb_JobScheduler(timeout = .3)
+        job = scheduler.addJob(self.stubCommand(5))
+        scheduler.run()
+        
+        self.assertEqual(job.status, "timeout")
+        self.assertEqual(scheduler.failedJobs(), [job])
+        self.assertLess(job.duration, 4)
+    
+    def test_progressCallback(self):
+        progress = []
+        scheduler = hb_JobScheduler(maxPRuns = 2, progressCallback = lambda finished, total, job: progress.append((finished, total)))
+        for count in range(3): scheduler.addJob(self.stubCommand(0))
+        scheduler.run()
+        
+        self.assertEqual(sorted(progress), [(1, 3), (2, 3), (3, 3)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+"""Tests for the snapshot of the parsed EnergyPlus and THERM libraries."""
+import hashlib
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+
+from hbsource import loadClasses
+
+
+class FakeColor(object):
+    def __init__(self, html):
+        self.html = html
+
+
+class FakeColorTranslator(object):
+    
+    @staticmethod
+    def FromHtml(html):
+        return FakeColor(html)
+    
+    @staticmethod
+    def ToHtml(color):
+        return color.html
+
+
+class FakeDrawing(object):
+    ColorTranslator = FakeColorTranslator
+
+
+class FakeSystem(object):
+    Drawing = FakeDrawing
+
+
+class FakeEPLibs(object):
+    def __init__(self, libraries = None):
+        self.libraries = libraries
+
+
+hb = loadClasses(["replaceFile", "removeTempFiles", "hb_EPLibrarySnapshot"],
+                 {"os": os, "pickle": pickle, "hashlib": hashlib, "System": FakeSystem})
+hb_EPLibrarySnapshot = hb["hb_EPLibrarySnapshot"]
+
+
+class EPLibrarySnapshotTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.sourceFile = os.path.join(self.folder, "EnergyPlusLibrary.idf")
+        with open(self.sourceFile, "w") as outf:
+            outf.write("Material,\n  concrete;\n")
+    
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+    
+    def test_materialWithoutColor(self):
+        libraries = {"ThermMaterial": {
+            "brick": {"Name": "brick", "RGBColor": FakeColor("#804000")},
+            # HB_GetEPLibraries leaves out the color when it can't be parsed
+            "nocolor": {"Name": "nocolor"}}}
+        hb_EPLibrarySnapshot([self.sourceFile]).save(FakeEPLibs(libraries), "standards")
+        
+        EPLibs = FakeEPLibs()
+        openStudioStandardLib = hb_EPLibrarySnapshot([self.sourceFile]).load(EPLibs)
+        self.assertEqual(openStudioStandardLib, "standards")
+        materials = EPLibs.libraries["ThermMaterial"]
+        self.assertEqual(materials["brick"]["RGBColor"].html, "#804000")
+        self.assertEqual(materials["nocolor"], {"Name": "nocolor"})
+    
+    def test_changedSourceIgnoresSnapshot(self):
+        hb_EPLibrarySnapshot([self.sourceFile]).save(FakeEPLibs({"ThermMaterial": {}}), "standards")
+        with open(self.sourceFile, "a") as outf:
+            outf.write("Material,\n  wood;\n")
+        self.assertEqual(hb_EPLibrarySnapshot([self.sourceFile]).load(FakeEPLibs()), None)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+"""Tests for reading the result csv files of Microclimate Map Analysis with hb_MicroclimateMatrix."""
+import os
+import shutil
+import tempfile
+import unittest
+
+from hbsource import loadClasses
+
+openedFiles = []
+
+
+def countedOpen(filePath, mode = "r"):
+    openedFiles.append(filePath)
+    return open(filePath, mode)
+
+hb = loadClasses(["hb_MicroclimateMatrix"], {"open": countedOpen})
+hb_MicroclimateMatrix = hb["hb_MicroclimateMatrix"]
+
+
+class MicroclimateMatrixTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.resultFilePath = os.path.join(self.folder, "PMV_Result.csv")
+        with open(self.resultFilePath, "wb") as resultFile:
+            resultFile.write("key:location/dataType/units,Point 1,Point 2\r\n")
+            for hour in range(5):
+                resultFile.write("%d.5,%d.25\r\n" % (hour, hour))
+        del openedFiles[:]
+    
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+    
+    def test_rowsAreReadWithOneHandle(self):
+        matrix = hb_MicroclimateMatrix(self.resultFilePath)
+        self.assertEqual(len(matrix), 6)
+        self.assertEqual(matrix[0], "key:location/dataType/units,Point 1,Point 2")
+        
+        del openedFiles[:]
+        self.assertEqual(matrix.getRows([5, 1, 3, 0]), \
+                         [[4.5, 4.25], [0.5, 0.25], [2.5, 2.25], "key:location/dataType/units,Point 1,Point 2"])
+        self.assertEqual(len(openedFiles), 1)
+        
+        # parsed rows are not read again
+        self.assertEqual(matrix[3], [2.5, 2.25])
+        self.assertEqual(matrix[-1], [4.5, 4.25])
+        self.assertEqual(len(openedFiles), 1)
+        
+        self.assertEqual(matrix[1:], [[hour + 0.5, hour + 0.25] for hour in range(5)])
+        self.assertEqual(len(openedFiles), 2)
+        self.assertEqual(list(matrix)[2], [1.5, 1.25])
+    
+    def test_indexOutOfRange(self):
+        matrix = hb_MicroclimateMatrix(self.resultFilePath)
+        self.assertRaises(IndexError, matrix.__getitem__, 6)
+        self.assertRaises(IndexError, matrix.getRows, [1, 7])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,38 @@
+"""Tests for the number of CPUs that Microclimate Map Analysis uses for the parallel_ input."""
+import unittest
+
+from hbsource import loadClasses
+
+
+class Environment(object):
+    ProcessorCount = 8
+
+
+class System(object):
+    Environment = Environment
+
+hb = loadClasses(["getWorkerCount"], {"System": System}, fileName = "Honeybee_Microclimate Map Analysis.py")
+getWorkerCount = hb["getWorkerCount"]
+
+
+class WorkerCountTest(unittest.TestCase):
+    
+    def test_booleans(self):
+        self.assertEqual(getWorkerCount(True), 8)
+        self.assertEqual(getWorkerCount(False), 1)
+        self.assertEqual(getWorkerCount(None), 1)
+        self.assertEqual(getWorkerCount("True"), 8)
+        self.assertEqual(getWorkerCount("false"), 1)
+    
+    def test_numberOfCPUs(self):
+        self.assertEqual(getWorkerCount(1), 1)
+        self.assertEqual(getWorkerCount(3), 3)
+        self.assertEqual(getWorkerCount(3.0), 3)
+        self.assertEqual(getWorkerCount("4"), 4)
+        self.assertEqual(getWorkerCount(64), 8)
+        self.assertEqual(getWorkerCount(0), 1)
+        self.assertEqual(getWorkerCount("all"), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
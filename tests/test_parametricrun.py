@@ -0,0 +1,121 @@
+"""Tests for hb_ParametricRun with a stub simulator that writes canned result files."""
+import hashlib
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+from hbsource import loadClasses
+
+
+class ScriptContext(object):
+    def __init__(self, sticky):
+        self.sticky = sticky
+
+
+sc = ScriptContext({})
+hb = loadClasses(["hb_Job", "hb_JobScheduler", "hb_IDFObject", "hb_IDFTokenizer", "hb_EPResultHeader", \
+                  "hb_EPResultCache", "hb_ParametricRun"], \
+                 {"os": os, "re": re, "json": json, "shutil": shutil, "subprocess": subprocess, \
+                  "threading": threading, "time": time, "hashlib": hashlib, "sc": sc})
+sc.sticky["honeybee_JobScheduler"] = hb["hb_JobScheduler"]
+hb_ParametricRun = hb["hb_ParametricRun"]
+
+idfContent = """Version,8.9;
+WindowMaterial:SimpleGlazingSystem,
+  Glazing 1,               !- Name
+  2.0,                     !- U-Factor {W/m2-K}
+  0.4;                     !- Solar Heat Gain Coefficient
+"""
+
+# writes the csv file with the U-Factor of the idf file as the values and the err file
+stubSource = """import sys
+idfFilePath, mode = sys.argv[1:3]
+fullPath = idfFilePath[:-4]
+uFactor = open(idfFilePath).read().split("!- U-Factor")[0].rsplit(",", 2)[-2].split()[-1]
+if mode != "nocsv":
+    with open(fullPath + ".csv", "w") as csvFile:
+        csvFile.write("Date/Time,ZONE1:Zone Mean Air Temperature [C](Hourly)\\n")
+        csvFile.write(" 01/01  01:00:00,%s\\n 01/01  02:00:00,%s\\n"%(uFactor, uFactor))
+with open(fullPath + ".err", "w") as errFile:
+    if mode == "fatal": errFile.write("   **  Fatal  ** Out of bounds value\\n")
+    else: errFile.write("   ************* EnergyPlus Completed Successfully.\\n")
+"""
+
+
+class ParametricRunTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.idfFilePath = os.path.join(self.folder, "base.idf")
+        with open(self.idfFilePath, "w") as idfFile:
+            idfFile.write(idfContent)
+        self.stub = os.path.join(self.folder, "stub.py")
+        with open(self.stub, "w") as stubFile:
+            stubFile.write(stubSource)
+        self.workingDir = os.path.join(self.folder, "variants")
+    
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+    
+    def parametricRun(self, variants, modes = None):
+        """Run the variants with the stub. modes is an optional dictionary of variant id: mode."""
+        modes = modes or {}
+        
+        def simulator(idfFilePath, epwFilePath):
+            variantId = os.path.splitext(os.path.basename(idfFilePath))[0]
+            return '"%s" "%s" "%s" %s'%(sys.executable, self.stub, idfFilePath, modes.get(variantId, "ok"))
+        
+        parametricRun = hb_ParametricRun(self.idfFilePath, "weather.epw", self.workingDir, simulator = simulator)
+        for variantId, parameters in variants:
+            parametricRun.addVariant(variantId, parameters)
+        parametricRun.run()
+        return parametricRun
+    
+    def getStatus(self, parametricRun):
+        connection = parametricRun.connect(parametricRun.databasePath)
+        try:
+            return dict(connection.execute("SELECT id, status FROM variants"))
+        finally:
+            connection.close()
+    
+    def test_resultsAreAddedToDatabase(self):
+        parameter = "WindowMaterial:SimpleGlazingSystem|Glazing 1|U-Factor"
+        parametricRun = self.parametricRun([("low", {parameter: "1.5"}), ("high", {parameter: "3"})])
+        self.assertEqual(self.getStatus(parametricRun), {"low": "done", "high": "done"})
+        self.assertEqual(parametricRun.getValues("Zone Mean Air Temperature", "ZONE1"), \
+                         {"low": [1.5, 1.5], "high": [3.0, 3.0]})
+    
+    def test_fatalErrorFailsVariant(self):
+        parametricRun = self.parametricRun([("base", {}), ("broken", {})], {"broken": "fatal"})
+        self.assertEqual(self.getStatus(parametricRun), {"base": "done", "broken": "failed"})
+        self.assertEqual(parametricRun.getValues("Zone Mean Air Temperature").keys(), ["base"])
+    
+    def test_rerunDoesNotReadOldResults(self):
+        self.parametricRun([("base", {})])
+        csvFilePath = os.path.join(self.workingDir, "base", "base.csv")
+        self.assertTrue(os.path.isfile(csvFilePath))
+        
+        # the second run doesn't write a csv file so the csv file of the first run can't be read
+        parametricRun = self.parametricRun([("base", {})], {"base": "nocsv"})
+        self.assertFalse(os.path.isfile(csvFilePath))
+        self.assertEqual(self.getStatus(parametricRun), {"base": "failed"})
+        self.assertEqual(parametricRun.getValues("Zone Mean Air Temperature"), {})
+    
+    def test_oldCsvFileIsNotNew(self):
+        parametricRun = self.parametricRun([("base", {})])
+        job, (variantId, parameters, variantFilePath) = parametricRun.jobVariants.items()[0]
+        # a csv file from before the simulation started
+        job.startTime = time.time() + 60
+        parametricRun.ingest(1, 1, job)
+        self.assertEqual(self.getStatus(parametricRun), {"base": "failed"})
+
+
+if __name__ == "__main__":
+    unittest.main()
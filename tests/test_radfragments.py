@@ -0,0 +1,56 @@
+"""Tests for the split of the exported rad strings to the frozen octree and the changed objects."""
+import os
+import unittest
+
+from hbsource import loadClasses
+
+
+class FakeGhenv(object):
+    Component = None
+
+hb = loadClasses(["hb_WriteRAD"], {"os": os, "ghenv": FakeGhenv})
+hb_WriteRAD = hb["hb_WriteRAD"]
+
+
+def export(keys, reusedKeys = ()):
+    return [(key, "fragment %s\n"%key, key in reusedKeys) for key in keys]
+
+
+class RADFragmentsTest(unittest.TestCase):
+    
+    def setUp(self):
+        hb_WriteRAD.staticRADKeys = set()
+    
+    def test_firstExportIsAllStatic(self):
+        static, changed = hb_WriteRAD.splitRADFragments(export(["a", "b", "c"]))
+        self.assertEqual(static, ["fragment a\n", "fragment b\n", "fragment c\n"])
+        self.assertEqual(changed, [])
+    
+    def test_changedObjectIsAddedToFrozenOctree(self):
+        hb_WriteRAD.splitRADFragments(export(["a", "b", "c"]))
+        # shading c is edited so it gets a new key
+        static, changed = hb_WriteRAD.splitRADFragments(export(["a", "b", "c2"], ["a", "b"]))
+        self.assertEqual(static, ["fragment a\n", "fragment b\n"])
+        self.assertEqual(changed, ["fragment c2\n"])
+        
+        # the frozen set stays the same while the other objects don't change
+        static, changed = hb_WriteRAD.splitRADFragments(export(["a", "b", "c3"], ["a", "b"]))
+        self.assertEqual(static, ["fragment a\n", "fragment b\n"])
+        self.assertEqual(changed, ["fragment c3\n"])
+    
+    def test_frozenSetIsResetWhenStaticObjectChanges(self):
+        hb_WriteRAD.splitRADFragments(export(["a", "b", "c"]))
+        hb_WriteRAD.splitRADFragments(export(["a", "b", "c2"], ["a", "b"]))
+        static, changed = hb_WriteRAD.splitRADFragments(export(["a2", "b", "c2"], ["b", "c2"]))
+        self.assertEqual(static, ["fragment b\n", "fragment c2\n"])
+        self.assertEqual(changed, ["fragment a2\n"])
+    
+    def test_objectsWithNoKeyAreChanged(self):
+        exportedFragments = export(["a"]) + [(None, "ies\n", False)]
+        static, changed = hb_WriteRAD.splitRADFragments(exportedFragments)
+        self.assertEqual(static, ["fragment a\n"])
+        self.assertEqual(changed, ["ies\n"])
+
+
+if __name__ == "__main__":
+    unittest.main()
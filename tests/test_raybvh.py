@@ -0,0 +1,125 @@
+"""Tests that hb_RayBVH finds the same surfaces as testing the ray against every triangle."""
+import random
+import unittest
+
+from hbsource import loadClasses
+
+hb = loadClasses(["hb_RayBVH"])
+hb_RayBVH = hb["hb_RayBVH"]
+
+
+def randomPoint(size = 10.0):
+    return tuple(random.uniform(-size, size) for i in range(3))
+
+
+def randomDirection():
+    while True:
+        direction = randomPoint(1.0)
+        if sum(d * d for d in direction) > 1e-4: return direction
+
+
+def sub(a, b): return [a[i] - b[i] for i in range(3)]
+def dot(a, b): return sum(a[i] * b[i] for i in range(3))
+def cross(a, b): return [a[1] * b[2] - a[2] * b[1], a[2] * b[0] - a[0] * b[2], a[0] * b[1] - a[1] * b[0]]
+
+
+def planeHit(triangle, origin, direction):
+    """Ray parameter of the hit with a triangle from its plane and same side tests."""
+    a, b, c = triangle
+    normal = cross(sub(b, a), sub(c, a))
+    denominator = dot(normal, direction)
+    if abs(denominator) < 1e-12: return None
+    t = dot(normal, sub(a, origin)) / denominator
+    if t < 0: return None
+    point = [origin[i] + t * direction[i] for i in range(3)]
+    for p, q in ((a, b), (b, c), (c, a)):
+        if dot(cross(sub(q, p), sub(point, p)), normal) < 0: return None
+    return t
+
+
+class BruteForce(object):
+    """Test a ray against every triangle with the same triangle test as the BVH."""
+    
+    def __init__(self, bvh):
+        self.bvh = bvh
+    
+    def hits(self, origin, direction):
+        hits = []
+        for triIndex in range(len(self.bvh.triangles)):
+            t = self.bvh.rayHitsTriangle(triIndex, origin, direction)
+            if t is not None: hits.append((t, self.bvh.surfaceIds[triIndex]))
+        return hits
+    
+    def closestHit(self, origin, direction):
+        hits = self.hits(origin, direction)
+        return min(hits)[1] if hits else None
+    
+    def hitSurfaces(self, origin, direction):
+        return set(surfaceId for t, surfaceId in self.hits(origin, direction))
+
+
+class RayBVHTest(unittest.TestCase):
+    
+    def assertSameHits(self, bvh, rays):
+        bruteForce = BruteForce(bvh)
+        for origin, direction in rays:
+            expectedSurfaces = bruteForce.hitSurfaces(origin, direction)
+            self.assertEqual(bvh.hitSurfaces(origin, direction), expectedSurfaces)
+            self.assertEqual(bvh.isHit(origin, direction), bool(expectedSurfaces))
+            self.assertEqual(bvh.closestHit(origin, direction), bruteForce.closestHit(origin, direction))
+    
+    def test_randomTrianglesAndRays(self):
+        random.seed(8)
+        triangles = []
+        for count in range(300):
+            a = randomPoint()
+            triangles.append((a, tuple(a[i] + random.uniform(-2, 2) for i in range(3)), \
+                              tuple(a[i] + random.uniform(-2, 2) for i in range(3))))
+        bvh = hb_RayBVH(triangles, [count // 3 for count in range(300)])
+        
+        rays = [(randomPoint(), randomDirection()) for count in range(400)]
+        # rays along the axes have no inverse direction on two axes
+        rays += [(randomPoint(), axis) for axis in ((1, 0, 0), (0, -1, 0), (0, 0, 1))] * 20
+        self.assertSameHits(bvh, rays)
+        self.assertTrue(any(bvh.isHit(origin, direction) for origin, direction in rays))
+        
+        # the triangle test of the BVH gives the same hits as a plane intersection
+        for origin, direction in rays:
+            hits = [(planeHit(triangle, origin, direction), count // 3) for count, triangle in enumerate(triangles)]
+            hits = [hit for hit in hits if hit[0] is not None]
+            self.assertEqual(bvh.hitSurfaces(origin, direction), set(surfaceId for t, surfaceId in hits))
+            self.assertEqual(bvh.closestHit(origin, direction), min(hits)[1] if hits else None)
+    
+    def test_tiesResolveToLowerSurface(self):
+        triangle = ((0, 0, 1), (1, 0, 1), (0, 1, 1))
+        # the same triangle for two surfaces, and a farther one
+        bvh = hb_RayBVH([triangle, triangle, ((0, 0, 2), (1, 0, 2), (0, 1, 2))], [5, 2, 0])
+        self.assertEqual(bvh.closestHit((0.2, 0.2, 0), (0, 0, 1)), 2)
+        self.assertEqual(bvh.hitSurfaces((0.2, 0.2, 0), (0, 0, 1)), set([0, 2, 5]))
+        
+        # a ray through the shared edge of two triangles
+        bvh = hb_RayBVH([((0, 0, 1), (1, 0, 1), (0, 1, 1)), ((1, 0, 1), (1, 1, 1), (0, 1, 1))], [1, 0])
+        self.assertSameHits(bvh, [((0.5, 0.5, 0), (0, 0, 1))])
+    
+    def test_grazingAndMissingRays(self):
+        triangles = [((0, 0, 0), (1, 0, 0), (0, 1, 0)), ((0, 0, 1), (1, 0, 1), (0, 1, 1))]
+        bvh = hb_RayBVH(triangles, [0, 1])
+        rays = [((-1, 0.2, 0), (1, 0, 0)),        # in the plane of the first triangle
+                ((0.2, 0.2, -1), (0, 0, -1)),     # pointing away
+                ((5, 5, -1), (0, 0, 1)),          # next to the triangles
+                ((0.2, 0.2, 0.5), (0, 0, 1)),     # starts between the triangles
+                ((0.2, 0.2, -1), (0, 0, 1))]
+        self.assertSameHits(bvh, rays)
+        self.assertEqual(bvh.closestHit((-1, 0.2, 0), (1, 0, 0)), None)
+        self.assertEqual(bvh.closestHit((0.2, 0.2, 0.5), (0, 0, 1)), 1)
+        self.assertEqual(bvh.closestHit((0.2, 0.2, -1), (0, 0, 1)), 0)
+    
+    def test_noTriangles(self):
+        bvh = hb_RayBVH([], [])
+        self.assertEqual(bvh.closestHit((0, 0, 0), (0, 0, 1)), None)
+        self.assertFalse(bvh.isHit((0, 0, 0), (0, 0, 1)))
+        self.assertEqual(bvh.hitSurfaces((0, 0, 0), (0, 0, 1)), set())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,214 @@
+"""
+Tests for the schedules that are compiled by hb_ScheduleCompiler.
+
+The values of the schedules that ReadEPSchedules supported before the schedules were
+compiled are checked against the original class in baseline_ReadEPSchedules.py.
+"""
+import os
+import unittest
+
+from hbsource import loadClasses
+
+baselineFilePath = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline_ReadEPSchedules.py")
+
+monthDays = [31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31]
+
+
+class FakeGhenv(object):
+    Component = None
+
+
+class ScriptContext(object):
+    def __init__(self, sticky):
+        self.sticky = sticky
+
+
+class Preparation(object):
+    def getJD(self, month, day):
+        return sum(monthDays[:month - 1]) + day
+
+
+def schedule(objClass, *fields):
+    EPObject = {0: objClass}
+    for count, field in enumerate(fields): EPObject[count + 1] = (field, "")
+    return EPObject
+
+
+sc = ScriptContext({})
+namespace = {"os": os, "sc": sc, "ghenv": FakeGhenv}
+hb = loadClasses(["hb_EPLibrary", "EPScheduleAux", "EPObjectsAux", "hb_CompiledSchedule",
+                  "hb_ScheduleCompiler", "ReadEPSchedules"], namespace)
+hb_EPLibrary = hb["hb_EPLibrary"]
+hb_ScheduleCompiler = hb["hb_ScheduleCompiler"]
+ReadEPSchedules = hb["ReadEPSchedules"]
+BaselineReadEPSchedules = loadClasses(["ReadEPSchedules"], {"sc": sc, "ghenv": FakeGhenv},
+                                      baselineFilePath)["ReadEPSchedules"]
+
+week = ["sunday", "monday", "tuesday", "wednesday", "thursday", "friday", "saturday"]
+
+
+def scheduleLibrary():
+    library = hb_EPLibrary({
+        "NIGHT": schedule("Schedule:Day:Interval", "Fraction", "No",
+                          "08:00", "1", "18:00", "0", "24:00", "0.5"),
+        "DAY": schedule("Schedule:Day:Interval", "Fraction", "No",
+                        "07:00", "0", "12:00", "1", "13:00", "0.25", "19:00", "1", "24:00", "0"),
+        "OFF": schedule("Schedule:Day:Interval", "Fraction", "No", "24:00", "0"),
+        "HALF HOUR": schedule("Schedule:Day:Interval", "Fraction", "Average", "08:30", "0", "24:00", "1"),
+        "HALF HOUR STEP": schedule("Schedule:Day:Interval", "Fraction", "No", "08:30", "0", "24:00", "1"),
+        "OFFICE WEEK": schedule("Schedule:Week:Daily", "NIGHT", "DAY", "DAY", "DAY", "DAY", "DAY",
+                                "OFF", "OFF", "DAY", "NIGHT", "OFF", "OFF"),
+        "SUMMER WEEK": schedule("Schedule:Week:Daily", "OFF", "NIGHT", "NIGHT", "DAY", "DAY", "DAY",
+                                "NIGHT", "NIGHT", "DAY", "NIGHT", "OFF", "OFF"),
+        "OFFICE YEAR": schedule("Schedule:Year", "Fraction", "OFFICE WEEK", "1", "1", "5", "31",
+                                "SUMMER WEEK", "6", "1", "8", "31", "OFFICE WEEK", "9", "1", "12", "31"),
+        "OFFICE COMPACT": schedule("Schedule:Compact", "Fraction", "Through: 12/31",
+                                   "For: Weekdays", "Until: 08:00", "0", "Until: 18:00", "1", "Until: 24:00", "0",
+                                   "For: Saturday", "Until: 12:00", "0.5", "Until: 24:00", "0",
+                                   "For: AllOtherDays", "Until: 24:00", "0.1"),
+        "SEASONS": schedule("Schedule:Compact", "On/Off", "Through: 3/31",
+                            "For: AllDays", "Until: 24:00", "1",
+                            "Through: 12/31", "For: Weekdays", "Until: 24:00", "2",
+                            "For: AllOtherDays", "Interpolate: Average", "Until: 06:30", "0", "Until: 24:00", "3"),
+        "CONSTANT": schedule("Schedule:Constant", "Fraction", "0.75")})
+    typeLimits = hb_EPLibrary({
+        "FRACTION": schedule("ScheduleTypeLimits", "0", "1", "Continuous"),
+        "ON/OFF": schedule("ScheduleTypeLimits", "0", "3", "Discrete")})
+    return library, typeLimits
+
+
+class ScheduleTest(unittest.TestCase):
+    
+    def setUp(self):
+        sc.sticky.clear()
+        sc.sticky["honeybee_ScheduleLib"], sc.sticky["honeybee_ScheduleTypeLimitsLib"] = scheduleLibrary()
+        sc.sticky["honeybee_EPScheduleAUX"] = hb["EPScheduleAux"]
+        sc.sticky["honeybee_EPObjectsAUX"] = hb["EPObjectsAux"]
+        sc.sticky["ladybug_Preparation"] = Preparation
+        hb_ScheduleCompiler.clearCache()
+
+
+class BaselineValuesTest(ScheduleTest):
+    
+    def assertSameValues(self, schName, startDayOfTheWeek = 0):
+        baselineValues = BaselineReadEPSchedules(schName, startDayOfTheWeek).getScheduleValues()
+        values = ReadEPSchedules(schName, startDayOfTheWeek).getScheduleValues()
+        if baselineValues and isinstance(baselineValues[0], list):
+            values = map(list, values)
+        self.assertEqual(list(values), baselineValues)
+    
+    def test_daySchedule(self):
+        self.assertSameValues("NIGHT")
+        self.assertSameValues("DAY")
+    
+    def test_weekSchedule(self):
+        for startDayOfTheWeek in range(7):
+            self.assertSameValues("OFFICE WEEK", startDayOfTheWeek)
+    
+    def test_yearSchedule(self):
+        self.assertSameValues("OFFICE YEAR")
+        self.assertSameValues("office year", 3)
+    
+    def test_yearHolidays(self):
+        baselineValues = BaselineReadEPSchedules("OFFICE YEAR", 0).getHolidaySchedValues()
+        values = ReadEPSchedules("OFFICE YEAR", 0).getHolidaySchedValues()
+        self.assertEqual([[startDay, endDay, list(profile)] for startDay, endDay, profile in values],
+                         baselineValues)
+    
+    def test_compactSchedule(self):
+        self.assertSameValues("OFFICE COMPACT")
+    
+    def test_yearValuesAreShared(self):
+        schedule = hb_ScheduleCompiler(0).compile("OFFICE YEAR")
+        # OFF is the same as the profile of the days that are not in any of the weeks
+        self.assertEqual(len(schedule.dayProfiles), 3)
+        self.assertEqual(len(schedule.getValues()), 8760)
+        self.assertTrue(hb_ScheduleCompiler(0).compile("Office Year") is schedule)
+
+
+class CompactScheduleTest(ScheduleTest):
+    
+    def dayValues(self, schName, day, startDayOfTheWeek = 0, timestep = 1):
+        schedule = hb_ScheduleCompiler(startDayOfTheWeek, timestep).compile(schName)
+        return list(schedule.getDayValues()[day])
+    
+    def test_through(self):
+        # 3/31 is the 90th day of the year
+        for day in range(90):
+            self.assertEqual(self.dayValues("SEASONS", day), 24 * [1])
+        # day 90 is the 1st of April and a Saturday when the year starts on Sunday
+        self.assertEqual(self.dayValues("SEASONS", 92), 24 * [2])
+        self.assertEqual(self.dayValues("SEASONS", 362), 24 * [2])
+    
+    def test_forAllOtherDays(self):
+        # weekend days get the AllOtherDays schedule
+        for day in [90, 91, 97, 98]:
+            self.assertEqual(self.dayValues("SEASONS", day)[7:], 17 * [3])
+        self.assertEqual(self.dayValues("OFFICE COMPACT", 0), 24 * [0.1])
+        self.assertEqual(self.dayValues("OFFICE COMPACT", 6), 12 * [0.5] + 12 * [0])
+    
+    def test_startDayOfTheWeek(self):
+        # day 90 is a Monday when the year starts on Tuesday
+        self.assertEqual(self.dayValues("SEASONS", 90, startDayOfTheWeek = 2), 24 * [2])
+        self.assertEqual(self.dayValues("SEASONS", 90, startDayOfTheWeek = 0)[7:], 17 * [3])
+    
+    def test_interpolate(self):
+        # 06:00 to 07:00 is 0 for half of the hour and 3 for the other half
+        self.assertEqual(self.dayValues("SEASONS", 90)[5:8], [0, 1.5, 3])
+        self.assertEqual(self.dayValues("SEASONS", 90, timestep = 2)[11:15], [0, 0, 3, 3])
+        self.assertEqual(self.dayValues("HALF HOUR", 0)[7:10], [0, 0.5, 1])
+    
+    def test_untilMinutesWithoutInterpolate(self):
+        # the value at the end of the timestep is used
+        self.assertEqual(self.dayValues("HALF HOUR STEP", 0)[7:10], [0, 1, 1])
+        values = self.dayValues("HALF HOUR STEP", 0, timestep = 4)
+        self.assertEqual(len(values), 96)
+        self.assertEqual(values[32:36], [0, 0, 1, 1])
+    
+    def test_constant(self):
+        schedule = ReadEPSchedules("CONSTANT", 0)
+        self.assertEqual(list(schedule.getScheduleValues()), 24 * [0.75])
+        self.assertEqual(len(schedule.getHourlyValues()), 8760)
+
+
+class CacheTest(ScheduleTest):
+    
+    def test_cacheIsUpdatedWhenScheduleChanges(self):
+        compiler = hb_ScheduleCompiler(0)
+        self.assertEqual(list(compiler.compile("CONSTANT").dayProfiles[0]), 24 * [0.75])
+        
+        sc.sticky["honeybee_ScheduleLib"]["CONSTANT"] = schedule("Schedule:Constant", "Fraction", "0.25")
+        self.assertEqual(list(compiler.compile("CONSTANT").dayProfiles[0]), 24 * [0.25])
+    
+    def test_cacheIsUpdatedWhenDayScheduleOfWeekChanges(self):
+        compiler = hb_ScheduleCompiler(0)
+        self.assertEqual(compiler.compile("OFFICE WEEK").getDayValues()[6], 24 * (0.0,))
+        
+        sc.sticky["honeybee_ScheduleLib"]["OFF"] = schedule("Schedule:Day:Interval", "Fraction", "No", "24:00", "0.2")
+        self.assertEqual(compiler.compile("OFFICE WEEK").getDayValues()[6], 24 * (0.2,))
+    
+    def test_cacheIsUpdatedWhenScheduleIsRemoved(self):
+        compiler = hb_ScheduleCompiler(0)
+        self.assertTrue(compiler.compile("CONSTANT") is not None)
+        
+        sc.sticky["honeybee_ScheduleLib"].pop("CONSTANT")
+        self.assertEqual(compiler.compile("CONSTANT"), None)
+    
+    def test_cacheIsUpdatedWhenTypeLimitsChange(self):
+        compiler = hb_ScheduleCompiler(0)
+        self.assertEqual(compiler.compile("SEASONS").unit, "Discrete")
+        
+        sc.sticky["honeybee_ScheduleTypeLimitsLib"]["ON/OFF"] = \
+            schedule("ScheduleTypeLimits", "0", "3", "Discrete", "Availability")
+        self.assertEqual(compiler.compile("SEASONS").unit, "Availability")
+    
+    def test_cacheIsUpdatedWhenLibraryIsReplaced(self):
+        compiler = hb_ScheduleCompiler(0)
+        compiler.compile("CONSTANT")
+        
+        sc.sticky["honeybee_ScheduleLib"] = hb_EPLibrary({"CONSTANT": schedule("Schedule:Constant", "Fraction", "1")})
+        self.assertEqual(list(compiler.compile("CONSTANT").dayProfiles[0]), 24 * [1])
+
+
+if __name__ == "__main__":
+    unittest.main()
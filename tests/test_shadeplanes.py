@@ -0,0 +1,64 @@
+"""Tests for the planes and the values of the shade cells of Energy Shade Benefit Evaluator."""
+import math
+import unittest
+
+from hbsource import loadClasses
+
+hb = loadClasses(["getShadePlanes", "valCalc"], {"math": math}, "Honeybee_Energy Shade Benefit Evaluator.py")
+getShadePlanes = hb["getShadePlanes"]
+valCalc = hb["valCalc"]
+
+
+def polygonArea(polygon):
+    area = 0
+    for i, (u, w) in enumerate(polygon):
+        un, wn = polygon[(i + 1) % len(polygon)]
+        area += u * wn - un * w
+    return abs(area) / 2
+
+
+class ShadePlanesTest(unittest.TestCase):
+    
+    def test_planarShade(self):
+        faces = [[(0, 0, 3), (1, 0, 3), (1, 1, 3), (0, 1, 3)], [(1, 0, 3), (2, 0, 3), (2, 1, 3), (1, 1, 3)]]
+        planes = getShadePlanes(faces, 0.001)
+        self.assertEqual(len(planes), 1)
+        self.assertEqual([faceCount for faceCount, polygon in planes[0]["faces"]], [0, 1])
+        for faceCount, polygon in planes[0]["faces"]:
+            self.assertAlmostEqual(polygonArea(polygon), 1)
+    
+    def test_firstEdgeIsDegenerate(self):
+        # a quad with a duplicated first vertex is a triangle
+        faces = [[(0, 0, 3), (0, 0, 3), (1, 0, 3), (0, 1, 3)]]
+        planes = getShadePlanes(faces, 0.001)
+        self.assertEqual(len(planes), 1)
+        xAxis, yAxis = planes[0]["xAxis"], planes[0]["yAxis"]
+        self.assertAlmostEqual(sum(a * a for a in xAxis), 1)
+        self.assertAlmostEqual(sum(a * b for a, b in zip(xAxis, yAxis)), 0)
+        self.assertAlmostEqual(polygonArea(planes[0]["faces"][0][1]), 0.5)
+    
+    def test_degenerateFaceIsSkipped(self):
+        faces = [[(0, 0, 3), (0, 0, 3), (0, 0, 3)], [(0, 0, 3), (1, 0, 3), (1, 1, 3), (0, 1, 3)]]
+        planes = getShadePlanes(faces, 0.001)
+        self.assertEqual([faceCount for faceCount, polygon in planes[0]["faces"]], [1])
+    
+    def test_curvedShade(self):
+        faces = [[(0, 0, 0), (1, 0, 0), (1, 1, 0), (0, 1, 0.5)]]
+        self.assertEqual(getShadePlanes(faces, 0.001), None)
+
+
+class ValCalcTest(unittest.TestCase):
+    
+    def test_percentBlocked(self):
+        # 4 test points, 2 of them are blocked in hour 0 and all of them in hour 1
+        coolEffect, heatEffect, netEffect = valCalc([{0: 2, 1: 4}], 4, [10.0, 20.0], [-1.0, -2.0], [2.0], 0)
+        self.assertEqual(coolEffect, [12.5])
+        self.assertEqual(heatEffect, [-1.25])
+        self.assertEqual(netEffect, [11.25])
+    
+    def test_extraDivisor(self):
+        self.assertEqual(valCalc([{1: 4}], 4, [10.0, 20.0], [-1.0, -2.0], [2.0], 2)[0], [5.0])
+
+
+if __name__ == "__main__":
+    unittest.main()
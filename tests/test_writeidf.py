@@ -0,0 +1,238 @@
+"""
+Golden file tests for the idf strings of WriteIDF in Honeybee_ Run Energy Simulation.
+
+golden/writeidf_model.idf was written by the WriteIDF of Run Energy Simulation before
+the idf file was buffered and the library strings were reused (git show f1bd46a^), so
+the tests check that the output of the current WriteIDF is the same byte for byte.
+"""
+import math
+import os
+import shutil
+import tempfile
+import unittest
+
+from hbsource import loadClasses
+
+goldenFilePath = os.path.join(os.path.dirname(os.path.abspath(__file__)), "golden", "writeidf_model.idf")
+
+
+class Point(object):
+    def __init__(self, x, y, z):
+        self.X, self.Y, self.Z = x, y, z
+    
+    def DistanceTo(self, other):
+        return math.sqrt((self.X - other.X) ** 2 + (self.Y - other.Y) ** 2 + (self.Z - other.Z) ** 2)
+
+
+class Doc(object):
+    ModelAbsoluteTolerance = 0.001
+
+
+class ScriptContext(object):
+    def __init__(self, sticky):
+        self.sticky = sticky
+        self.doc = Doc()
+
+
+class Record(object):
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+
+def pts(*coordinates):
+    return [Point(*xyz) for xyz in coordinates]
+
+
+def libraries(hb_EPLibrary):
+    materials = hb_EPLibrary({
+        "BRICK": {0: "Material", 1: ["MediumRough", "Roughness"], 2: [0.1016, "Thickness {m}"], \
+                  3: [0.89, "Conductivity {W/m-K}"], 4: [1920, "Density {kg/m3}"], 5: [790, "Specific Heat {J/kg-K}"]},
+        "INSULATION R-3": {0: "Material:NoMass", 1: ["Smooth", "Roughness"], 2: [0.1 + 0.2, "Thermal Resistance {m2-K/W}"]},
+        "GYPSUM": {0: "Material", 1: ["Smooth", "Roughness"], 2: ["0.0127", "Thickness {m}"], \
+                   3: ["0.16", "Conductivity {W/m-K}"], 4: ["800", "Density {kg/m3}"], 5: ["1090", "Specific Heat {J/kg-K}"]}})
+    windowMaterials = hb_EPLibrary({
+        "GLAZING": {0: "WindowMaterial:SimpleGlazingSystem", 1: [2.0, "U-Factor {W/m2-K}"], \
+                    2: [0.4, "Solar Heat Gain Coefficient"], 3: [0.6, "Visible Transmittance"]}})
+    constructions = hb_EPLibrary({
+        "WALL": {0: "Construction", 1: ["BRICK", "Outside Layer"], 2: ["INSULATION R-3", "Layer 2"], 3: ["GYPSUM", "Layer 3"]},
+        "WINDOW": {0: "Construction", 1: ["GLAZING", "Outside Layer"]},
+        "MASS": {0: "Construction", 1: ["GYPSUM", "Outside Layer"]}})
+    schedules = hb_EPLibrary({
+        "OCCUPANCY": {0: "Schedule:Compact", 1: ["Fraction", "Schedule Type Limits Name"], 2: ["Through: 12/31", "Field 1"], \
+                      3: ["For: Weekdays", "Field 2"], 4: ["Until: 08:00", "Field 3"], 5: ["0", "Field 4"], \
+                      6: ["Until: 18:00", "Field 5"], 7: ["1", "Field 6"], 8: ["For: AllOtherDays", "Field 7"], \
+                      9: ["Until: 24:00", "Field 8"], 10: [0.25, "Field 9"]},
+        "ALWAYS ON": {0: "Schedule:Constant", 1: ["On/Off", "Schedule Type Limits Name"], 2: [1, "Hourly Value"]}})
+    typeLimits = hb_EPLibrary({
+        "FRACTION": {0: "ScheduleTypeLimits", 1: ["0", "Lower Limit Value"], 2: ["1", "Upper Limit Value"], \
+                     3: ["Continuous", "Numeric Type"]},
+        "ANY NUMBER": {0: "ScheduleTypeLimits"}})
+    return {"honeybee_materialLib": materials, "honeybee_windowMaterialLib": windowMaterials, \
+            "honeybee_constructionLib": constructions, "honeybee_ScheduleLib": schedules, \
+            "honeybee_ScheduleTypeLimitsLib": typeLimits}
+
+
+def buildModel():
+    """Two zones. zone_2 is a non-planar zone with its curved wall split into planar pieces."""
+    srfType = {0: "WALL", 1: "ROOF", 2: "FLOOR", 3: "CEILING", 5: "Window"}
+    outdoors = Record(name = "")
+    zones = []
+    for zoneCount, zoneName in enumerate(["zone_1", "zone_2"]):
+        zone = Record(name = zoneName, isPlenum = zoneCount == 1, partOfArea = True, north = 0, \
+                      origin = Point(0.0, 0.0, 0.0), zoneType = 1, multiplier = 1, ceilingHeight = "autocalculate", \
+                      volume = "autocalculate", floorArea = "autocalculate", insideConvectionAlgorithm = "TARP", \
+                      outsideConvectionAlgorithm = "DOE-2", surfaces = [], internalMass = [])
+        zones.append(zone)
+    
+    def surface(zone, name, coordinates, srfTypeIndex, children = ()):
+        srf = Record(name = name, coordinates = coordinates, type = srfTypeIndex, srfType = srfType, \
+                     construction = "WALL", parent = zone, BC = "Outdoors", BCObject = outdoors, \
+                     sunExposure = "SunExposed", windExposure = "WindExposed", groundViewFactor = "autocalculate", \
+                     childSrfs = list(children), hasChild = bool(children))
+        for child in srf.childSrfs: child.parent = srf
+        zone.surfaces.append(srf)
+        return srf
+    
+    def window(name, coordinates, shadingControlName = ()):
+        return Record(name = name, coordinates = coordinates, type = 5, srfType = srfType, construction = "WINDOW", \
+                      BCObject = outdoors, groundViewFactor = "autocalculate", frameName = "", Multiplier = 1, \
+                      shadingControlName = list(shadingControlName))
+    
+    zone1, zone2 = zones
+    # plain box zone with a window and a duplicated vertex that is removed
+    surface(zone1, "zone_1_wall_south", pts((0, 0, 0), (5, 0, 0), (5, 0, 3), (0, 0, 3)), 0, \
+            [window("zone_1_glz_0", pts((1, 0, 0.9), (4, 0, 0.9), (4, 0, 2.4), (1, 0, 2.4)), ["SHADE_CNTRL"])])
+    surface(zone1, "zone_1_wall_east", pts((5, 0, 0), (5, 4, 0), (5, 4, 3), (5, 4, 3.0000001), (5, 0, 3)), 0)
+    surface(zone1, "zone_1_roof", pts((0, 0, 3), (5, 0, 3), (5, 4, 3), (0, 4, 3)), 1)
+    surface(zone1, "zone_1_floor", pts((0, 4, 0), (5, 4, 0), (5, 0, 0), (0, 0, 0)), 2)
+    # air wall type is written as a wall
+    surface(zone1, "zone_1_airwall", pts((0, 4, 0), (0, 0, 0), (0, 0, 3), (0, 4, 3)), 4)
+    # a surface with less than 3 distinct vertices is skipped
+    surface(zone1, "zone_1_sliver", pts((0, 0, 0), (0, 0, 0.0001), (0, 0, 0.0002)), 0)
+    
+    # non-planar zone: the curved wall is split into planar pieces with coordinates that are not round
+    for pieceCount in range(4):
+        a0 = math.pi * pieceCount / 8
+        a1 = math.pi * (pieceCount + 1) / 8
+        surface(zone2, "zone_2_curvedWall_%d"%pieceCount, \
+                pts((10 + 3 * math.cos(a0), 3 * math.sin(a0), 0), (10 + 3 * math.cos(a1), 3 * math.sin(a1), 0), \
+                    (10 + 3 * math.cos(a1), 3 * math.sin(a1), 2.7), (10 + 3 * math.cos(a0), 3 * math.sin(a0), 2.7)), 0, \
+                [window("zone_2_curvedWall_%d_glz"%pieceCount, \
+                        pts((10 + 2.9 * math.cos(a0), 2.9 * math.sin(a0), 1.0 / 3), (10 + 2.9 * math.cos(a1), 2.9 * math.sin(a1), 1.0 / 3), \
+                            (10 + 2.9 * math.cos(a1), 2.9 * math.sin(a1), 2.2), (10 + 2.9 * math.cos(a0), 2.9 * math.sin(a0), 2.2)))] \
+                if pieceCount % 2 == 0 else [])
+    surface(zone2, "zone_2_roof", pts(*[(10 + 3 * math.cos(math.pi * i / 8), 3 * math.sin(math.pi * i / 8), 2.7) for i in range(5)] + \
+                                        [(10, 0, 2.7)]), 1)
+    
+    shading = Record(name = "overhang", TransmittanceSCH = "ALWAYS ON", containsPVgen = None, \
+                     extractPoints = lambda: [pts((1, 0, 2.5), (4, 0, 2.5), (4, -0.6, 2.5), (1, -0.6, 2.5)), \
+                                              pts((1, -0.6, 2.5), (4, -0.6, 2.5), (4, -0.7, 2.2))])
+    return zones, shading
+
+
+def writeModel(WriteIDF, idfFile, workingDir):
+    """Write the model in the same order as the main function of Run Energy Simulation."""
+    zones, shading = buildModel()
+    hb_writeIDF = WriteIDF(workingDir)
+    
+    idfFile.write(hb_writeIDF.EPShdSurface(shading))
+    for zone in zones:
+        idfFile.write(hb_writeIDF.EPZone(zone))
+        for srf in zone.surfaces:
+            idfFile.write(hb_writeIDF.EPZoneSurface(srf))
+            if srf.hasChild: idfFile.write(hb_writeIDF.EPFenSurface(srf))
+    idfFile.write(hb_writeIDF.EPInternalMass(zones[0], "zone_1_mass", 12.5, "MASS"))
+    
+    materials = []
+    for constructionName in ["WALL", "WINDOW", "MASS", "WALL"]:
+        constructionStr, constructionMaterials = hb_writeIDF.EPConstructionStr(constructionName)
+        idfFile.write(constructionStr)
+        materials.extend(constructionMaterials)
+    # materials are written twice to check the reused strings
+    for materialName in materials:
+        idfFile.write(hb_writeIDF.EPMaterialStr(materialName.upper()))
+    for scheduleName in ["fraction", "any number", "occupancy", "always on", "occupancy"]:
+        idfFile.write(hb_writeIDF.EPSCHStr(scheduleName))
+
+
+class WriteIDFTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        lib = loadClasses(["hb_EPLibrary"])
+        self.sticky = libraries(lib["hb_EPLibrary"])
+        self.sticky["honeybee_folders"] = {"EPVersion": "8-9-0"}
+        self.sc = ScriptContext(self.sticky)
+        self.hb = loadClasses(["IDFFile", "NameList", "WriteIDF"], \
+                              {"sc": self.sc, "os": os, "shutil": shutil}, "Honeybee_ Run Energy Simulation.py")
+    
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+    
+    def writeIdf(self, fileName = "model.idf"):
+        idfFilePath = os.path.join(self.folder, fileName)
+        idfFile = self.hb["IDFFile"](idfFilePath, bufferSize = 256)
+        writeModel(self.hb["WriteIDF"], idfFile, self.folder)
+        idfFile.close()
+        with open(idfFilePath, "rb") as inf:
+            return inf.read()
+    
+    def goldenModel(self, EPVersion):
+        with open(goldenFilePath, "rb") as inf:
+            return inf.read().split("!- EnergyPlus %s\n"%EPVersion)[1].split("!- EnergyPlus")[0]
+    
+    def test_goldenFile(self):
+        self.assertEqual(self.writeIdf(), self.goldenModel("8-9-0"))
+    
+    def test_goldenFileEnergyPlus9(self):
+        # the fenestration surfaces don't have a shading control field in EnergyPlus 9
+        self.sticky["honeybee_folders"]["EPVersion"] = "9-0-1"
+        self.assertEqual(self.writeIdf(), self.goldenModel("9-0-1"))
+    
+    def test_reusedStringsAreTheSame(self):
+        firstRun = self.writeIdf("first.idf")
+        self.assertTrue(self.sticky["honeybee_EPLibraryStrings"]["strings"])
+        self.assertEqual(self.writeIdf("second.idf"), firstRun)
+    
+    def test_libraryObjectReplaced(self):
+        self.writeIdf()
+        self.sticky["honeybee_materialLib"]["BRICK"] = {0: "Material", 1: ["MediumRough", "Roughness"], \
+            2: [0.2, "Thickness {m}"], 3: [0.89, "Conductivity {W/m-K}"], 4: [1920, "Density {kg/m3}"], \
+            5: [790, "Specific Heat {J/kg-K}"]}
+        hb_writeIDF = self.hb["WriteIDF"](self.folder)
+        self.assertIn("  0.2,   !- Thickness {m}\n", hb_writeIDF.EPMaterialStr("BRICK"))
+    
+    def test_libraryVersionChange(self):
+        self.writeIdf()
+        strings = self.sticky["honeybee_EPLibraryStrings"]["strings"]
+        constructionString = strings[("honeybee_constructionLib", "WALL")]
+        self.sticky["honeybee_materialLib"]["NEW MATERIAL"] = {0: "Material:NoMass", 1: ["Smooth", "Roughness"]}
+        hb_writeIDF = self.hb["WriteIDF"](self.folder)
+        
+        # only the strings of the changed library are written again
+        hb_writeIDF.EPConstructionStr("WALL")
+        hb_writeIDF.EPMaterialStr("GYPSUM")
+        self.assertIs(strings[("honeybee_constructionLib", "WALL")], constructionString)
+        self.assertEqual(strings[("honeybee_materialLib", "GYPSUM")][0], \
+                         (id(self.sticky["honeybee_materialLib"]), self.sticky["honeybee_materialLib"].version))
+    
+    def test_replacedLibrary(self):
+        self.writeIdf()
+        materials = self.sticky["honeybee_materialLib"]
+        self.sticky["honeybee_materialLib"] = type(materials)({"GYPSUM": {0: "Material:NoMass", \
+            1: ["Smooth", "Roughness"], 2: ["0.5", "Thermal Resistance {m2-K/W}"]}})
+        hb_writeIDF = self.hb["WriteIDF"](self.folder)
+        self.assertIn("Material:NoMass,\n  GYPSUM,", hb_writeIDF.EPMaterialStr("GYPSUM"))
+    
+    def test_libraryStringsLimit(self):
+        self.hb["WriteIDF"].maxLibraryStrings = 3
+        try:
+            self.writeIdf()
+            self.assertGreater(len(self.sticky["honeybee_EPLibraryStrings"]["strings"]), 3)
+            self.assertEqual(self.hb["WriteIDF"](self.folder).libraryStrings, {})
+        finally:
+            del(self.hb["WriteIDF"].maxLibraryStrings)
+
+
+if __name__ == "__main__":
+    unittest.main()